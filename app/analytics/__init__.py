@@ -0,0 +1,15 @@
+"""
+Módulo de análise de séries temporais dos dados de saúde.
+
+Este módulo contém:
+- timeseries.py: Intervalos de agregação e downsampling LTTB
+- quantiles.py: Sketch de quantis KLL mesclável (percentis dos resumos)
+"""
+
+from .timeseries import parse_bucket, choose_bucket, lttb_indices
+from .quantiles import KllSketch, quantiles_from_pairs, summary_quantiles, merge_pairs
+
+__all__ = [
+    "parse_bucket", "choose_bucket", "lttb_indices",
+    "KllSketch", "quantiles_from_pairs", "summary_quantiles", "merge_pairs"
+]
@@ -0,0 +1,193 @@
+"""
+Sketch de quantis KLL (Karnin, Lang e Liberty) mesclável.
+
+A pulseira mantém um sketch por sensor a cada período de resumo e envia
+sua forma compacta: pares [valor, peso] em ordem crescente de valor, com
+valores iguais agrupados. Com poucas leituras (até k) o sketch é exato;
+acima disso, cada compactação descarta metade dos itens de um nível e
+dobra o peso dos restantes, limitando o tamanho a O(k) com erro de rank
+de aproximadamente 1,7/k.
+
+No servidor, os sketches de vários resumos são mesclados (merge) para
+obter percentis de horas ou dias sem guardar as leituras brutas.
+
+A compactação alterna o deslocamento (pares/ímpares) a cada vez em vez
+de sorteá-lo, então o resultado é determinístico para a mesma sequência
+de leituras.
+"""
+
+import math
+from typing import Dict, Iterable, List, Sequence
+
+DEFAULT_K = 200
+_MIN_CAPACITY = 8
+
+# Percentis incluídos nas estatísticas do resumo
+SUMMARY_QUANTILES = (("p5", 0.05), ("p50", 0.5), ("p95", 0.95))
+
+
+class KllSketch:
+    """
+    Sketch KLL com níveis de compactação
+
+    Args:
+        k: Tamanho do nível mais alto (precisão x memória)
+    """
+
+    __slots__ = ("k", "n", "levels", "_offsets", "_size", "_max_size")
+
+    def __init__(self, k: int = DEFAULT_K):
+        if k < _MIN_CAPACITY:
+            raise ValueError(f"k deve ser pelo menos {_MIN_CAPACITY}")
+        self.k = k
+        self.n = 0
+        self.levels = [[]]
+        self._offsets = [0]
+        self._size = 0
+        self._max_size = self._capacity(0)
+
+    def _capacity(self, h: int) -> int:
+        depth = len(self.levels) - h - 1
+        return max(_MIN_CAPACITY, int(math.ceil(self.k * (2 / 3) ** depth)))
+
+    def _grow(self):
+        self.levels.append([])
+        self._offsets.append(0)
+        self._max_size = sum(self._capacity(h) for h in range(len(self.levels)))
+
+    def add(self, value):
+        """Adiciona uma leitura (O(1) amortizado)"""
+        self.levels[0].append(value)
+        self.n += 1
+        self._size += 1
+        if self._size >= self._max_size:
+            self._compress()
+
+    def _compress(self):
+        """Compacta níveis cheios, do mais baixo para o mais alto, até caber no limite"""
+        for h in range(len(self.levels)):
+            if len(self.levels[h]) < self._capacity(h):
+                continue
+            if h + 1 == len(self.levels):
+                self._grow()
+            items = sorted(self.levels[h])
+            # Com quantidade ímpar, o menor item fica no nível
+            keep = [items.pop(0)] if len(items) % 2 else []
+            offset = self._offsets[h]
+            self._offsets[h] ^= 1
+            self.levels[h + 1].extend(items[offset::2])
+            self.levels[h] = keep
+            self._size = sum(len(level) for level in self.levels)
+            if self._size < self._max_size:
+                break
+
+    def merge(self, other: "KllSketch"):
+        """Incorpora outro sketch (o resultado equivale a ter visto as duas sequências)"""
+        while len(self.levels) < len(other.levels):
+            self._grow()
+        for h, level in enumerate(other.levels):
+            self.levels[h].extend(level)
+        self.n += other.n
+        self._size = sum(len(level) for level in self.levels)
+        while self._size >= self._max_size:
+            self._compress()
+
+    def to_pairs(self) -> List[List]:
+        """Forma compacta: [[valor, peso], ...] em ordem crescente de valor"""
+        weights = {}
+        for h, level in enumerate(self.levels):
+            weight = 1 << h
+            for value in level:
+                weights[value] = weights.get(value, 0) + weight
+        return [[value, weights[value]] for value in sorted(weights)]
+
+    @classmethod
+    def from_pairs(cls, pairs: Iterable[Sequence], k: int = DEFAULT_K) -> "KllSketch":
+        """
+        Reconstrói um sketch a partir da forma compacta (cada peso é
+        decomposto em potências de 2, uma por nível)
+
+        Raises:
+            ValueError: Se os pares forem inválidos
+        """
+        sketch = cls(k)
+        try:
+            for value, weight in pairs:
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    raise ValueError(f"valor inválido: {value!r}")
+                if isinstance(weight, bool) or not isinstance(weight, int) or weight <= 0:
+                    raise ValueError(f"peso inválido: {weight!r}")
+                h = 0
+                remaining = weight
+                while remaining:
+                    if remaining & 1:
+                        while len(sketch.levels) <= h:
+                            sketch._grow()
+                        sketch.levels[h].append(value)
+                    remaining >>= 1
+                    h += 1
+                sketch.n += weight
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Sketch inválido: {e}")
+        sketch._size = sum(len(level) for level in sketch.levels)
+        while sketch._size >= sketch._max_size:
+            sketch._compress()
+        return sketch
+
+    def to_state(self) -> List:
+        """Estado completo (níveis e deslocamentos), para checkpoint"""
+        return [self.k, self.n, [list(level) for level in self.levels], list(self._offsets)]
+
+    @classmethod
+    def from_state(cls, state: Sequence) -> "KllSketch":
+        """Restaura o sketch exatamente como estava (as próximas compactações são as mesmas)"""
+        k, n, levels, offsets = state
+        sketch = cls(k)
+        sketch.n = n
+        sketch.levels = [list(level) for level in levels]
+        sketch._offsets = list(offsets)
+        sketch._size = sum(len(level) for level in sketch.levels)
+        sketch._max_size = sum(sketch._capacity(h) for h in range(len(sketch.levels)))
+        return sketch
+
+    def quantiles(self, qs: Sequence[float]) -> List:
+        return quantiles_from_pairs(self.to_pairs(), qs)
+
+
+def quantiles_from_pairs(pairs: Sequence[Sequence], qs: Sequence[float]) -> List:
+    """
+    Quantis (rank mais próximo: primeiro valor cujo peso acumulado atinge
+    q * total) a partir da forma compacta; None se não houver itens
+    """
+    total = 0
+    for _, weight in pairs:
+        total += weight
+    results = []
+    for q in qs:
+        if not total:
+            results.append(None)
+            continue
+        target = q * total
+        cumulative = 0
+        value = pairs[-1][0]
+        for item, weight in pairs:
+            cumulative += weight
+            if cumulative >= target:
+                value = item
+                break
+        results.append(value)
+    return results
+
+
+def summary_quantiles(pairs: Sequence[Sequence]) -> Dict:
+    """Percentis do resumo (p5/p50/p95) a partir da forma compacta"""
+    values = quantiles_from_pairs(pairs, [q for _, q in SUMMARY_QUANTILES])
+    return {name: value for (name, _), value in zip(SUMMARY_QUANTILES, values)}
+
+
+def merge_pairs(sketches: Iterable[Sequence[Sequence]], k: int = DEFAULT_K) -> KllSketch:
+    """Mescla vários sketches na forma compacta em um único KllSketch"""
+    merged = KllSketch(k)
+    for pairs in sketches:
+        merged.merge(KllSketch.from_pairs(pairs, k))
+    return merged
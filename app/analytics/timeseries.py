@@ -0,0 +1,79 @@
+"""
+Funções de apoio às séries temporais (/patients/{id}/series).
+
+- parse_bucket / choose_bucket: tamanho dos intervalos de agregação
+- lttb_indices: downsampling Largest-Triangle-Three-Buckets, que limita
+  o número de pontos preservando picos e vales da curva
+"""
+
+import math
+import re
+import numpy as np
+
+_BUCKET_RE = re.compile(r"^(\d+)([smhd])$")
+_UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+# Intervalos "redondos" usados na escolha automática
+_NICE_BUCKETS = [60, 300, 600, 900, 1800, 3600, 7200, 10800, 21600, 43200, 86400]
+
+def parse_bucket(bucket: str) -> int:
+    """
+    Converte um intervalo como "30s", "5m", "1h" ou "1d" em segundos.
+    
+    Raises:
+        ValueError: Se o formato for inválido
+    """
+    match = _BUCKET_RE.match(bucket.strip().lower())
+    if not match or int(match.group(1)) == 0:
+        raise ValueError(f"Intervalo inválido: {bucket} (use ex: 30s, 5m, 1h, 1d)")
+    return int(match.group(1)) * _UNIT_SECONDS[match.group(2)]
+
+def choose_bucket(range_seconds: float, max_points: int) -> int:
+    """Escolhe o menor intervalo "redondo" que gera no máximo max_points pontos"""
+    minimum = math.ceil(range_seconds / max_points)
+    for bucket in _NICE_BUCKETS:
+        if bucket >= minimum:
+            return bucket
+    return math.ceil(minimum / 86400) * 86400
+
+def lttb_indices(x, y, threshold: int) -> np.ndarray:
+    """
+    Seleciona `threshold` pontos de uma série com o algoritmo LTTB.
+    
+    Args:
+        x: Coordenadas x (ex: timestamps), em ordem crescente
+        y: Valores da série
+        threshold: Número máximo de pontos mantidos (>= 3)
+    
+    Returns:
+        np.ndarray: Índices dos pontos selecionados (sempre inclui o primeiro e o último)
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    
+    # Limites dos buckets internos (primeiro e último ponto ficam fixos)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0] = 0
+    selected[-1] = n - 1
+    
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # Média do próximo bucket (ou o último ponto)
+        next_start, next_end = end, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+        
+        # Área do triângulo (a, candidato, média do próximo bucket)
+        areas = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(areas))
+        selected[i + 1] = a
+    
+    return selected
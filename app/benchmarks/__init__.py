@@ -0,0 +1,6 @@
+"""
+Benchmarks do sistema de monitoramento.
+
+Execute a partir da pasta app, por exemplo:
+    python -m benchmarks.bench_payloads
+"""
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark da geração de leituras: sensores individuais x sensores em lote
+
+Os dois lados partem da mesma mistura de status (parte das pulseiras em
+alerta ou crítica) e avançam o mesmo número de ciclos. Compara leituras
+por segundo e as distribuições resultantes (média e percentis de cada
+sensor), e confere o intervalo mínimo entre quedas nos sensores em lote.
+
+Uso (a partir da pasta app):
+    python -m benchmarks.bench_batch_sensors [--devices 10000] [--batch-devices 1000000]
+"""
+
+import argparse
+import random
+import time
+import numpy as np
+from sensors.heart_rate_sensor import HeartRateSensor
+from sensors.stress_sensor import StressSensor
+from sensors.temperature_sensor import TemperatureSensor
+from sensors.oxygen_sensor import OxygenSensor
+from sensors.fall_sensor import FallSensor, FALL_REFRACTORY_SECONDS
+from sensors.batch_sensors import BatchPulseiras
+
+SENSORS = ('heart_rate', 'stress_level', 'temperature', 'oxygen_saturation')
+STATUS_KEYS = ('heart_rate', 'stress', 'temperature', 'oxygen')
+
+def _statuses(n_devices: int, seed: int):
+    """Um sensor alterado em parte das pulseiras (como no simulador de frota)"""
+    rng = np.random.default_rng(seed)
+    draw = rng.random(n_devices)
+    status = np.where(draw < 0.02, 'critical', np.where(draw < 0.12, 'alert', 'stable'))
+    altered = rng.integers(0, len(STATUS_KEYS), n_devices)
+    return {key: np.where(altered == k, status, 'stable') for k, key in enumerate(STATUS_KEYS)}
+
+def _run_scalar(statuses, n_devices: int, ticks: int, seed: int):
+    random.seed(seed)
+    devices = [[HeartRateSensor("P", statuses['heart_rate'][i]), StressSensor("P", statuses['stress'][i]),
+                TemperatureSensor("P", statuses['temperature'][i]), OxygenSensor("P", statuses['oxygen'][i]),
+                FallSensor("P")] for i in range(n_devices)]
+    values = {sensor: np.empty((ticks, n_devices)) for sensor in SENSORS}
+    t0 = time.perf_counter()
+    for t in range(ticks):
+        for i, sensors in enumerate(devices):
+            for sensor_type, sensor in zip(SENSORS, sensors):
+                values[sensor_type][t, i] = sensor.read_value()
+            sensors[4].read_value()
+    return values, time.perf_counter() - t0
+
+def _run_batch(statuses, n_devices: int, ticks: int, interval: float, seed: int):
+    pulseiras = BatchPulseiras(n_devices, statuses, seed=seed)
+    values = {sensor: np.empty((ticks, n_devices), dtype=np.float32) for sensor in SENSORS}
+    falls = np.zeros((ticks, n_devices), dtype=bool)
+    t0 = time.perf_counter()
+    for t in range(ticks):
+        readings = pulseiras.tick(1_000_000.0 + t * interval)
+        for sensor_type in SENSORS:
+            values[sensor_type][t] = readings[sensor_type]
+        falls[t] = readings['fall_detection'] == 1.0
+    return values, falls, time.perf_counter() - t0
+
+def _min_fall_gap(falls: np.ndarray, interval: float) -> float:
+    """Menor intervalo entre duas quedas da mesma pulseira (inf se nenhuma caiu duas vezes)"""
+    tick_idx, device = np.nonzero(falls)
+    order = np.lexsort((tick_idx, device))
+    tick_idx, device = tick_idx[order], device[order]
+    same = device[1:] == device[:-1]
+    gaps = np.diff(tick_idx)[same] * interval
+    return float(gaps.min()) if len(gaps) else float('inf')
+
+def main():
+    parser = argparse.ArgumentParser(description="Geração de leituras: sensores individuais x em lote")
+    parser.add_argument("--devices", type=int, default=10_000, help="Pulseiras nos sensores individuais")
+    parser.add_argument("--batch-devices", type=int, default=1_000_000, help="Pulseiras nos sensores em lote")
+    parser.add_argument("--ticks", type=int, default=30)
+    parser.add_argument("--interval", type=float, default=10.0, help="Segundos simulados entre ciclos")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    readings_per_device = len(SENSORS) + 1
+    scalar_values, scalar_seconds = _run_scalar(_statuses(args.devices, args.seed), args.devices,
+                                                args.ticks, args.seed)
+    batch_values, falls, batch_seconds = _run_batch(_statuses(args.batch_devices, args.seed),
+                                                    args.batch_devices, args.ticks, args.interval, args.seed)
+    scalar_rate = args.devices * args.ticks * readings_per_device / scalar_seconds
+    batch_rate = args.batch_devices * args.ticks * readings_per_device / batch_seconds
+
+    print(f"\n📊 === GERAÇÃO DE LEITURAS ({args.ticks} ciclos) ===")
+    print(f"Sensores individuais: {args.devices:>9,} pulseiras {scalar_rate:>14,.0f} leituras/s")
+    print(f"Sensores em lote:     {args.batch_devices:>9,} pulseiras {batch_rate:>14,.0f} leituras/s "
+          f"({batch_rate / scalar_rate:.0f}x)")
+
+    print(f"\n{'sensor':<18} {'média ind.':>10} {'média lote':>10} {'p5 ind.':>8} {'p5 lote':>8} {'p95 ind.':>9} {'p95 lote':>9}")
+    for sensor_type in SENSORS:
+        scalar = scalar_values[sensor_type].ravel()
+        batch = batch_values[sensor_type].ravel()
+        print(f"{sensor_type:<18} {scalar.mean():>10.2f} {batch.mean():>10.2f} "
+              f"{np.percentile(scalar, 5):>8.1f} {np.percentile(batch, 5):>8.1f} "
+              f"{np.percentile(scalar, 95):>9.1f} {np.percentile(batch, 95):>9.1f}")
+
+    print(f"\n🤸 Quedas (lote): {int(falls.sum()):,} | menor intervalo entre quedas da mesma pulseira: "
+          f"{_min_fall_gap(falls, args.interval):.0f}s (mínimo {FALL_REFRACTORY_SECONDS}s)")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Benchmark do checkpoint do EdgeProcessor (reinício da frota simulada)
+
+N pulseiras processam ciclos em tempo simulado (parte delas com oxigenação
+baixa sustentada, ou seja, com episódios de alerta abertos e suprimidos).
+No instante do reinício, o estado de todas é gravado em disco; depois:
+- referência: os mesmos processadores continuam sem reiniciar;
+- restaurado: processadores novos carregados do checkpoint;
+- sem checkpoint: processadores novos (partida a frio).
+
+Mede o tempo de gravação e de restauração por mil pulseiras e as
+emergências enviadas nos minutos seguintes ao reinício. Confere também que
+um checkpoint vencido (só os agregados) gera o resumo seguinte mesmo se um
+sensor restaurado não mandar mais leituras.
+
+Uso (a partir da pasta app):
+    python -m benchmarks.bench_edge_checkpoint [--devices 1000]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+import numpy as np
+from sensors.edge_processor import EdgeProcessor
+from sensors.checkpoint import save_checkpoint, load_checkpoint
+from config.settings import EDGE_CHECKPOINT_MAX_AGE
+
+def _device_cycles(n_devices: int, n_cycles: int, critical_share: float, seed: int):
+    """Ciclos por pulseira: sinais estáveis ou oxigenação crítica sustentada"""
+    rng = np.random.default_rng(seed)
+    devices = []
+    for _ in range(n_devices):
+        times = 1_000_000.0 + np.cumsum(rng.uniform(8, 15, n_cycles))
+        hypoxic = rng.random() < critical_share
+        hr = np.round(rng.normal(75, 5, n_cycles)).astype(int)
+        temp = np.round(rng.normal(36.6, 0.2, n_cycles), 1)
+        o2 = np.clip(np.round(rng.normal(86 if hypoxic else 97, 1, n_cycles)), 80, 100).astype(int)
+        cycles = []
+        for k in range(n_cycles):
+            cycles.append((float(times[k]), [
+                {'sensor_type': 'heart_rate', 'value': int(hr[k]), 'unit': 'bpm'},
+                {'sensor_type': 'temperature', 'value': float(temp[k]), 'unit': '°C'},
+                {'sensor_type': 'oxygen_saturation', 'value': int(o2[k]), 'unit': '%'},
+                {'sensor_type': 'fall_detection', 'fall_detected': False},
+            ]))
+        devices.append(cycles)
+    return devices
+
+def _run(processors, devices, start: int, end: int):
+    """Mensagens (tipo, paciente, instante, alertas) dos ciclos [start, end)"""
+    messages = []
+    for processor, cycles in zip(processors, devices):
+        for timestamp, readings in cycles[start:end]:
+            result = processor.process_sensor_readings(readings, now=timestamp)
+            if result['action'] in ('emergency', 'summary'):
+                data = result['data']
+                messages.append((data['message_type'], data['patient_id'], data['timestamp'],
+                                 json.dumps(data['alerts'], sort_keys=True)))
+    return messages
+
+def _new_processors(patient_ids, devices, start: int):
+    processors = []
+    for patient_id, cycles in zip(patient_ids, devices):
+        processor = EdgeProcessor(patient_id, adaptive=False)
+        processor.last_summary_sent = cycles[start][0]
+        processors.append(processor)
+    return processors
+
+def _stale_summary(path: str, patient_id: str, cycles) -> bool:
+    """Checkpoint vencido e depois só leituras de batimento, até sair um resumo"""
+    processor = EdgeProcessor(patient_id, adaptive=False)
+    with contextlib.redirect_stdout(io.StringIO()):
+        load_checkpoint(path, processor, now=time.time() + EDGE_CHECKPOINT_MAX_AGE + 1, max_age=EDGE_CHECKPOINT_MAX_AGE)
+    processor.last_summary_sent = cycles[0][0]
+    for timestamp, readings in cycles:
+        heart_rate = [reading for reading in readings if reading['sensor_type'] == 'heart_rate']
+        if processor.process_sensor_readings(heart_rate, now=timestamp)['action'] == 'summary':
+            return True
+    return False
+
+def main():
+    parser = argparse.ArgumentParser(description="Checkpoint do EdgeProcessor: reinício da frota")
+    parser.add_argument("--devices", type=int, default=1000)
+    parser.add_argument("--warmup", type=int, default=120, help="Ciclos antes do reinício")
+    parser.add_argument("--after", type=int, default=40, help="Ciclos após o reinício")
+    parser.add_argument("--critical-share", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    patient_ids = [f"PAT{i:05d}" for i in range(args.devices)]
+    devices = _device_cycles(args.devices, args.warmup + args.after, args.critical_share, args.seed)
+    restart, end = args.warmup, args.warmup + args.after
+
+    reference = _new_processors(patient_ids, devices, 0)
+    _run(reference, devices, 0, restart)
+
+    with tempfile.TemporaryDirectory() as directory:
+        paths = [os.path.join(directory, f"{patient_id}.ckpt") for patient_id in patient_ids]
+
+        t0 = time.perf_counter()
+        written = sum(save_checkpoint(path, processor) for path, processor in zip(paths, reference))
+        save_seconds = time.perf_counter() - t0
+
+        restored = [EdgeProcessor(patient_id, adaptive=False) for patient_id in patient_ids]
+        t0 = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            loaded = sum(load_checkpoint(path, processor) for path, processor in zip(paths, restored))
+        load_seconds = time.perf_counter() - t0
+        stale_ok = _stale_summary(paths[0], patient_ids[0], devices[0][restart:])
+
+    cold = _new_processors(patient_ids, devices, restart)
+    expected = _run(reference, devices, restart, end)
+    results = {
+        'sem reinício': expected,
+        'checkpoint': _run(restored, devices, restart, end),
+        'sem checkpoint': _run(cold, devices, restart, end),
+    }
+    first_cycle = {patient_id: cycles[restart][0] for patient_id, cycles in zip(patient_ids, devices)}
+
+    per_thousand = 1000 / args.devices
+    print(f"\n📊 === CHECKPOINT DO EDGEPROCESSOR ({args.devices} pulseiras, "
+          f"{args.critical_share:.0%} com oxigenação crítica) ===")
+    print(f"Gravação:    {save_seconds * per_thousand * 1000:>7.1f} ms por mil pulseiras "
+          f"({written / args.devices:,.0f} bytes por pulseira, com fsync)")
+    print(f"Restauração: {load_seconds * per_thousand * 1000:>7.1f} ms por mil pulseiras ({loaded} restauradas)")
+    print(f"\n{'após o reinício':<16} {'emergências no 1º ciclo':>24} {'emergências':>12} {'resumos':>8} {'divergências':>13}")
+    for name, messages in results.items():
+        emergencies = [m for m in messages if m[0] == 'emergency']
+        burst = sum(1 for m in emergencies if m[2] == first_cycle[m[1]])
+        summaries = len(messages) - len(emergencies)
+        mismatches = len(set(messages) ^ set(expected))
+        print(f"{name:<16} {burst:>24} {len(emergencies):>12} {summaries:>8} {mismatches:>13}")
+    print(f"\nCheckpoint vencido + só batimento depois: resumo {'gerado' if stale_ok else 'NÃO gerado'}")
+
+if __name__ == "__main__":
+    main()
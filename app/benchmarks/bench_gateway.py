@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Gateway de cabeceira: conexões, memória e justiça entre pulseiras
+
+1. Custo por pulseira no gateway: N PulseiraPublishers com conexão própria
+   (um cliente paho cada) x as mesmas N pulseiras em um GatewayPublisher
+   (memória alocada medida com tracemalloc; conexões e threads de rede
+   contadas: cada cliente paho conectado tem socket, thread e keepalive).
+2. Justiça: uma pulseira com um spool grande (leituras de ~1,5 KB) e
+   outras pulseiras com um resumo cada, na mesma conexão. Mede quantos
+   bytes saem antes do resumo de cada uma com o Deficit Round Robin do
+   gateway e com uma fila única em ordem de chegada (o que o paho faria
+   com um cliente compartilhado sem escalonador).
+
+Uso (a partir da pasta app):
+    python -m benchmarks.bench_gateway [--devices 200] [--backlog 1000]
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import tracemalloc
+from sensors.gateway import GatewayPublisher
+from sensors.pulseira_publisher import PulseiraPublisher
+
+class _SendOrder:
+    """Gravador da conexão em dry-run: ordem e tamanho do que saiu"""
+
+    def __init__(self):
+        self.sent = []
+
+    def record(self, topic, payload, qos, retain):
+        self.sent.append((topic, len(payload)))
+
+def _allocated(build) -> int:
+    """Bytes alocados (e mantidos) por build()"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    with contextlib.redirect_stdout(io.StringIO()):
+        kept = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return after - before
+
+def _memory(devices: int, connections: int):
+    own = _allocated(lambda: [PulseiraPublisher(f"PAT{i:05d}", spool_dir='') for i in range(devices)])
+
+    def build_gateway():
+        gateway = GatewayPublisher("bench", connections=connections)
+        for i in range(devices):
+            gateway.register(f"PAT{i:05d}", spool_dir='')
+        return gateway
+    shared = _allocated(build_gateway)
+    print(f"\n📊 === {devices} PULSEIRAS: CONEXÃO PRÓPRIA x GATEWAY ({connections} conexões) ===")
+    print(f"{'':<22} {'conexões':>9} {'threads de rede':>16} {'memória':>10} {'por pulseira':>13}")
+    print(f"{'conexão própria':<22} {devices:>9} {devices:>16} {own / 2**20:>8.1f} MiB {own / devices / 1024:>10.1f} KiB")
+    print(f"{'gateway':<22} {connections:>9} {connections:>16} {shared / 2**20:>8.1f} MiB "
+          f"{shared / devices / 1024:>10.1f} KiB")
+    print("(memória do processo da pulseira/gateway; no broker, cada conexão também tem sessão e keepalive)")
+
+def _fairness(backlog: int, light_devices: int):
+    order = _SendOrder()
+    with contextlib.redirect_stdout(io.StringIO()):
+        # Dry-run: a conexão confirma na hora; send_next() é chamado aqui, sem a thread do escalonador
+        gateway = GatewayPublisher("bench", connections=1, dry_run=True, recorder=order,
+                                   device_queue=backlog + 1)
+        connection = gateway.connections[0]
+        gateway._started = True
+        heavy = gateway.register("PAT_SPOOL", spool_dir='')
+        light = [gateway.register(f"PAT{i:03d}", spool_dir='') for i in range(light_devices)]
+        for publisher in [heavy] + light:
+            publisher.client.connect()
+
+    reading = b'x' * 1500
+    summary = b'y' * 300
+    for _ in range(backlog):
+        heavy.client.publish(f"eldercare/readings/{heavy.patient_id}", reading, qos=1)
+    for publisher in light:
+        publisher.client.publish(f"eldercare/summary/{publisher.patient_id}", summary, qos=1)
+    while connection.send_next():
+        pass
+
+    # Bytes enviados antes do resumo de cada pulseira leve
+    waited, total = [], 0
+    for topic, size in order.sent:
+        if topic.startswith("eldercare/summary/"):
+            waited.append(total)
+        total += size
+    fifo = [backlog * len(reading) + i * len(summary) for i in range(light_devices)]
+
+    print(f"\n📊 === JUSTIÇA: 1 pulseira com {backlog} leituras no spool + {light_devices} com um resumo ===")
+    print(f"{'escalonamento':<26} {'KiB antes do 1º resumo':>23} {'antes do último':>16}")
+    print(f"{'fila única (ordem)':<26} {fifo[0] / 1024:>23,.1f} {fifo[-1] / 1024:>16,.1f}")
+    print(f"{'DRR do gateway':<26} {waited[0] / 1024:>23,.1f} {waited[-1] / 1024:>16,.1f}")
+    print(f"No uplink de 256 kbit/s do gateway, o último resumo sai em {fifo[-1] * 8 / 256_000:.0f}s "
+          f"(fila única) x {waited[-1] * 8 / 256_000:.1f}s (DRR).")
+
+def main():
+    parser = argparse.ArgumentParser(description="Gateway: conexões, memória e justiça")
+    parser.add_argument("--devices", type=int, default=200)
+    parser.add_argument("--connections", type=int, default=2)
+    parser.add_argument("--backlog", type=int, default=1000)
+    parser.add_argument("--light", type=int, default=9, help="Pulseiras com um resumo cada")
+    args = parser.parse_args()
+    _memory(args.devices, args.connections)
+    _fairness(args.backlog, args.light)
+
+if __name__ == "__main__":
+    main()
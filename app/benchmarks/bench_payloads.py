@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark de payload das rotas de mensagens
+
+Compara, para requisições típicas do dashboard, o tamanho em bytes
+trafegado e o tempo de CPU do servidor com e sem projeção de campos
+(?fields=) e com compressão identity/gzip/brotli.
+
+Uso (a partir da pasta app):
+    python -m benchmarks.bench_payloads [--messages 100] [--iterations 50]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+# Banco temporário: precisa ser definido antes de importar o servidor
+_tmp_dir = tempfile.mkdtemp(prefix="eldercare_bench_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_tmp_dir, 'bench.db')}"
+
+from fastapi.testclient import TestClient  # noqa: E402
+from database import create_patient, create_health_message  # noqa: E402
+import server  # noqa: E402
+
+DASHBOARD_FIELDS = "id,timestamp,message_type,data.health_status"
+
+def _fake_summary(i: int) -> dict:
+    """Resumo no mesmo formato gerado pelo EdgeProcessor"""
+    def sensor(avg, unit):
+        return {'avg': avg, 'min': avg - 3, 'max': avg + 3, 'count': 6,
+                'last_value': avg + 1, 'unit': unit}
+    return {
+        'message_type': 'summary',
+        'timestamp': time.time() - i * 60,
+        'patient_id': 'PAT001',
+        'health_status': random.choice(['stable', 'alert', 'critical']),
+        'alerts': [{
+            'type': 'batimento_elevado', 'sensor': 'heart_rate', 'value': 104.5,
+            'severity': 'concern', 'message': 'Batimento cardíaco elevado: 104.5 bpm'
+        }] * random.randint(0, 3),
+        'statistics': {
+            'heart_rate': sensor(random.randint(60, 110), 'bpm'),
+            'stress_level': sensor(random.randint(10, 70), '%'),
+            'temperature': sensor(round(random.uniform(36, 38), 1), '°C'),
+            'oxygen_saturation': sensor(random.randint(90, 100), '%'),
+            'fall_detection': {'fall_detected': False}
+        }
+    }
+
+def _measure(client: TestClient, url: str, encoding: str, iterations: int):
+    headers = {"Accept-Encoding": encoding}
+    response = client.get(url, headers=headers)  # aquecimento
+    wire_bytes = response.num_bytes_downloaded
+    
+    start = time.process_time()
+    for _ in range(iterations):
+        client.get(url, headers=headers)
+    cpu_ms = (time.process_time() - start) / iterations * 1000
+    
+    return wire_bytes, cpu_ms, response.headers.get("content-encoding", "identity")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de payload da API")
+    parser.add_argument("--messages", type=int, default=100, help="Mensagens no histórico")
+    parser.add_argument("--iterations", type=int, default=50, help="Requisições por cenário")
+    args = parser.parse_args()
+    
+    create_patient("PAT001", "Maria Silva", 78, "F")
+    for i in range(args.messages):
+        create_health_message("PAT001", "summary", _fake_summary(i))
+    
+    client = TestClient(server.app)
+    scenarios = [
+        ("completo", "/messages/PAT001"),
+        ("projeção dashboard", f"/messages/PAT001?fields={DASHBOARD_FIELDS}"),
+    ]
+    
+    print(f"\n📊 === BENCHMARK DE PAYLOAD ({args.messages} mensagens) ===")
+    print(f"{'cenário':<20} {'codificação':<12} {'bytes':>10} {'redução':>9} {'CPU/req':>10}")
+    baseline = None
+    for name, url in scenarios:
+        for encoding in ("identity", "gzip", "br"):
+            wire_bytes, cpu_ms, used = _measure(client, url, encoding, args.iterations)
+            baseline = baseline or wire_bytes
+            reduction = 100 * (1 - wire_bytes / baseline)
+            print(f"{name:<20} {used:<12} {wire_bytes:>10} {reduction:>8.1f}% {cpu_ms:>8.2f}ms")
+
+if __name__ == "__main__":
+    main()
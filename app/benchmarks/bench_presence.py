@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Conectividade por pulseira: heartbeat + timeout x presença pelo broker
+
+Roda SmartPulseiras em tempo virtual (VirtualClock passo a passo) com um
+cliente MQTT falso que conta, por paciente-hora, o tráfego só de
+conectividade: PUBLISH de heartbeat e de presença (com os acks) e os
+PINGREQ/PINGRESP do keepalive MQTT, enviados quando a conexão fica
+keepalive segundos sem nenhum pacote da pulseira (no modo 'edge' quase não
+há outras publicações, então os pings aparecem). Pings têm 2 bytes; um
+heartbeat JSON, mais de 200. Informa também o pior caso de detecção de
+uma pulseira que some sem desconectar:
+- heartbeat: HEARTBEAT_TIMEOUT + um ciclo do monitor do subscriber;
+- presença: 1,5 x PRESENCE_KEEPALIVE até o broker publicar o Last Will.
+
+Com presença, os pacotes por paciente-hora aumentam (os pings substituem os
+heartbeats, e são mais frequentes), enquanto publicações e bytes caem. O
+último cenário repete a presença com keepalive de 60s, para enlaces cobrados
+por pacote ou pulseiras com pouca bateria.
+
+Uso (a partir da pasta app):
+    python -m benchmarks.bench_presence [--devices 10] [--hours 6]
+"""
+
+import argparse
+import contextlib
+import io
+import random
+from collections import Counter
+from config.settings import (
+    MQTT_KEEPALIVE, HEARTBEAT_TIMEOUT, SUBSCRIBER_STATUS_INTERVAL, PRESENCE_KEEPALIVE
+)
+from sensors.clock import VirtualClock
+from sensors.smart_pulseira import SmartPulseira, READINGS_MODES
+from sensors.pulseira_publisher import PulseiraPublisher
+
+START = 1_700_000_000.0
+PING_BYTES = 2          # PINGREQ e PINGRESP
+ACK_BYTES = 4
+
+class _Info:
+    rc = 0
+
+    def __init__(self, mid: int):
+        self.mid = mid
+
+    def is_published(self) -> bool:
+        return True
+
+class _Connected:
+    is_failure = False
+
+class _ConnectivityCounter:
+    """Cliente MQTT falso: conta pacotes de conectividade e os pings do keepalive"""
+
+    def __init__(self, clock, keepalive: int):
+        self.clock = clock
+        self.keepalive = keepalive
+        self.mid = 0
+        self.last_packet = clock.time()
+        self.messages = Counter()   # PUBLISH por tipo
+        self.packets = Counter()    # Todos os pacotes (PUBLISH, acks e pings)
+        self.bytes = Counter()
+
+    def _pings_until(self, now: float):
+        # O paho envia PINGREQ quando passa keepalive segundos sem enviar nada
+        while now - self.last_packet >= self.keepalive:
+            self.last_packet += self.keepalive
+            self.packets['ping'] += 2
+            self.bytes['ping'] += 2 * PING_BYTES
+
+    def publish(self, topic, payload, qos=0, retain=False, properties=None):
+        now = self.clock.time()
+        self._pings_until(now)
+        self.last_packet = now
+        self.mid += 1
+        kind = topic.split('/')[1]
+        if kind in ('heartbeat', 'presence'):
+            if isinstance(payload, str):
+                payload = payload.encode()
+            remaining = 2 + len(topic.encode()) + (2 if qos else 0) + len(payload)
+            acks = {0: 0, 1: 1, 2: 3}[qos]
+            self.messages[kind] += 1
+            self.packets[kind] += 1 + acks
+            self.bytes[kind] += 2 + remaining + acks * ACK_BYTES
+        return _Info(self.mid)
+
+def _run(args, presence: bool, keepalive: int):
+    """Pacotes e bytes de conectividade de args.devices pulseiras por args.hours horas"""
+    random.seed(args.seed)
+    clock = VirtualClock(start=START)
+    messages, packets, sizes = Counter(), Counter(), Counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(args.devices):
+            pulseira = SmartPulseira(f"PAT{i:05d}", readings_mode=args.readings_mode, checkpoint_dir='',
+                                     spool_dir='', presence=presence, clock=clock)
+            publisher = PulseiraPublisher(pulseira.patient_id, clock=clock, spool_dir='', presence=presence)
+            publisher.keepalive = keepalive
+            counter = _ConnectivityCounter(clock, keepalive)
+            publisher.client = counter
+            publisher._on_connect(counter, None, None, _Connected(), None)
+            pulseira.publisher = publisher
+            pulseira.running = True
+            pulseira._main_monitoring_loop(args.hours * 3600)
+            counter._pings_until(clock.time())
+            messages += counter.messages
+            packets += counter.packets
+            sizes += counter.bytes
+    return messages, packets, sizes
+
+def main():
+    parser = argparse.ArgumentParser(description="Conectividade: heartbeat x presença pelo broker")
+    parser.add_argument("--devices", type=int, default=10)
+    parser.add_argument("--hours", type=float, default=6)
+    parser.add_argument("--readings-mode", dest="readings_mode", choices=READINGS_MODES, default='edge')
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    scenarios = [
+        ("heartbeat 30s + timeout", False, MQTT_KEEPALIVE, HEARTBEAT_TIMEOUT + SUBSCRIBER_STATUS_INTERVAL),
+        ("presença (LWT) + heartbeat lento", True, PRESENCE_KEEPALIVE, 1.5 * PRESENCE_KEEPALIVE),
+        ("presença, keepalive 60s", True, 60, 1.5 * 60),
+    ]
+    patient_hours = args.devices * args.hours
+    print(f"\n📊 === CONECTIVIDADE POR PACIENTE-HORA ({args.devices} pulseiras x {args.hours:g}h, "
+          f"leituras '{args.readings_mode}') ===")
+    print(f"{'cenário':<34} {'heartbeat':>10} {'presença':>9} {'pings':>6} {'pacotes':>8} {'bytes':>7} "
+          f"{'detecção':>9}")
+    for name, presence, keepalive, detection in scenarios:
+        messages, packets, sizes = _run(args, presence, keepalive)
+        print(f"{name:<34} {messages['heartbeat'] / patient_hours:>10.1f} {messages['presence'] / patient_hours:>9.1f} "
+              f"{packets['ping'] / patient_hours:>6.1f} {sum(packets.values()) / patient_hours:>8.1f} "
+              f"{sum(sizes.values()) / patient_hours:>7.0f} {detection:>8.0f}s")
+    print(f"\nDetecção = pior caso de uma pulseira que some sem desconectar (keepalive MQTT "
+          f"{MQTT_KEEPALIVE}s x {PRESENCE_KEEPALIVE}s); desconexão normal ou queda do TCP é imediata com presença.")
+    print("Pacotes incluem os pings do keepalive: com presença há menos publicações e bytes, mas mais pacotes; "
+          "em enlaces cobrados por pacote ou com pouca bateria, aumente PRESENCE_KEEPALIVE.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Pacotes e bytes MQTT por paciente-hora: lotes e MQTT v5 na pulseira
+
+Roda SmartPulseiras completas em tempo virtual (VirtualClock passo a
+passo) com um cliente MQTT falso que calcula cada pacote como iria para o
+broker: PUBLISH (cabeçalho fixo, tópico ou alias, packet id, propriedades
+v5, payload) e as confirmações do QoS (PUBACK; PUBREC/PUBREL/PUBCOMP).
+Cada cenário usa a mesma semente, então as pulseiras geram exatamente as
+mesmas leituras, emergências e resumos; só muda a forma de publicar.
+
+Uso (a partir da pasta app):
+    python -m benchmarks.bench_publish_batching [--devices 10] [--hours 6] [--window 60]
+"""
+
+import argparse
+import contextlib
+import io
+import random
+from collections import Counter
+from sensors.clock import VirtualClock
+from sensors.smart_pulseira import SmartPulseira, READINGS_MODES
+from sensors.pulseira_publisher import PulseiraPublisher
+
+START = 1_700_000_000.0
+ALIAS_MAXIMUM = 10    # Padrão do mosquitto (max_topic_alias)
+ACK_BYTES = 4         # PUBACK/PUBREC/PUBREL/PUBCOMP sem propriedades
+
+def _varint_size(n: int) -> int:
+    size = 1
+    while n >= 128:
+        n //= 128
+        size += 1
+    return size
+
+class _Info:
+    rc = 0
+
+    def __init__(self, mid: int):
+        self.mid = mid
+
+    def is_published(self) -> bool:
+        return True
+
+class _WireCounter:
+    """Cliente MQTT falso: soma os pacotes e bytes trocados com o broker"""
+
+    def __init__(self, mqtt_v5: bool):
+        self.mqtt_v5 = mqtt_v5
+        self.mid = 0
+        self.packets = Counter()
+        self.bytes = Counter()
+
+    def publish(self, topic, payload, qos=0, retain=False, properties=None):
+        self.mid += 1
+        if isinstance(payload, str):
+            payload = payload.encode()
+        remaining = 2 + len(topic.encode()) + (2 if qos else 0) + len(payload)
+        if self.mqtt_v5:
+            remaining += len(properties.pack()) if properties is not None else 1
+        self.packets['publish'] += 1
+        self.bytes['publish'] += 1 + _varint_size(remaining) + remaining
+        acks = {0: 0, 1: 1, 2: 3}[qos]
+        self.packets['ack'] += acks
+        self.bytes['ack'] += acks * ACK_BYTES
+        return _Info(self.mid)
+
+def _run(args, wire_format: str, mqtt_v5: bool, batch_window: float):
+    """Pacotes e bytes de args.devices pulseiras por args.hours horas"""
+    random.seed(args.seed)
+    clock = VirtualClock(start=START)
+    total_packets, total_bytes, batches = Counter(), Counter(), 0
+    statuses = ('stable', 'stable', 'alert', 'critical')
+    with contextlib.redirect_stdout(io.StringIO()):
+        for i in range(args.devices):
+            status = statuses[i % len(statuses)]
+            pulseira = SmartPulseira(f"PAT{i:05d}", heart_rate_status=status, temp_status=status,
+                                     fall_chance='medium', readings_mode=args.readings_mode,
+                                     delta_encoding=args.delta, checkpoint_dir='', spool_dir='', clock=clock)
+            publisher = PulseiraPublisher(pulseira.patient_id, delta_encoding=args.delta, clock=clock, spool_dir='',
+                                          wire_format=wire_format, mqtt_v5=mqtt_v5, batch_window=batch_window)
+            counter = _WireCounter(mqtt_v5)
+            publisher.client = counter
+            publisher._alias_maximum = ALIAS_MAXIMUM if mqtt_v5 else 0
+            publisher.is_connected = True
+            pulseira.publisher = publisher
+            pulseira.running = True
+            pulseira._main_monitoring_loop(args.hours * 3600)
+            pulseira._flush_readings()
+            publisher.flush_batch()
+            total_packets += counter.packets
+            total_bytes += counter.bytes
+            batches += publisher.stats['batches_sent']
+    return total_packets, total_bytes, batches
+
+def main():
+    parser = argparse.ArgumentParser(description="Pacotes e bytes MQTT por paciente-hora")
+    parser.add_argument("--devices", type=int, default=10)
+    parser.add_argument("--hours", type=float, default=6)
+    parser.add_argument("--window", type=float, default=60, help="Janela dos lotes (segundos)")
+    parser.add_argument("--readings-mode", dest="readings_mode", choices=READINGS_MODES, default='both')
+    parser.add_argument("--delta", action="store_true")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    scenarios = [
+        ("atual (MQTT 3.1.1, JSON)", 'json', False, 0),
+        ("MQTT v5 (alias + expiração)", 'json', True, 0),
+        (f"lotes {args.window:g}s", 'json', False, args.window),
+        (f"lotes {args.window:g}s + v5", 'json', True, args.window),
+        (f"lotes {args.window:g}s + v5 + compacto", 'compact', True, args.window),
+    ]
+    patient_hours = args.devices * args.hours
+    print(f"\n📊 === PUBLICAÇÃO POR PACIENTE-HORA ({args.devices} pulseiras x {args.hours:g}h, "
+          f"leituras '{args.readings_mode}'{', delta' if args.delta else ''}) ===")
+    print(f"{'cenário':<34} {'PUBLISH':>8} {'acks':>6} {'pacotes':>8} {'KiB':>8} {'x atual':>8}")
+    baseline = None
+    for name, wire_format, mqtt_v5, window in scenarios:
+        packets, sizes, batches = _run(args, wire_format, mqtt_v5, window)
+        total = sum(sizes.values())
+        baseline = baseline or total
+        print(f"{name:<34} {packets['publish'] / patient_hours:>8.0f} {packets['ack'] / patient_hours:>6.0f} "
+              f"{sum(packets.values()) / patient_hours:>8.0f} {total / 1024 / patient_hours:>8.1f} "
+              f"{total / baseline:>8.2f}" + (f"  ({batches / patient_hours:.0f} lotes/h)" if batches else ""))
+    print(f"\nEmergências nunca entram em lote; resumos e leituras esperam no máximo {args.window:g}s "
+          f"(ou o próximo heartbeat).")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark de memória das leituras de sensor
+
+Simula N pulseiras (5 sensores cada) e compara a leitura em dict (formato
+anterior: dict de generate_data expandido com ** em outro dict) com a
+SensorReading compacta:
+- alocações e bytes de um ciclo de leitura de todas as pulseiras;
+- memória retida pela janela de contexto do EdgeProcessor (10 ciclos);
+- tempo de um ciclo de coleta e de um ciclo coleta + EdgeProcessor.
+
+Uso (a partir da pasta app):
+    python -m benchmarks.bench_reading_memory [--devices 10000]
+"""
+
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from sensors.heart_rate_sensor import HeartRateSensor
+from sensors.stress_sensor import StressSensor
+from sensors.temperature_sensor import TemperatureSensor
+from sensors.oxygen_sensor import OxygenSensor
+from sensors.fall_sensor import FallSensor
+from sensors.edge_processor import EdgeProcessor
+
+CONTEXT_CYCLES = 10
+
+def _legacy_reading(sensor):
+    """Leitura no formato anterior (dict + dict intermediário de generate_data)"""
+    return {
+        "sensor_type": sensor.sensor_type,
+        "timestamp": time.time(),
+        **sensor.generate_data()
+    }
+
+def _compact_reading(sensor):
+    return sensor.get_sensor_reading()
+
+def _devices(n_devices: int, seed: int):
+    random.seed(seed)
+    return [[HeartRateSensor(f"PAT{i:05d}"), StressSensor(f"PAT{i:05d}"), TemperatureSensor(f"PAT{i:05d}"),
+             OxygenSensor(f"PAT{i:05d}"), FallSensor(f"PAT{i:05d}")] for i in range(n_devices)]
+
+def _collect(devices, read):
+    return [[read(sensor) for sensor in sensors] for sensors in devices]
+
+def _measure_memory(devices, read, cycles: int):
+    """(blocos alocados, bytes) retidos por `cycles` ciclos de todas as pulseiras"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    retained = [_collect(devices, read) for _ in range(cycles)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    stats = after.compare_to(before, 'filename')
+    blocks = sum(s.count_diff for s in stats)
+    size = sum(s.size_diff for s in stats)
+    del retained
+    return blocks, size
+
+def _measure_time(devices, read, repeats: int, process: bool):
+    processors = [EdgeProcessor(f"PAT{i:05d}", adaptive=False) for i in range(len(devices))] if process else None
+    best = float('inf')
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        cycle = _collect(devices, read)
+        if process:
+            for processor, readings in zip(processors, cycle):
+                processor.process_sensor_readings(readings)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Memória das leituras: dict x SensorReading")
+    parser.add_argument("--devices", type=int, default=10_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    devices = _devices(args.devices, args.seed)
+    readings = args.devices * len(devices[0])
+
+    print(f"\n📊 === LEITURAS DE SENSOR ({args.devices} pulseiras, {readings} leituras por ciclo) ===")
+    print(f"{'formato':<15} {'blocos/ciclo':>13} {'KiB/ciclo':>10} {'MiB janela':>11} {'coleta ms':>10} {'+edge ms':>9}")
+    results = {}
+    for name, read in (('dict', _legacy_reading), ('SensorReading', _compact_reading)):
+        blocks, size = _measure_memory(devices, read, 1)
+        _, window = _measure_memory(devices, read, CONTEXT_CYCLES)
+        collect = _measure_time(devices, read, args.repeats, process=False)
+        edge = _measure_time(devices, read, args.repeats, process=True)
+        results[name] = (blocks, size, window)
+        print(f"{name:<15} {blocks:>13,} {size / 1024:>10,.0f} {window / 2**20:>11,.1f} "
+              f"{collect * 1000:>10,.1f} {edge * 1000:>9,.1f}")
+
+    (b0, s0, w0), (b1, s1, w1) = results['dict'], results['SensorReading']
+    print(f"\nBytes por leitura: {s0 / readings:.0f} -> {s1 / readings:.0f} "
+          f"({(1 - s1 / s0) * 100:.0f}% menos) | janela de contexto: {(1 - w1 / w0) * 100:.0f}% menos")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark do motor de regras de alerta
+
+Mede o custo de avaliar um ciclo de leituras em função do número de
+regras: avaliação interpretada (laço sobre as regras), função compilada
+(RuleSet.evaluate) e avaliação vetorizada por paciente (evaluate_arrays).
+
+Uso (a partir da pasta app):
+    python -m benchmarks.bench_rules [--rules 7 25 100 400] [--cycles 20000]
+"""
+
+import argparse
+import json
+import operator
+import os
+import random
+import tempfile
+import time
+import numpy as np
+from config.settings import ALERT_RULES_PATH
+from rules import RuleEngine
+
+SENSOR_RANGES = {
+    'heart_rate': (35, 130),
+    'stress_level': (0, 90),
+    'temperature': (34.8, 39.2),
+    'oxygen_saturation': (86, 100),
+}
+_OPS = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge,
+        '==': operator.eq, '!=': operator.ne}
+
+def _rule_table(n_rules: int, seed: int) -> dict:
+    """Regras padrão de emergência + regras sintéticas até n_rules"""
+    with open(ALERT_RULES_PATH, 'r', encoding='utf-8') as f:
+        base = [r for r in json.load(f)['rules'] if r['stage'] == 'emergency']
+    rng = random.Random(seed)
+    rules = base[:n_rules]
+    for k in range(n_rules - len(rules)):
+        sensor = rng.choice(list(SENSOR_RANGES))
+        low, high = SENSOR_RANGES[sensor]
+        comparator = rng.choice(['<', '>'])
+        # Limiares perto dos extremos: poucas regras disparam, como na prática
+        margin = (high - low) * rng.uniform(0.0, 0.05)
+        threshold = low + margin if comparator == '<' else high - margin
+        rules.append({
+            'id': f'synthetic.{k}', 'stage': 'emergency', 'type': f'SYNTHETIC_{k}',
+            'group': f'{sensor}_{k % 3}', 'sensor': sensor, 'aggregate': 'value',
+            'comparator': comparator, 'threshold': round(threshold, 1),
+            'severity': 'concern', 'message': f'{sensor}: {{value}}'
+        })
+    return {'rules': rules, 'patients': {}}
+
+def _interpreted(rules, records):
+    """Avaliação ingênua (referência): percorre as regras a cada ciclo"""
+    alerts = []
+    taken = set()
+    for rule in rules:
+        if rule.group is not None and rule.group in taken:
+            continue
+        record = records.get(rule.sensor)
+        if not record:
+            continue
+        value = record.get(rule.aggregate)
+        if value is not None and _OPS[rule.comparator](value, rule.threshold):
+            if rule.group is not None:
+                taken.add(rule.group)
+            alerts.append(rule.make_alert(value))
+    return alerts
+
+def _cycles(n: int, seed: int):
+    rng = random.Random(seed)
+    cycles = []
+    for _ in range(n):
+        records = {}
+        for sensor, (low, high) in SENSOR_RANGES.items():
+            value = round(rng.uniform(low, high), 1) if sensor == 'temperature' else rng.randint(low, high)
+            records[sensor] = {'sensor_type': sensor, 'value': value}
+        records['fall_detection'] = {'sensor_type': 'fall_detection', 'fall_detected': rng.random() < 0.01}
+        cycles.append(records)
+    return cycles
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do motor de regras de alerta")
+    parser.add_argument("--rules", type=int, nargs="+", default=[7, 25, 100, 400])
+    parser.add_argument("--cycles", type=int, default=20000)
+    parser.add_argument("--patients", type=int, default=10000, help="Pacientes na avaliação vetorizada")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    cycles = _cycles(args.cycles, args.seed)
+    readings_per_cycle = len(SENSOR_RANGES) + 1
+    rng = np.random.default_rng(args.seed)
+    columns = {(s, 'value'): (np.round(rng.uniform(lo, hi, args.patients), 1)) for s, (lo, hi) in SENSOR_RANGES.items()}
+    columns[('fall_detection', 'fall_detected')] = (rng.random(args.patients) < 0.01).astype(float)
+
+    print(f"\n📊 === MOTOR DE REGRAS ({args.cycles} ciclos, {readings_per_cycle} leituras/ciclo) ===")
+    print(f"{'regras':>7} | {'interpretado':>14} | {'compilado':>14} | {'vetorizado':>16} | alertas")
+    print(f"{'':>7} | {'(ns/leitura)':>14} | {'(ns/leitura)':>14} | {'(ns/paciente)':>16} |")
+
+    for n_rules in args.rules:
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False, encoding='utf-8') as f:
+            json.dump(_rule_table(n_rules, args.seed), f)
+            path = f.name
+        try:
+            ruleset = RuleEngine(path).ruleset('emergency')
+        finally:
+            os.unlink(path)
+
+        t0 = time.perf_counter()
+        expected = [_interpreted(ruleset.rules, records) for records in cycles]
+        interpreted_seconds = time.perf_counter() - t0
+
+        evaluate = ruleset.evaluate
+        t0 = time.perf_counter()
+        compiled = [evaluate(records) for records in cycles]
+        compiled_seconds = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        ruleset.evaluate_arrays(columns)
+        vector_seconds = time.perf_counter() - t0
+
+        if compiled != expected:
+            print(f"❌ Resultados divergentes com {n_rules} regras")
+
+        per_reading = 1e9 / (args.cycles * readings_per_cycle)
+        alerts = sum(len(a) for a in compiled)
+        print(f"{len(ruleset):>7} | {interpreted_seconds * per_reading:>14.0f} | "
+              f"{compiled_seconds * per_reading:>14.0f} | "
+              f"{vector_seconds * 1e9 / args.patients:>16.1f} | {alerts}")
+
+if __name__ == "__main__":
+    main()
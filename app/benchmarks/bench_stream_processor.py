@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark do processamento de borda no servidor (leituras brutas)
+
+Simula N pulseiras publicando lotes de ciclos em eldercare/readings, cada
+uma com seus próprios instantes. Mede leituras por segundo em um núcleo
+(json.loads + ReadingStreamProcessor.ingest + flush) e confere se as
+emergências e resumos são os mesmos de um EdgeProcessor por pulseira.
+
+Meta: STREAM_TARGET leituras/s por núcleo. Uma pulseira gera 5 leituras a
+cada 8-15s (~0,43 leituras/s), então a meta equivale a mais de 200 mil
+pulseiras por núcleo.
+
+Uso (a partir da pasta app):
+    python -m benchmarks.bench_stream_processor [--devices 2000] [--batches 20]
+"""
+
+import argparse
+import json
+import time
+import numpy as np
+from protocol import encode_readings, decode_readings
+from sensors.edge_processor import EdgeProcessor
+from subscriber.stream_processor import ReadingStreamProcessor
+
+STREAM_TARGET = 100_000
+DEVICE_READINGS_PER_SECOND = 5 / 11.5
+
+def _device_cycles(n_devices: int, n_cycles: int, seed: int):
+    """Ciclos de leitura por pulseira (sinais estáveis, ~1% de ciclos críticos, intervalos de 8-15s)"""
+    rng = np.random.default_rng(seed)
+    devices = []
+    for _ in range(n_devices):
+        times = 1_000_000.0 + np.cumsum(rng.uniform(8, 15, n_cycles))
+        critical = rng.random(n_cycles) < 0.01
+        hr = np.where(critical, rng.integers(121, 140, n_cycles), np.round(rng.normal(75, 5, n_cycles))).astype(int)
+        stress = np.clip(np.round(rng.normal(30, 8, n_cycles)), 0, 79).astype(int)
+        temp = np.round(rng.normal(36.6, 0.2, n_cycles), 1)
+        o2 = np.clip(np.round(rng.normal(97, 1, n_cycles)), 90, 100).astype(int)
+        falls = rng.random(n_cycles) < 0.002
+        cycles = []
+        for k in range(n_cycles):
+            cycles.append((float(times[k]), [
+                {'sensor_type': 'heart_rate', 'value': int(hr[k]), 'unit': 'bpm'},
+                {'sensor_type': 'stress_level', 'value': int(stress[k]), 'unit': '%'},
+                {'sensor_type': 'temperature', 'value': float(temp[k]), 'unit': '°C'},
+                {'sensor_type': 'oxygen_saturation', 'value': int(o2[k]), 'unit': '%'},
+                {'sensor_type': 'fall_detection', 'fall_detected': bool(falls[k])},
+            ]))
+        devices.append(cycles)
+    return devices
+
+def _key(data):
+    return (data['message_type'], data['patient_id'], data['timestamp'],
+            json.dumps(data['alerts'], sort_keys=True), data['health_status'])
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do processamento de leituras brutas no servidor")
+    parser.add_argument("--devices", type=int, default=2000)
+    parser.add_argument("--batches", type=int, default=20, help="Lotes por pulseira")
+    parser.add_argument("--batch-size", type=int, default=6, help="Ciclos por lote")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    n_cycles = args.batches * args.batch_size
+    devices = _device_cycles(args.devices, n_cycles, args.seed)
+    patient_ids = [f"PAT{i:05d}" for i in range(args.devices)]
+    readings_total = args.devices * n_cycles * 5
+
+    # Lotes já serializados, na ordem de chegada (um lote de cada pulseira por rodada)
+    rounds = []
+    wire_times = [[] for _ in range(args.devices)]   # Instantes como chegam no servidor (ms)
+    for b in range(args.batches):
+        chunk = slice(b * args.batch_size, (b + 1) * args.batch_size)
+        batch_round = []
+        for d in range(args.devices):
+            payload = encode_readings(devices[d][chunk])
+            wire_times[d].extend(decode_readings(payload)[1].tolist())
+            batch_round.append((patient_ids[d], json.dumps(payload).encode()))
+        rounds.append(batch_round)
+
+    # Servidor: processamento em bloco (flush a cada rodada de lotes)
+    emitted = []
+    stream = ReadingStreamProcessor(lambda message_type, patient_id, data: emitted.append(data))
+    t0 = time.perf_counter()
+    for batch_round in rounds:
+        for patient_id, body in batch_round:
+            stream.ingest(patient_id, json.loads(body))
+        stream.flush()
+    stream_seconds = time.perf_counter() - t0
+
+    # Referência: um EdgeProcessor por pulseira, ciclo a ciclo
+    expected = []
+    t0 = time.perf_counter()
+    for patient_id, cycles, times in zip(patient_ids, devices, wire_times):
+        processor = EdgeProcessor(patient_id, adaptive=False)
+        processor.last_summary_sent = times[0]
+        for timestamp, (_, readings) in zip(times, cycles):
+            result = processor.process_sensor_readings(readings, now=timestamp)
+            if result['action'] in ('emergency', 'summary'):
+                expected.append(result['data'])
+    scalar_seconds = time.perf_counter() - t0
+
+    mismatches = len(set(map(_key, emitted)) ^ set(map(_key, expected)))
+
+    rate = readings_total / stream_seconds
+    print(f"\n📊 === LEITURAS BRUTAS NO SERVIDOR ({args.devices} pulseiras x {n_cycles} ciclos, lotes de {args.batch_size}) ===")
+    print(f"EdgeProcessor (1 por pulseira):   {readings_total / scalar_seconds:>12,.0f} leituras/s")
+    print(f"ReadingStreamProcessor (1 núcleo): {rate:>11,.0f} leituras/s")
+    print(f"Meta: {STREAM_TARGET:,} leituras/s por núcleo {'✅' if rate >= STREAM_TARGET else '❌'} "
+          f"(~{rate / DEVICE_READINGS_PER_SECOND:,.0f} pulseiras por núcleo)")
+    print(f"Mensagens emitidas: {len(emitted)} | divergências: {mismatches}")
+
+if __name__ == "__main__":
+    main()
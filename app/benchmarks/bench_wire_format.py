@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark do formato das mensagens da pulseira: JSON x compacto
+
+Gera mensagens reais (emergências, resumos completos e delta, lotes de
+leituras e heartbeats) com o pipeline de borda em tempo virtual e compara,
+por tipo, o tamanho e o custo de codificar/decodificar em:
+- JSON com indent=2 (formato atual de emergências e resumos);
+- JSON sem espaços;
+- formato compacto (protocol.compact).
+Confere também se a decodificação do compacto é igual à do JSON.
+
+Uso (a partir da pasta app):
+    python -m benchmarks.bench_wire_format [--devices 20] [--hours 6]
+"""
+
+import argparse
+import json
+import random
+import time
+from collections import defaultdict
+from protocol import DeltaEncoder, encode_readings, compact
+from sensors.clock import VirtualClock
+from sensors.heart_rate_sensor import HeartRateSensor
+from sensors.stress_sensor import StressSensor
+from sensors.temperature_sensor import TemperatureSensor
+from sensors.oxygen_sensor import OxygenSensor
+from sensors.fall_sensor import FallSensor
+from sensors.edge_processor import EdgeProcessor
+
+START = 1_700_000_000.0
+READINGS_BATCH = 6
+
+FORMATS = {
+    'json indent=2': (lambda data: json.dumps(data, indent=2).encode(), lambda body: json.loads(body)),
+    'json compacto': (lambda data: json.dumps(data, separators=(',', ':')).encode(), lambda body: json.loads(body)),
+    'compact': (compact.dumps, compact.loads),
+}
+
+def _generate(n_devices: int, hours: float, seed: int):
+    """{tipo: [mensagens]} de n_devices pulseiras em hours horas simuladas"""
+    random.seed(seed)
+    clock = VirtualClock(start=START)
+    messages = defaultdict(list)
+    for i in range(n_devices):
+        patient_id = f"PAT{i:05d}"
+        status = random.choice(('stable', 'stable', 'alert', 'critical'))
+        sensors = [HeartRateSensor(patient_id, status=status, clock=clock),
+                   StressSensor(patient_id, clock=clock),
+                   TemperatureSensor(patient_id, status=status, clock=clock),
+                   OxygenSensor(patient_id, clock=clock),
+                   FallSensor(patient_id, chance='medium', clock=clock)]
+        processor = EdgeProcessor(patient_id, clock=clock)
+        encoder = DeltaEncoder(dumps=compact.dumps)
+        cycles = []
+        end = clock.time() + hours * 3600
+        while clock.time() < end:
+            clock.advance(random.uniform(8, 15))
+            readings = [sensor.get_sensor_reading() for sensor in sensors]
+            result = processor.process_sensor_readings(readings)
+            if result['action'] == 'emergency':
+                messages['emergency'].append(result['data'])
+            elif result['action'] == 'summary':
+                messages['summary'].append(result['data'])
+                seq, payload = encoder.encode(result['data'])
+                encoder.acknowledge(seq)
+                if payload.get('encoding') == 'delta':
+                    messages['summary delta'].append(payload)
+            cycles.append((clock.time(), readings))
+            if len(cycles) >= READINGS_BATCH:
+                messages['readings'].append(encode_readings(cycles))
+                cycles = []
+        messages['heartbeat'].append({
+            'patient_id': patient_id, 'device_id': f"pulseira_{patient_id}", 'message_type': 'HEARTBEAT',
+            'created_at': clock.time(), 'status': 'online', 'uptime_seconds': hours * 3600,
+            'stats': {'emergency_sent': 3, 'summary_sent': 120, 'failed_sends': 0}
+        })
+    return messages
+
+def _measure(items, encode, decode):
+    """(bytes totais, µs por codificação, µs por decodificação)"""
+    t0 = time.perf_counter()
+    bodies = [encode(item) for item in items]
+    encode_us = (time.perf_counter() - t0) / len(items) * 1e6
+    t0 = time.perf_counter()
+    for body in bodies:
+        decode(body)
+    decode_us = (time.perf_counter() - t0) / len(items) * 1e6
+    return sum(len(body) for body in bodies), encode_us, decode_us
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON x formato compacto")
+    parser.add_argument("--devices", type=int, default=20)
+    parser.add_argument("--hours", type=float, default=6)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    messages = _generate(args.devices, args.hours, args.seed)
+
+    mismatches = 0
+    for items in messages.values():
+        for item in items:
+            if compact.loads(compact.dumps(item)) != json.loads(json.dumps(item)):
+                mismatches += 1
+
+    print(f"\n📊 === FORMATO DAS MENSAGENS ({args.devices} pulseiras x {args.hours:g}h) ===")
+    print(f"{'tipo':<14} {'msgs':>6} {'formato':<14} {'bytes/msg':>10} {'x atual':>8} {'cod. µs':>8} {'dec. µs':>8}")
+    totals = defaultdict(int)
+    for message_type in ('emergency', 'summary', 'summary delta', 'readings', 'heartbeat'):
+        items = messages.get(message_type)
+        if not items:
+            continue
+        baseline = None
+        for name, (encode, decode) in FORMATS.items():
+            size, encode_us, decode_us = _measure(items, encode, decode)
+            baseline = baseline or size
+            totals[name] += size
+            print(f"{message_type:<14} {len(items):>6} {name:<14} {size / len(items):>10,.0f} "
+                  f"{size / baseline:>8.2f} {encode_us:>8.1f} {decode_us:>8.1f}")
+    print()
+    for name, size in totals.items():
+        print(f"Total {name:<14} {size / 1024:>10,.1f} KiB ({size / totals['json indent=2']:.0%} do atual)")
+    print(f"Decodificação do compacto igual à do JSON: {'sim' if mismatches == 0 else f'NÃO ({mismatches} divergentes)'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Simulação de um dia de resumos: intervalo fixo x adaptativo, completo x delta
+
+Gera 24h de leituras por paciente (sinais estáveis com ruído; parte dos
+pacientes tem um episódio de febre com taquicardia), passa pelo
+EdgeProcessor com e sem o modo adaptativo e codifica os resumos como
+completos ou delta (PUBACK imediato). Reporta mensagens, bytes publicados,
+atraso até o primeiro resumo alterado em cada episódio e confere se o
+decodificador do subscriber reconstrói exatamente todos os resumos.
+
+Uso (a partir da pasta app):
+    python -m benchmarks.sim_adaptive_reporting [--patients 20] [--hours 24]
+"""
+
+import argparse
+import time
+import numpy as np
+from protocol import DeltaEncoder, DeltaDecoder
+from sensors.edge_processor import EdgeProcessor
+from sensors.pulseira_publisher import PulseiraPublisher
+
+EPISODE_SECONDS = 2 * 3600
+
+def _patient_day(rng, seconds: float, episode_start):
+    """Instantes e leituras de um paciente (episódio de febre opcional)"""
+    timestamps = np.cumsum(rng.uniform(8, 15, int(seconds / 8) + 1))
+    timestamps = timestamps[timestamps < seconds]
+    n = len(timestamps)
+
+    # Episódio: sobe em 1h, mantém e volta em 1h
+    ramp = np.zeros(n)
+    if episode_start is not None:
+        phase = (timestamps - episode_start) / (EPISODE_SECONDS / 2)
+        ramp = np.clip(np.minimum(phase, 2 - phase), 0, 1)
+
+    heart_rate = np.round(rng.normal(72, 3, n) + 25 * ramp)
+    stress = np.clip(np.round(rng.normal(25, 4, n) + 15 * ramp), 0, 100)
+    temperature = np.round(rng.normal(36.5, 0.1, n) + 2.0 * ramp, 1)
+    oxygen = np.clip(np.round(rng.normal(97, 0.8, n) - 2 * ramp), 0, 100)
+
+    cycles = []
+    for i in range(n):
+        cycles.append([
+            {'sensor_type': 'heart_rate', 'value': int(heart_rate[i]), 'unit': 'bpm'},
+            {'sensor_type': 'stress_level', 'value': int(stress[i]), 'unit': '%'},
+            {'sensor_type': 'temperature', 'value': float(temperature[i]), 'unit': '°C'},
+            {'sensor_type': 'oxygen_saturation', 'value': int(oxygen[i]), 'unit': '%'},
+            {'sensor_type': 'fall_detection', 'fall_detected': False},
+        ])
+    return timestamps, cycles
+
+def _run(patient_id, timestamps, cycles, adaptive: bool, start: float):
+    processor = EdgeProcessor(patient_id, adaptive=adaptive)
+    processor.last_summary_sent = start
+    summaries, emergencies = [], 0
+    for t, readings in zip(timestamps, cycles):
+        result = processor.process_sensor_readings(readings, now=start + float(t))
+        if result['action'] == 'summary':
+            summaries.append(result['data'])
+        elif result['action'] == 'emergency':
+            emergencies += 1
+    return summaries, emergencies
+
+def _encode(patient_id, summaries, delta: bool, decoder: DeltaDecoder):
+    """Bytes publicados e quantidade de resumos reconstruídos incorretamente"""
+    encode = PulseiraPublisher._encode
+    if not delta:
+        return sum(len(encode(s)) for s in summaries), 0, 0
+
+    encoder = DeltaEncoder(dumps=encode)
+    total, deltas, errors = 0, 0, 0
+    for summary in summaries:
+        seq, payload = encoder.encode(summary)
+        total += len(encode(payload))
+        deltas += payload.get('encoding') == 'delta'
+        encoder.acknowledge(seq)
+        if decoder.decode(patient_id, payload) != dict(summary, seq=seq):
+            errors += 1
+    return total, deltas, errors
+
+def _detection_delay(summaries, episode_start, start):
+    """Segundos entre o início do episódio e o primeiro resumo com alerta"""
+    if episode_start is None:
+        return None
+    for summary in summaries:
+        if summary['timestamp'] - start >= episode_start and summary['alerts']:
+            return summary['timestamp'] - start - episode_start
+    return None
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulação de resumos adaptativos e delta")
+    parser.add_argument("--patients", type=int, default=20)
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--episodes", type=float, default=0.25, help="Fração de pacientes com episódio")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    seconds = args.hours * 3600
+    start = 1_000_000.0
+
+    rows = {}
+    readings_total = 0
+    t0 = time.perf_counter()
+    for p in range(args.patients):
+        patient_id = f"PAT{p:03d}"
+        episode_start = None
+        if rng.random() < args.episodes and seconds > EPISODE_SECONDS:
+            episode_start = float(rng.uniform(0.1 * seconds, seconds - EPISODE_SECONDS))
+        timestamps, cycles = _patient_day(rng, seconds, episode_start)
+        readings_total += len(cycles)
+
+        for adaptive in (False, True):
+            summaries, emergencies = _run(patient_id, timestamps, cycles, adaptive, start)
+            delay = _detection_delay(summaries, episode_start, start)
+            for delta in (False, True):
+                decoder = DeltaDecoder()
+                payload_bytes, deltas, errors = _encode(patient_id, summaries, delta, decoder)
+                row = rows.setdefault((adaptive, delta), {
+                    'messages': 0, 'bytes': 0, 'deltas': 0, 'errors': 0,
+                    'emergencies': 0, 'delays': []
+                })
+                row['messages'] += len(summaries)
+                row['bytes'] += payload_bytes
+                row['deltas'] += deltas
+                row['errors'] += errors
+                row['emergencies'] += emergencies
+                if delay is not None:
+                    row['delays'].append(delay)
+    elapsed = time.perf_counter() - t0
+
+    baseline = rows[(False, False)]
+    print(f"\n📊 === RESUMOS EM {args.hours:g}h ({args.patients} pacientes, {readings_total} ciclos, {elapsed:.1f}s) ===")
+    print(f"{'modo':<22} | {'mensagens':>9} | {'bytes':>11} | {'redução msgs':>12} | {'redução bytes':>13} | "
+          f"{'deltas':>6} | {'atraso episódio':>15} | erros")
+    for (adaptive, delta), row in rows.items():
+        name = ('adaptativo' if adaptive else 'fixo') + (' + delta' if delta else '')
+        delay = f"{np.mean(row['delays']):.0f}s" if row['delays'] else '-'
+        print(f"{name:<22} | {row['messages']:>9} | {row['bytes']:>11} | "
+              f"{1 - row['messages'] / baseline['messages']:>11.1%} | "
+              f"{1 - row['bytes'] / baseline['bytes']:>12.1%} | {row['deltas']:>6} | {delay:>15} | {row['errors']}")
+
+    if any(row['errors'] for row in rows.values()):
+        print("❌ Resumos reconstruídos diferentes dos originais")
+    else:
+        print("✅ Todos os resumos delta reconstruídos sem diferenças")
+
+if __name__ == "__main__":
+    main()
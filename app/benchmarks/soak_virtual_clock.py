@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Soak do pipeline de borda em tempo virtual
+
+N pulseiras (sensores + EdgeProcessor, como na SmartPulseira) compartilham
+um VirtualClock passo a passo: cada ciclo avança o relógio até o instante
+da próxima pulseira, sem dormir. Horas de comportamento rodam em segundos.
+A simulação roda duas vezes com a mesma semente e confere se as mensagens
+(emergências e resumos) são idênticas.
+
+Uso (a partir da pasta app):
+    python -m benchmarks.soak_virtual_clock [--devices 50] [--hours 24]
+"""
+
+import argparse
+import hashlib
+import heapq
+import json
+import random
+import time
+from sensors.clock import VirtualClock
+from sensors.heart_rate_sensor import HeartRateSensor
+from sensors.stress_sensor import StressSensor
+from sensors.temperature_sensor import TemperatureSensor
+from sensors.oxygen_sensor import OxygenSensor
+from sensors.fall_sensor import FallSensor
+from sensors.edge_processor import EdgeProcessor
+
+READING_INTERVAL = (8, 15)   # Como na SmartPulseira
+START = 1_700_000_000.0
+
+def _simulate(n_devices: int, hours: float, alert_share: float, seed: int):
+    """Mensagens emitidas e ciclos executados em hours horas simuladas"""
+    random.seed(seed)
+    clock = VirtualClock(start=START)
+    devices = []
+    for i in range(n_devices):
+        patient_id = f"PAT{i:05d}"
+        status = 'alert' if random.random() < alert_share else 'stable'
+        sensors = [HeartRateSensor(patient_id, status=status, clock=clock),
+                   StressSensor(patient_id, clock=clock),
+                   TemperatureSensor(patient_id, status=status, clock=clock),
+                   OxygenSensor(patient_id, clock=clock),
+                   FallSensor(patient_id, chance='medium', clock=clock)]
+        devices.append((sensors, EdgeProcessor(patient_id, clock=clock)))
+
+    end = START + hours * 3600
+    schedule = [(START + random.uniform(0, READING_INTERVAL[1]), i) for i in range(n_devices)]
+    heapq.heapify(schedule)
+    messages, cycles = [], 0
+    while schedule[0][0] < end:
+        due, i = heapq.heappop(schedule)
+        clock.advance_to(due)
+        sensors, processor = devices[i]
+        result = processor.process_sensor_readings([sensor.get_sensor_reading() for sensor in sensors])
+        if result['action'] in ('emergency', 'summary'):
+            messages.append(result['data'])
+        cycles += 1
+        heapq.heappush(schedule, (due + random.uniform(*READING_INTERVAL), i))
+    return messages, cycles
+
+def _digest(messages) -> str:
+    return hashlib.sha256(json.dumps(messages, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak do pipeline de borda com relógio virtual")
+    parser.add_argument("--devices", type=int, default=50)
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--alert-share", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    t0 = time.perf_counter()
+    messages, cycles = _simulate(args.devices, args.hours, args.alert_share, args.seed)
+    seconds = time.perf_counter() - t0
+    repeat, _ = _simulate(args.devices, args.hours, args.alert_share, args.seed)
+
+    emergencies = sum(1 for m in messages if m['message_type'] == 'emergency')
+    digest = _digest(messages)
+    print(f"\n📊 === SOAK EM TEMPO VIRTUAL ({args.devices} pulseiras x {args.hours:g}h) ===")
+    print(f"Ciclos: {cycles:,} em {seconds:.1f}s reais ({args.hours * 3600 / seconds:,.0f}x o tempo real)")
+    print(f"Mensagens: {len(messages):,} ({emergencies:,} emergências, {len(messages) - emergencies:,} resumos)")
+    same = digest == _digest(repeat)
+    print(f"Repetição com a mesma semente: {'idêntica' if same else 'DIVERGENTE'} ({digest})")
+
+if __name__ == "__main__":
+    main()
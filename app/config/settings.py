@@ -8,10 +8,111 @@ MQTT_BROKER = os.getenv("MQTT_BROKER", "mosquitto")
 MQTT_PORT = int(os.getenv("MQTT_PORT", "1883"))
 MQTT_KEEPALIVE = 60
 
+# Subscriber e conectividade
+HEARTBEAT_TIMEOUT = int(os.getenv("HEARTBEAT_TIMEOUT", "90"))  # 90s sem heartbeat = offline
+SUBSCRIBER_STATUS_INTERVAL = int(os.getenv("SUBSCRIBER_STATUS_INTERVAL", "10"))  # Sinal de vida do serviço
+# Permite que POST /start_subscriber rode o subscriber dentro da API
+# (desative quando o subscriber roda como serviço separado: python -m subscriber)
+EMBEDDED_SUBSCRIBER = os.getenv("EMBEDDED_SUBSCRIBER", "true").lower() in ("1", "true", "yes")
+
 # Unidades de sensores
 SENSOR_UNITS = {
     "heart_rate": "bpm",
     "stress_level": "%",
     "temperature": "°C",
     "oxygen_saturation": "%"
-}
\ No newline at end of file
+}
+
+# Resolução das leituras (piso do desvio padrão nos detectores de tendência)
+SENSOR_RESOLUTION = {
+    "heart_rate": 1.0,
+    "stress_level": 1.0,
+    "temperature": 0.1,
+    "oxygen_saturation": 1.0
+}
+
+# Regras de alerta (arquivo JSON recarregado automaticamente quando muda)
+ALERT_RULES_PATH = os.getenv(
+    "ALERT_RULES_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "rules", "default_rules.json")
+)
+RULES_RELOAD_INTERVAL = float(os.getenv("RULES_RELOAD_INTERVAL", "5"))  # Verifica o arquivo a cada 5s
+
+# Supressão de emergências por tipo de alerta: nova condição sempre sai;
+# a mesma condição só volta a sair se piorar ou depois do backoff (que dobra)
+EMERGENCY_BACKOFF_INITIAL = float(os.getenv("EMERGENCY_BACKOFF_INITIAL", "30"))   # 30s
+EMERGENCY_BACKOFF_MAX = float(os.getenv("EMERGENCY_BACKOFF_MAX", "600"))          # 10 minutos
+EMERGENCY_EPISODE_CLEAR = float(os.getenv("EMERGENCY_EPISODE_CLEAR", "120"))      # Condição ausente por 2 min encerra o episódio
+
+# Resumos adaptativos: o intervalo dobra enquanto o paciente está estável
+# (até o máximo) e volta ao mínimo quando a variância ou a tendência sobem
+ADAPTIVE_REPORTING = os.getenv("ADAPTIVE_REPORTING", "false").lower() in ("1", "true", "yes")
+SUMMARY_INTERVAL_MIN = int(os.getenv("SUMMARY_INTERVAL_MIN", "60"))    # 1 minuto
+SUMMARY_INTERVAL_MAX = int(os.getenv("SUMMARY_INTERVAL_MAX", "600"))   # 10 minutos
+ADAPTIVE_VARIANCE_RATIO = float(os.getenv("ADAPTIVE_VARIANCE_RATIO", "1.5"))  # Desvio do período x linha de base
+
+# Codificação delta dos resumos (patch contra o último resumo confirmado)
+DELTA_ENCODING = os.getenv("DELTA_ENCODING", "false").lower() in ("1", "true", "yes")
+DELTA_KEYFRAME_INTERVAL = int(os.getenv("DELTA_KEYFRAME_INTERVAL", "10"))  # Resumo completo a cada 10
+
+# Formato das mensagens da pulseira: 'json' ou 'compact' (CBOR com dicionário,
+# protocol/compact.py); o subscriber aceita os dois
+WIRE_FORMAT = os.getenv("WIRE_FORMAT", "json").lower()
+
+# MQTT v5 na pulseira: aliases de tópico e expiração das mensagens no broker
+MQTT_V5 = os.getenv("MQTT_V5", "false").lower() in ("1", "true", "yes")
+SUMMARY_EXPIRY = int(os.getenv("SUMMARY_EXPIRY", "3600"))     # Resumo não entregue em 1h é descartado
+READINGS_EXPIRY = int(os.getenv("READINGS_EXPIRY", "3600"))
+HEARTBEAT_EXPIRY = int(os.getenv("HEARTBEAT_EXPIRY", "60"))   # Heartbeat atrasado não diz nada
+
+# Lotes (eldercare/batch): resumos, leituras e heartbeats esperam até
+# PUBLISH_BATCH_WINDOW segundos e saem juntos em uma publicação (0 = desativado)
+PUBLISH_BATCH_WINDOW = float(os.getenv("PUBLISH_BATCH_WINDOW", "0"))
+PUBLISH_BATCH_MAX_MESSAGES = int(os.getenv("PUBLISH_BATCH_MAX_MESSAGES", "20"))
+
+# Presença pelo broker (eldercare/presence): status online/offline retido e
+# Last Will, com keepalive MQTT curto; o heartbeat vira só um sinal lento
+PRESENCE_LWT = os.getenv("PRESENCE_LWT", "false").lower() in ("1", "true", "yes")
+PRESENCE_KEEPALIVE = int(os.getenv("PRESENCE_KEEPALIVE", "20"))   # Broker publica o Will após 1,5x sem pacotes; pulseira ociosa manda ping a cada keepalive
+PRESENCE_HEARTBEAT_INTERVAL = int(os.getenv("PRESENCE_HEARTBEAT_INTERVAL", "300"))
+PRESENCE_HEARTBEAT_TIMEOUT = int(os.getenv("PRESENCE_HEARTBEAT_TIMEOUT", "900"))  # Reserva, se o Will não chegar
+
+# Gateway de cabeceira (sensors.gateway): várias pulseiras em poucas conexões MQTT
+GATEWAY_CONNECTIONS = int(os.getenv("GATEWAY_CONNECTIONS", "2"))
+GATEWAY_INFLIGHT = int(os.getenv("GATEWAY_INFLIGHT", "20"))          # Publicações em voo por conexão
+GATEWAY_QUANTUM = int(os.getenv("GATEWAY_QUANTUM", "1500"))          # Bytes por pulseira a cada rodada
+GATEWAY_DEVICE_QUEUE = int(os.getenv("GATEWAY_DEVICE_QUEUE", "200"))  # Fila máxima por pulseira
+
+# Checkpoint do estado do EdgeProcessor na pulseira (vazio = desativado)
+EDGE_CHECKPOINT_DIR = os.getenv("EDGE_CHECKPOINT_DIR", "")
+EDGE_CHECKPOINT_INTERVAL = float(os.getenv("EDGE_CHECKPOINT_INTERVAL", "30"))  # Grava a cada 30s
+# Checkpoint mais antigo que isso só devolve os agregados do período (0 = sem limite)
+EDGE_CHECKPOINT_MAX_AGE = float(os.getenv("EDGE_CHECKPOINT_MAX_AGE", "900"))    # 15 minutos
+
+# Spool da pulseira (store-and-forward): mensagens guardadas em disco enquanto
+# não há conexão e reenviadas na reconexão (vazio = desativado)
+PUBLISH_SPOOL_DIR = os.getenv("PUBLISH_SPOOL_DIR", "")
+SPOOL_MAX_BYTES = int(os.getenv("SPOOL_MAX_BYTES", str(8 * 1024 * 1024)))        # 8 MiB por pulseira
+SPOOL_SEGMENT_BYTES = int(os.getenv("SPOOL_SEGMENT_BYTES", str(256 * 1024)))     # Segmentos de 256 KiB
+SPOOL_DRAIN_RATE = float(os.getenv("SPOOL_DRAIN_RATE", "20"))   # Mensagens/s no reenvio
+SPOOL_DRAIN_BURST = int(os.getenv("SPOOL_DRAIN_BURST", "50"))   # Rajada inicial no reenvio
+
+# Leituras brutas (eldercare/readings): 'edge' = só processamento na pulseira,
+# 'raw' = pulseira envia as leituras e o servidor processa, 'both' = os dois
+# (leituras marcadas como já processadas, só para auditoria)
+READINGS_MODE = os.getenv("READINGS_MODE", "edge").lower()
+READINGS_BATCH_SIZE = int(os.getenv("READINGS_BATCH_SIZE", "6"))            # Ciclos por lote
+STREAM_FLUSH_INTERVAL = float(os.getenv("STREAM_FLUSH_INTERVAL", "1.0"))   # Processamento em bloco a cada 1s
+
+# Change log (delta-sync via /changes)
+CHANGE_LOG_RETENTION_SECONDS = int(os.getenv("CHANGE_LOG_RETENTION_SECONDS", "3600"))  # Mantém 1h de alterações
+CHANGE_LOG_MAX_ENTRIES = int(os.getenv("CHANGE_LOG_MAX_ENTRIES", "50000"))
+CHANGE_LOG_COMPACT_INTERVAL = int(os.getenv("CHANGE_LOG_COMPACT_INTERVAL", "300"))  # Compacta a cada 5 minutos
+
+# Compressão das respostas da API (gzip/brotli)
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))  # bytes
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+
+# Séries temporais (/patients/{id}/series)
+SERIES_MAX_POINTS = int(os.getenv("SERIES_MAX_POINTS", "1000"))  # Limite de pontos por resposta
@@ -24,9 +24,14 @@ from .crud import (
     create_patient, get_patient, get_all_patients,
     create_health_message, get_patient_messages, 
     get_recent_emergencies, get_latest_summary,
-    get_message_data_as_dict, initialize_sample_patients
+    get_message_data_as_dict, initialize_sample_patients,
+    record_change, get_changes_since, compact_change_log,
+    get_message_rows, iter_patient_message_rows, get_sensor_series,
+    iter_sensor_sketches,
+    update_device_presence, get_device_presence,
+    update_service_status, get_service_status
 )
-from .models import Patient, HealthMessage, Base
+from .models import Patient, HealthMessage, ChangeLog, DevicePresence, ServiceStatus, Base
 
 __all__ = [
     # Database
@@ -37,7 +42,12 @@ __all__ = [
     "create_health_message", "get_patient_messages",
     "get_recent_emergencies", "get_latest_summary",
     "get_message_data_as_dict", "initialize_sample_patients",
+    "record_change", "get_changes_since", "compact_change_log",
+    "get_message_rows", "iter_patient_message_rows", "get_sensor_series",
+    "iter_sensor_sketches",
+    "update_device_presence", "get_device_presence",
+    "update_service_status", "get_service_status",
     
     # Models
-    "Patient", "HealthMessage", "Base"
+    "Patient", "HealthMessage", "ChangeLog", "DevicePresence", "ServiceStatus", "Base"
 ]
\ No newline at end of file
@@ -4,10 +4,11 @@ Contém funções para inserir, consultar e manipular dados no SQLite.
 """
 
 import json
-from datetime import datetime
+import time
+from datetime import datetime, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
-from .models import Patient, HealthMessage
+from sqlalchemy import desc, func, select, Integer, cast
+from .models import Patient, HealthMessage, ChangeLog, DevicePresence, ServiceStatus
 from .database import get_db_session_sync
 
 # ====== OPERAÇÕES COM PACIENTES ======
@@ -113,8 +114,8 @@ def create_health_message(patient_id: str, message_type: str, data: dict, origin
         timestamp_str = original_timestamp or datetime.now().isoformat()
         message_id = f"{patient_id}_{message_type}_{int(datetime.now().timestamp() * 1000)}"
         
-        # Converter dados para JSON string
-        data_json = json.dumps(data, ensure_ascii=False, indent=2)
+        # Converter dados para JSON string (compacto: é copiado direto para a API)
+        data_json = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
         
         # Criar mensagem
         message = HealthMessage(
@@ -127,6 +128,16 @@ def create_health_message(patient_id: str, message_type: str, data: dict, origin
         )
         
         db.add(message)
+        
+        # Registra no log de alterações na mesma transação (delta-sync)
+        _add_change(db, "message", patient_id, {
+            "id": message_id,
+            "patient_id": patient_id,
+            "message_type": message_type,
+            "timestamp": timestamp_str,
+            "data": data
+        }, ref_id=message_id)
+        
         db.commit()
         db.refresh(message)
         
@@ -180,6 +191,147 @@ def get_patient_messages(patient_id: str, message_type: str = None, limit: int =
     finally:
         db.close()
 
+def _projection_columns(fields):
+    """
+    Converte os campos da projeção em colunas SQL. Caminhos dentro de `data`
+    são extraídos pelo próprio SQLite (operador ->, retorna JSON).
+    """
+    columns = []
+    for field in fields:
+        if field.startswith("data."):
+            path = "$" + field[len("data"):]
+            columns.append(func.coalesce(HealthMessage.data.op("->")(path), "null").label(field))
+        else:
+            columns.append(getattr(HealthMessage, field))
+    return columns
+
+def _message_rows_query(patient_id: str = None, message_type: str = None, fields=None):
+    """Consulta apenas as colunas serializadas pela API (sem objetos ORM)"""
+    if fields:
+        query = select(*_projection_columns(fields))
+    else:
+        query = select(
+            HealthMessage.id, HealthMessage.patient_id, HealthMessage.message_type,
+            HealthMessage.timestamp, HealthMessage.data
+        )
+    if patient_id:
+        query = query.where(HealthMessage.patient_id == patient_id)
+    if message_type:
+        query = query.where(HealthMessage.message_type == message_type)
+    return query.order_by(desc(HealthMessage.received_at))
+
+def get_message_rows(patient_id: str = None, message_type: str = None, limit: int = 100, fields=None):
+    """
+    Busca mensagens como linhas (id, patient_id, message_type, timestamp, data),
+    prontas para serialização rápida.
+    
+    Args:
+        patient_id: ID do paciente (opcional, None = todos)
+        message_type: Tipo de mensagem para filtrar (opcional)
+        limit: Número máximo de mensagens a retornar
+        fields: Campos da projeção (opcional, ver serializers.parse_fields);
+                se informado, cada linha traz uma coluna por campo
+    
+    Returns:
+        List[Row]: Linhas com as colunas da mensagem
+    """
+    db = get_db_session_sync()
+    try:
+        return db.execute(_message_rows_query(patient_id, message_type, fields).limit(limit)).all()
+    finally:
+        db.close()
+
+def iter_patient_message_rows(patient_id: str, message_type: str = None, batch_size: int = 1000):
+    """
+    Percorre todas as mensagens de um paciente com cursor no servidor,
+    buscando `batch_size` linhas por vez (memória constante).
+    
+    Args:
+        patient_id: ID do paciente
+        message_type: Tipo de mensagem para filtrar (opcional)
+        batch_size: Linhas buscadas do banco por vez
+    
+    Yields:
+        Row: Linhas com as colunas da mensagem
+    """
+    db = get_db_session_sync()
+    try:
+        query = _message_rows_query(patient_id, message_type).execution_options(yield_per=batch_size)
+        for row in db.execute(query):
+            yield row
+    finally:
+        db.close()
+
+def get_sensor_series(patient_id: str, sensor: str, start: str, end: str, bucket_seconds: int):
+    """
+    Agrega as estatísticas de um sensor nos resumos em intervalos fixos (no SQL).
+    
+    A média de cada intervalo é ponderada pela contagem de leituras de cada resumo.
+    
+    Args:
+        patient_id: ID do paciente
+        sensor: Tipo do sensor (ex: "heart_rate")
+        start: Início do período (ISO, inclusivo)
+        end: Fim do período (ISO, exclusivo)
+        bucket_seconds: Tamanho do intervalo em segundos
+    
+    Returns:
+        List[Row]: (bucket, avg, min, max, count) em ordem crescente de bucket,
+                   onde bucket * bucket_seconds é o início do intervalo (epoch)
+    """
+    path = f"$.statistics.{sensor}"
+    avg = func.json_extract(HealthMessage.data, f"{path}.avg")
+    count = func.coalesce(func.json_extract(HealthMessage.data, f"{path}.count"), 1)
+    bucket = cast(func.strftime("%s", HealthMessage.timestamp), Integer) // bucket_seconds
+    
+    query = (select(
+                bucket.label("bucket"),
+                (func.sum(avg * count) / func.sum(count)).label("avg"),
+                func.min(func.json_extract(HealthMessage.data, f"{path}.min")).label("min"),
+                func.max(func.json_extract(HealthMessage.data, f"{path}.max")).label("max"),
+                func.sum(count).label("count"))
+             .where(HealthMessage.patient_id == patient_id)
+             .where(HealthMessage.message_type == "summary")
+             .where(HealthMessage.timestamp >= start)
+             .where(HealthMessage.timestamp < end)
+             .where(avg.isnot(None))
+             .group_by("bucket")
+             .order_by("bucket"))
+    
+    db = get_db_session_sync()
+    try:
+        return db.execute(query).all()
+    finally:
+        db.close()
+
+def iter_sensor_sketches(patient_id: str, sensor: str, start: str, end: str,
+                         bucket_seconds: int, batch_size: int = 1000):
+    """
+    Percorre os sketches de quantis de um sensor nos resumos do período,
+    em ordem de intervalo (resumos antigos, sem sketch, são ignorados).
+    
+    Returns:
+        Iterator[Row]: (bucket, sketch) com o sketch em JSON ([[valor, peso], ...])
+    """
+    sketch = HealthMessage.data.op("->")(f"$.statistics.{sensor}.sketch")
+    bucket = cast(func.strftime("%s", HealthMessage.timestamp), Integer) // bucket_seconds
+    
+    query = (select(bucket.label("bucket"), sketch.label("sketch"))
+             .where(HealthMessage.patient_id == patient_id)
+             .where(HealthMessage.message_type == "summary")
+             .where(HealthMessage.timestamp >= start)
+             .where(HealthMessage.timestamp < end)
+             .where(sketch.isnot(None))
+             .order_by("bucket")
+             .execution_options(yield_per=batch_size))
+    
+    db = get_db_session_sync()
+    try:
+        for row in db.execute(query):
+            yield row
+    finally:
+        db.close()
+
 def get_recent_emergencies(limit: int = 50):
     """
     Busca as emergências mais recentes de todos os pacientes.
@@ -237,6 +389,216 @@ def get_message_data_as_dict(message: HealthMessage):
     except (json.JSONDecodeError, AttributeError):
         return {}
 
+# ====== OPERAÇÕES COM O LOG DE ALTERAÇÕES ======
+
+def _add_change(db: Session, change_type: str, patient_id: str, data: dict, ref_id: str = None):
+    """Adiciona uma entrada ao log de alterações na sessão informada (sem commit)"""
+    entry = ChangeLog(
+        created_at=datetime.now().isoformat(),
+        change_type=change_type,
+        patient_id=patient_id,
+        ref_id=ref_id,
+        data=json.dumps(data, ensure_ascii=False)
+    )
+    db.add(entry)
+    return entry
+
+def record_change(change_type: str, patient_id: str, data: dict, ref_id: str = None):
+    """
+    Registra uma alteração no log (mudança de estado ou de conectividade).
+    
+    Args:
+        change_type: Tipo da alteração ("message", "state" ou "connectivity")
+        patient_id: ID do paciente
+        data: Dados da alteração (dict que será convertido para JSON)
+        ref_id: ID do registro relacionado (opcional)
+    
+    Returns:
+        int: Número de sequência da alteração ou None se erro
+    """
+    db = get_db_session_sync()
+    try:
+        entry = _add_change(db, change_type, patient_id, data, ref_id)
+        db.commit()
+        return entry.seq
+    except Exception as e:
+        db.rollback()
+        print(f"Erro ao registrar alteração: {e}")
+        return None
+    finally:
+        db.close()
+
+def get_changes_since(since: int, limit: int = 500):
+    """
+    Busca as alterações com número de sequência maior que o cursor informado.
+    
+    Args:
+        since: Último cursor conhecido pelo cliente (0 = nenhum)
+        limit: Número máximo de alterações a retornar
+    
+    Returns:
+        dict: {"resync_required", "cursor", "has_more", "changes"}.
+              Se o cursor expirou (compactado) ou é desconhecido,
+              resync_required=True e cursor aponta para o topo atual do log.
+    """
+    db = get_db_session_sync()
+    try:
+        oldest, latest = db.query(func.min(ChangeLog.seq), func.max(ChangeLog.seq)).one()
+        latest = latest or 0
+        
+        # Cursor à frente do log (banco recriado) ou anterior à compactação
+        expired = oldest is not None and since < oldest - 1
+        if since > latest or expired:
+            return {"resync_required": True, "cursor": latest, "has_more": False, "changes": []}
+        
+        entries = (db.query(ChangeLog)
+                   .filter(ChangeLog.seq > since)
+                   .order_by(ChangeLog.seq)
+                   .limit(limit + 1)
+                   .all())
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+        
+        changes = []
+        for entry in entries:
+            try:
+                data = json.loads(entry.data)
+            except json.JSONDecodeError:
+                data = {}
+            changes.append({
+                "seq": entry.seq,
+                "created_at": entry.created_at,
+                "change_type": entry.change_type,
+                "patient_id": entry.patient_id,
+                "ref_id": entry.ref_id,
+                "data": data
+            })
+        
+        return {
+            "resync_required": False,
+            "cursor": entries[-1].seq if entries else since,
+            "has_more": has_more,
+            "changes": changes
+        }
+    finally:
+        db.close()
+
+def compact_change_log(retention_seconds: int, max_entries: int = None):
+    """
+    Remove alterações antigas do log. A entrada mais recente é sempre mantida,
+    para que o cursor continue monotônico e cursores expirados sejam detectados.
+    
+    Args:
+        retention_seconds: Idade máxima (segundos) das entradas mantidas
+        max_entries: Número máximo de entradas mantidas (opcional)
+    
+    Returns:
+        int: Número de entradas removidas
+    """
+    db = get_db_session_sync()
+    try:
+        latest = db.query(func.max(ChangeLog.seq)).scalar()
+        if latest is None:
+            return 0
+        
+        cutoff = (datetime.now() - timedelta(seconds=retention_seconds)).isoformat()
+        query = db.query(ChangeLog).filter(ChangeLog.seq < latest)
+        removed = query.filter(ChangeLog.created_at < cutoff).delete(synchronize_session=False)
+        
+        if max_entries:
+            removed += (query.filter(ChangeLog.seq <= latest - max_entries)
+                        .delete(synchronize_session=False))
+        
+        db.commit()
+        return removed
+    except Exception as e:
+        db.rollback()
+        print(f"Erro ao compactar log de alterações: {e}")
+        return 0
+    finally:
+        db.close()
+
+# ====== ESTADO COMPARTILHADO ENTRE PROCESSOS ======
+# O subscriber roda em processo próprio e publica aqui a conectividade das
+# pulseiras e o próprio sinal de vida; os workers da API apenas leem.
+
+def update_device_presence(patient_id: str, status: str, last_heartbeat: float = None):
+    """
+    Atualiza (ou cria) o status de conectividade de uma pulseira.
+    
+    Args:
+        patient_id: ID do paciente
+        status: "ONLINE" ou "OFFLINE"
+        last_heartbeat: Epoch do último heartbeat (None mantém o atual)
+    """
+    db = get_db_session_sync()
+    try:
+        presence = db.get(DevicePresence, patient_id)
+        if presence is None:
+            presence = DevicePresence(patient_id=patient_id)
+            db.add(presence)
+        presence.status = status
+        if last_heartbeat is not None:
+            presence.last_heartbeat = last_heartbeat
+        presence.updated_at = time.time()
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Erro ao atualizar conectividade: {e}")
+    finally:
+        db.close()
+
+def get_device_presence():
+    """
+    Retorna a conectividade de todas as pulseiras conhecidas.
+    
+    Returns:
+        List[DevicePresence]: Status de cada pulseira
+    """
+    db = get_db_session_sync()
+    try:
+        return db.query(DevicePresence).all()
+    finally:
+        db.close()
+
+def update_service_status(name: str, started_at: float, data: dict):
+    """
+    Registra o sinal de vida de um serviço (ex: subscriber) com estatísticas.
+    
+    Args:
+        name: Nome do serviço
+        started_at: Epoch de início do serviço
+        data: Estatísticas do serviço (dict que será convertido para JSON)
+    """
+    db = get_db_session_sync()
+    try:
+        status = db.get(ServiceStatus, name)
+        if status is None:
+            status = ServiceStatus(name=name)
+            db.add(status)
+        status.started_at = started_at
+        status.last_seen = time.time()
+        status.data = json.dumps(data, ensure_ascii=False, default=str)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Erro ao atualizar status do serviço: {e}")
+    finally:
+        db.close()
+
+def get_service_status(name: str):
+    """
+    Busca o último sinal de vida de um serviço.
+    
+    Returns:
+        ServiceStatus: Status do serviço ou None se nunca registrado
+    """
+    db = get_db_session_sync()
+    try:
+        return db.get(ServiceStatus, name)
+    finally:
+        db.close()
+
 # ====== FUNÇÕES DE UTILIDADE ======
 
 def initialize_sample_patients():
@@ -4,13 +4,13 @@ Responsável por criar e configurar a conexão com o banco.
 """
 
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from .models import Base
 
-# Caminho para o banco de dados
+# Caminho para o banco de dados (DATABASE_URL no ambiente sobrescreve o padrão)
 DATABASE_PATH = os.path.join(os.path.dirname(__file__), '..', 'health.db')
-DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
+DATABASE_URL = os.getenv("DATABASE_URL", f"sqlite:///{DATABASE_PATH}")
 
 # Engine do SQLAlchemy
 engine = create_engine(
@@ -19,6 +19,19 @@ engine = create_engine(
     echo=False  # True para debug SQL
 )
 
+@event.listens_for(engine, "connect")
+def _configure_sqlite(dbapi_connection, connection_record):
+    """
+    WAL permite que vários workers da API leiam enquanto o subscriber
+    (processo separado) escreve; busy_timeout espera locks em vez de falhar.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
 # SessionLocal para criar sessões do banco
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -28,7 +41,7 @@ def create_database():
     Deve ser chamada uma vez para inicializar o banco.
     """
     Base.metadata.create_all(bind=engine)
-    print(f"Banco de dados criado em: {DATABASE_PATH}")
+    print(f"Banco de dados criado em: {engine.url.database}")
 
 def get_db_session():
     """
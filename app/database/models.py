@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, Text, ForeignKey, DateTime
+from sqlalchemy import Column, String, Integer, Float, Text, ForeignKey, DateTime, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -21,6 +21,12 @@ class Patient(Base):
 
 class HealthMessage(Base):
     __tablename__ = "health_messages"
+    __table_args__ = (
+        # Histórico por paciente sem ordenação em memória (/messages e exportação)
+        Index("ix_health_messages_patient_received", "patient_id", "received_at"),
+        # Séries temporais por tipo de mensagem e período (/patients/{id}/series)
+        Index("ix_health_messages_patient_type_timestamp", "patient_id", "message_type", "timestamp"),
+    )
     
     id = Column(String, primary_key=True)     # PAT001_emergency_123456
     received_at = Column(String, nullable=False)  # timestamp recebimento
@@ -33,4 +39,43 @@ class HealthMessage(Base):
     patient = relationship("Patient", back_populates="health_messages")
     
     def __repr__(self):
-        return f"<HealthMessage(id='{self.id}', type='{self.message_type}', patient_id='{self.patient_id}')>"
\ No newline at end of file
+        return f"<HealthMessage(id='{self.id}', type='{self.message_type}', patient_id='{self.patient_id}')>"
+
+class ChangeLog(Base):
+    __tablename__ = "change_log"
+    __table_args__ = {"sqlite_autoincrement": True}  # seq nunca é reutilizado após compactação
+    
+    seq = Column(Integer, primary_key=True, autoincrement=True)  # cursor monotônico
+    created_at = Column(String, nullable=False)   # timestamp da alteração
+    change_type = Column(String, nullable=False)  # "message", "state" ou "connectivity"
+    patient_id = Column(String, nullable=False)   # PAT001
+    ref_id = Column(String)                       # id da mensagem (quando aplicável)
+    data = Column(Text, nullable=False)           # JSON como string
+    
+    def __repr__(self):
+        return f"<ChangeLog(seq={self.seq}, type='{self.change_type}', patient_id='{self.patient_id}')>"
+
+
+
+class DevicePresence(Base):
+    __tablename__ = "device_presence"
+    
+    patient_id = Column(String, primary_key=True)  # PAT001
+    last_heartbeat = Column(Float)                 # epoch do último heartbeat
+    status = Column(String, nullable=False)        # "ONLINE" ou "OFFLINE"
+    updated_at = Column(Float, nullable=False)     # epoch da última atualização
+    
+    def __repr__(self):
+        return f"<DevicePresence(patient_id='{self.patient_id}', status='{self.status}')>"
+
+
+class ServiceStatus(Base):
+    __tablename__ = "service_status"
+    
+    name = Column(String, primary_key=True)       # "subscriber"
+    started_at = Column(Float, nullable=False)    # epoch de início do serviço
+    last_seen = Column(Float, nullable=False)     # epoch do último sinal de vida
+    data = Column(Text, nullable=False)           # JSON com estatísticas
+    
+    def __repr__(self):
+        return f"<ServiceStatus(name='{self.name}', last_seen={self.last_seen})>"
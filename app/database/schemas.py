@@ -1,12 +1,11 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Any, Dict
 
 class HealthMessageSchema(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
     patient_id: str
     message_type: str
     timestamp: str
     data: Dict[str, Any]
-
-    class Config:
-        orm_mode = True
@@ -0,0 +1,127 @@
+"""
+Serialização rápida de mensagens de saúde para as respostas da API.
+
+O campo `data` já é gravado como JSON válido pelo próprio sistema, então
+ele é copiado diretamente para a resposta, sem `json.loads` nem nova
+validação pelo Pydantic. Os demais campos são codificados com orjson.
+"""
+
+import re
+from typing import List
+import orjson
+
+# Colunas de HealthMessage expostas pela API (na ordem de serialização)
+MESSAGE_FIELDS = ("id", "patient_id", "message_type", "timestamp")
+
+# Campos aceitos pela projeção (?fields=): colunas e caminhos dentro de `data`
+PROJECTABLE_COLUMNS = MESSAGE_FIELDS + ("received_at", "data")
+DATA_PATH_RE = re.compile(r"^data(\.[A-Za-z_][A-Za-z0-9_]*)+$")
+
+def encode_message_row(row) -> bytes:
+    """
+    Codifica uma linha (id, patient_id, message_type, timestamp, data) em JSON.
+    
+    Args:
+        row: Tupla/Row com as colunas de MESSAGE_FIELDS seguidas de `data`
+    
+    Returns:
+        bytes: Objeto JSON da mensagem
+    """
+    message_id, patient_id, message_type, timestamp, data = row
+    head = orjson.dumps({
+        "id": message_id,
+        "patient_id": patient_id,
+        "message_type": message_type,
+        "timestamp": timestamp or ""
+    })
+    return head[:-1] + b',"data":' + (data.encode() if data else b"{}") + b"}"
+
+def encode_message_rows(rows) -> bytes:
+    """Codifica uma lista de linhas como array JSON"""
+    return b"[" + b",".join(encode_message_row(row) for row in rows) + b"]"
+
+def iter_ndjson(rows, chunk_size: int = 500):
+    """
+    Gera NDJSON (uma mensagem por linha) a partir de um iterável de linhas,
+    agrupando `chunk_size` linhas por bloco enviado.
+    """
+    chunk = []
+    for row in rows:
+        chunk.append(encode_message_row(row))
+        if len(chunk) >= chunk_size:
+            yield b"\n".join(chunk) + b"\n"
+            chunk = []
+    if chunk:
+        yield b"\n".join(chunk) + b"\n"
+
+# ====== PROJEÇÃO DE CAMPOS (?fields=) ======
+
+def parse_fields(fields: str) -> List[str]:
+    """
+    Valida a lista de campos da projeção.
+    
+    Args:
+        fields: Campos separados por vírgula, ex: "id,timestamp,data.health_status"
+    
+    Returns:
+        List[str]: Campos normalizados (sem duplicatas; um caminho pai,
+                   como `data` inteiro, substitui os caminhos filhos)
+    
+    Raises:
+        ValueError: Se algum campo não for uma coluna ou caminho válido
+    """
+    result = []
+    for field in (f.strip() for f in fields.split(",")):
+        if not field or field in result:
+            continue
+        if field not in PROJECTABLE_COLUMNS and not DATA_PATH_RE.match(field):
+            raise ValueError(f"Campo inválido: {field}")
+        result.append(field)
+    
+    if not result:
+        raise ValueError("Nenhum campo informado")
+    return [f for f in result if not any(f.startswith(g + ".") for g in result)]
+
+def _build_field_tree(fields: List[str]) -> dict:
+    """Monta a árvore de saída: folhas são o índice da coluna na linha"""
+    tree = {}
+    for index, field in enumerate(fields):
+        *parents, leaf = field.split(".")
+        node = tree
+        for key in parents:
+            node = node.setdefault(key, {})
+        node[leaf] = index
+    return tree
+
+def _compile_node(node: dict, raw_columns) -> list:
+    """Pré-calcula os prefixos `"chave":` de cada nível da árvore"""
+    compiled = []
+    for key, child in node.items():
+        prefix = orjson.dumps(key) + b":"
+        if isinstance(child, dict):
+            compiled.append((prefix, "node", _compile_node(child, raw_columns)))
+        else:
+            compiled.append((prefix, "raw" if child in raw_columns else "value", child))
+    return compiled
+
+def _encode_node(compiled: list, row) -> bytes:
+    parts = []
+    for prefix, kind, child in compiled:
+        if kind == "node":
+            value = _encode_node(child, row)
+        elif kind == "raw":
+            # Já é JSON (coluna data ou extraído pelo SQLite)
+            value = row[child].encode() if row[child] else b"null"
+        else:
+            value = orjson.dumps(row[child])
+        parts.append(prefix + value)
+    return b"{" + b",".join(parts) + b"}"
+
+def encode_projected_rows(rows, fields: List[str]) -> bytes:
+    """
+    Codifica linhas projetadas (uma coluna por campo, na ordem de `fields`)
+    como array JSON, reconstruindo o aninhamento dos caminhos de `data`.
+    """
+    raw_columns = {i for i, f in enumerate(fields) if f == "data" or f.startswith("data.")}
+    compiled = _compile_node(_build_field_tree(fields), raw_columns)
+    return b"[" + b",".join(_encode_node(compiled, row) for row in rows) + b"]"
@@ -0,0 +1,9 @@
+"""
+Middlewares ASGI da API.
+
+- compression.py: Compressão gzip/brotli das respostas com limite mínimo de tamanho
+"""
+
+from .compression import CompressionMiddleware
+
+__all__ = ["CompressionMiddleware"]
@@ -0,0 +1,173 @@
+"""
+Middleware de compressão das respostas da API (gzip e brotli).
+
+Escolhe a codificação pelo cabeçalho Accept-Encoding (brotli, se o pacote
+estiver instalado, senão gzip). Respostas menores que `minimum_size` são
+enviadas sem compressão. Respostas em streaming (ex: exportação NDJSON)
+são comprimidas bloco a bloco, sem acumular o corpo em memória.
+"""
+
+import zlib
+from typing import Optional
+
+try:
+    import brotli
+except ImportError:  # brotli é opcional: sem ele, apenas gzip
+    brotli = None
+
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        # wbits=31 -> formato gzip (cabeçalho + CRC)
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+class _BrotliCompressor:
+    def __init__(self, quality: int):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self._compressor.process(data) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class CompressionMiddleware:
+    """
+    Comprime respostas HTTP com gzip ou brotli
+    
+    Args:
+        app: Aplicação ASGI
+        minimum_size: Tamanho mínimo (bytes) para comprimir
+        gzip_level: Nível de compressão gzip (1-9)
+        brotli_quality: Qualidade brotli (0-11)
+    """
+    
+    def __init__(self, app, minimum_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        encoding = self._choose_encoding(scope)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        
+        await _CompressionResponder(self, encoding, send).run(scope, receive)
+    
+    def _choose_encoding(self, scope) -> Optional[str]:
+        """Escolhe a codificação aceita pelo cliente (brotli > gzip)"""
+        accept = ""
+        for name, value in scope.get("headers", []):
+            if name == b"accept-encoding":
+                accept = value.decode("latin-1").lower()
+                break
+        
+        accepted = set()
+        for item in accept.split(","):
+            token, *params = item.split(";")
+            quality = 1.0
+            for param in params:
+                key, _, value = param.strip().partition("=")
+                if key == "q":
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0
+            if quality > 0:
+                accepted.add(token.strip())
+        
+        if brotli is not None and "br" in accepted:
+            return "br"
+        if "gzip" in accepted:
+            return "gzip"
+        return None
+    
+    def _create_compressor(self, encoding: str):
+        if encoding == "br":
+            return _BrotliCompressor(self.brotli_quality)
+        return _GzipCompressor(self.gzip_level)
+
+
+class _CompressionResponder:
+    """Intercepta as mensagens ASGI de uma resposta e comprime o corpo"""
+    
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message = None
+        self.compressor = None
+        self.passthrough = False
+    
+    async def run(self, scope, receive):
+        await self.middleware.app(scope, receive, self.send_wrapper)
+    
+    async def send_wrapper(self, message):
+        message_type = message["type"]
+        
+        if message_type == "http.response.start":
+            # Adia o início da resposta até conhecer o primeiro bloco do corpo
+            self.start_message = message
+            headers = {name.lower() for name, _ in message.get("headers", [])}
+            self.passthrough = b"content-encoding" in headers
+            return
+        
+        if message_type != "http.response.body" or self.passthrough:
+            await self._flush_start()
+            await self.send(message)
+            return
+        
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        
+        if self.compressor is None:
+            # Resposta completa e pequena: envia sem compressão
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self.passthrough = True
+                await self._flush_start()
+                await self.send(message)
+                return
+            
+            self.compressor = self.middleware._create_compressor(self.encoding)
+            compressed = self.compressor.compress(body)
+            if not more_body:
+                compressed += self.compressor.finish()
+            self._set_compression_headers(len(compressed) if not more_body else None)
+            await self._flush_start()
+            await self.send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+            return
+        
+        compressed = self.compressor.compress(body) if body else b""
+        if not more_body:
+            compressed += self.compressor.finish()
+        await self.send({"type": "http.response.body", "body": compressed, "more_body": more_body})
+    
+    def _set_compression_headers(self, content_length: Optional[int]):
+        headers = [
+            (name, value) for name, value in self.start_message.get("headers", [])
+            if name.lower() not in (b"content-length", b"content-encoding")
+        ]
+        headers.append((b"content-encoding", self.encoding.encode()))
+        headers.append((b"vary", b"Accept-Encoding"))
+        if content_length is not None:
+            headers.append((b"content-length", str(content_length).encode()))
+        self.start_message = {**self.start_message, "headers": headers}
+    
+    async def _flush_start(self):
+        if self.start_message is not None:
+            await self.send(self.start_message)
+            self.start_message = None
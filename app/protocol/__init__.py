@@ -0,0 +1,20 @@
+"""
+Formato das mensagens trocadas entre a pulseira e o subscriber.
+
+- delta.py: Resumos codificados como patch (RFC 7396) contra o último resumo confirmado
+- readings.py: Lotes de leituras brutas (tópico eldercare/readings)
+- compact.py: Formato binário compacto (CBOR com dicionário), alternativa ao JSON
+- batch.py: Lotes de mensagens em uma só publicação (tópico eldercare/batch)
+"""
+
+from .delta import create_merge_patch, apply_merge_patch, DeltaEncoder, DeltaDecoder, SUBSCRIBER_EPOCH_TOPIC
+from .readings import READING_SENSORS, encode_readings, decode_readings
+from .compact import WIRE_FORMATS, encode_message, decode_payload, is_compact
+from .batch import BATCH_TYPES, encode_batch, decode_batch
+
+__all__ = [
+    "create_merge_patch", "apply_merge_patch", "DeltaEncoder", "DeltaDecoder", "SUBSCRIBER_EPOCH_TOPIC",
+    "READING_SENSORS", "encode_readings", "decode_readings",
+    "WIRE_FORMATS", "encode_message", "decode_payload", "is_compact",
+    "BATCH_TYPES", "encode_batch", "decode_batch"
+]
@@ -0,0 +1,43 @@
+"""
+Lotes de mensagens da pulseira (tópico eldercare/batch/<paciente>)
+
+Cada publicação QoS 1 custa dois pacotes (PUBLISH + PUBACK) e repete o
+cabeçalho MQTT. Com PUBLISH_BATCH_WINDOW, resumos, leituras e heartbeats
+esperam até a janela fechar e saem juntos:
+
+    {"message_type": "batch",
+     "messages": [["summary", {...}], ["readings", {...}], ["heartbeat", {...}]]}
+
+Cada item é [tipo, payload], com o payload exatamente como seria publicado
+em eldercare/<tipo>/<paciente> (inclusive resumos delta). Emergências
+nunca entram em lote. O subscriber processa os itens em ordem, como se
+cada um tivesse chegado no próprio tópico.
+"""
+
+from typing import Dict, List, Tuple
+
+BATCH_TYPES = ('summary', 'readings', 'heartbeat')
+
+
+def encode_batch(items: List[Tuple[str, Dict]]) -> Dict:
+    """Monta o lote a partir de [(tipo, payload)]"""
+    return {'message_type': 'batch', 'messages': [[message_type, payload] for message_type, payload in items]}
+
+
+def decode_batch(payload: Dict) -> List[Tuple[str, Dict]]:
+    """
+    [(tipo, payload)] dos itens do lote (valida todos antes de retornar)
+
+    Raises:
+        ValueError: Se o lote ou algum item for inválido
+    """
+    messages = payload.get('messages') if isinstance(payload, dict) else None
+    if not isinstance(messages, list):
+        raise ValueError("Lote inválido: esperado 'messages' com a lista de itens")
+    items = []
+    for item in messages:
+        if (not isinstance(item, list) or len(item) != 2 or item[0] not in BATCH_TYPES
+                or not isinstance(item[1], dict)):
+            raise ValueError(f"Item de lote inválido: {str(item)[:80]}")
+        items.append((item[0], item[1]))
+    return items
@@ -0,0 +1,324 @@
+"""
+Formato binário compacto das mensagens da pulseira (CBOR com dicionário)
+
+Alternativa ao JSON para pulseiras em rede celular (WIRE_FORMAT=compact).
+A mensagem é CBOR (RFC 8949) começando pela tag "self-describe"
+(bytes d9 d9 f7), o que a distingue de JSON (que começa com '{'), então o
+subscriber decodifica os dois formatos pelo próprio payload. Com MQTT v5 o
+formato poderia ir na propriedade Content Type, mas ela não acompanha o
+payload no spool da pulseira nem nas gravações de tráfego (traffic), que
+guardam só tópico e payload, e o subscriber também recebe pulseiras sem
+MQTT v5; por isso o formato continua no próprio payload.
+
+Para não repetir nomes longos ('oxygen_saturation', 'last_value', 'unit'...)
+em toda mensagem, as palavras conhecidas (WORDS) viram inteiros:
+- como chave de mapa, o próprio índice (inteiro CBOR);
+- como valor de texto, o índice com a tag 6.
+Palavras fora da tabela continuam como texto. WORDS só pode crescer no fim:
+mudar a ordem quebra a decodificação de mensagens já gravadas ou em spool.
+
+Floats vão no menor formato sem perda: half (3 bytes) quando exato, fração
+decimal (tag 4, [expoente, mantissa]) para valores arredondados como 97.33,
+ou double. O resultado decodificado é igual a json.loads(json.dumps(data)).
+"""
+
+import json
+import math
+import struct
+from typing import Dict, Optional, Union
+
+MAGIC = b'\xd9\xd9\xf7'   # Tag 55799 (self-describe CBOR)
+
+WIRE_FORMATS = ('json', 'compact')
+
+_WORD_TAG = 6
+_DECIMAL_TAG = 4
+_INT_LIMIT = 2 ** 64   # Inteiros CBOR: argumento de até 64 bits (-2**64 a 2**64 - 1)
+
+WORDS = (
+    # Mensagens
+    'message_type', 'timestamp', 'patient_id', 'health_status', 'alerts', 'statistics',
+    'context_data', 'type', 'sensor', 'value', 'severity', 'message', 'episode',
+    'started_at', 'occurrences', 'suppressed', 'worst_value', 'sensor_type', 'unit',
+    'fall_detected', 'buffer_size', 'episodes', 'trends', 'trend', 'baseline', 'deviation',
+    'slope', 'direction', 'drift',
+    # Estatísticas do resumo
+    'avg', 'min', 'max', 'count', 'last_value', 'std', 'p5', 'p50', 'p95', 'sketch',
+    # Delta e leituras brutas
+    'encoding', 'delta', 'seq', 'base_seq', 'patch', 't0', 'sensors', 'rows', 'processed',
+    # Heartbeat
+    'device_id', 'created_at', 'status', 'uptime_seconds', 'stats', 'emergency_sent',
+    'summary_sent', 'failed_sends', 'HEARTBEAT', 'online',
+    # Sensores e unidades
+    'heart_rate', 'stress_level', 'temperature', 'oxygen_saturation', 'fall_detection',
+    'bpm', '%', '°C',
+    # Tipos, severidades e estados
+    'summary', 'emergency', 'stable', 'alert', 'critical', 'normal', 'concern',
+    'estável', 'subindo', 'descendo',
+    'FALL_DETECTED', 'CRITICAL_HEART_RATE', 'EXTREME_TEMPERATURE', 'HIGH_STRESS', 'LOW_OXYGEN',
+    'batimento_baixo', 'batimento_elevado', 'batimento_critico_alto', 'batimento_critico_baixo',
+    'oxigenacao_baixa', 'oxigenacao_critica_baixa', 'queda_detectada', 'stress_alto',
+    'stress_critico', 'temperatura_baixa', 'temperatura_elevada', 'temperatura_critica_alta',
+    'temperatura_critica_baixa', 'tendencia_alta_batimento', 'tendencia_alta_stress',
+    'tendencia_alta_temperatura', 'tendencia_queda_batimento', 'tendencia_queda_oxigenacao',
+    'tendencia_queda_temperatura',
+    # Lotes (protocol.batch)
+    'batch', 'messages',
+)
+_WORD_INDEX = {word: i for i, word in enumerate(WORDS)}
+
+_HALF = struct.Struct('>e')
+_DOUBLE = struct.Struct('>d')
+_POW10 = [10 ** places for places in range(24)]
+
+
+def is_compact(payload: bytes) -> bool:
+    """Se o payload está no formato compacto (começa pela tag self-describe)"""
+    return payload[:3] == MAGIC
+
+
+def dumps(data) -> bytes:
+    """
+    Codifica data (tipos JSON) no formato compacto
+
+    Raises:
+        ValueError: Se algum valor não tiver representação (tipo não suportado ou inteiro fora de 64 bits)
+    """
+    out = bytearray(MAGIC)
+    _encode(data, out)
+    return bytes(out)
+
+
+def loads(payload: Union[bytes, bytearray, memoryview]):
+    """
+    Decodifica uma mensagem compacta
+
+    Raises:
+        ValueError: Se o payload não for uma mensagem compacta válida
+    """
+    payload = bytes(payload)
+    if not is_compact(payload):
+        raise ValueError("Payload não está no formato compacto")
+    try:
+        value, offset = _decode(payload, len(MAGIC))
+    except (IndexError, TypeError, struct.error) as e:
+        raise ValueError(f"Mensagem compacta inválida: {e}")
+    if offset != len(payload):
+        raise ValueError("Bytes extras após a mensagem compacta")
+    return value
+
+
+def encode_message(data: Dict, wire_format: str = 'json', indent: Optional[int] = None) -> bytes:
+    """Codifica uma mensagem da pulseira no formato escolhido (WIRE_FORMATS)"""
+    if wire_format == 'compact':
+        return dumps(data)
+    if indent is None:
+        return json.dumps(data, separators=(',', ':')).encode()
+    return json.dumps(data, indent=indent).encode()
+
+
+def decode_payload(payload: bytes) -> Dict:
+    """Payload MQTT em qualquer dos formatos (compacto ou JSON)"""
+    if is_compact(payload):
+        return loads(payload)
+    return json.loads(payload.decode() if isinstance(payload, (bytes, bytearray)) else payload)
+
+
+# === CODIFICAÇÃO ===
+
+def _head(major: int, n: int, out: bytearray):
+    if n < 24:
+        out.append(major << 5 | n)
+    elif n < 0x100:
+        out += bytes((major << 5 | 24, n))
+    elif n < 0x10000:
+        out.append(major << 5 | 25)
+        out += n.to_bytes(2, 'big')
+    elif n < 0x100000000:
+        out.append(major << 5 | 26)
+        out += n.to_bytes(4, 'big')
+    else:
+        out.append(major << 5 | 27)
+        out += n.to_bytes(8, 'big')
+
+
+def _encode(value, out: bytearray):
+    if value is None:
+        out.append(0xf6)
+    elif value is True:
+        out.append(0xf5)
+    elif value is False:
+        out.append(0xf4)
+    elif isinstance(value, int):
+        if not -_INT_LIMIT <= value < _INT_LIMIT:
+            raise ValueError(f"Inteiro fora do intervalo do formato compacto (64 bits): {value}")
+        if value >= 0:
+            _head(0, value, out)
+        else:
+            _head(1, -1 - value, out)
+    elif isinstance(value, float):
+        _encode_float(value, out)
+    elif isinstance(value, str):
+        index = _WORD_INDEX.get(value)
+        if index is not None:
+            _head(6, _WORD_TAG, out)
+            _head(0, index, out)
+        else:
+            encoded = value.encode()
+            _head(3, len(encoded), out)
+            out += encoded
+    elif isinstance(value, dict):
+        _head(5, len(value), out)
+        for key, item in value.items():
+            key = key if isinstance(key, str) else _json_key(key)
+            index = _WORD_INDEX.get(key)
+            if index is not None:
+                _head(0, index, out)
+            else:
+                encoded = key.encode()
+                _head(3, len(encoded), out)
+                out += encoded
+            _encode(item, out)
+    elif isinstance(value, (list, tuple)):
+        _head(4, len(value), out)
+        for item in value:
+            _encode(item, out)
+    elif isinstance(value, (bytes, bytearray)):
+        _head(2, len(value), out)
+        out += value
+    else:
+        raise ValueError(f"Tipo não suportado no formato compacto: {type(value).__name__}")
+
+
+def _json_key(key) -> str:
+    """Mesma conversão de chaves que o json.dumps"""
+    if key is True:
+        return 'true'
+    if key is False:
+        return 'false'
+    if key is None:
+        return 'null'
+    if isinstance(key, (int, float)):
+        return repr(key) if isinstance(key, float) else str(key)
+    raise ValueError(f"Chave não suportada no formato compacto: {type(key).__name__}")
+
+
+def _encode_float(value: float, out: bytearray):
+    if not math.isfinite(value):
+        out.append(0xf9)
+        out += _HALF.pack(value)
+        return
+    try:
+        if _HALF.unpack(_HALF.pack(value))[0] == value:
+            out.append(0xf9)
+            out += _HALF.pack(value)
+            return
+    except OverflowError:
+        pass
+    # Fração decimal: o menor número de casas que reproduz o valor exato
+    for places in range(7):
+        mantissa = round(value * 10 ** places)
+        if mantissa / 10 ** places == value:
+            if abs(mantissa) < 0x100000000:   # Até 4 bytes de mantissa (senão o double é menor)
+                _head(6, _DECIMAL_TAG, out)
+                out.append(0x82)
+                _encode(-places, out)
+                _encode(mantissa, out)
+                return
+            break
+    out.append(0xfb)
+    out += _DOUBLE.pack(value)
+
+
+# === DECODIFICAÇÃO ===
+
+def _argument(data: bytes, info: int, offset: int):
+    if info < 24:
+        return info, offset
+    if info == 24:
+        return data[offset], offset + 1
+    size = {25: 2, 26: 4, 27: 8}.get(info)
+    if size is None:
+        raise ValueError(f"Cabeçalho CBOR não suportado ({info})")
+    end = offset + size
+    if end > len(data):
+        raise IndexError("fim do payload")
+    return int.from_bytes(data[offset:end], 'big'), end
+
+
+def _decode(data: bytes, offset: int):
+    initial = data[offset]
+    offset += 1
+    # Casos mais comuns primeiro: inteiro pequeno, palavra e fração decimal
+    if initial < 0x18:
+        return initial, offset
+    if initial == 0xc6:
+        index = data[offset]
+        if index < 0x18:
+            return _word(index), offset + 1
+        index, offset = _decode(data, offset)
+        return _word(index), offset
+    if initial == 0xc4:
+        (exponent, mantissa), offset = _decode(data, offset)
+        if -len(_POW10) < exponent <= 0:
+            return mantissa / _POW10[-exponent], offset
+        return float(mantissa * 10 ** exponent), offset
+
+    major, info = initial >> 5, initial & 0x1f
+    if major == 7:
+        if info == 20:
+            return False, offset
+        if info == 21:
+            return True, offset
+        if info == 22:
+            return None, offset
+        if info == 25:
+            return _HALF.unpack_from(data, offset)[0], offset + 2
+        if info == 26:
+            return struct.unpack_from('>f', data, offset)[0], offset + 4
+        if info == 27:
+            return _DOUBLE.unpack_from(data, offset)[0], offset + 8
+        raise ValueError(f"Valor simples CBOR não suportado ({info})")
+
+    n, offset = _argument(data, info, offset)
+    if major == 0:
+        return n, offset
+    if major == 1:
+        return -1 - n, offset
+    if major in (2, 3):
+        end = offset + n
+        if end > len(data):
+            raise IndexError("fim do payload")
+        chunk = data[offset:end]
+        return (chunk if major == 2 else chunk.decode()), end
+    if major == 4:
+        items = []
+        for _ in range(n):
+            item, offset = _decode(data, offset)
+            items.append(item)
+        return items, offset
+    if major == 5:
+        result = {}
+        for _ in range(n):
+            key = data[offset]
+            if key < 0x18:
+                key = _word(key)
+                offset += 1
+            else:
+                key, offset = _decode(data, offset)
+                if isinstance(key, int):
+                    key = _word(key)
+            result[key], offset = _decode(data, offset)
+        return result, offset
+    # major 6: outras tags
+    if n == 55799:
+        return _decode(data, offset)
+    if n in (_WORD_TAG, _DECIMAL_TAG):
+        raise ValueError(f"Tag CBOR {n} com cabeçalho longo não suportada")
+    raise ValueError(f"Tag CBOR não suportada ({n})")
+
+
+def _word(index) -> str:
+    if isinstance(index, int) and 0 <= index < len(WORDS):
+        return WORDS[index]
+    raise ValueError(f"Palavra desconhecida no formato compacto ({index})")
@@ -0,0 +1,226 @@
+"""
+Codificação delta dos resumos (pulseira -> subscriber)
+
+A pulseira numera os resumos (seq) e, em vez do resumo completo, envia só
+o que mudou em relação ao último resumo confirmado pelo broker (PUBACK):
+
+    keyframe: o próprio resumo, com 'seq'
+    delta:    {'encoding': 'delta', 'seq': 8, 'base_seq': 7, 'patch': {...}}
+
+O patch segue o JSON Merge Patch (RFC 7396): dicionários são comparados
+recursivamente, qualquer outro valor (inclusive listas) é substituído por
+inteiro e null remove a chave. Um keyframe é enviado a cada
+DELTA_KEYFRAME_INTERVAL resumos, quando não há base confirmada ou quando o
+patch não é menor que o resumo completo.
+
+O subscriber reconstrói o resumo completo a partir da última base que
+conhece; sem ela, o delta é descartado e o próximo keyframe ressincroniza.
+
+O PUBACK só diz que o broker recebeu a base, não que o subscriber a
+viu: um resumo entregue enquanto o subscriber estava desconectado (sessão
+limpa) some para ele. Por isso a base é descartada (reset) quando a
+pulseira reconecta e quando o subscriber anuncia uma nova época
+(SUBSCRIBER_EPOCH_TOPIC, retido, republicado a cada conexão dele). O
+risco que sobra é o subscriber perder um resumo sem desconectar; aí os
+deltas seguintes são descartados até o próximo keyframe (no máximo
+DELTA_KEYFRAME_INTERVAL - 1 resumos).
+"""
+
+import json
+import threading
+from collections import deque
+from typing import Callable, Dict, Optional, Tuple
+from config.settings import DELTA_KEYFRAME_INTERVAL
+
+ENCODING_DELTA = "delta"
+
+# Época do subscriber (retida): muda a cada conexão dele ao broker
+SUBSCRIBER_EPOCH_TOPIC = "eldercare/subscriber/epoch"
+
+
+class _NotRepresentable(Exception):
+    """O resumo contém null e não pode ser expresso como merge patch"""
+
+
+def create_merge_patch(base: Dict, target: Dict) -> Dict:
+    """
+    Patch que transforma base em target (RFC 7396)
+
+    Raises:
+        ValueError: Se target tiver valores None (null significa remoção no patch)
+    """
+    try:
+        return _diff(base, target)
+    except _NotRepresentable:
+        raise ValueError("Resumo com valores nulos não pode ser codificado como delta")
+
+
+def _diff(base: Dict, target: Dict) -> Dict:
+    patch = {}
+    for key, value in target.items():
+        if value is None:
+            raise _NotRepresentable()
+        if key not in base:
+            _check_no_none(value)
+            patch[key] = value
+            continue
+        previous = base[key]
+        if isinstance(value, dict) and isinstance(previous, dict):
+            nested = _diff(previous, value)
+            if nested:
+                patch[key] = nested
+        elif value != previous or type(value) is not type(previous):
+            _check_no_none(value)
+            patch[key] = value
+    for key in base:
+        if key not in target:
+            patch[key] = None
+    return patch
+
+
+def _check_no_none(value):
+    if value is None:
+        raise _NotRepresentable()
+    if isinstance(value, dict):
+        for item in value.values():
+            _check_no_none(item)
+    elif isinstance(value, list):
+        for item in value:
+            _check_no_none(item)
+
+
+def apply_merge_patch(base: Dict, patch: Dict) -> Dict:
+    """Aplica um merge patch (não altera base)"""
+    result = dict(base)
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        elif isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = apply_merge_patch(result[key], value)
+        else:
+            result[key] = value
+    return result
+
+
+class DeltaEncoder:
+    """
+    Lado da pulseira: numera os resumos e decide entre keyframe e delta
+
+    Uso:
+        seq, payload = encoder.encode(summary)
+        ...publica payload...
+        encoder.acknowledge(seq)   # no PUBACK (on_publish)
+    """
+
+    def __init__(self, keyframe_interval: int = DELTA_KEYFRAME_INTERVAL,
+                 dumps: Callable[[Dict], bytes] = None):
+        self.keyframe_interval = keyframe_interval
+        self._dumps = dumps or (lambda data: json.dumps(data, separators=(",", ":")).encode())
+        self._lock = threading.Lock()
+        self.seq = 0
+        self._since_keyframe = 0
+        self._pending = {}            # {seq: resumo completo} aguardando PUBACK
+        self._acked: Optional[Tuple[int, Dict]] = None
+        self.stats = {'keyframes': 0, 'deltas': 0}
+
+    def encode(self, summary: Dict) -> Tuple[int, Dict]:
+        """Retorna (seq, payload) para o resumo"""
+        with self._lock:
+            self.seq += 1
+            seq = self.seq
+            full = dict(summary, seq=seq)
+            self._pending[seq] = full
+            # Só mantém pendentes recentes (os antigos nunca serão base)
+            if len(self._pending) > self.keyframe_interval:
+                self._pending.pop(min(self._pending))
+
+            payload = None
+            if self._acked is not None and self._since_keyframe < self.keyframe_interval - 1:
+                base_seq, base = self._acked
+                try:
+                    patch = create_merge_patch(base, full)
+                except ValueError:
+                    patch = None
+                if patch is not None:
+                    delta = {'encoding': ENCODING_DELTA, 'seq': seq, 'base_seq': base_seq, 'patch': patch}
+                    if len(self._dumps(delta)) < len(self._dumps(full)):
+                        payload = delta
+
+            if payload is None:
+                self._since_keyframe = 0
+                self.stats['keyframes'] += 1
+                return seq, full
+            self._since_keyframe += 1
+            self.stats['deltas'] += 1
+            return seq, payload
+
+    def acknowledge(self, seq: int):
+        """Marca o resumo seq como entregue ao broker (vira a base dos próximos deltas)"""
+        with self._lock:
+            full = self._pending.pop(seq, None)
+            if full is not None and (self._acked is None or seq > self._acked[0]):
+                self._acked = (seq, full)
+
+    def reset(self):
+        """Descarta a base (ex: reconexão sem sessão persistente); próximo resumo é keyframe"""
+        with self._lock:
+            self._acked = None
+            self._pending.clear()
+
+
+class DeltaDecoder:
+    """
+    Lado do subscriber: reconstrói os resumos completos por paciente
+
+    Guarda os últimos resumos de cada paciente (a base de um delta pode ser
+    anterior ao último recebido, se o PUBACK deste ainda não tinha chegado
+    à pulseira quando o delta foi gerado).
+
+    Args:
+        load_base: Função opcional (patient_id) -> último resumo salvo, usada
+                   quando a base não está em memória (ex: após reiniciar)
+        history: Resumos mantidos por paciente
+    """
+
+    def __init__(self, load_base: Optional[Callable[[str], Optional[Dict]]] = None,
+                 history: int = DELTA_KEYFRAME_INTERVAL):
+        self._load_base = load_base
+        self._history_size = history
+        self._recent = {}             # {patient_id: deque de resumos completos}
+        self.stats = {'keyframes': 0, 'deltas': 0, 'missing_base': 0}
+
+    def _remember(self, patient_id: str, summary: Dict):
+        recent = self._recent.get(patient_id)
+        if recent is None:
+            recent = self._recent[patient_id] = deque(maxlen=self._history_size)
+        recent.append(summary)
+
+    def _find_base(self, patient_id: str, base_seq) -> Optional[Dict]:
+        for summary in reversed(self._recent.get(patient_id, ())):
+            if summary.get('seq') == base_seq:
+                return summary
+        if self._load_base is not None:
+            summary = self._load_base(patient_id)
+            if summary and summary.get('seq') == base_seq:
+                self._remember(patient_id, summary)
+                return summary
+        return None
+
+    def decode(self, patient_id: str, payload: Dict) -> Optional[Dict]:
+        """Resumo completo, ou None se o delta não tiver base conhecida"""
+        if payload.get('encoding') != ENCODING_DELTA:
+            if 'seq' in payload:
+                self._remember(patient_id, payload)
+            self.stats['keyframes'] += 1
+            return payload
+
+        patch = payload.get('patch')
+        base = self._find_base(patient_id, payload.get('base_seq'))
+        if base is None or not isinstance(patch, dict):
+            self.stats['missing_base'] += 1
+            return None
+
+        full = apply_merge_patch(base, patch)
+        self._remember(patient_id, full)
+        self.stats['deltas'] += 1
+        return full
@@ -0,0 +1,69 @@
+"""
+Lotes de leituras brutas (tópico eldercare/readings/<paciente>)
+
+Pulseiras sem processamento de borda (ou que precisam guardar as leituras
+para auditoria) enviam os ciclos de leitura em lote, em forma de tabela:
+
+    {"t0": 1700000000.0,
+     "sensors": ["heart_rate", "stress_level", "temperature", "oxygen_saturation", "fall_detection"],
+     "rows": [[0.0, 72, 25, 36.5, 97, 0], [10.4, 74, 27, 36.6, 96, 0]],
+     "processed": false}
+
+Cada linha é [segundos desde t0, valor de cada sensor]; null = sem leitura
+e fall_detection vale 1/0. 'processed' indica se a pulseira já rodou o
+EdgeProcessor (nesse caso o servidor não gera emergências nem resumos).
+"""
+
+import math
+from typing import Dict, List, Tuple
+import numpy as np
+
+READING_SENSORS = ('heart_rate', 'stress_level', 'temperature', 'oxygen_saturation', 'fall_detection')
+
+
+def encode_readings(cycles: List[Tuple[float, List[Dict]]], processed: bool = False) -> Dict:
+    """
+    Monta o lote a partir de [(instante, leituras do ciclo)]
+
+    Args:
+        cycles: Ciclos em ordem de tempo (leituras no formato dos sensores)
+        processed: Se a pulseira já processou os ciclos (EdgeProcessor)
+    """
+    t0 = cycles[0][0] if cycles else 0.0
+    rows = []
+    for timestamp, readings in cycles:
+        values = dict.fromkeys(READING_SENSORS)
+        for reading in readings:
+            sensor_type = reading.get('sensor_type')
+            if sensor_type == 'fall_detection':
+                values[sensor_type] = 1 if reading.get('fall_detected') else 0
+            elif sensor_type in values:
+                values[sensor_type] = reading.get('value')
+        rows.append([round(timestamp - t0, 3)] + [values[s] for s in READING_SENSORS])
+    return {'t0': t0, 'sensors': list(READING_SENSORS), 'rows': rows, 'processed': processed}
+
+
+def decode_readings(payload: Dict) -> Tuple[List[str], np.ndarray, np.ndarray]:
+    """
+    Converte o lote em arrays
+
+    Returns:
+        (sensores, instantes (ciclos,), valores (ciclos, sensores) com NaN = sem leitura)
+
+    Raises:
+        ValueError: Se o lote for inválido
+    """
+    try:
+        t0 = float(payload['t0'])
+        sensors = [str(s) for s in payload['sensors']]
+        rows = payload['rows']
+        if not math.isfinite(t0) or len(set(sensors)) != len(sensors):
+            raise ValueError("cabeçalho inválido")
+        table = np.array(
+            [[np.nan if v is None else v for v in row] for row in rows], dtype=float
+        ).reshape(len(rows), len(sensors) + 1)
+    except (KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Lote de leituras inválido: {e}")
+    if not np.isfinite(table[:, 0]).all():
+        raise ValueError("Lote de leituras inválido: instante ausente")
+    return sensors, t0 + table[:, 0], table[:, 1:]
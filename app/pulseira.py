@@ -2,13 +2,135 @@
 """
 Script para simular uma pulseira IoT individual
 Permite personalizar sensores e executar monitoramento
+
+Sem argumentos, pergunta a configuração (modo interativo). Com opções,
+roda sem perguntas (scripts, CI, vários terminais):
+    python pulseira.py --patient-id PAT002 --duration 600 --oxygen critical --yes
+    python pulseira.py --config pulseira.json --yes
 """
 
 import sys
 import os
+import argparse
 from sensors.smart_pulseira import SmartPulseira
+from simulator.config import load_config, SENSOR_STATUSES, FALL_CHANCES
+
+# Chaves aceitas no arquivo --config (mesmos nomes dos parâmetros da SmartPulseira)
+PULSEIRA_DEFAULTS = {
+    'patient_id': "PAT001",
+    'duration': 120,
+    'oxygen_status': "stable",
+    'stress_status': "stable",
+    'temp_status': "stable",
+    'heart_rate_status': "stable",
+    'fall_chance': "low",
+}
 
 def main():
+    """Executa a pulseira com as opções da linha de comando ou, sem elas, no modo interativo"""
+    args = _parse_args()
+    try:
+        config = _config_from_args(args)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+
+    if config is None:
+        interactive_main()
+        return
+
+    _print_summary(config)
+    if not args.yes:
+        try:
+            confirma = input("\n✅ Confirmar e iniciar monitoramento? (s/N): ").strip().lower()
+        except (KeyboardInterrupt, EOFError):
+            confirma = ''
+        if confirma not in ['s', 'sim', 'y', 'yes']:
+            print("❌ Operação cancelada pelo usuário")
+            return
+    try:
+        run_pulseira(config)
+    except KeyboardInterrupt:
+        print(f"\n🛑 Interrompido pelo usuário (Ctrl+C)")
+
+
+def _parse_args():
+    # add_help=False: -h/--help/help mostram a ajuda própria do script (show_help)
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument("--config", help="Arquivo JSON com a configuração")
+    parser.add_argument("--patient-id", dest="patient_id")
+    parser.add_argument("--duration", type=int)
+    parser.add_argument("--oxygen", dest="oxygen_status", choices=SENSOR_STATUSES)
+    parser.add_argument("--stress", dest="stress_status", choices=SENSOR_STATUSES)
+    parser.add_argument("--temperature", dest="temp_status", choices=SENSOR_STATUSES)
+    parser.add_argument("--heart-rate", dest="heart_rate_status", choices=SENSOR_STATUSES)
+    parser.add_argument("--fall", dest="fall_chance", choices=FALL_CHANCES)
+    parser.add_argument("--yes", "-y", action="store_true", help="Não pede confirmação")
+    return parser.parse_args()
+
+
+def _config_from_args(args):
+    """
+    Configuração vinda do arquivo e das opções (as opções têm prioridade)
+
+    Returns:
+        Dict com as chaves de PULSEIRA_DEFAULTS, ou None se nada foi informado (modo interativo)
+
+    Raises:
+        ValueError: Se o arquivo ou algum valor for inválido
+    """
+    overrides = {key: getattr(args, key) for key in PULSEIRA_DEFAULTS if getattr(args, key) is not None}
+    if not args.config and not overrides:
+        return None if not args.yes else dict(PULSEIRA_DEFAULTS)
+
+    config = load_config(PULSEIRA_DEFAULTS, args.config, overrides)
+
+    if not isinstance(config['duration'], int) or config['duration'] <= 0:
+        raise ValueError("'duration' deve ser um inteiro positivo (segundos)")
+    for key in ('oxygen_status', 'stress_status', 'temp_status', 'heart_rate_status'):
+        if config[key] not in SENSOR_STATUSES:
+            raise ValueError(f"'{key}' deve ser um de: {', '.join(SENSOR_STATUSES)}")
+    if config['fall_chance'] not in FALL_CHANCES:
+        raise ValueError(f"'fall_chance' deve ser um de: {', '.join(FALL_CHANCES)}")
+    return config
+
+
+def _print_summary(config):
+    print(f"\n📋 === RESUMO DA CONFIGURAÇÃO ===")
+    print(f"👤 Paciente: {config['patient_id']}")
+    print(f"⏱️  Duração: {config['duration']} segundos")
+    print(f"🫁 Oxigênio: {config['oxygen_status']}")
+    print(f"😰 Stress: {config['stress_status']}")
+    print(f"🌡️  Temperatura: {config['temp_status']}")
+    print(f"💓 Batimento: {config['heart_rate_status']}")
+    print(f"🤸 Queda: {config['fall_chance']}")
+
+
+def run_pulseira(config):
+    """Cria a pulseira e executa o monitoramento (config com as chaves de PULSEIRA_DEFAULTS)"""
+    patient_id = config['patient_id']
+    print(f"\n🚀 === INICIANDO PULSEIRA {patient_id} ===")
+
+    # Instancia a pulseira com configurações personalizadas
+    pulseira = SmartPulseira(
+        patient_id=patient_id,
+        oxygen_status=config['oxygen_status'],
+        stress_status=config['stress_status'],
+        temp_status=config['temp_status'],
+        heart_rate_status=config['heart_rate_status'],
+        fall_chance=config['fall_chance']
+    )
+
+    # Inicia o monitoramento
+    success = pulseira.start_monitoring(config['duration'])
+
+    if success:
+        print(f"\n🎉 Monitoramento da pulseira {patient_id} finalizado com sucesso!")
+    else:
+        print(f"\n❌ Erro durante o monitoramento da pulseira {patient_id}")
+
+
+def interactive_main():
     """Interface interativa para criar e executar uma pulseira"""
     print("🔧 === SIMULADOR DE PULSEIRA IOT ===")
     print("Configure uma pulseira personalizada para monitoramento")
@@ -73,14 +195,16 @@ def main():
             print("   📋 Usando configuração padrão para todos os sensores")
         
         # 4. Resumo da configuração
-        print(f"\n📋 === RESUMO DA CONFIGURAÇÃO ===")
-        print(f"👤 Paciente: {patient_id}")
-        print(f"⏱️  Duração: {duration} segundos")
-        print(f"🫁 Oxigênio: {oxygen_status}")
-        print(f"😰 Stress: {stress_status}")
-        print(f"🌡️  Temperatura: {temp_status}")
-        print(f"💓 Batimento: {heart_rate_status}")
-        print(f"🤸 Queda: {fall_chance}")
+        config = {
+            'patient_id': patient_id,
+            'duration': duration,
+            'oxygen_status': oxygen_status,
+            'stress_status': stress_status,
+            'temp_status': temp_status,
+            'heart_rate_status': heart_rate_status,
+            'fall_chance': fall_chance
+        }
+        _print_summary(config)
         
         # 5. Confirmação
         confirma = input("\n✅ Confirmar e iniciar monitoramento? (s/N): ").strip().lower()
@@ -89,25 +213,7 @@ def main():
             return
         
         # 6. Criação e execução da pulseira
-        print(f"\n🚀 === INICIANDO PULSEIRA {patient_id} ===")
-        
-        # Instancia a pulseira com configurações personalizadas
-        pulseira = SmartPulseira(
-            patient_id=patient_id,
-            oxygen_status=oxygen_status,
-            stress_status=stress_status,
-            temp_status=temp_status,
-            heart_rate_status=heart_rate_status,
-            fall_chance=fall_chance
-        )
-        
-        # Inicia o monitoramento
-        success = pulseira.start_monitoring(duration)
-        
-        if success:
-            print(f"\n🎉 Monitoramento da pulseira {patient_id} finalizado com sucesso!")
-        else:
-            print(f"\n❌ Erro durante o monitoramento da pulseira {patient_id}")
+        run_pulseira(config)
     
     except KeyboardInterrupt:
         print(f"\n🛑 Interrompido pelo usuário (Ctrl+C)")
@@ -133,6 +239,15 @@ def show_help():
     print("5. Configure os valores dos sensores escolhidos")
     print("6. Confirme e acompanhe o monitoramento")
     print()
+    print("🤖 SEM PERGUNTAS (scripts e vários terminais):")
+    print("   python pulseira.py --patient-id PAT002 --duration 600 --oxygen critical --yes")
+    print("   python pulseira.py --config pulseira.json --yes")
+    print("• Opções: --patient-id, --duration, --oxygen, --stress, --temperature,")
+    print("  --heart-rate (stable/alert/critical), --fall (low/medium/high)")
+    print("• --config: JSON com patient_id, duration, oxygen_status, stress_status,")
+    print("  temp_status, heart_rate_status, fall_chance (as opções têm prioridade)")
+    print("• --yes: inicia sem pedir confirmação")
+    print()
     print("🎛️  SENSORES DISPONÍVEIS:")
     print("• oxigenio: stable (95-100%), alert (90-94%), critical (80-89%)")
     print("• stress: stable (baixo), alert (médio), critical (alto)")
@@ -0,0 +1,11 @@
+"""
+Motor de regras de alerta compartilhado pela pulseira (EdgeProcessor),
+pelo processador de frota e pela API.
+
+- engine.py: Regras declarativas compiladas, configuração por paciente e recarga automática
+- default_rules.json: Tabela padrão (mesmos limiares usados até então)
+"""
+
+from .engine import AlertRule, RuleSet, RuleEngine, assess_status, get_rule_engine
+
+__all__ = ["AlertRule", "RuleSet", "RuleEngine", "assess_status", "get_rule_engine"]
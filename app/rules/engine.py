@@ -0,0 +1,399 @@
+"""
+Motor de regras de alerta declarativo.
+
+As regras ficam em um arquivo JSON (ALERT_RULES_PATH) e são compiladas
+uma vez em uma função Python gerada, de modo que avaliar um ciclo de
+leituras custa apenas algumas comparações, independente de como as
+regras foram escritas. O mesmo conjunto de regras tem uma avaliação
+vetorizada (NumPy) usada pelo FleetEdgeProcessor.
+
+Formato de uma regra:
+    id          identificador único (usado nas configurações por paciente)
+    stage       "emergency" (leitura de um ciclo) ou "summary" (estatísticas do período)
+    type        tipo do alerta gerado
+    sensor      sensor avaliado (ex: heart_rate)
+    aggregate   campo avaliado: "value"/"fall_detected" na leitura ou
+                "avg", "min", "max", "last_value", "std", "count" no resumo
+    comparator  <, <=, >, >=, == ou !=
+    threshold   limiar (número ou booleano)
+    severity    "critical" ou "concern"
+    message     texto do alerta; {value} é substituído pelo valor avaliado
+    group       (opcional) dentro de um grupo só a primeira regra satisfeita
+                gera alerta, o que permite descrever faixas em ordem de prioridade
+    include_value (opcional, default true) inclui 'value' no alerta
+    enabled     (opcional, default true)
+
+Configuração por paciente (chave "patients"):
+    {"PAT001": {"overrides": {"emergency.oxygen_low": {"threshold": 88}},
+                "disabled": ["summary.oxygen_low"],
+                "rules": [ ...regras extras... ]}}
+
+O arquivo é relido automaticamente quando modificado (verificação a cada
+RULES_RELOAD_INTERVAL segundos). Um arquivo inválido é ignorado e as
+regras anteriores continuam valendo.
+"""
+
+import json
+import math
+import operator
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from config.settings import ALERT_RULES_PATH, RULES_RELOAD_INTERVAL
+
+STAGES = ("emergency", "summary")
+SEVERITIES = ("critical", "concern")
+# Severidade do alerta -> health_status resultante
+SEVERITY_STATUS = {"critical": "critical", "concern": "alert"}
+
+_COMPARATORS = {
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "==": operator.eq,
+    "!=": operator.ne,
+}
+_NAME_RE = re.compile(r"^[a-z][a-z0-9_]*$")
+_OVERRIDABLE = ("comparator", "threshold", "severity", "message", "enabled")
+
+
+class AlertRule:
+    """Uma regra validada (imutável depois de criada)"""
+
+    __slots__ = ("id", "stage", "type", "sensor", "aggregate", "comparator", "threshold",
+                 "severity", "message", "group", "include_value", "enabled", "make_alert")
+
+    def __init__(self, spec: Dict):
+        if not isinstance(spec, dict):
+            raise ValueError(f"Regra inválida: {spec!r}")
+
+        def field(name, default=None, required=True):
+            if name not in spec:
+                if required:
+                    raise ValueError(f"Regra {spec.get('id', '?')}: campo '{name}' obrigatório")
+                return default
+            return spec[name]
+
+        self.id = str(field("id"))
+        self.stage = field("stage")
+        self.type = str(field("type"))
+        self.sensor = field("sensor")
+        self.aggregate = field("aggregate")
+        self.comparator = field("comparator")
+        self.threshold = field("threshold")
+        self.severity = field("severity")
+        self.message = str(field("message", "{value}", required=False))
+        self.group = field("group", None, required=False)
+        self.include_value = bool(field("include_value", True, required=False))
+        self.enabled = bool(field("enabled", True, required=False))
+
+        if self.stage not in STAGES:
+            raise ValueError(f"Regra {self.id}: stage deve ser um de {STAGES}")
+        for name in ("sensor", "aggregate"):
+            value = getattr(self, name)
+            if not isinstance(value, str) or not _NAME_RE.match(value):
+                raise ValueError(f"Regra {self.id}: {name} inválido: {value!r}")
+        if self.comparator not in _COMPARATORS:
+            raise ValueError(f"Regra {self.id}: comparador inválido: {self.comparator!r}")
+        if not isinstance(self.threshold, (int, float)) or not math.isfinite(self.threshold):
+            raise ValueError(f"Regra {self.id}: threshold deve ser número ou booleano")
+        if self.severity not in SEVERITIES:
+            raise ValueError(f"Regra {self.id}: severity deve ser um de {SEVERITIES}")
+        if self.group is not None:
+            self.group = str(self.group)
+        try:
+            self.message.format(value=0)
+        except (KeyError, IndexError, ValueError) as e:
+            raise ValueError(f"Regra {self.id}: mensagem inválida ({e})")
+
+        self.make_alert = self._alert_factory()
+
+    def with_overrides(self, overrides: Dict) -> "AlertRule":
+        """Cópia da regra com campos substituídos (configuração por paciente)"""
+        unknown = set(overrides) - set(_OVERRIDABLE)
+        if unknown:
+            raise ValueError(f"Regra {self.id}: campos não configuráveis por paciente: {sorted(unknown)}")
+        spec = self.to_dict()
+        spec.update(overrides)
+        return AlertRule(spec)
+
+    def excess(self, value) -> float:
+        """Quanto o valor passou do limiar no sentido do alerta (0 para == e !=)"""
+        if value is None or isinstance(value, bool):
+            return 0.0
+        if self.comparator in ("<", "<="):
+            return max(0.0, self.threshold - value)
+        if self.comparator in (">", ">="):
+            return max(0.0, value - self.threshold)
+        return 0.0
+
+    def to_dict(self) -> Dict:
+        spec = {name: getattr(self, name) for name in self.__slots__ if name != "make_alert"}
+        if spec["group"] is None:
+            del spec["group"]
+        return spec
+
+    def _alert_factory(self):
+        """Função que monta o dicionário do alerta (mesmo formato de antes)"""
+        alert_type, sensor, severity = self.type, self.sensor, self.severity
+        template = self.message
+        constant_message = "{" not in template
+
+        if self.include_value:
+            def make_alert(value):
+                return {
+                    'type': alert_type,
+                    'sensor': sensor,
+                    'value': value,
+                    'severity': severity,
+                    'message': template if constant_message else template.format(value=value)
+                }
+        else:
+            def make_alert(value):
+                return {
+                    'type': alert_type,
+                    'sensor': sensor,
+                    'severity': severity,
+                    'message': template if constant_message else template.format(value=value)
+                }
+        return make_alert
+
+
+class RuleSet:
+    """
+    Regras de um estágio compiladas para avaliação rápida
+
+    evaluate(records) recebe {sensor: {campo: valor}} (leituras do ciclo ou
+    estatísticas do resumo) e devolve a lista de alertas, na ordem das regras.
+    """
+
+    def __init__(self, stage: str, rules: List[AlertRule]):
+        self.stage = stage
+        self.rules = tuple(rule for rule in rules if rule.enabled)
+        self.columns = {(rule.sensor, rule.aggregate) for rule in self.rules}
+        self._by_type = {}
+        for rule in self.rules:
+            self._by_type.setdefault(rule.type, []).append(rule)
+        self.evaluate = self._compile()
+
+    def __len__(self):
+        return len(self.rules)
+
+    def rule_for(self, alert: Dict) -> Optional[AlertRule]:
+        """Regra que gerou um alerta (mesmo tipo e sensor, condição satisfeita pelo valor)"""
+        candidates = self._by_type.get(alert.get('type'), ())
+        value = alert.get('value')
+        for rule in candidates:
+            if rule.sensor != alert.get('sensor'):
+                continue
+            if value is None or _COMPARATORS[rule.comparator](value, rule.threshold):
+                return rule
+        return None
+
+    def _compile(self):
+        """
+        Gera o código de uma função com as comparações "desenroladas".
+        Sensores, campos e comparadores já foram validados; os limiares
+        entram via repr() de números, então o código gerado é seguro.
+        """
+        namespace = {}
+        group_flags = {}
+        value_names = {}
+        lines = ["def evaluate(records):", "    alerts = []"]
+
+        # Cada campo usado pelas regras é lido uma única vez
+        for sensor in dict.fromkeys(rule.sensor for rule in self.rules):
+            lines.append(f"    r = records.get({sensor!r})")
+            for aggregate in dict.fromkeys(rule.aggregate for rule in self.rules if rule.sensor == sensor):
+                name = value_names[(sensor, aggregate)] = f"v{len(value_names)}"
+                lines.append(f"    {name} = r.get({aggregate!r}) if r else None")
+
+        for group in dict.fromkeys(rule.group for rule in self.rules if rule.group is not None):
+            flag = group_flags[group] = f"g{len(group_flags)}"
+            lines.append(f"    {flag} = False")
+
+        for k, rule in enumerate(self.rules):
+            namespace[f"make{k}"] = rule.make_alert
+            v = value_names[(rule.sensor, rule.aggregate)]
+            condition = f"{v} is not None and {v} {rule.comparator} {rule.threshold!r}"
+            flag = group_flags.get(rule.group)
+            if flag:
+                condition = f"not {flag} and {condition}"
+            lines.append(f"    if {condition}:")
+            if flag:
+                lines.append(f"        {flag} = True")
+            lines.append(f"        alerts.append(make{k}({v}))")
+
+        lines.append("    return alerts")
+        exec(compile("\n".join(lines), f"<rules:{self.stage}>", "exec"), namespace)
+        return namespace["evaluate"]
+
+    def evaluate_arrays(self, columns: Dict[Tuple[str, str], np.ndarray]) -> List[Tuple[AlertRule, np.ndarray]]:
+        """
+        Avaliação vetorizada: columns = {(sensor, campo): array por paciente}
+        (NaN = sem valor). Retorna [(regra, máscara)] respeitando os grupos.
+        """
+        matches = []
+        taken = {}
+        with np.errstate(invalid='ignore'):
+            for rule in self.rules:
+                values = columns.get((rule.sensor, rule.aggregate))
+                if values is None:
+                    continue
+                mask = _COMPARATORS[rule.comparator](values, rule.threshold) & ~np.isnan(values)
+                if rule.group is not None:
+                    previous = taken.get(rule.group)
+                    if previous is not None:
+                        mask &= ~previous
+                        previous |= mask
+                    else:
+                        taken[rule.group] = mask.copy()
+                matches.append((rule, mask))
+        return matches
+
+
+def assess_status(alerts: List[Dict]) -> str:
+    """health_status a partir dos alertas: critical > alert > stable"""
+    status = "stable"
+    for alert in alerts:
+        mapped = SEVERITY_STATUS.get(alert.get("severity"))
+        if mapped == "critical":
+            return "critical"
+        if mapped:
+            status = mapped
+    return status
+
+
+class RuleEngine:
+    """
+    Tabela de regras carregada de um arquivo JSON, com configuração por
+    paciente e recarga automática quando o arquivo muda
+
+    Args:
+        path: Arquivo de regras (default: ALERT_RULES_PATH)
+        reload_interval: Intervalo mínimo entre verificações do arquivo (s)
+
+    Raises:
+        ValueError: Se o arquivo inicial for inválido
+    """
+
+    def __init__(self, path: Optional[str] = None, reload_interval: float = RULES_RELOAD_INTERVAL):
+        self.path = path or ALERT_RULES_PATH
+        self.reload_interval = reload_interval
+        self.version = 0
+        self._lock = threading.Lock()
+        self._next_check = 0.0
+        self._mtime = None
+        self._load(initial=True)
+
+    def _load(self, initial: bool = False) -> bool:
+        """Lê, valida e compila o arquivo; só troca as regras se tudo estiver válido"""
+        try:
+            mtime = os.path.getmtime(self.path)
+            with open(self.path, "r", encoding="utf-8") as f:
+                config = json.load(f)
+            rules, patients = self._parse(config)
+        except (OSError, ValueError) as e:
+            if initial:
+                raise ValueError(f"Arquivo de regras inválido ({self.path}): {e}")
+            print(f"❌ Regras de alerta não recarregadas ({self.path}): {e}")
+            self._mtime = os.path.getmtime(self.path) if os.path.exists(self.path) else None
+            return False
+
+        with self._lock:
+            self._rules = rules
+            self._patients = patients
+            self._rulesets = {}
+            self._mtime = mtime
+            self.version += 1
+
+        if not initial:
+            print(f"🔄 Regras de alerta recarregadas (versão {self.version}, {len(rules)} regras)")
+        return True
+
+    @staticmethod
+    def _parse(config: Dict) -> Tuple[List[AlertRule], Dict[str, List[AlertRule]]]:
+        if not isinstance(config, dict) or not isinstance(config.get("rules"), list):
+            raise ValueError("o arquivo deve conter uma lista 'rules'")
+
+        rules = [AlertRule(spec) for spec in config["rules"]]
+        by_id = {}
+        for rule in rules:
+            if rule.id in by_id:
+                raise ValueError(f"id de regra duplicado: {rule.id}")
+            by_id[rule.id] = rule
+
+        patients = {}
+        for patient_id, patient_config in (config.get("patients") or {}).items():
+            if not isinstance(patient_config, dict):
+                raise ValueError(f"configuração inválida para o paciente {patient_id}")
+            overrides = patient_config.get("overrides") or {}
+            disabled = set(patient_config.get("disabled") or [])
+            for rule_id in set(overrides) | disabled:
+                if rule_id not in by_id:
+                    raise ValueError(f"paciente {patient_id}: regra desconhecida {rule_id}")
+            patient_rules = [
+                rule.with_overrides(overrides[rule.id]) if rule.id in overrides else rule
+                for rule in rules if rule.id not in disabled
+            ]
+            patient_rules += [AlertRule(spec) for spec in patient_config.get("rules") or []]
+            patients[str(patient_id)] = patient_rules
+
+        return rules, patients
+
+    def maybe_reload(self) -> bool:
+        """Recarrega o arquivo se ele mudou (no máximo uma verificação por intervalo)"""
+        now = time.monotonic()
+        if now < self._next_check:
+            return False
+        self._next_check = now + self.reload_interval
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            return False
+        if mtime == self._mtime:
+            return False
+        return self._load()
+
+    def has_overrides(self, patient_id: Optional[str]) -> bool:
+        return patient_id in self._patients
+
+    def ruleset(self, stage: str, patient_id: Optional[str] = None) -> RuleSet:
+        """Regras compiladas de um estágio (com as configurações do paciente, se houver)"""
+        key = (stage, patient_id if patient_id in self._patients else None)
+        ruleset = self._rulesets.get(key)
+        if ruleset is None:
+            with self._lock:
+                rules = self._patients[key[1]] if key[1] is not None else self._rules
+                ruleset = RuleSet(stage, [rule for rule in rules if rule.stage == stage])
+                self._rulesets[key] = ruleset
+        return ruleset
+
+    def describe(self) -> Dict:
+        """Regras atuais (para inspeção via API)"""
+        return {
+            "path": self.path,
+            "version": self.version,
+            "rules": [rule.to_dict() for rule in self._rules],
+            "patients": {
+                patient_id: [rule.to_dict() for rule in rules]
+                for patient_id, rules in self._patients.items()
+            }
+        }
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_rule_engine() -> RuleEngine:
+    """Motor de regras compartilhado pelo processo (carregado sob demanda)"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = RuleEngine()
+    return _engine
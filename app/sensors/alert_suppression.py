@@ -0,0 +1,150 @@
+"""
+Supressão de emergências repetidas por tipo de alerta
+
+Cada tipo de alerta (FALL_DETECTED, LOW_OXYGEN, ...) tem o seu episódio.
+Um tipo sem episódio aberto sempre gera emergência; com episódio aberto, o
+alerta só sai de novo se a condição piorar (passou mais do limiar do que
+o pior valor já enviado, ou a severidade subiu) ou depois do backoff, que
+dobra a cada reenvio até EMERGENCY_BACKOFF_MAX. As repetições suprimidas
+viram contadores no episódio, enviados junto com o próximo alerta do tipo.
+O episódio é encerrado quando a condição some por EMERGENCY_EPISODE_CLEAR
+segundos.
+
+As decisões dependem apenas dos alertas e dos instantes recebidos, então o
+EdgeProcessor e o FleetEdgeProcessor chegam ao mesmo resultado.
+"""
+
+from typing import Dict, List
+from config.settings import (
+    SENSOR_RESOLUTION, EMERGENCY_BACKOFF_INITIAL, EMERGENCY_BACKOFF_MAX, EMERGENCY_EPISODE_CLEAR
+)
+
+_SEVERITY_RANK = {'concern': 1, 'critical': 2}
+
+
+class AlertEpisode:
+    """Estado de uma condição em andamento"""
+
+    __slots__ = ('started_at', 'last_seen', 'last_sent', 'backoff', 'occurrences',
+                 'suppressed', 'worst_excess', 'worst_value', 'severity')
+
+    def __init__(self, now: float, backoff: float):
+        self.started_at = now
+        self.last_seen = now
+        self.last_sent = now
+        self.backoff = backoff
+        self.occurrences = 0
+        self.suppressed = 0
+        self.worst_excess = 0.0
+        self.worst_value = None
+        self.severity = None
+
+    def to_state(self) -> List:
+        """Estado completo do episódio (checkpoint)"""
+        return [getattr(self, name) for name in self.__slots__]
+    
+    @classmethod
+    def from_state(cls, state: List) -> 'AlertEpisode':
+        if len(state) != len(cls.__slots__):
+            raise ValueError(f"AlertEpisode espera {len(cls.__slots__)} campos")
+        episode = cls.__new__(cls)
+        for name, value in zip(cls.__slots__, state):
+            setattr(episode, name, value)
+        return episode
+    
+    def to_dict(self) -> Dict:
+        return {
+            'started_at': self.started_at,
+            'occurrences': self.occurrences,
+            'suppressed': self.suppressed,
+            'worst_value': self.worst_value
+        }
+
+
+class AlertSuppressor:
+    """
+    Tabela de supressão {tipo de alerta: AlertEpisode} de um paciente
+
+    Args:
+        initial_backoff: Espera mínima para repetir um alerta sem piora
+        max_backoff: Teto do backoff exponencial
+        clear_after: Segundos sem a condição para encerrar o episódio
+    """
+
+    __slots__ = ('initial_backoff', 'max_backoff', 'clear_after', 'episodes')
+
+    def __init__(self, initial_backoff: float = EMERGENCY_BACKOFF_INITIAL,
+                 max_backoff: float = EMERGENCY_BACKOFF_MAX,
+                 clear_after: float = EMERGENCY_EPISODE_CLEAR):
+        self.initial_backoff = initial_backoff
+        self.max_backoff = max_backoff
+        self.clear_after = clear_after
+        self.episodes = {}
+
+    def __bool__(self):
+        return bool(self.episodes)
+
+    def expire(self, now: float):
+        """Encerra os episódios cuja condição sumiu há clear_after segundos"""
+        if not self.episodes:
+            return
+        for alert_type in [t for t, e in self.episodes.items() if now - e.last_seen >= self.clear_after]:
+            del self.episodes[alert_type]
+
+    def filter(self, alerts: List[Dict], now: float, ruleset=None) -> List[Dict]:
+        """
+        Registra os alertas do ciclo e retorna os que devem ser emitidos agora,
+        cada um com 'episode' (contadores do episódio); os demais são coalescidos
+
+        Args:
+            alerts: Alertas do ciclo (formato do motor de regras)
+            now: Instante do ciclo
+            ruleset: RuleSet que gerou os alertas (para medir a piora)
+        """
+        self.expire(now)
+        emitted = []
+        for alert in alerts:
+            alert_type = alert.get('type')
+            rule = ruleset.rule_for(alert) if ruleset is not None else None
+            excess = rule.excess(alert.get('value')) if rule is not None else 0.0
+            rank = _SEVERITY_RANK.get(alert.get('severity'), 0)
+
+            episode = self.episodes.get(alert_type)
+            if episode is None:
+                episode = self.episodes[alert_type] = AlertEpisode(now, self.initial_backoff)
+                send = True
+            else:
+                resolution = SENSOR_RESOLUTION.get(alert.get('sensor'), 1.0)
+                worse = (excess >= episode.worst_excess + resolution or
+                         rank > _SEVERITY_RANK.get(episode.severity, 0))
+                due = now - episode.last_sent >= episode.backoff
+                send = worse or due
+                if due and not worse:
+                    episode.backoff = min(episode.backoff * 2, self.max_backoff)
+
+            episode.last_seen = now
+            episode.occurrences += 1
+            if send:
+                if episode.worst_value is None or excess >= episode.worst_excess:
+                    episode.worst_excess = excess
+                    episode.worst_value = alert.get('value')
+                if rank > _SEVERITY_RANK.get(episode.severity, 0):
+                    episode.severity = alert.get('severity')
+                episode.last_sent = now
+                emitted.append(dict(alert, episode=episode.to_dict()))
+                episode.suppressed = 0
+            else:
+                episode.suppressed += 1
+        return emitted
+
+    def to_state(self) -> Dict:
+        """Episódios abertos com todo o estado de supressão (checkpoint)"""
+        return {alert_type: episode.to_state() for alert_type, episode in self.episodes.items()}
+    
+    def restore(self, state: Dict):
+        """Restaura os episódios salvos por to_state"""
+        self.episodes = {alert_type: AlertEpisode.from_state(episode) for alert_type, episode in state.items()}
+    
+    def snapshot(self) -> Dict:
+        """Episódios abertos (para o contexto das emergências e o status)"""
+        return {alert_type: episode.to_dict() for alert_type, episode in self.episodes.items()}
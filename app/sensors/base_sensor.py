@@ -1,5 +1,6 @@
-import time
 from abc import ABC, abstractmethod
+from .reading import SensorReading
+from .clock import SYSTEM_CLOCK
 
 class BaseSensor(ABC):
     """
@@ -7,34 +8,40 @@ class BaseSensor(ABC):
     Sensores apenas GERAM dados - não publicam diretamente
     """
     
-    def __init__(self, patient_id, sensor_type):
+    unit = None  # Unidade do valor (definida em cada sensor)
+    
+    def __init__(self, patient_id, sensor_type, clock=None):
         self.patient_id = patient_id
         self.sensor_type = sensor_type
+        self.clock = clock or SYSTEM_CLOCK  # Relógio dos timestamps (sensors.clock)
         
     @abstractmethod
-    def generate_data(self):
+    def read_value(self):
         """
         Método abstrato - cada sensor implementa sua lógica específica
         
         Returns:
-            dict: Dados específicos do sensor (sem metadata)
+            Valor medido (sem metadata)
         """
         pass
     
+    def generate_data(self):
+        """
+        Dados específicos do sensor (sem metadata)
+        
+        Returns:
+            dict: {"value": ..., "unit": ...}
+        """
+        return {"value": self.read_value(), "unit": self.unit}
+    
     def get_sensor_reading(self):
         """
         Retorna leitura completa do sensor com metadata
         
         Returns:
-            dict: Dados completos prontos para processamento
+            SensorReading: Leitura compacta pronta para processamento
         """
-        sensor_data = self.generate_data()
-        
-        return {
-            "sensor_type": self.sensor_type,
-            "timestamp": time.time(),
-            **sensor_data  # Expande os dados específicos do sensor
-        }
+        return SensorReading(self.sensor_type, self.clock.time(), self.read_value(), self.unit)
     
     def __str__(self):
         return f"{self.sensor_type.title()}Sensor({self.patient_id})"
@@ -0,0 +1,196 @@
+"""
+Geração vetorizada de leituras para uma frota de pulseiras
+
+Cada sensor em lote guarda o estado de todas as pulseiras em um array
+NumPy e avança o passeio aleatório de todas com uma operação por ciclo,
+com as mesmas distribuições iniciais, variações e limites dos sensores
+individuais (heart_rate_sensor.py, oxygen_sensor.py, ...). O gerador é um
+np.random.Generator com semente, então a mesma semente repete a execução.
+
+As leituras saem no formato de FleetEdgeProcessor.process_tick
+({sensor_type: array float, uma posição por pulseira}).
+"""
+
+from typing import Dict, Optional, Sequence, Union
+import numpy as np
+from .fall_sensor import FALL_REFRACTORY_SECONDS
+
+Statuses = Union[str, Sequence[str]]
+
+
+class BatchSensor:
+    """
+    Passeio aleatório de N pulseiras para um tipo de sensor
+
+    As subclasses definem as faixas iniciais por status (uma faixa é
+    sorteada com a mesma probabilidade quando há mais de uma), a variação
+    por leitura e os limites, como nos sensores individuais.
+
+    Args:
+        statuses: Status por pulseira ('stable'/'alert'/'critical'), ou um só para todas
+        rng: Gerador NumPy compartilhado
+        size: Quantidade de pulseiras (obrigatório se statuses for uma string)
+    """
+
+    sensor_type = None
+    unit = None
+    initial_ranges: Dict[str, tuple] = {}
+    default_value = 0
+    step = (0, 0)      # Variação por leitura (inteira, inclusiva)
+    limits = (0, 0)
+
+    def __init__(self, statuses: Statuses, rng: np.random.Generator, size: Optional[int] = None):
+        self.rng = rng
+        statuses = _status_array(statuses, size)
+        self.values = np.full(len(statuses), float(self.default_value))
+        for status, ranges in self.initial_ranges.items():
+            idx = np.flatnonzero(statuses == status)
+            if not len(idx):
+                continue
+            choice = rng.integers(0, len(ranges), len(idx))
+            for k, (low, high) in enumerate(ranges):
+                rows = idx[choice == k]
+                self.values[rows] = self._draw_initial(low, high, len(rows))
+
+    def __len__(self):
+        return len(self.values)
+
+    def _draw_initial(self, low, high, size: int) -> np.ndarray:
+        return self.rng.integers(low, high + 1, size)
+
+    def read_values(self) -> np.ndarray:
+        """Avança uma leitura de todas as pulseiras e retorna os valores"""
+        self.values += self.rng.integers(self.step[0], self.step[1] + 1, len(self.values))
+        np.clip(self.values, *self.limits, out=self.values)
+        return self.values.copy()
+
+
+class HeartRateBatch(BatchSensor):
+    sensor_type = "heart_rate"
+    unit = "bpm"
+    initial_ranges = {'stable': ((65, 100),),
+                      'alert': ((101, 120), (40, 64)),
+                      'critical': ((121, 200), (25, 39))}
+    default_value = 75
+    step = (-5, 5)
+    limits = (25, 200)
+
+
+class OxygenBatch(BatchSensor):
+    sensor_type = "oxygen_saturation"
+    unit = "%"
+    initial_ranges = {'stable': ((95, 100),), 'alert': ((90, 94),), 'critical': ((80, 89),)}
+    default_value = 98
+    step = (-1, 1)
+    limits = (70, 100)
+
+
+class StressBatch(BatchSensor):
+    sensor_type = "stress_level"
+    unit = "%"
+    initial_ranges = {'stable': ((0, 60),), 'alert': ((61, 80),), 'critical': ((81, 100),)}
+    default_value = 40
+    step = (-3, 3)
+    limits = (0, 100)
+
+
+class TemperatureBatch(BatchSensor):
+    sensor_type = "temperature"
+    unit = "°C"
+    initial_ranges = {'stable': ((36.0, 37.0),),
+                      'alert': ((37.1, 38.9), (35.0, 35.9)),
+                      'critical': ((39.0, 40.0), (34.0, 34.9))}
+    default_value = 36.5
+    limits = (34.0, 40.0)
+
+    def _draw_initial(self, low, high, size: int) -> np.ndarray:
+        return np.round(self.rng.uniform(low, high, size), 1)
+
+    def read_values(self) -> np.ndarray:
+        # Variação round(uniform(-0.1, 0.1), 1); o estado guarda o valor sem arredondar
+        self.values += np.round(self.rng.uniform(-0.1, 0.1, len(self.values)), 1)
+        np.clip(self.values, *self.limits, out=self.values)
+        return np.round(self.values, 1)
+
+
+class FallBatch:
+    """
+    Detecção de queda de N pulseiras, com o intervalo mínimo entre quedas
+
+    Args:
+        chances: Chance por pulseira ('low'/'medium'/'high'), ou uma só para todas
+        rng: Gerador NumPy compartilhado
+        size: Quantidade de pulseiras (obrigatório se chances for uma string)
+    """
+
+    sensor_type = "fall_detection"
+    probabilities = {'low': 0.01, 'medium': 0.05, 'high': 0.1}
+    default_probability = 0.025
+
+    def __init__(self, chances: Statuses, rng: np.random.Generator, size: Optional[int] = None):
+        self.rng = rng
+        chances = _status_array(chances, size)
+        self.chance = np.full(len(chances), self.default_probability)
+        for name, probability in self.probabilities.items():
+            self.chance[chances == name] = probability
+        # Sem queda anterior: o instante simulado pode começar em qualquer valor
+        self.last_fall_time = np.full(len(chances), -np.inf)
+
+    def __len__(self):
+        return len(self.chance)
+
+    def read_values(self, now: float) -> np.ndarray:
+        """Sorteia as quedas no instante now (1.0 = queda detectada)"""
+        falls = (now - self.last_fall_time >= FALL_REFRACTORY_SECONDS) & (self.rng.random(len(self.chance)) < self.chance)
+        self.last_fall_time[falls] = now
+        return falls.astype(float)
+
+
+class BatchPulseiras:
+    """
+    Os cinco sensores de N pulseiras, avançados juntos a cada ciclo
+
+    Args:
+        size: Quantidade de pulseiras
+        statuses: Status por sensor, com as chaves da VirtualPulseira
+                  ('heart_rate', 'stress', 'temperature', 'oxygen', 'fall');
+                  cada valor é um status para todas ou uma sequência por pulseira
+        seed: Semente do gerador (None = não reproduzível)
+    """
+
+    def __init__(self, size: int, statuses: Optional[Dict[str, Statuses]] = None,
+                 seed: Optional[int] = None):
+        statuses = statuses or {}
+        self.rng = np.random.default_rng(seed)
+        self.sensors = [
+            HeartRateBatch(statuses.get('heart_rate', 'stable'), self.rng, size),
+            StressBatch(statuses.get('stress', 'stable'), self.rng, size),
+            TemperatureBatch(statuses.get('temperature', 'stable'), self.rng, size),
+            OxygenBatch(statuses.get('oxygen', 'stable'), self.rng, size),
+        ]
+        self.fall_sensor = FallBatch(statuses.get('fall', 'low'), self.rng, size)
+
+    def __len__(self):
+        return len(self.fall_sensor)
+
+    def tick(self, now: float) -> Dict[str, np.ndarray]:
+        """
+        Uma leitura de cada sensor de todas as pulseiras
+
+        Returns:
+            {sensor_type: array}, no formato de FleetEdgeProcessor.process_tick
+        """
+        readings = {sensor.sensor_type: sensor.read_values() for sensor in self.sensors}
+        readings[self.fall_sensor.sensor_type] = self.fall_sensor.read_values(now)
+        return readings
+
+
+def _status_array(statuses: Statuses, size: Optional[int]) -> np.ndarray:
+    if isinstance(statuses, str):
+        if size is None:
+            raise ValueError("size é obrigatório quando o status é o mesmo para todas as pulseiras")
+        return np.full(size, statuses, dtype=object)
+    statuses = np.asarray(statuses, dtype=object)
+    if size is not None and len(statuses) != size:
+        raise ValueError(f"Esperados {size} status, recebidos {len(statuses)}")
+    return statuses
@@ -0,0 +1,164 @@
+"""
+Checkpoint do estado do EdgeProcessor em disco
+
+Ao reiniciar, a pulseira recupera os agregados do período, a cadência dos
+resumos e os episódios de supressão de alertas: sem resumo vazio antecipado
+e sem reenviar emergências que estavam suprimidas.
+
+Formato do arquivo (little-endian):
+
+    magic b'EPCK' | versão (uint8) | 3 bytes reservados | salvo em (float64)
+    | crc32 do payload (uint32) | tamanho do payload (uint32) | payload
+
+O payload é o estado (EdgeProcessor.to_state) em JSON comprimido com zlib.
+A gravação vai para um arquivo temporário no mesmo diretório, com fsync,
+e só então substitui o checkpoint anterior (os.replace é atômico, e o
+fsync do diretório torna a troca durável): uma queda no meio da gravação
+deixa o checkpoint anterior intacto.
+
+Um checkpoint mais antigo que EDGE_CHECKPOINT_MAX_AGE só devolve os
+agregados do período: a cadência dos resumos, as tendências e os
+episódios de supressão daquela época não valem mais (um episódio antigo
+poderia suprimir uma emergência nova).
+"""
+
+import json
+import os
+import struct
+import time
+import zlib
+from typing import Dict, Optional, Tuple
+from config.settings import EDGE_CHECKPOINT_INTERVAL, EDGE_CHECKPOINT_MAX_AGE
+
+CHECKPOINT_MAGIC = b'EPCK'
+CHECKPOINT_VERSION = 1
+_HEADER = struct.Struct('<4sB3xdII')
+
+
+def encode_checkpoint(state: Dict, saved_at: float) -> bytes:
+    """Cabeçalho binário + estado em JSON comprimido"""
+    payload = zlib.compress(json.dumps(state, separators=(',', ':')).encode(), 6)
+    return _HEADER.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION, saved_at,
+                        zlib.crc32(payload), len(payload)) + payload
+
+
+def decode_checkpoint(data: bytes) -> Tuple[float, Dict]:
+    """
+    Returns:
+        (instante da gravação, estado)
+
+    Raises:
+        ValueError: Se o arquivo estiver truncado, corrompido ou em outra versão
+    """
+    if len(data) < _HEADER.size:
+        raise ValueError("Checkpoint truncado")
+    magic, version, saved_at, crc, size = _HEADER.unpack_from(data)
+    if magic != CHECKPOINT_MAGIC:
+        raise ValueError("Arquivo não é um checkpoint do EdgeProcessor")
+    if version != CHECKPOINT_VERSION:
+        raise ValueError(f"Versão de checkpoint não suportada: {version}")
+    payload = data[_HEADER.size:]
+    if len(payload) != size or zlib.crc32(payload) != crc:
+        raise ValueError("Checkpoint corrompido (tamanho ou CRC)")
+    try:
+        return saved_at, json.loads(zlib.decompress(payload))
+    except (zlib.error, ValueError) as e:
+        raise ValueError(f"Checkpoint corrompido: {e}")
+
+
+def save_checkpoint(path: str, processor, now: Optional[float] = None) -> int:
+    """
+    Grava o estado do processador de forma atômica
+
+    Returns:
+        Bytes gravados
+    """
+    data = encode_checkpoint(processor.to_state(), time.time() if now is None else now)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_directory(os.path.dirname(path) or '.')
+    return len(data)
+
+
+def _fsync_directory(directory: str):
+    """Grava a entrada do diretório (sem isso, a troca pode se perder numa queda de energia)"""
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def load_checkpoint(path: str, processor, now: Optional[float] = None,
+                    max_age: float = EDGE_CHECKPOINT_MAX_AGE) -> bool:
+    """
+    Restaura o processador a partir do checkpoint, se houver um válido
+
+    Acima de max_age segundos (0 = sem limite), restaura só os agregados
+    do período (EdgeProcessor.restore com buffers_only).
+
+    Returns:
+        True se o estado (completo ou só os agregados) foi restaurado
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return False
+    now = processor.clock.time() if now is None else now
+    try:
+        saved_at, state = decode_checkpoint(data)
+        stale = max_age > 0 and now - saved_at > max_age
+        processor.restore(state, buffers_only=stale)
+    except ValueError as e:
+        print(f"⚠️ Checkpoint ignorado ({path}): {e}")
+        return False
+    if stale:
+        print(f"♻️ Checkpoint de {processor.patient_id} salvo há {now - saved_at:.0f}s: "
+              f"só os agregados do período restaurados")
+    else:
+        print(f"♻️ Estado de {processor.patient_id} restaurado (salvo há {now - saved_at:.0f}s)")
+    return True
+
+
+class EdgeCheckpointer:
+    """
+    Gravação periódica do checkpoint de um EdgeProcessor
+
+    Args:
+        path: Arquivo do checkpoint
+        interval: Segundos entre gravações
+    """
+
+    def __init__(self, path: str, interval: float = EDGE_CHECKPOINT_INTERVAL):
+        self.path = path
+        self.interval = interval
+        self.last_saved = 0.0
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def load(self, processor) -> bool:
+        return load_checkpoint(self.path, processor)
+
+    def save(self, processor, now: Optional[float] = None) -> bool:
+        """Grava agora (erros de disco não interrompem o monitoramento)"""
+        now = time.time() if now is None else now
+        try:
+            save_checkpoint(self.path, processor, now)
+        except OSError as e:
+            print(f"❌ Erro ao gravar checkpoint {self.path}: {e}")
+            return False
+        self.last_saved = now
+        return True
+
+    def maybe_save(self, processor, now: Optional[float] = None) -> bool:
+        """Grava se o intervalo desde a última gravação já passou"""
+        now = time.time() if now is None else now
+        if now - self.last_saved < self.interval:
+            return False
+        return self.save(processor, now)
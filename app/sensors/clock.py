@@ -0,0 +1,81 @@
+"""
+Relógios injetáveis para a pulseira e o processamento de borda
+
+Sensores, EdgeProcessor, PulseiraPublisher e SmartPulseira leem o tempo e
+dormem pelo relógio recebido no construtor (default: SYSTEM_CLOCK, o
+relógio real). Com um VirtualClock, horas de comportamento da pulseira
+rodam em segundos:
+- passo a passo (speed=None): sleep só avança o tempo simulado, sem
+  esperar; com o random semeado, a execução é determinística;
+- acelerado (speed=N): o tempo simulado corre N vezes mais rápido que o
+  real e sleep espera seconds / N (threads e MQTT continuam funcionando).
+"""
+
+import threading
+import time
+from typing import Optional
+
+
+class SystemClock:
+    """Relógio real (time.time / time.sleep)"""
+
+    stepped = False   # sleep espera de fato (outras threads avançam sozinhas)
+
+    def time(self) -> float:
+        return time.time()
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+class VirtualClock:
+    """
+    Relógio simulado
+
+    Args:
+        start: Instante inicial (default: agora); fixe para resultados reproduzíveis
+        speed: None = passo a passo (sleep avança o tempo na hora);
+               N = acelerado (o tempo simulado corre N vezes mais rápido)
+    """
+
+    def __init__(self, start: Optional[float] = None, speed: Optional[float] = None):
+        if speed is not None and speed <= 0:
+            raise ValueError("speed deve ser positivo")
+        self.start = time.time() if start is None else start
+        self.speed = speed
+        self.stepped = speed is None
+        self._offset = 0.0
+        self._real_start = time.monotonic()
+        self._lock = threading.Lock()
+
+    def time(self) -> float:
+        if self.stepped:
+            return self.start + self._offset
+        return self.start + self._offset + (time.monotonic() - self._real_start) * self.speed
+
+    def sleep(self, seconds: float):
+        if seconds <= 0:
+            return
+        if self.stepped:
+            self.advance(seconds)
+        else:
+            time.sleep(seconds / self.speed)
+
+    def advance(self, seconds: float):
+        """Avança o tempo simulado sem esperar"""
+        if seconds < 0:
+            raise ValueError("O relógio não volta no tempo")
+        with self._lock:
+            self._offset += seconds
+
+    def advance_to(self, timestamp: float):
+        """Avança até timestamp (sem efeito se já passou)"""
+        self.advance(max(0.0, timestamp - self.time()))
+
+    def elapsed(self) -> float:
+        """Segundos simulados desde o início"""
+        return self.time() - self.start
+
+
+SYSTEM_CLOCK = SystemClock()
@@ -1,146 +1,137 @@
-import time
+import math
+from collections import deque
 from typing import List, Dict, Optional
-from config.settings import SENSOR_UNITS
+from config.settings import (
+    SENSOR_UNITS, SENSOR_RESOLUTION, ADAPTIVE_REPORTING,
+    SUMMARY_INTERVAL_MIN, SUMMARY_INTERVAL_MAX, ADAPTIVE_VARIANCE_RATIO
+)
+from analytics.quantiles import KllSketch, summary_quantiles
+from rules import RuleEngine, assess_status, get_rule_engine
+from .streaming_stats import RunningStats, TrendDetector, TREND_WARMUP
+from .alert_suppression import AlertSuppressor
+from .reading import SensorReading, as_readings
+from .clock import SYSTEM_CLOCK
+
+# Leituras mínimas no período para comparar a variância com a linha de base
+ADAPTIVE_MIN_READINGS = 10
+# Intervalo entre prévias das regras de resumo durante um período longo
+ADAPTIVE_CHECK_INTERVAL = 60
 
 class EdgeProcessor:
     """
     Processador de borda - Inteligência da pulseira IoT
     Recebe dados de múltiplos sensores e decide o que enviar
+    
+    No modo adaptativo o intervalo entre resumos dobra a cada resumo estável
+    (até SUMMARY_INTERVAL_MAX) e volta a SUMMARY_INTERVAL_MIN quando há
+    alertas (inclusive de tendência), variância acima da linha de base ou
+    emergência. Durante um período longo, variância alta ou alertas na
+    prévia das regras de resumo antecipam o próximo resumo.
     """
     
-    def __init__(self, patient_id: str):
+    def __init__(self, patient_id: str, context_window: int = 10,
+                 rule_engine: Optional[RuleEngine] = None,
+                 adaptive: bool = ADAPTIVE_REPORTING,
+                 clock=None):
         self.patient_id = patient_id
-        self.normal_data_buffer = []
-        self.last_summary_sent = time.time()
-        self.summary_interval = 60  # 1 minutos entre resumos
-        self.emergency_cooldown = 30  # 1 minuto entre emergências
+        self.clock = clock or SYSTEM_CLOCK  # Instante quando now não é informado (sensors.clock)
+        
+        # Regras de alerta (tabela compartilhada, recarregada quando o arquivo muda)
+        self.rule_engine = rule_engine or get_rule_engine()
+        
+        # Janela curta de contexto (ring buffer de tamanho fixo)
+        self.normal_data_buffer = deque(maxlen=context_window)
+        
+        # Agregados em streaming desde o último resumo (O(1) por leitura)
+        self.sensor_stats = {}        # {sensor_type: RunningStats}
+        self.quantile_sketches = {}   # {sensor_type: KllSketch} do período
+        self.fall_detected = None     # None = sem leituras de queda no período
+        self.readings_count = 0       # Ciclos de leitura desde o último resumo
+        self.period_start = None
+        
+        # Detectores de tendência por sensor (mantidos entre períodos)
+        self.trend_detectors = {}     # {sensor_type: TrendDetector}
+        
+        self.last_summary_sent = self.clock.time()
+        self.adaptive = adaptive
+        self.min_summary_interval = SUMMARY_INTERVAL_MIN
+        self.max_summary_interval = SUMMARY_INTERVAL_MAX
+        self.summary_interval = SUMMARY_INTERVAL_MIN  # 1 minuto entre resumos (ajustado no modo adaptativo)
+        self.last_adaptive_check = 0
+        # Supressão por tipo de alerta (substitui o cooldown global entre emergências)
+        self.alert_suppressor = AlertSuppressor()
         self.last_emergency_time = 0
         
-    def process_sensor_readings(self, sensor_readings: List[Dict]) -> Dict:
+    def process_sensor_readings(self, sensor_readings: List[Dict], now: Optional[float] = None) -> Dict:
         """
         Processa múltiplas leituras de sensores e decide ação
         
         Args:
-            sensor_readings: Lista de dados de todos os sensores
+            sensor_readings: Leituras do ciclo (SensorReading ou dicts no mesmo formato)
+            now: Instante do processamento (default: self.clock.time())
             
         Returns:
             Dict com decisão: 'emergency', 'summary', 'buffer' ou 'ignore'
         """
+        if now is None:
+            now = self.clock.time()
+        
+        self.rule_engine.maybe_reload()
+        sensor_readings = as_readings(sensor_readings)
 
         # Adiciona ao buffer de dados normais
-        self._add_to_buffer(sensor_readings)
+        self._add_to_buffer(sensor_readings, now)
         
         # Verifica alertas críticos primeiro
-        emergency_result = self._check_emergency_conditions(sensor_readings)
+        emergency_result = self._check_emergency_conditions(sensor_readings, now)
         if emergency_result:
             return emergency_result
         
         
         # Verifica se deve enviar resumo
-        if self._should_send_summary():
-            return self._create_summary_result()
+        if self._should_send_summary(now):
+            return self._create_summary_result(now)
         
         # Apenas adiciona ao buffer, não envia nada
         return {
             'action': 'buffer',
-            'message': f'Dados adicionados ao buffer ({len(self.normal_data_buffer)} readings)',
-            'buffer_size': len(self.normal_data_buffer)
+            'message': f'Dados adicionados ao buffer ({self.readings_count} readings)',
+            'buffer_size': self.readings_count
         }
     
-    def _check_emergency_conditions(self, readings: List[Dict]) -> Optional[Dict]:
+    def _check_emergency_conditions(self, readings: List[SensorReading], now: Optional[float] = None) -> Optional[Dict]:
         """
         Verifica condições de emergência analisando múltiplos sensores
         
         Returns:
             Dict com dados de emergência ou None se não há emergência
         """
-        current_time = time.time()
+        current_time = self.clock.time() if now is None else now
         
-        # Cooldown entre emergências (evita spam)
-        if current_time - self.last_emergency_time < self.emergency_cooldown:
+        critical_alerts = self._detect_critical_alerts(readings)
+        if not critical_alerts:
+            self.alert_suppressor.expire(current_time)
             return None
         
-        # Organiza readings por tipo de sensor
-        sensor_data = {}
-        for reading in readings:
-            sensor_type = reading.get('sensor_type')
-            sensor_data[sensor_type] = reading
-        
-        # Verifica condições críticas individuais
-        critical_alerts = []
-        
-        # 1. Queda detectada = EMERGÊNCIA IMEDIATA
-        fall_data = sensor_data.get('fall_detection')
-        if fall_data and fall_data.get('fall_detected'):
-            critical_alerts.append({
-                'type': 'FALL_DETECTED',
-                'sensor': 'fall_detection',
-                'severity': 'critical',
-                'message': 'Queda detectada!'
-            })
-        
-        # 2. Oxigenação crítica
-        oxygen_data = sensor_data.get('oxygen_saturation')
-        if oxygen_data and oxygen_data.get('value', 100) < 90:
-            critical_alerts.append({
-                'type': 'LOW_OXYGEN',
-                'sensor': 'oxygen_saturation',
-                'value': oxygen_data.get('value'),
-                'severity': 'critical',
-                'message': f"Oxigenação crítica: {oxygen_data.get('value')}%"
-            })
+        # Condições novas saem sempre; repetidas só se piorarem ou após o backoff
+        ruleset = self.rule_engine.ruleset('emergency', self.patient_id)
+        critical_alerts = self.alert_suppressor.filter(critical_alerts, current_time, ruleset)
         
-        # 3. Temperatura extrema
-        temp_data = sensor_data.get('temperature')
-        if temp_data:
-            temp_value = temp_data.get('value', 36.5)
-            if temp_value < 35.0 or temp_value > 39.0:
-                critical_alerts.append({
-                    'type': 'EXTREME_TEMPERATURE',
-                    'sensor': 'temperature',
-                    'value': temp_value,
-                    'severity': 'critical',
-                    'message': f"Temperatura extrema: {temp_value}°C"
-                })
-        
-        # 4. Batimento cardíaco crítico
-        heart_data = sensor_data.get('heart_rate')
-        if heart_data:
-            heart_rate = heart_data.get('value', 70)
-            if heart_rate < 40 or heart_rate > 120:
-                critical_alerts.append({
-                    'type': 'CRITICAL_HEART_RATE',
-                    'sensor': 'heart_rate',
-                    'value': heart_rate,
-                    'severity': 'critical',
-                    'message': f"Batimento cardíaco crítico: {heart_rate} bpm"
-                })
-        
-        # 5. Nível de stress crítico
-        stress_data = sensor_data.get('stress_level')
-        if stress_data:
-            stress_level = stress_data.get('value', 20)
-            if stress_level > 80:
-                critical_alerts.append({
-                    'type': 'HIGH_STRESS',
-                    'sensor': 'stress_level',
-                    'value': stress_level,
-                    'severity': 'critical',
-                    'message': f"Nível de stress crítico: {stress_level}%"
-                })
-        
-        # Se há alertas críticos, cria emergência
+        # Se há alertas críticos a emitir, cria emergência
         if critical_alerts:
             self.last_emergency_time = current_time
+            # Após uma emergência os resumos voltam à cadência mínima
+            self.summary_interval = self.min_summary_interval
             
             critical_message = self._create_unified_message(
                 message_type='emergency',
                 patient_id=self.patient_id,
                 severity='critical',
                 health_status='critical',
-                statistics=readings,
+                statistics=[reading.to_dict() for reading in readings],
                 alerts=critical_alerts,
-                context_data=self._get_recent_context()
+                context_data=self._get_recent_context(),
+                timestamp=current_time
             )
 
             return {
@@ -152,39 +143,106 @@ class EdgeProcessor:
         
         return None
     
-    def _add_to_buffer(self, readings: List[Dict]):
-        """Adiciona leituras ao buffer de dados normais"""
-        timestamp = time.time()
-        
-        buffer_entry = {
-            'timestamp': timestamp,
-            'readings': readings,
-            'readings_count': len(readings)
-        }
+    def _detect_critical_alerts(self, readings: List[SensorReading]) -> List[Dict]:
+        """Retorna os alertas críticos presentes em um ciclo de leituras"""
+        # Organiza readings por tipo de sensor
+        sensor_data = {reading.sensor_type: reading for reading in readings}
         
-        self.normal_data_buffer.append(buffer_entry)
+        # Regras do estágio de emergência (queda, oxigenação, temperatura...)
+        return self.rule_engine.ruleset('emergency', self.patient_id).evaluate(sensor_data)
+    
+    def _add_to_buffer(self, readings: List[SensorReading], now: Optional[float] = None):
+        """Atualiza os agregados por sensor e a janela de contexto"""
+        timestamp = self.clock.time() if now is None else now
         
-        # Limita o buffer (evita crescimento infinito)
-        if len(self.normal_data_buffer) > 100:
-            self.normal_data_buffer.pop(0)  # Remove o mais antigo
+        for reading in readings:
+            sensor_type = reading.sensor_type
+            # Sensor de queda: apenas se houve alguma queda no período
+            if sensor_type == 'fall_detection':
+                self.fall_detected = bool(self.fall_detected) or bool(reading.fall_detected)
+                continue
+            value = reading.value
+            if value is None:
+                continue
+            stats = self.sensor_stats.get(sensor_type)
+            if stats is None:
+                stats = self.sensor_stats[sensor_type] = RunningStats()
+            stats.add(value)
+            
+            sketch = self.quantile_sketches.get(sensor_type)
+            if sketch is None:
+                sketch = self.quantile_sketches[sensor_type] = KllSketch()
+            sketch.add(value)
+            
+            detector = self.trend_detectors.get(sensor_type)
+            if detector is None:
+                detector = self.trend_detectors[sensor_type] = TrendDetector(
+                    SENSOR_RESOLUTION.get(sensor_type, 1.0)
+                )
+            detector.add(value, timestamp)
+        
+        if self.readings_count == 0:
+            self.period_start = timestamp
+        self.readings_count += 1
+        
+        # Ring buffer: descarta o mais antigo automaticamente
+        self.normal_data_buffer.append((timestamp, readings))
     
-    def _should_send_summary(self) -> bool:
+    def _should_send_summary(self, now: Optional[float] = None) -> bool:
         """Verifica se deve enviar resumo dos dados normais"""
-        current_time = time.time()
+        current_time = self.clock.time() if now is None else now
         time_elapsed = current_time - self.last_summary_sent
         
-        # Envia resumo se: tempo passou E tem dados no buffer
-        return (time_elapsed >= self.summary_interval and 
-                len(self.normal_data_buffer) > 0)
+        if self.readings_count == 0:
+            return False
+        
+        # Envia resumo se: tempo passou E tem dados no período
+        if time_elapsed >= self.summary_interval:
+            return True
+        
+        # Modo adaptativo: variância alta ou alertas pendentes antecipam o resumo
+        if not self.adaptive or time_elapsed < self.min_summary_interval:
+            return False
+        return self._variance_rising() or self._alerts_pending(current_time)
+    
+    def _alerts_pending(self, now: float) -> bool:
+        """Prévia das regras de resumo sobre os agregados parciais (sem percentis)"""
+        if now - self.last_adaptive_check < ADAPTIVE_CHECK_INTERVAL:
+            return False
+        self.last_adaptive_check = now
+        stats = self._calculate_statistics(with_quantiles=False)
+        return bool(self.rule_engine.ruleset('summary', self.patient_id).evaluate(stats))
+    
+    def _variance_rising(self) -> bool:
+        """Se o desvio padrão do período ultrapassou o da linha de base em algum sensor"""
+        for sensor_type, stats in self.sensor_stats.items():
+            detector = self.trend_detectors.get(sensor_type)
+            if stats.count < ADAPTIVE_MIN_READINGS or detector is None or detector.count <= TREND_WARMUP:
+                continue
+            baseline_std = max(math.sqrt(detector.var), detector.min_std)
+            if stats.std > ADAPTIVE_VARIANCE_RATIO * baseline_std:
+                return True
+        return False
+    
+    def _adapt_interval(self, health_status: str, alerts: List[Dict]):
+        """Define o intervalo até o próximo resumo (modo adaptativo)"""
+        if not self.adaptive:
+            return
+        
+        # Deriva relevante já aparece como alerta (regras de tendência)
+        if health_status == 'stable' and not alerts and not self._variance_rising():
+            self.summary_interval = min(self.summary_interval * 2, self.max_summary_interval)
+        else:
+            self.summary_interval = self.min_summary_interval
     
-    def _create_summary_result(self) -> Dict:
+    def _create_summary_result(self, now: Optional[float] = None) -> Dict:
         """Cria resultado com resumo estatístico"""
-        if not self.normal_data_buffer:
+        if self.readings_count == 0:
             return {'action': 'ignore', 'message': 'Buffer vazio'}
         
-        current_time = time.time()
+        current_time = self.clock.time() if now is None else now
         
-        # Calcula estatísticas por sensor
+        # Estatísticas por sensor a partir dos agregados (O(sensores))
         stats = self._calculate_statistics()
         
         health_status, health_alerts = self._assess_overall_health(stats)
@@ -196,13 +254,17 @@ class EdgeProcessor:
             health_status=health_status,
             alerts=health_alerts,
             statistics=stats,
-            readings_count=len(self.normal_data_buffer),
-            period_start=self.normal_data_buffer[0]['timestamp'],
-            period_end=current_time
+            readings_count=self.readings_count,
+            period_start=self.period_start,
+            period_end=current_time,
+            timestamp=current_time
         )
         
-        # Limpa buffer e atualiza timestamp
-        self.normal_data_buffer.clear()
+        # Próximo intervalo (antes de zerar os agregados do período)
+        self._adapt_interval(health_status, health_alerts)
+        
+        # Zera agregados do período e atualiza timestamp
+        self._reset_period()
         self.last_summary_sent = current_time
         
         return {
@@ -212,13 +274,24 @@ class EdgeProcessor:
             'data': summary_data
         }
     
+    def _reset_period(self):
+        """Zera os agregados do período de resumo (mantém a janela de contexto)"""
+        for stats in self.sensor_stats.values():
+            stats.reset()
+        for detector in self.trend_detectors.values():
+            detector.reset_period()
+        self.quantile_sketches.clear()
+        self.fall_detected = None
+        self.readings_count = 0
+        self.period_start = None
+    
     def _create_unified_message(self, message_type: str, **kwargs) -> Dict:
         """Centraliza criação de estrutura unificada"""
         
         # CAMPOS COMUNS (definidos uma vez só)
         base_message = {
             'message_type': message_type,
-            'timestamp': time.time(),
+            'timestamp': kwargs['timestamp'] if kwargs.get('timestamp') is not None else self.clock.time(),
             'patient_id': self.patient_id,
             #'severity': kwargs.get('severity', 'normal'),
             'health_status': kwargs.get('health_status', 'stable'),
@@ -227,10 +300,10 @@ class EdgeProcessor:
         }
         
         # CAMPOS ESPECÍFICOS POR TIPO
-        # if message_type == 'emergency':
-        #     base_message.update({
-        #         'context_data': kwargs.get('context_data', {})
-        #     })
+        if message_type == 'emergency':
+            base_message.update({
+                'context_data': kwargs.get('context_data', {})
+            })
         # elif message_type == 'summary':
         #     base_message.update({
         #         'readings_count': kwargs.get('readings_count', 0),
@@ -240,41 +313,28 @@ class EdgeProcessor:
         
         return base_message
     
-    def _calculate_statistics(self) -> Dict:
-        """Calcula estatísticas dos dados no buffer"""
+    def _calculate_statistics(self, with_quantiles: bool = True) -> Dict:
+        """Monta as estatísticas do período a partir dos agregados"""
         stats = {}
-        sensor_groups = {}
-
-        for entry in self.normal_data_buffer:
-            for reading in entry['readings']:
-                sensor_type = reading.get('sensor_type')
-                if sensor_type not in sensor_groups:
-                    sensor_groups[sensor_type] = []
-                # Sensor de queda: salva o bool
-                if sensor_type == 'fall_detection':
-                    sensor_groups[sensor_type].append(reading.get('fall_detected', False))
-                else:
-                    value = reading.get('value')
-                    if value is not None:
-                        sensor_groups[sensor_type].append(value)
-
-        for sensor_type, values in sensor_groups.items():
-            unit = SENSOR_UNITS.get(sensor_type, 'unknown')
-            if sensor_type == 'fall_detection':
-                # Se qualquer valor for True, houve queda
-                stats[sensor_type] = {
-                    'fall_detected': any(values),
-                }
-            elif values:
-                stats[sensor_type] = {
-                    'avg': round(sum(values) / len(values), 2),
-                    'min': min(values),
-                    'max': max(values),
-                    'count': len(values),
-                    'last_value': values[-1],
-                    'unit': unit
-                }
-
+        
+        for sensor_type, sensor_stats in self.sensor_stats.items():
+            if sensor_stats.count:
+                stats[sensor_type] = sensor_stats.to_summary(SENSOR_UNITS.get(sensor_type, 'unknown'))
+                # Linha de base, inclinação e deriva confirmada (avaliadas pelas regras)
+                stats[sensor_type].update(self.trend_detectors[sensor_type].to_summary())
+                if not with_quantiles:
+                    continue
+                # Percentis e o sketch compacto (mesclável no servidor)
+                sketch = self.quantile_sketches[sensor_type].to_pairs()
+                stats[sensor_type].update(summary_quantiles(sketch))
+                stats[sensor_type]['sketch'] = sketch
+        
+        if self.fall_detected is not None:
+            # Se qualquer valor for True, houve queda
+            stats['fall_detection'] = {
+                'fall_detected': self.fall_detected,
+            }
+        
         return stats
     
     def _assess_overall_health(self, stats: Dict) -> tuple[str, List[Dict]]:
@@ -284,180 +344,101 @@ class EdgeProcessor:
         Returns:
             tuple: (status_geral, lista_de_alertas)
         """
-        concerns = []
-        criticals = []
-        alerts = []
-        
-        # Analisa cada sensor
-        if 'heart_rate' in stats:
-            avg_hr = stats['heart_rate']['avg']
-            if avg_hr > 100:
-                if avg_hr > 120:
-                    criticals.append('batimento_critico_alto')
-                    alerts.append({
-                    'type': 'batimento_critico_alto',
-                    'sensor': 'heart_rate',
-                    'value': avg_hr,
-                    'severity': 'critical',
-                    'message': f'Batimento cardíaco muito alto: {avg_hr} bpm'
-                    })
-                else:
-                    concerns.append('batimento_elevado')
-                    alerts.append({
-                    'type': 'batimento_elevado',
-                    'sensor': 'heart_rate',
-                    'value': avg_hr,
-                    'severity': 'concern',
-                    'message': f'Batimento cardíaco elevado: {avg_hr} bpm'
-                    })
-            elif avg_hr < 65:
-                if avg_hr < 40:
-                    criticals.append('batimento_critico_baixo')
-                    alerts.append({
-                    'type': 'batimento_critico_baixo',
-                    'sensor': 'heart_rate',
-                    'value': avg_hr,
-                    'severity': 'critical',
-                    'message': f'Batimento cardíaco muito baixo: {avg_hr} bpm'
-                    })
-                else: 
-                    concerns.append('batimento_baixo')
-                    alerts.append({
-                    'type': 'batimento_baixo',
-                    'sensor': 'heart_rate',
-                    'value': avg_hr,
-                    'severity': 'concern',
-                    'message': f'Batimento cardíaco baixo: {avg_hr} bpm'
-                    })
-        
-        if 'stress_level' in stats:
-            avg_stress = stats['stress_level']['avg']
-            if avg_stress > 80:
-                criticals.append('stress_critico')
-                alerts.append({
-                    'type': 'stress_critico',
-                    'sensor': 'stress_level',
-                    'value': avg_stress,
-                    'severity': 'critical',
-                    'message': f'Nível de stress crítico: {avg_stress}%'
-                })
-            elif avg_stress > 60:
-                concerns.append('stress_alto')
-                alerts.append({
-                    'type': 'stress_alto',
-                    'sensor': 'stress_level',
-                    'value': avg_stress,
-                    'severity': 'concern',
-                    'message': f'Nível de stress elevado: {avg_stress}%'
-                })
-        
-        if 'temperature' in stats:
-            avg_temp = stats['temperature']['avg']
-            if avg_temp > 37.0:
-                if avg_temp >= 39.0:
-                    criticals.append('temperatura_critica_alta')
-                    alerts.append({
-                    'type': 'temperatura_critica_alta',
-                    'sensor': 'temperature',
-                    'value': avg_temp,
-                    'severity': 'critical',
-                    'message': f'Temperatura corporal muito alta: {avg_temp}°C'
-                    })
-                else:
-                    concerns.append('temperatura_elevada')
-                    alerts.append({
-                    'type': 'temperatura_elevada',
-                    'sensor': 'temperature',
-                    'value': avg_temp,
-                    'severity': 'concern',
-                    'message': f'Temperatura corporal elevada: {avg_temp}°C'
-                    })
-            elif avg_temp < 36.0:
-                if avg_temp < 35.0:
-                    criticals.append('temperatura_critica_baixa')
-                    alerts.append({
-                    'type': 'temperatura_critica_baixa',
-                    'sensor': 'temperature',
-                    'value': avg_temp,
-                    'severity': 'critical',
-                    'message': f'Temperatura corporal muito baixa: {avg_temp}°C'
-                    })
-                else:
-                    concerns.append('temperatura_baixa')
-                    alerts.append({
-                    'type': 'temperatura_baixa',
-                    'sensor': 'temperature',
-                    'value': avg_temp,
-                    'severity': 'concern',
-                    'message': f'Temperatura corporal baixa: {avg_temp}°C'
-                    })
-        
-        if 'oxygen_saturation' in stats:
-            avg_oxygen = stats['oxygen_saturation']['avg']
-            if avg_oxygen < 96:
-                if avg_oxygen < 90:
-                    criticals.append('oxigenacao_critica_baixa')
-                    alerts.append({
-                    'type': 'oxigenacao_critica_baixa',
-                    'sensor': 'oxygen_saturation',
-                    'value': avg_oxygen,
-                    'severity': 'critical',
-                    'message': f'Oxigenação sanguínea muito baixa: {avg_oxygen}%'
-                    })
-                else:
-                    concerns.append('oxigenacao_baixa')
-                    alerts.append({
-                    'type': 'oxigenacao_baixa',
-                    'sensor': 'oxygen_saturation',
-                    'value': avg_oxygen,
-                    'severity': 'concern',
-                    'message': f'Oxigenação sanguínea baixa: {avg_oxygen}%'
-                    })
-
-        if 'fall_detection' in stats and stats['fall_detection'].get('fall_detected', False):
-            criticals.append('queda_detectada')
-            alerts.append({
-            'type': 'queda_detectada',
-            'sensor': 'fall_detection',
-            'severity': 'critical',
-            'message': 'Queda detectada!'
-            })
-
-        
-        # Determina status geral
-        if criticals:
-            status = 'critical'
-        elif concerns:
-            status = 'alert'
-        else:
-            status = 'stable'
-        
-        return status, alerts
-
+        alerts = self.rule_engine.ruleset('summary', self.patient_id).evaluate(stats)
+        return assess_status(alerts), alerts
     
     def _get_recent_context(self) -> Dict:
         """Retorna contexto dos dados recentes para emergências"""
-        if not self.normal_data_buffer:
+        if not self.trend_detectors:
             return {'message': 'Sem dados recentes disponíveis'}
         
-        # Pega últimos 3 entries do buffer
-        recent_entries = self.normal_data_buffer[-3:] if len(self.normal_data_buffer) >= 3 else self.normal_data_buffer
+        trends = {sensor_type: detector.context() for sensor_type, detector in self.trend_detectors.items()}
+        changing = [f"{sensor_type} {trend['direction']} ({trend['slope']}/h)"
+                    for sensor_type, trend in trends.items() if trend['direction'] != 'estável']
         
         return {
-            'recent_readings_count': len(recent_entries),
-            'buffer_size': len(self.normal_data_buffer),
-            'trend': 'Dados estavam normais antes da emergência'
+            'buffer_size': self.readings_count,
+            'episodes': self.alert_suppressor.snapshot(),
+            'trends': trends,
+            'trend': ('Tendência antes da emergência: ' + ', '.join(changing)) if changing
+                     else 'Sem tendência anormal antes da emergência'
         }
     
     
+    def to_state(self) -> Dict:
+        """
+        Estado completo do processador (agregados do período, detectores de
+        tendência, sketches, cadência dos resumos e episódios de alerta),
+        serializável em JSON para o checkpoint (sensors.checkpoint)
+        """
+        return {
+            'patient_id': self.patient_id,
+            'readings_count': self.readings_count,
+            'period_start': self.period_start,
+            'fall_detected': self.fall_detected,
+            'last_summary_sent': self.last_summary_sent,
+            'summary_interval': self.summary_interval,
+            'last_adaptive_check': self.last_adaptive_check,
+            'last_emergency_time': self.last_emergency_time,
+            'sensor_stats': {s: stats.to_state() for s, stats in self.sensor_stats.items()},
+            'quantile_sketches': {s: sketch.to_state() for s, sketch in self.quantile_sketches.items()},
+            'trend_detectors': {s: detector.to_state() for s, detector in self.trend_detectors.items()},
+            'episodes': self.alert_suppressor.to_state()
+        }
+    
+    def restore(self, state: Dict, buffers_only: bool = False):
+        """
+        Restaura o estado salvo por to_state (a janela de contexto recomeça vazia)
+        
+        Com buffers_only, só os agregados do período (estatísticas, sketches,
+        contagem, início e queda): cadência dos resumos, tendências e
+        episódios de alerta continuam os de um processador novo (cada sensor
+        restaurado ganha um TrendDetector vazio, usado no próximo resumo).
+        
+        Raises:
+            ValueError: Se o estado for de outro paciente ou estiver incompleto
+        """
+        if state.get('patient_id') != self.patient_id:
+            raise ValueError(f"Estado de {state.get('patient_id')} não pertence a {self.patient_id}")
+        try:
+            sensor_stats = {s: RunningStats.from_state(v) for s, v in state['sensor_stats'].items()}
+            sketches = {s: KllSketch.from_state(v) for s, v in state['quantile_sketches'].items()}
+            detectors = {s: TrendDetector.from_state(v) for s, v in state['trend_detectors'].items()}
+            suppressor = AlertSuppressor(self.alert_suppressor.initial_backoff,
+                                         self.alert_suppressor.max_backoff, self.alert_suppressor.clear_after)
+            suppressor.restore(state['episodes'])
+            scalars = {name: state[name] for name in (
+                'readings_count', 'period_start', 'fall_detected', 'last_summary_sent',
+                'summary_interval', 'last_adaptive_check', 'last_emergency_time'
+            )}
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Estado do EdgeProcessor inválido: {e}")
+        
+        self.sensor_stats = sensor_stats
+        self.quantile_sketches = sketches
+        self.normal_data_buffer.clear()
+        if buffers_only:
+            for name in ('readings_count', 'period_start', 'fall_detected'):
+                setattr(self, name, scalars[name])
+            for sensor_type in sensor_stats:
+                if sensor_type not in self.trend_detectors:
+                    self.trend_detectors[sensor_type] = TrendDetector(SENSOR_RESOLUTION.get(sensor_type, 1.0))
+            return
+        self.trend_detectors = detectors
+        self.alert_suppressor = suppressor
+        for name, value in scalars.items():
+            setattr(self, name, value)
+    
     def get_status(self) -> Dict:
         """Retorna status atual do processador"""
         return {
             'patient_id': self.patient_id,
-            'buffer_size': len(self.normal_data_buffer),
+            'buffer_size': self.readings_count,
             'last_summary': self.last_summary_sent,
-            'next_summary_in': max(0, self.summary_interval - (time.time() - self.last_summary_sent)),
-            'last_emergency': self.last_emergency_time
+            'summary_interval': self.summary_interval,
+            'next_summary_in': max(0, self.summary_interval - (self.clock.time() - self.last_summary_sent)),
+            'last_emergency': self.last_emergency_time,
+            'open_episodes': self.alert_suppressor.snapshot()
         }
 
 # Função para testes
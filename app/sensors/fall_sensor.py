@@ -1,10 +1,12 @@
 import random
-import time
 from .base_sensor import BaseSensor
+from .reading import SensorReading
+
+FALL_REFRACTORY_SECONDS = 120  # Intervalo mínimo entre duas quedas detectadas
 
 class FallSensor(BaseSensor):
-    def __init__(self, patient_id, chance='low'):
-        super().__init__(patient_id, "fall_detection")
+    def __init__(self, patient_id, chance='low', clock=None):
+        super().__init__(patient_id, "fall_detection", clock)
         self.last_fall_time = 0
         if chance == 'low':
             # Probabilidade baixa de queda (1%)
@@ -20,19 +22,26 @@ class FallSensor(BaseSensor):
             self.chance = 0.025
 
     
-    def generate_data(self):
+    def read_value(self):
         """Detecta quedas (evento raro mas crítico)"""
-        current_time = time.time()
+        current_time = self.clock.time()
         
         # Evita quedas muito próximas (mínimo 2 minutos entre quedas)
-        if current_time - self.last_fall_time < 120:
-            return {
-                "fall_detected": False,
-            }
+        if current_time - self.last_fall_time < FALL_REFRACTORY_SECONDS:
+            return False
         
         # Probabilidade de queda
         fall_detected = random.random() < self.chance
-            
+        if fall_detected:
+            self.last_fall_time = current_time
+        return fall_detected
+    
+    def generate_data(self):
+        """Dados de queda (sem metadata)"""
         return {
-            "fall_detected": fall_detected,
-        }
\ No newline at end of file
+            "fall_detected": self.read_value(),
+        }
+    
+    def get_sensor_reading(self):
+        """Leitura de queda (sem valor/unidade)"""
+        return SensorReading(self.sensor_type, self.clock.time(), fall_detected=self.read_value())
\ No newline at end of file
@@ -0,0 +1,753 @@
+"""
+Processador de borda vetorizado para uma frota de pulseiras
+
+Mantém o estado de todos os pacientes em arrays NumPy (um índice por
+paciente) e avalia os limiares de todos de uma vez a cada ciclo. As
+decisões (emergência/resumo) são as mesmas do EdgeProcessor para as
+mesmas leituras e instantes (as regras de alerta são as mesmas, avaliadas
+de forma vetorizada); as mensagens só são montadas para os pacientes que
+de fato emitem algo.
+"""
+
+import time
+from typing import Dict, List, Optional
+import numpy as np
+from config.settings import SENSOR_UNITS, SENSOR_RESOLUTION
+from analytics.quantiles import KllSketch, SUMMARY_QUANTILES
+from rules import RuleEngine, assess_status, get_rule_engine
+from .alert_suppression import AlertSuppressor
+from .streaming_stats import (
+    TREND_EWMA_ALPHA, TREND_CUSUM_K, TREND_CUSUM_H, TREND_WARMUP, TREND_WINDOW, TREND_BLOCK_SECONDS,
+    TREND_MIN_BLOCKS
+)
+
+# Sensores numéricos (fall_detection é tratado à parte)
+FLEET_SENSORS = ('heart_rate', 'stress_level', 'temperature', 'oxygen_saturation')
+# Sensores cujas leituras são inteiras (para montar mensagens iguais às do EdgeProcessor)
+INTEGER_SENSORS = {'heart_rate', 'stress_level', 'oxygen_saturation'}
+
+# Leituras por período guardadas em array para os percentis; acima disso o
+# paciente passa a usar um KllSketch próprio (mesmo resultado do EdgeProcessor)
+QUANTILE_BUFFER = 32
+
+# Estado por paciente (arrays com uma linha por paciente) estendido por add_patients
+_PATIENT_STATE = ('last_summary_sent', 'last_emergency_time', 'readings_count', 'period_start',
+                  'count', 'total', 'min', 'max', 'last', 'mean', 'm2', 'period_values',
+                  'trend', 'fall_detected')
+
+# Códigos de health_status
+STABLE, ALERT, CRITICAL = 0, 1, 2
+HEALTH_STATUS_NAMES = ('stable', 'alert', 'critical')
+
+
+def _reading_dicts(readings: Dict[str, np.ndarray], i: int) -> List[Dict]:
+    """Leituras de um paciente no formato do EdgeProcessor"""
+    dicts = []
+    for sensor_type, values in readings.items():
+        value = values[i]
+        if np.isnan(value):
+            continue
+        if sensor_type == 'fall_detection':
+            dicts.append({'sensor_type': sensor_type, 'fall_detected': bool(value)})
+        else:
+            value = int(value) if sensor_type in INTEGER_SENSORS else float(value)
+            dicts.append({'sensor_type': sensor_type, 'value': value,
+                          'unit': SENSOR_UNITS.get(sensor_type)})
+    return dicts
+
+
+def _concat_state(current, extra):
+    """Concatena o estado de dois processadores (arrays, dicts de arrays; o resto é mantido)"""
+    if isinstance(current, np.ndarray):
+        return np.concatenate([current, extra])
+    if isinstance(current, dict):
+        return {key: _concat_state(value, extra[key]) for key, value in current.items()}
+    return current
+
+
+def _round2(values: np.ndarray) -> np.ndarray:
+    """
+    Arredonda para 2 casas com o mesmo resultado de round(x, 2) do Python.
+    np.round só diverge em casos quase exatamente no meio (x.xx5), que são
+    refeitos com round().
+    """
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    ambiguous = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    for j in ambiguous:
+        rounded[j] = round(float(values[j]), 2)
+    return rounded
+
+
+class FleetTickResult:
+    """
+    Decisões de um ciclo para toda a frota (arrays indexados por paciente)
+    
+    Atributos:
+        emergency: bool - paciente emite emergência neste ciclo
+        summary: bool - paciente emite resumo neste ciclo
+        health_status: int8 - STABLE/ALERT/CRITICAL (válido onde summary=True)
+        emergency_alerts: {tipo_alerta: bool} - condições críticas emitidas
+    """
+    
+    def __init__(self, fleet, now, times, readings, emergency, emergency_alerts, summary, health_status,
+                 summary_stats, emergency_context, alert_lists):
+        self.fleet = fleet
+        self.now = now
+        self.times = times
+        self.readings = readings
+        self.emergency = emergency
+        self.emergency_alerts = emergency_alerts
+        self.summary = summary
+        self.health_status = health_status
+        self._summary_stats = summary_stats
+        self._emergency_context = emergency_context
+        self._alert_lists = alert_lists
+    
+    def messages(self) -> List[Dict]:
+        """
+        Monta os resultados (mesmo formato do EdgeProcessor) dos pacientes
+        que emitiram emergência ou resumo neste ciclo
+        """
+        results = []
+        patient_ids = self.fleet.patient_ids
+        rule_engine = self.fleet.rule_engine
+        
+        for position, i in enumerate(np.flatnonzero(self.emergency)):
+            patient_id = patient_ids[i]
+            results.append({
+                'action': 'emergency',
+                'priority': 'critical',
+                'channel': f'eldercare/emergency/{patient_id}',
+                'data': {
+                    'message_type': 'emergency',
+                    'timestamp': float(self.times[i]),
+                    'patient_id': patient_id,
+                    'health_status': 'critical',
+                    'alerts': self._alert_lists[i],
+                    'statistics': _reading_dicts(self.readings, i),
+                    'context_data': self._emergency_context(position)
+                }
+            })
+        
+        for position, i in enumerate(np.flatnonzero(self.summary)):
+            patient_id = patient_ids[i]
+            stats = self._summary_stats(position)
+            alerts = rule_engine.ruleset('summary', patient_id).evaluate(stats)
+            status = assess_status(alerts)
+            results.append({
+                'action': 'summary',
+                'priority': 'normal',
+                'channel': f'eldercare/summary/{patient_id}',
+                'data': {
+                    'message_type': 'summary',
+                    'timestamp': float(self.times[i]),
+                    'patient_id': patient_id,
+                    'health_status': status,
+                    'alerts': alerts,
+                    'statistics': stats
+                }
+            })
+        
+        return results
+
+
+class FleetEdgeProcessor:
+    """
+    EdgeProcessor vetorizado: estado de N pacientes em arrays NumPy
+    
+    Args:
+        patient_ids: IDs dos pacientes (a posição define o índice nos arrays)
+        start_time: Instante inicial (default: time.time())
+        rule_engine: Regras de alerta (default: tabela compartilhada do processo)
+    """
+    
+    def __init__(self, patient_ids: List[str], start_time: Optional[float] = None,
+                 rule_engine: Optional[RuleEngine] = None):
+        self.patient_ids = list(patient_ids)
+        self.index = {patient_id: i for i, patient_id in enumerate(self.patient_ids)}
+        n = len(self.patient_ids)
+        start_time = time.time() if start_time is None else start_time
+        
+        # Mesmas configurações do EdgeProcessor
+        self.summary_interval = 60
+        
+        # Supressão por tipo de alerta, só para quem tem episódio aberto {índice: AlertSuppressor}
+        self.alert_suppressors = {}
+        
+        self.last_summary_sent = np.full(n, start_time, dtype=float)
+        self.last_emergency_time = np.zeros(n, dtype=float)
+        self.readings_count = np.zeros(n, dtype=np.int64)
+        self.period_start = np.full(n, np.nan)
+        
+        # Agregados em streaming por sensor (Welford vetorizado)
+        self.count = {s: np.zeros(n, dtype=np.int64) for s in FLEET_SENSORS}
+        self.total = {s: np.zeros(n, dtype=float) for s in FLEET_SENSORS}
+        self.min = {s: np.full(n, np.inf) for s in FLEET_SENSORS}
+        self.max = {s: np.full(n, -np.inf) for s in FLEET_SENSORS}
+        self.last = {s: np.full(n, np.nan) for s in FLEET_SENSORS}
+        self.mean = {s: np.zeros(n, dtype=float) for s in FLEET_SENSORS}
+        self.m2 = {s: np.zeros(n, dtype=float) for s in FLEET_SENSORS}
+        
+        # Leituras do período para os percentis (e sketches de quem passou do buffer)
+        self.period_values = {s: np.zeros((n, QUANTILE_BUFFER), dtype=float) for s in FLEET_SENSORS}
+        self.period_sketches = {s: {} for s in FLEET_SENSORS}
+        
+        # Detectores de tendência (mesmo algoritmo do TrendDetector, vetorizado)
+        self.trend = {s: self._new_trend_state(n, SENSOR_RESOLUTION.get(s, 1.0)) for s in FLEET_SENSORS}
+        
+        # Queda no período: -1 = sem leituras de queda, 0 = não, 1 = sim
+        self.fall_detected = np.full(n, -1, dtype=np.int8)
+        
+        # Regras de alerta; pacientes com configuração própria são avaliados à parte
+        self.rule_engine = rule_engine or get_rule_engine()
+        self._rules_version = None
+        self._override_mask = np.zeros(n, dtype=bool)
+    
+    def __len__(self):
+        return len(self.patient_ids)
+    
+    def add_patients(self, patient_ids: List[str], start_time: Optional[float] = None) -> List[int]:
+        """
+        Acrescenta pacientes à frota, com o mesmo estado inicial de um
+        FleetEdgeProcessor novo (custo O(frota), faça em lotes)
+        
+        Returns:
+            Índices dos pacientes acrescentados (já existentes são ignorados)
+        """
+        new_ids = [p for p in dict.fromkeys(patient_ids) if p not in self.index]
+        if not new_ids:
+            return []
+        extra = FleetEdgeProcessor(new_ids, start_time, rule_engine=self.rule_engine)
+        for name in _PATIENT_STATE:
+            setattr(self, name, _concat_state(getattr(self, name), getattr(extra, name)))
+        first = len(self.patient_ids)
+        self.patient_ids.extend(new_ids)
+        for position, patient_id in enumerate(new_ids):
+            self.index[patient_id] = first + position
+        # Configurações por paciente reavaliadas no próximo ciclo
+        self._rules_version = None
+        return list(range(first, len(self.patient_ids)))
+    
+    def process_tick(self, readings: Dict[str, np.ndarray], now=None,
+                     active: Optional[np.ndarray] = None) -> FleetTickResult:
+        """
+        Processa um ciclo de leituras de toda a frota
+        
+        Args:
+            readings: {sensor_type: array float por paciente}; NaN = sem leitura.
+                      fall_detection usa 1.0 (queda) / 0.0 (sem queda)
+            now: Instante do ciclo (default: time.time()) ou array com o
+                 instante de cada paciente (leituras recebidas em lote)
+            active: Máscara dos pacientes com leituras neste ciclo (default: todos)
+        
+        Returns:
+            FleetTickResult com as decisões do ciclo
+        """
+        now = time.time() if now is None else now
+        n = len(self.patient_ids)
+        times = np.asarray(now, dtype=float) if np.ndim(now) else np.full(n, now, dtype=float)
+        active = np.ones(n, dtype=bool) if active is None else np.asarray(active, dtype=bool)
+        readings = {s: np.asarray(v, dtype=float) for s, v in readings.items()}
+        
+        self.rule_engine.maybe_reload()
+        self._add_readings(readings, active, times)
+        
+        # 1. Emergências (mesmas regras do EdgeProcessor)
+        alerts = self._detect_critical_alerts(readings)
+        any_alert = np.zeros(n, dtype=bool)
+        for mask in alerts.values():
+            any_alert |= mask
+        alert_lists = self._suppress_alerts(readings, active & any_alert, active & ~any_alert, times)
+        emergency = np.zeros(n, dtype=bool)
+        emergency[list(alert_lists)] = True
+        self.last_emergency_time[emergency] = times[emergency]
+        emitted = {}
+        for i, patient_alerts in alert_lists.items():
+            for alert in patient_alerts:
+                mask = emitted.get(alert['type'])
+                if mask is None:
+                    mask = emitted[alert['type']] = np.zeros(n, dtype=bool)
+                mask[i] = True
+        emergency_context = self._snapshot_context(np.flatnonzero(emergency))
+        
+        # 2. Resumos (apenas quem não emitiu emergência neste ciclo)
+        summary = (active & ~emergency
+                   & ((times - self.last_summary_sent) >= self.summary_interval)
+                   & (self.readings_count > 0))
+        summary_idx = np.flatnonzero(summary)
+        
+        health_status = np.zeros(n, dtype=np.int8)
+        summary_stats = self._snapshot_stats(summary_idx)
+        if len(summary_idx):
+            health_status[summary_idx] = self._assess_health(summary_stats, summary_idx)
+            self._reset_period(summary_idx)
+            self.last_summary_sent[summary_idx] = times[summary_idx]
+        
+        return FleetTickResult(
+            self, now, times, readings,
+            emergency=emergency,
+            emergency_alerts=emitted,
+            summary=summary,
+            health_status=health_status,
+            summary_stats=lambda position: self._stats_dict(summary_stats, position),
+            emergency_context=lambda position: self._context_dict(emergency_context, position),
+            alert_lists=alert_lists
+        )
+    
+    def _suppress_alerts(self, readings: Dict[str, np.ndarray], alerting: np.ndarray,
+                         quiet: np.ndarray, times: np.ndarray) -> Dict[int, List[Dict]]:
+        """
+        Aplica a supressão por tipo de alerta (mesma do EdgeProcessor) aos
+        pacientes com condições críticas no ciclo
+        
+        Returns:
+            {índice: alertas a emitir} dos pacientes que emitem emergência
+        """
+        # Encerra episódios de quem ficou sem condições críticas
+        for i in [i for i in self.alert_suppressors if quiet[i]]:
+            suppressor = self.alert_suppressors[i]
+            suppressor.expire(float(times[i]))
+            if not suppressor:
+                del self.alert_suppressors[i]
+        
+        alert_lists = {}
+        for i in np.flatnonzero(alerting):
+            i = int(i)
+            ruleset = self.rule_engine.ruleset('emergency', self.patient_ids[i])
+            patient_alerts = ruleset.evaluate({r['sensor_type']: r for r in _reading_dicts(readings, i)})
+            suppressor = self.alert_suppressors.get(i)
+            if suppressor is None:
+                suppressor = self.alert_suppressors[i] = AlertSuppressor()
+            patient_alerts = suppressor.filter(patient_alerts, float(times[i]), ruleset)
+            if patient_alerts:
+                alert_lists[i] = patient_alerts
+        return alert_lists
+    
+    def _add_readings(self, readings: Dict[str, np.ndarray], active: np.ndarray, times: np.ndarray):
+        """Atualiza os agregados de todos os pacientes ativos (Welford vetorizado)"""
+        for sensor_type in FLEET_SENSORS:
+            values = readings.get(sensor_type)
+            if values is None:
+                continue
+            idx = np.flatnonzero(active & ~np.isnan(values))
+            if not len(idx):
+                continue
+            v = values[idx]
+            count = self.count[sensor_type][idx] + 1
+            self.count[sensor_type][idx] = count
+            self.total[sensor_type][idx] += v
+            self.min[sensor_type][idx] = np.minimum(self.min[sensor_type][idx], v)
+            self.max[sensor_type][idx] = np.maximum(self.max[sensor_type][idx], v)
+            self.last[sensor_type][idx] = v
+            mean = self.mean[sensor_type][idx]
+            delta = v - mean
+            mean = mean + delta / count
+            self.mean[sensor_type][idx] = mean
+            self.m2[sensor_type][idx] += delta * (v - mean)
+            self._add_period_values(sensor_type, idx, v, count)
+            self._update_trend(self.trend[sensor_type], idx, v, times[idx])
+        
+        falls = readings.get('fall_detection')
+        if falls is not None:
+            idx = np.flatnonzero(active & ~np.isnan(falls))
+            self.fall_detected[idx] = np.maximum(self.fall_detected[idx], (falls[idx] > 0).astype(np.int8))
+        
+        starting = active & (self.readings_count == 0)
+        self.period_start[starting] = times[starting]
+        self.readings_count[active] += 1
+    
+    def _add_period_values(self, sensor_type: str, idx: np.ndarray, v: np.ndarray, count: np.ndarray):
+        """Guarda as leituras do período; quem passa de QUANTILE_BUFFER ganha um KllSketch"""
+        position = count - 1
+        fits = position < QUANTILE_BUFFER
+        self.period_values[sensor_type][idx[fits], position[fits]] = v[fits]
+        if fits.all():
+            return
+        convert = int if sensor_type in INTEGER_SENSORS else float
+        sketches = self.period_sketches[sensor_type]
+        for j in np.flatnonzero(~fits):
+            i = idx[j]
+            sketch = sketches.get(i)
+            if sketch is None:
+                sketch = sketches[i] = KllSketch()
+                for value in self.period_values[sensor_type][i]:
+                    sketch.add(convert(value))
+            sketch.add(convert(v[j]))
+    
+    @staticmethod
+    def _new_trend_state(n: int, min_std: float) -> Dict:
+        return {
+            'min_std': float(min_std),
+            'count': np.zeros(n, dtype=np.int64),
+            'mean': np.zeros(n, dtype=float),
+            'var': np.zeros(n, dtype=float),
+            'last_z': np.zeros(n, dtype=float),
+            's_hi': np.zeros(n, dtype=float),
+            's_lo': np.zeros(n, dtype=float),
+            'shift_up': np.zeros(n, dtype=bool),
+            'shift_down': np.zeros(n, dtype=bool),
+            'block_start': np.zeros(n, dtype=float),
+            'block_sum': np.zeros(n, dtype=float),
+            'block_count': np.zeros(n, dtype=np.int64),
+            'ring_t': np.zeros((n, TREND_WINDOW), dtype=float),
+            'ring_y': np.zeros((n, TREND_WINDOW), dtype=float),
+            'ring_pos': np.zeros(n, dtype=np.int64),
+            'ring_n': np.zeros(n, dtype=np.int64),
+            'slope': np.zeros(n, dtype=float),
+        }
+    
+    @staticmethod
+    def _update_trend(state: Dict, idx: np.ndarray, v: np.ndarray, now: np.ndarray):
+        """TrendDetector.add para os pacientes idx (EWMA, CUSUM e blocos da inclinação)"""
+        count = state['count'][idx]
+        mean = state['mean'][idx]
+        var = state['var'][idx]
+        first = count == 0
+        std = np.maximum(np.sqrt(var), state['min_std'])
+        diff = v - mean
+        increment = TREND_EWMA_ALPHA * diff
+        z = np.where(first, 0.0, diff / std)
+        state['mean'][idx] = np.where(first, v, mean + increment)
+        state['var'][idx] = np.where(first, var, (1 - TREND_EWMA_ALPHA) * (var + diff * increment))
+        count = count + 1
+        state['count'][idx] = count
+        state['last_z'][idx] = z
+        
+        # CUSUM bilateral
+        armed = count > TREND_WARMUP
+        s_hi = np.where(armed, np.maximum(0.0, state['s_hi'][idx] + z - TREND_CUSUM_K), state['s_hi'][idx])
+        s_lo = np.where(armed, np.maximum(0.0, state['s_lo'][idx] - z - TREND_CUSUM_K), state['s_lo'][idx])
+        up = armed & (s_hi > TREND_CUSUM_H)
+        down = armed & ~up & (s_lo > TREND_CUSUM_H)
+        fired = up | down
+        state['s_hi'][idx] = np.where(fired, 0.0, s_hi)
+        state['s_lo'][idx] = np.where(fired, 0.0, s_lo)
+        state['shift_up'][idx] |= up
+        state['shift_down'][idx] |= down
+        
+        # Fecha os blocos completos e inicia os novos
+        closing = (state['block_count'][idx] > 0) & (now - state['block_start'][idx] >= TREND_BLOCK_SECONDS)
+        if closing.any():
+            rows = idx[closing]
+            pos = state['ring_pos'][rows]
+            state['ring_t'][rows, pos] = state['block_start'][rows]
+            state['ring_y'][rows, pos] = state['block_sum'][rows] / state['block_count'][rows]
+            state['ring_pos'][rows] = (pos + 1) % TREND_WINDOW
+            state['ring_n'][rows] = np.minimum(state['ring_n'][rows] + 1, TREND_WINDOW)
+            state['block_sum'][rows] = 0.0
+            state['block_count'][rows] = 0
+            state['slope'][rows] = FleetEdgeProcessor._fit_slopes(state, rows)
+        state['block_start'][idx] = np.where(state['block_count'][idx] == 0, now, state['block_start'][idx])
+        state['block_sum'][idx] += v
+        state['block_count'][idx] += 1
+    
+    @staticmethod
+    def _fit_slopes(state: Dict, rows: np.ndarray) -> np.ndarray:
+        """Inclinação (unidades/hora) dos blocos na janela, na mesma ordem de soma do TrendDetector"""
+        n = state['ring_n'][rows]
+        start = (state['ring_pos'][rows] - n) % TREND_WINDOW
+        ring_t = state['ring_t'][rows]
+        ring_y = state['ring_y'][rows]
+        r = np.arange(len(rows))
+        origin = ring_t[r, start]
+        
+        columns = []
+        sum_x = np.zeros(len(rows))
+        sum_y = np.zeros(len(rows))
+        for j in range(TREND_WINDOW):
+            valid = j < n
+            col = (start + j) % TREND_WINDOW
+            x = (ring_t[r, col] - origin) / 3600
+            y = ring_y[r, col]
+            columns.append((valid, x, y))
+            sum_x += np.where(valid, x, 0.0)
+            sum_y += np.where(valid, y, 0.0)
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            mean_x = sum_x / n
+            mean_y = sum_y / n
+            sxx = np.zeros(len(rows))
+            sxy = np.zeros(len(rows))
+            for valid, x, y in columns:
+                dx = x - mean_x
+                sxx += np.where(valid, dx * dx, 0.0)
+                sxy += np.where(valid, dx * (y - mean_y), 0.0)
+            return np.where((n >= TREND_MIN_BLOCKS) & (sxx > 0), sxy / sxx, 0.0)
+    
+    def _trend_fields(self, sensor_type: str, idx: np.ndarray) -> Dict:
+        """Campos de tendência (TrendDetector.to_summary/context) dos pacientes idx"""
+        state = self.trend[sensor_type]
+        slope = state['slope'][idx]
+        confirmed = (((slope < 0) & state['shift_down'][idx])
+                     | ((slope > 0) & state['shift_up'][idx]))
+        drift = np.where(confirmed, slope, 0.0)
+        return {
+            'present': state['count'][idx] > 0,
+            'baseline': _round2(state['mean'][idx]),
+            'deviation': _round2(state['last_z'][idx]),
+            'slope': _round2(slope),
+            'drift': _round2(drift),
+            'direction': np.sign(drift).astype(np.int8),
+        }
+    
+    def _snapshot_context(self, idx: np.ndarray) -> Dict:
+        """Contexto das emergências do ciclo (mesmo formato de EdgeProcessor._get_recent_context)"""
+        snapshot = {
+            'buffer_size': self.readings_count[idx].copy(),
+            'episodes': [self.alert_suppressors[i].snapshot() for i in idx]
+        }
+        if len(idx):
+            for sensor_type in FLEET_SENSORS:
+                snapshot[sensor_type] = self._trend_fields(sensor_type, idx)
+        return snapshot
+    
+    @staticmethod
+    def _context_dict(snapshot: Dict, position: int) -> Dict:
+        trends = {}
+        for sensor_type in FLEET_SENSORS:
+            data = snapshot[sensor_type]
+            if not data['present'][position]:
+                continue
+            direction = data['direction'][position]
+            trends[sensor_type] = {
+                'baseline': float(data['baseline'][position]),
+                'deviation': float(data['deviation'][position]),
+                'slope': float(data['slope'][position]),
+                'direction': 'subindo' if direction > 0 else 'descendo' if direction < 0 else 'estável'
+            }
+        if not trends:
+            return {'message': 'Sem dados recentes disponíveis'}
+        
+        changing = [f"{sensor_type} {trend['direction']} ({trend['slope']}/h)"
+                    for sensor_type, trend in trends.items() if trend['direction'] != 'estável']
+        return {
+            'buffer_size': int(snapshot['buffer_size'][position]),
+            'episodes': snapshot['episodes'][position],
+            'trends': trends,
+            'trend': ('Tendência antes da emergência: ' + ', '.join(changing)) if changing
+                     else 'Sem tendência anormal antes da emergência'
+        }
+    
+    def _rule_partition(self, rows: Optional[np.ndarray]) -> List:
+        """
+        Divide as linhas avaliadas entre a tabela padrão e os pacientes com
+        configuração própria. rows: índice do paciente de cada linha (None = todos)
+        
+        Returns:
+            [(patient_id ou None, posições ou None = todas)]
+        """
+        if self._rules_version != self.rule_engine.version:
+            self._rules_version = self.rule_engine.version
+            self._override_mask = np.array(
+                [self.rule_engine.has_overrides(p) for p in self.patient_ids], dtype=bool
+            )
+        
+        if not self._override_mask.any():
+            return [(None, None)]
+        special = self._override_mask if rows is None else self._override_mask[rows]
+        parts = [(None, np.flatnonzero(~special))]
+        for position in np.flatnonzero(special):
+            i = position if rows is None else rows[position]
+            parts.append((self.patient_ids[i], np.array([position])))
+        return parts
+    
+    def _evaluate_rules(self, stage: str, columns: Dict, size: int,
+                        rows: Optional[np.ndarray] = None) -> List:
+        """Avalia as regras de um estágio; retorna [(regra, máscara de tamanho size)]"""
+        matches = []
+        for patient_id, positions in self._rule_partition(rows):
+            ruleset = self.rule_engine.ruleset(stage, patient_id)
+            if positions is None:
+                matches += ruleset.evaluate_arrays(columns)
+                continue
+            if not len(positions):
+                continue
+            subset = {key: values[positions] for key, values in columns.items()}
+            for rule, mask in ruleset.evaluate_arrays(subset):
+                full = np.zeros(size, dtype=bool)
+                full[positions] = mask
+                matches.append((rule, full))
+        return matches
+    
+    def _detect_critical_alerts(self, readings: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Condições críticas por paciente, agrupadas por tipo de alerta"""
+        if not readings:
+            return {}
+        n = len(self.patient_ids)
+        columns = {}
+        for sensor_type, values in readings.items():
+            field = 'fall_detected' if sensor_type == 'fall_detection' else 'value'
+            columns[(sensor_type, field)] = values
+        
+        alerts = {}
+        for rule, mask in self._evaluate_rules('emergency', columns, n):
+            if rule.type in alerts:
+                alerts[rule.type] = alerts[rule.type] | mask
+            else:
+                alerts[rule.type] = mask
+        return alerts
+    
+    def _snapshot_stats(self, idx: np.ndarray) -> Dict:
+        """Copia os agregados dos pacientes que vão emitir resumo"""
+        snapshot = {'avg': {}, 'fall': self.fall_detected[idx].copy()}
+        for sensor_type in FLEET_SENSORS:
+            count = self.count[sensor_type][idx]
+            total = self.total[sensor_type][idx]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                snapshot['avg'][sensor_type] = _round2(np.where(count > 0, total / count, np.nan))
+            snapshot[sensor_type] = {
+                'trend': self._trend_fields(sensor_type, idx),
+                'quantiles': self._snapshot_quantiles(sensor_type, idx, count),
+                'count': count.copy(),
+                'min': self.min[sensor_type][idx].copy(),
+                'max': self.max[sensor_type][idx].copy(),
+                'last': self.last[sensor_type][idx].copy(),
+                'm2': self.m2[sensor_type][idx].copy(),
+            }
+        return snapshot
+    
+    def _snapshot_quantiles(self, sensor_type: str, idx: np.ndarray, count: np.ndarray) -> Dict:
+        """Percentis (rank mais próximo, como quantiles_from_pairs) dos pacientes idx"""
+        values = self.period_values[sensor_type][idx]
+        sketches = self.period_sketches[sensor_type]
+        overflow = {position: sketches[i] for position, i in enumerate(idx) if i in sketches}
+        
+        rows = np.arange(len(idx))
+        in_period = np.arange(QUANTILE_BUFFER)[None, :] < count[:, None]
+        ordered = np.sort(np.where(in_period, values, np.nan), axis=1)
+        snapshot = {'ordered': ordered, 'sketches': overflow}
+        for name, q in SUMMARY_QUANTILES:
+            rank = np.minimum(np.maximum(np.ceil(q * count) - 1, 0), QUANTILE_BUFFER - 1).astype(np.int64)
+            snapshot[name] = np.where(count > 0, ordered[rows, rank], np.nan)
+        for position, sketch in overflow.items():
+            for (name, _), value in zip(SUMMARY_QUANTILES, sketch.quantiles([q for _, q in SUMMARY_QUANTILES])):
+                snapshot[name][position] = value
+        return snapshot
+    
+    @staticmethod
+    def _sketch_pairs(quantiles: Dict, ordered: List, position: int, convert) -> List[List]:
+        """Forma compacta do sketch do período (igual a KllSketch.to_pairs)"""
+        sketch = quantiles['sketches'].get(position)
+        if sketch is not None:
+            return sketch.to_pairs()
+        # Leituras do período já ordenadas: agrupa as repetidas
+        pairs = []
+        for value in ordered:
+            value = convert(value)
+            if pairs and pairs[-1][0] == value:
+                pairs[-1][1] += 1
+            else:
+                pairs.append([value, 1])
+        return pairs
+    
+    @staticmethod
+    def _snapshot_lists(snapshot: Dict) -> Dict:
+        """Arrays do snapshot convertidos para listas (acesso por paciente sem custo de NumPy)"""
+        lists = {'fall': snapshot['fall'].tolist()}
+        for sensor_type in FLEET_SENSORS:
+            data = snapshot[sensor_type]
+            count = data['count']
+            with np.errstate(invalid='ignore', divide='ignore'):
+                std = np.sqrt(np.where(count > 1, data['m2'] / np.maximum(count - 1, 1), 0.0))
+            quantiles = data['quantiles']
+            lists[sensor_type] = {
+                'avg': snapshot['avg'][sensor_type].tolist(),
+                'count': count.tolist(),
+                'min': data['min'].tolist(),
+                'max': data['max'].tolist(),
+                'last': data['last'].tolist(),
+                'std': std.tolist(),
+                'baseline': data['trend']['baseline'].tolist(),
+                'slope': data['trend']['slope'].tolist(),
+                'drift': data['trend']['drift'].tolist(),
+                'quantiles': {name: quantiles[name].tolist() for name, _ in SUMMARY_QUANTILES},
+                'ordered': quantiles['ordered'].tolist()
+            }
+        return lists
+    
+    @staticmethod
+    def _stats_dict(snapshot: Dict, position: int) -> Dict:
+        """Estatísticas de um paciente no formato do resumo do EdgeProcessor"""
+        lists = snapshot.get('lists')
+        if lists is None:
+            lists = snapshot['lists'] = FleetEdgeProcessor._snapshot_lists(snapshot)
+        stats = {}
+        for sensor_type in FLEET_SENSORS:
+            data = lists[sensor_type]
+            count = data['count'][position]
+            if not count:
+                continue
+            convert = int if sensor_type in INTEGER_SENSORS else float
+            stats[sensor_type] = {
+                'avg': data['avg'][position],
+                'min': convert(data['min'][position]),
+                'max': convert(data['max'][position]),
+                'count': count,
+                'last_value': convert(data['last'][position]),
+                'std': round(data['std'][position], 2),
+                'unit': SENSOR_UNITS.get(sensor_type, 'unknown'),
+                'baseline': data['baseline'][position],
+                'slope': data['slope'][position],
+                'drift': data['drift'][position]
+            }
+            for name, _ in SUMMARY_QUANTILES:
+                stats[sensor_type][name] = convert(data['quantiles'][name][position])
+            stats[sensor_type]['sketch'] = FleetEdgeProcessor._sketch_pairs(
+                snapshot[sensor_type]['quantiles'], data['ordered'][position][:count], position, convert
+            )
+        fall = lists['fall'][position]
+        if fall >= 0:
+            stats['fall_detection'] = {'fall_detected': bool(fall)}
+        return stats
+    
+    def _assess_health(self, snapshot: Dict, idx: np.ndarray) -> np.ndarray:
+        """Regras do estágio de resumo avaliadas para todos os resumos do ciclo"""
+        size = len(idx)
+        columns = {}
+        with np.errstate(invalid='ignore', divide='ignore'):
+            for sensor_type in FLEET_SENSORS:
+                data = snapshot[sensor_type]
+                count = data['count']
+                present = count > 0
+                std = _round2(np.sqrt(np.where(count > 1, data['m2'] / (count - 1), 0.0)))
+                for field, values in (('avg', snapshot['avg'][sensor_type]), ('min', data['min']),
+                                      ('max', data['max']), ('last_value', data['last']),
+                                      ('count', count.astype(float)), ('std', std),
+                                      ('baseline', data['trend']['baseline']),
+                                      ('slope', data['trend']['slope']),
+                                      ('drift', data['trend']['drift']),
+                                      *((name, data['quantiles'][name]) for name, _ in SUMMARY_QUANTILES)):
+                    columns[(sensor_type, field)] = np.where(present, values, np.nan)
+        fall = snapshot['fall']
+        columns[('fall_detection', 'fall_detected')] = np.where(fall >= 0, (fall > 0).astype(float), np.nan)
+        
+        critical = np.zeros(size, dtype=bool)
+        concern = np.zeros(size, dtype=bool)
+        for rule, mask in self._evaluate_rules('summary', columns, size, rows=idx):
+            if rule.severity == 'critical':
+                critical |= mask
+            else:
+                concern |= mask
+        
+        return np.where(critical, CRITICAL, np.where(concern, ALERT, STABLE)).astype(np.int8)
+    
+    def _reset_period(self, idx: np.ndarray):
+        """Zera os agregados do período dos pacientes que emitiram resumo"""
+        for sensor_type in FLEET_SENSORS:
+            self.count[sensor_type][idx] = 0
+            self.total[sensor_type][idx] = 0.0
+            self.min[sensor_type][idx] = np.inf
+            self.max[sensor_type][idx] = -np.inf
+            self.last[sensor_type][idx] = np.nan
+            self.mean[sensor_type][idx] = 0.0
+            self.m2[sensor_type][idx] = 0.0
+            self.trend[sensor_type]['shift_up'][idx] = False
+            self.trend[sensor_type]['shift_down'][idx] = False
+            sketches = self.period_sketches[sensor_type]
+            if sketches:
+                for i in idx:
+                    sketches.pop(i, None)
+        self.fall_detected[idx] = -1
+        self.readings_count[idx] = 0
+        self.period_start[idx] = np.nan
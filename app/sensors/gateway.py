@@ -0,0 +1,489 @@
+"""
+Gateway de cabeceira: várias pulseiras em poucas conexões MQTT
+
+Em vez de uma conexão (cliente paho, socket, thread de rede e keepalive)
+por pulseira, o GatewayPublisher abre GATEWAY_CONNECTIONS conexões e
+cada pulseira registrada ganha um PulseiraPublisher completo (delta,
+spool, lotes, MQTT v5, presença) cujo cliente é um canal do gateway:
+
+    gateway = GatewayPublisher("quarto12")
+    pulseira = SmartPulseira("PAT001", gateway=gateway)
+
+- Roteamento: a pulseira usa sempre a mesma conexão (crc32 do paciente),
+  então a ordem das mensagens de cada pulseira é mantida; os tópicos
+  continuam os de cada pulseira (eldercare/<tipo>/<paciente>).
+- Escalonamento justo: cada pulseira tem sua fila e a conexão entrega às
+  filas por Deficit Round Robin (GATEWAY_QUANTUM bytes por rodada), com no
+  máximo GATEWAY_INFLIGHT publicações em voo. Uma pulseira esvaziando o
+  spool não atrasa as outras; emergências (QoS 2) passam na frente.
+- Conexões: as do pool do simulador (simulator.connections), com os
+  client_ids fixos quando há presença. O paho reconecta cada uma com espera
+  exponencial e a conexão repassa conexão/queda a todas as pulseiras dela
+  (que anunciam presença, reenviam o spool etc., como se fossem sozinhas).
+- Presença: o Last Will é da conexão (eldercare/gateway/<gateway>_<n>,
+  retido); o subscriber marca offline as pulseiras cuja última presença
+  veio por ela. O status retido 'online' (com a lista das pulseiras) é
+  republicado a cada pulseira que entra ou sai, e o Will é atualizado,
+  mas o broker só recebe o Will novo na próxima conexão.
+"""
+
+import threading
+import time
+import zlib
+from collections import deque
+from typing import Dict, List, Optional
+import paho.mqtt.client as mqtt
+from config.settings import (
+    MQTT_PORT, MQTT_KEEPALIVE, MQTT_V5, WIRE_FORMAT, PRESENCE_LWT, PRESENCE_KEEPALIVE, PRESENCE_HEARTBEAT_TIMEOUT,
+    GATEWAY_CONNECTIONS, GATEWAY_INFLIGHT, GATEWAY_QUANTUM, GATEWAY_DEVICE_QUEUE
+)
+from protocol import encode_message
+from simulator.connections import MqttConnection, MqttConnectionPool
+from .pulseira_publisher import PulseiraPublisher, MQTT_BROKER
+
+
+class GatewayMessage:
+    """
+    Publicação de uma pulseira na fila do gateway (o MQTTMessageInfo dela)
+
+    is_published() e wait_for_publish() funcionam como no paho: a mensagem
+    só conta como publicada depois da confirmação do broker (QoS > 0).
+    """
+
+    __slots__ = ('mid', 'rc', 'topic', 'payload', 'qos', 'retain', 'properties', 'size', 'channel', '_published')
+
+    def __init__(self, mid: int, rc: int, topic: str, payload: bytes, qos: int, retain: bool,
+                 properties, channel):
+        self.mid = mid
+        self.rc = rc
+        self.topic = topic
+        self.payload = payload
+        self.qos = qos
+        self.retain = retain
+        self.properties = properties
+        self.size = len(topic) + len(payload)
+        self.channel = channel
+        self._published = threading.Event()
+
+    def is_published(self) -> bool:
+        return self._published.is_set()
+
+    def wait_for_publish(self, timeout: Optional[float] = None) -> bool:
+        return self._published.wait(timeout)
+
+    def confirm(self, mid: int, reason_code, properties):
+        """on_publish da conexão (mid dela, não o da pulseira)"""
+        self.channel.connection._complete(self, reason_code)
+
+
+class GatewayChannel:
+    """
+    Cliente MQTT de uma pulseira atrás do gateway
+
+    Implementa a parte do cliente paho que o PulseiraPublisher usa; as
+    publicações entram na fila da pulseira e saem pela conexão dela.
+    """
+
+    def __init__(self, gateway: 'GatewayPublisher', patient_id: str, connection: '_GatewayConnection'):
+        self.gateway = gateway
+        self.patient_id = patient_id
+        self.connection = connection
+        self.gateway_id = connection.name
+        self.on_connect = None
+        self.on_disconnect = None
+        self.on_publish = None
+        self.on_message = None
+        self.queue = deque()      # Mensagens normais (DRR)
+        self.urgent = deque()     # Emergências (QoS 2), antes de tudo
+        self.deficit = 0
+        self.closed = False
+        self._mid = 0
+        self.stats = {'queued': 0, 'published': 0, 'rejected': 0, 'bytes': 0}
+
+    # === INTERFACE DO CLIENTE PAHO ===
+
+    def will_set(self, topic: str, payload=None, qos: int = 0, retain: bool = False, properties=None):
+        """O Will da pulseira vira a entrada dela no Will da conexão"""
+        self.connection.refresh_will()
+
+    def connect(self, host: str = None, port: int = None, keepalive: int = None):
+        """Entra na conexão compartilhada (conecta o gateway na primeira vez)"""
+        self.closed = False
+        self.gateway.connect()
+        self.connection.attach(self)
+
+    def loop_start(self):
+        pass
+
+    def loop_stop(self):
+        pass
+
+    def disconnect(self):
+        """Sai da conexão compartilhada (o que já estava na fila ainda é enviado)"""
+        self.closed = True
+        self.connection.detach(self)
+
+    def subscribe(self, topic: str, qos: int = 0):
+        """Assinatura pela conexão compartilhada (só tópicos exatos, repassados a on_message)"""
+        self.connection.subscribe(self, topic, qos)
+        return mqtt.MQTT_ERR_SUCCESS, None
+
+    def publish(self, topic: str, payload=None, qos: int = 0, retain: bool = False, properties=None):
+        if isinstance(payload, str):
+            payload = payload.encode()
+        return self.connection.enqueue(self, topic, payload or b'', qos, retain, properties)
+
+    def next_mid(self) -> int:
+        self._mid = self._mid % 65535 + 1
+        return self._mid
+
+    def pending(self) -> int:
+        return len(self.queue) + len(self.urgent)
+
+
+class _GatewayConnection:
+    """
+    Escalonador das pulseiras de uma conexão do pool (MqttConnection)
+
+    A MqttConnection repassa conexão/queda e mensagens assinadas às
+    pulseiras (registradas nela com attach); aqui ficam as filas, o DRR e
+    o status/Will do gateway.
+    """
+
+    def __init__(self, gateway: 'GatewayPublisher', index: int, connection: MqttConnection):
+        self.gateway = gateway
+        self.index = index
+        self.connection = connection
+        self.name = f"{gateway.gateway_id}_{index}"
+        self.topic = f"eldercare/gateway/{self.name}"
+        self.channels: Dict[str, GatewayChannel] = {}
+        self.running = False
+        self._cond = threading.Condition()
+        self._active = deque()         # Pulseiras com mensagens normais na fila (rodada do DRR)
+        self._urgent_active = deque()  # Pulseiras com emergências na fila
+        self._outstanding = set()      # Entregues à conexão, aguardando confirmação
+        self._thread = None
+        # Registrado antes das pulseiras: o status do gateway sai antes da presença delas
+        self.on_connect = self._on_connect
+        self.on_disconnect = self._on_disconnect
+        self.on_message = None
+        connection.attach(self)
+
+    @property
+    def is_connected(self) -> bool:
+        return self.connection.is_connected
+
+    @property
+    def _inflight(self) -> int:
+        return len(self._outstanding)
+
+    # === PULSEIRAS ===
+
+    def attach(self, channel: GatewayChannel):
+        with self._cond:
+            self.channels[channel.patient_id] = channel
+        self.publish_status()
+        self.connection.attach(channel)
+
+    def detach(self, channel: GatewayChannel):
+        self.connection.detach(channel)
+        with self._cond:
+            if not channel.pending():
+                self._remove(channel)
+        self.publish_status()
+
+    def subscribe(self, channel: GatewayChannel, topic: str, qos: int):
+        """Assina o tópico na conexão (uma vez; o broker reenvia o retido a cada SUBSCRIBE)"""
+        self.connection.subscribe(channel, topic, qos)
+
+    def _remove(self, channel: GatewayChannel):
+        if self.channels.get(channel.patient_id) is channel:
+            del self.channels[channel.patient_id]
+
+    def device_ids(self) -> List[str]:
+        return sorted(patient_id for patient_id, channel in self.channels.items() if not channel.closed)
+
+    def _status_payload(self, status: str, reason: str) -> bytes:
+        return encode_message({
+            'gateway_id': self.name,
+            'status': status,
+            'reason': reason,
+            'devices': self.device_ids(),
+            'created_at': time.time(),
+            'heartbeat_timeout': PRESENCE_HEARTBEAT_TIMEOUT
+        }, self.gateway.wire_format)
+
+    def refresh_will(self):
+        """Will da conexão com as pulseiras atuais (vale a partir da próxima conexão)"""
+        if self.gateway.presence:
+            self.connection.will_set(self.topic, self._status_payload('offline', 'lost'), qos=1, retain=True)
+
+    def publish_status(self, reason: str = 'devices'):
+        """Status 'online' retido com as pulseiras atuais (e o Will, para a próxima conexão)"""
+        if not self.gateway.presence:
+            return
+        self.refresh_will()
+        if self.is_connected:
+            self.connection.publish(self.topic, self._status_payload('online', reason), 1, retain=True)
+
+    # === FILA E ESCALONAMENTO ===
+
+    def enqueue(self, channel: GatewayChannel, topic: str, payload: bytes, qos: int, retain: bool, properties):
+        """Coloca a publicação na fila da pulseira (sem bloquear)"""
+        with self._cond:
+            if not self.is_connected:
+                return GatewayMessage(channel.next_mid(), mqtt.MQTT_ERR_NO_CONN, topic, payload, qos, retain,
+                                      properties, channel)
+            if channel.pending() >= self.gateway.device_queue:
+                channel.stats['rejected'] += 1
+                return GatewayMessage(channel.next_mid(), mqtt.MQTT_ERR_QUEUE_SIZE, topic, payload, qos, retain,
+                                      properties, channel)
+            message = GatewayMessage(channel.next_mid(), mqtt.MQTT_ERR_SUCCESS, topic, payload, qos, retain,
+                                     properties, channel)
+            if qos == 2:
+                if not channel.urgent:
+                    self._urgent_active.append(channel)
+                channel.urgent.append(message)
+            else:
+                if not channel.queue:
+                    self._active.append(channel)
+                channel.queue.append(message)
+            channel.stats['queued'] += 1
+            self._cond.notify()
+            return message
+
+    def _next_message(self) -> Optional[GatewayMessage]:
+        """
+        Próxima mensagem a sair (chamar com o lock): emergências em rodízio,
+        depois Deficit Round Robin entre as filas normais
+        """
+        if self._urgent_active:
+            channel = self._urgent_active.popleft()
+            message = channel.urgent.popleft()
+            if channel.urgent:
+                self._urgent_active.append(channel)
+            return message
+        quantum = self.gateway.quantum
+        while self._active:
+            channel = self._active[0]
+            head = channel.queue[0]
+            if head.size > channel.deficit:
+                # Vez da pulseira acabou: ganha um quantum e vai para o fim da rodada
+                channel.deficit += quantum
+                self._active.rotate(-1)
+                continue
+            channel.queue.popleft()
+            channel.deficit -= head.size
+            if not channel.queue:
+                channel.deficit = 0
+                self._active.popleft()
+            return head
+        return None
+
+    def send_next(self) -> bool:
+        """
+        Entrega uma mensagem à conexão se houver conexão, espaço na janela e fila
+
+        Returns:
+            False se não havia o que enviar agora
+        """
+        with self._cond:
+            if not self.is_connected or self._inflight >= self.gateway.inflight:
+                return False
+            message = self._next_message()
+            if message is None:
+                return False
+            self._outstanding.add(message)
+        try:
+            info = self.connection.publish(message.topic, message.payload, message.qos, message.retain,
+                                           message.properties, on_publish=message.confirm)
+        except Exception as e:
+            print(f"❌ Erro ao publicar pelo gateway {self.name}: {e}")
+            info = None
+        if info is None:
+            with self._cond:
+                # Conexão caiu no meio: volta para o início da fila da pulseira
+                self._outstanding.discard(message)
+                self._requeue(message)
+            return False
+        return True
+
+    def _requeue(self, message: GatewayMessage):
+        channel = message.channel
+        if message.qos == 2:
+            if not channel.urgent:
+                self._urgent_active.appendleft(channel)
+            channel.urgent.appendleft(message)
+        else:
+            if not channel.queue:
+                self._active.appendleft(channel)
+            channel.queue.appendleft(message)
+
+    def _complete(self, message: GatewayMessage, reason_code):
+        """Confirmada pelo broker: libera a janela e avisa o PulseiraPublisher da pulseira"""
+        with self._cond:
+            self._outstanding.discard(message)
+            self._cond.notify()
+        channel = message.channel
+        message._published.set()
+        channel.stats['published'] += 1
+        channel.stats['bytes'] += len(message.payload)
+        if channel.on_publish is not None:
+            channel.on_publish(channel, None, message.mid, reason_code, None)
+        if channel.closed and not channel.pending():
+            with self._cond:
+                self._remove(channel)
+
+    def _can_send(self) -> bool:
+        return (self.is_connected and self._inflight < self.gateway.inflight
+                and bool(self._urgent_active or self._active))
+
+    def _scheduler_loop(self):
+        while self.running:
+            with self._cond:
+                while self.running and not self._can_send():
+                    self._cond.wait(0.5)
+            self.send_next()
+
+    # === CONEXÃO ===
+
+    def start(self):
+        self.running = True
+        self.refresh_will()
+        self.connection.connect()
+        self._thread = threading.Thread(target=self._scheduler_loop, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self.gateway.presence and self.is_connected:
+            try:
+                self.connection.publish(self.topic, self._status_payload('offline', 'disconnect'),
+                                        1, retain=True).wait_for_publish(timeout=2)
+            except Exception as e:
+                print(f"⚠️  Status offline do gateway {self.name} não confirmado: {e}")
+        self.connection.close()
+
+    def _on_connect(self, client, userdata, flags, reason_code, properties):
+        """Conexão no ar (repassada pela MqttConnection antes das pulseiras)"""
+        with self._cond:
+            self._cond.notify_all()
+            devices = len(self.device_ids())
+        print(f"✅ Gateway {self.name} ONLINE ({devices} pulseiras)")
+        self.publish_status('connect')
+
+    def _on_disconnect(self, client, userdata, disconnect_flags, reason_code, properties):
+        with self._cond:
+            # O paho reenvia sozinho o QoS 1/2 pendente; QoS 0 não enviado se perdeu
+            self._outstanding = {message for message in self._outstanding if message.qos > 0}
+        if reason_code != 0:
+            print(f"⚠️ Gateway {self.name} OFFLINE (inesperado): {reason_code} — reconectando")
+
+
+class GatewayPublisher:
+    """
+    Multiplexa as pulseiras de um gateway em poucas conexões MQTT
+
+    Args:
+        gateway_id: Identificador do gateway (client_ids e tópico do Will)
+        connections: Quantidade de conexões MQTT
+        presence: Will por conexão (eldercare/gateway/...) e presença das pulseiras
+        mqtt_v5, wire_format: Repassados às pulseiras (e ao status do gateway)
+        dry_run, recorder: Como no pool do simulador (sem broker / gravação do tráfego)
+    """
+
+    def __init__(self, gateway_id: str, connections: int = GATEWAY_CONNECTIONS,
+                 presence: bool = PRESENCE_LWT, mqtt_v5: bool = MQTT_V5, wire_format: str = WIRE_FORMAT,
+                 inflight: int = GATEWAY_INFLIGHT, quantum: int = GATEWAY_QUANTUM,
+                 device_queue: int = GATEWAY_DEVICE_QUEUE, dry_run: bool = False, recorder=None):
+        if connections < 1:
+            raise ValueError("O gateway precisa de pelo menos uma conexão")
+        if inflight < 1 or quantum < 1 or device_queue < 1:
+            raise ValueError("inflight, quantum e device_queue devem ser positivos")
+        self.gateway_id = gateway_id
+        self.presence = presence
+        self.mqtt_v5 = mqtt_v5
+        self.wire_format = wire_format
+        self.inflight = inflight
+        self.quantum = quantum
+        self.device_queue = device_queue
+        self.keepalive = PRESENCE_KEEPALIVE if presence else MQTT_KEEPALIVE
+        # Com presença, client_ids fixos: ao reconectar, o broker encerra a sessão
+        # antiga (publicando o Will dela) antes do novo 'online', e nunca depois
+        self.pool = MqttConnectionPool(
+            connections, MQTT_BROKER, MQTT_PORT, client_prefix=f"gateway_{gateway_id}", dry_run=dry_run,
+            recorder=recorder, fixed_ids=presence, keepalive=self.keepalive,
+            protocol=mqtt.MQTTv5 if mqtt_v5 else mqtt.MQTTv311, max_inflight=inflight
+        )
+        self.connections = [_GatewayConnection(self, i, connection)
+                            for i, connection in enumerate(self.pool.connections)]
+        self.publishers: Dict[str, PulseiraPublisher] = {}
+        self._lock = threading.Lock()
+        self._started = False
+
+    def connection_for(self, patient_id: str) -> _GatewayConnection:
+        """Conexão da pulseira (sempre a mesma para o mesmo paciente)"""
+        return self.connections[zlib.crc32(patient_id.encode()) % len(self.connections)]
+
+    def register(self, patient_id: str, **publisher_options) -> PulseiraPublisher:
+        """
+        PulseiraPublisher da pulseira, publicando pelo gateway
+
+        publisher_options vão para o PulseiraPublisher (delta_encoding,
+        spool_dir, batch_window, clock...); presence, mqtt_v5 e wire_format
+        seguem os do gateway.
+        """
+        if patient_id in self.publishers:
+            raise ValueError(f"Pulseira {patient_id} já registrada no gateway {self.gateway_id}")
+        channel = GatewayChannel(self, patient_id, self.connection_for(patient_id))
+        publisher = PulseiraPublisher(patient_id, presence=self.presence, mqtt_v5=self.mqtt_v5,
+                                      wire_format=self.wire_format, client=channel, **publisher_options)
+        self.publishers[patient_id] = publisher
+        return publisher
+
+    def connect(self, timeout: float = 0) -> int:
+        """
+        Inicia as conexões (só na primeira chamada; o paho reconecta sozinho)
+
+        Returns:
+            Quantidade de conexões ativas após esperar até timeout
+        """
+        with self._lock:
+            if not self._started:
+                print(f"🔌 Gateway {self.gateway_id}: {len(self.connections)} conexões para "
+                      f"{len(self.publishers)} pulseiras")
+                for connection in self.connections:
+                    connection.start()
+                self._started = True
+        deadline = time.time() + timeout
+        while time.time() < deadline and not all(c.is_connected for c in self.connections):
+            time.sleep(0.1)
+        return sum(c.is_connected for c in self.connections)
+
+    def close(self):
+        """Desconecta as pulseiras que ainda estão ativas e fecha as conexões"""
+        for publisher in self.publishers.values():
+            if not publisher.client.closed and publisher.is_connected:
+                publisher.disconnect()
+        with self._lock:
+            if self._started:
+                for connection in self.connections:
+                    connection.stop()
+                self._started = False
+
+    def get_status(self) -> Dict:
+        """Conexões, pulseiras por conexão e filas"""
+        return {
+            'gateway_id': self.gateway_id,
+            'connections': [{
+                'name': connection.name,
+                'connected': connection.is_connected,
+                'devices': len(connection.channels),
+                'queued': sum(channel.pending() for channel in connection.channels.values()),
+                'inflight': connection._inflight,
+                **connection.connection.stats
+            } for connection in self.connections],
+            'devices': len(self.publishers)
+        }
@@ -2,8 +2,10 @@ import random
 from .base_sensor import BaseSensor
 
 class HeartRateSensor(BaseSensor):
-    def __init__(self, patient_id, status='stable'):
-        super().__init__(patient_id, "heart_rate")
+    unit = "bpm"
+    
+    def __init__(self, patient_id, status='stable', clock=None):
+        super().__init__(patient_id, "heart_rate", clock)
         if status == 'stable':
             # Batimento cardíaco inicial estável (60-100 bpm)
             self.current_heart_rate = random.randint(65, 100)
@@ -17,7 +19,7 @@ class HeartRateSensor(BaseSensor):
             # Valor padrão se o status não for reconhecido
             self.current_heart_rate = 75
     
-    def generate_data(self):
+    def read_value(self):
         """Gera dados de batimento cardíaco com variação gradual"""
         # Varia entre -5 e +5 bpm do valor anterior
         variation = random.randint(-5, 5)
@@ -26,7 +28,4 @@ class HeartRateSensor(BaseSensor):
         # Mantém dentro de limites realistas
         self.current_heart_rate = max(25, min(200, self.current_heart_rate))
             
-        return {
-            "value": self.current_heart_rate,
-            "unit": "bpm",
-        }
\ No newline at end of file
+        return self.current_heart_rate
\ No newline at end of file
@@ -2,8 +2,10 @@ import random
 from .base_sensor import BaseSensor
 
 class OxygenSensor(BaseSensor):
-    def __init__(self, patient_id, status='stable'):
-        super().__init__(patient_id, "oxygen_saturation")
+    unit = "%"
+    
+    def __init__(self, patient_id, status='stable', clock=None):
+        super().__init__(patient_id, "oxygen_saturation", clock)
         if status == 'stable':
             # Saturação de oxigênio inicial estável (95-100%)
             self.current_oxygen = random.randint(95, 100)
@@ -17,7 +19,7 @@ class OxygenSensor(BaseSensor):
             # Valor padrão se o status não for reconhecido
             self.current_oxygen = 98
     
-    def generate_data(self):
+    def read_value(self):
         """Gera dados de saturação de oxigênio (85-100%)"""
         # Normal: 95-100%
         # Baixo: 90-94% (atenção)
@@ -30,7 +32,4 @@ class OxygenSensor(BaseSensor):
         
         oxygen = self.current_oxygen
 
-        return {
-            "value": oxygen,
-            "unit": "%",
-        }
\ No newline at end of file
+        return oxygen
\ No newline at end of file
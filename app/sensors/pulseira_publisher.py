@@ -1,46 +1,167 @@
 import json
+import math
+import os
+import threading
 import time
-from typing import Dict
+from collections import OrderedDict
+from typing import Dict, List, Tuple
 import paho.mqtt.client as mqtt
-from config.settings import MQTT_PORT
+from paho.mqtt.packettypes import PacketTypes
+from paho.mqtt.properties import Properties
+from config.settings import (
+    MQTT_PORT, MQTT_KEEPALIVE, DELTA_ENCODING, WIRE_FORMAT, PUBLISH_SPOOL_DIR, SPOOL_MAX_BYTES, SPOOL_SEGMENT_BYTES,
+    SPOOL_DRAIN_RATE, SPOOL_DRAIN_BURST, MQTT_V5, SUMMARY_EXPIRY, READINGS_EXPIRY, HEARTBEAT_EXPIRY,
+    PUBLISH_BATCH_WINDOW, PUBLISH_BATCH_MAX_MESSAGES, PRESENCE_LWT, PRESENCE_KEEPALIVE,
+    PRESENCE_HEARTBEAT_TIMEOUT
+)
+from protocol import (
+    DeltaEncoder, encode_readings, encode_message, encode_batch, WIRE_FORMATS, SUBSCRIBER_EPOCH_TOPIC
+)
+from .clock import SYSTEM_CLOCK
+from .spool import MessageSpool, TokenBucket
 
 MQTT_BROKER = "localhost"  # Altere para o endereço do seu broker MQTT
 
+# Expiração no broker por tipo (MQTT v5, segundos; 0 = não expira). Emergências não expiram.
+MESSAGE_EXPIRY = {'emergency': 0, 'summary': SUMMARY_EXPIRY, 'readings': READINGS_EXPIRY,
+                  'heartbeat': HEARTBEAT_EXPIRY}
+
+def _batch_expiry(message_types) -> int:
+    """Expiração de um lote: a mais longa dos itens (nada expira antes do que expiraria sozinho)"""
+    expiries = [MESSAGE_EXPIRY[message_type] for message_type in message_types]
+    return 0 if not expiries or 0 in expiries else max(expiries)
+
 class PulseiraPublisher:
     """
     Publisher MQTT com Callback API v2 (mais recente)
+    
+    Com delta_encoding, cada resumo vai como patch contra o último resumo
+    confirmado pelo broker (PUBACK), com keyframes periódicos (protocol.delta).
+    A base é descartada a cada reconexão e quando o subscriber anuncia uma
+    nova época (SUBSCRIBER_EPOCH_TOPIC); o resumo seguinte vai completo.
+    
+    Os instantes das mensagens vêm de clock (sensors.clock); a espera pela
+    conexão com o broker usa sempre o tempo real.
+    
+    Com spool_dir, emergências, resumos e leituras que não puderem sair
+    (sem conexão ou publish recusado) ficam em <spool_dir>/<paciente> e
+    são reenviados na reconexão, emergências primeiro, a no máximo
+    SPOOL_DRAIN_RATE mensagens/s (sensors.spool).
+    
+    wire_format 'compact' publica as mensagens em CBOR com dicionário
+    (protocol.compact) em vez de JSON.
+    
+    Com mqtt_v5, cada publicação leva a expiração do tipo (MESSAGE_EXPIRY) e
+    usa alias de tópico até o limite anunciado pelo broker no CONNACK (só
+    alias, sem o tópico, apenas em QoS 0; ver _publish). Com
+    batch_window > 0, resumos, leituras e heartbeats esperam até
+    batch_window segundos e saem juntos em eldercare/batch/<paciente>
+    (protocol.batch); quem usa a pulseira chama poll() a cada ciclo.
+    
+    Com presence, a conectividade vem do broker: a pulseira publica
+    'online' retido em eldercare/presence/<paciente> ao conectar, 'offline'
+    retido ao desconectar normalmente e deixa o mesmo 'offline' como Last
+    Will, que o broker publica se a conexão cair (keepalive MQTT curto,
+    PRESENCE_KEEPALIVE). O heartbeat deixa de ser enviado na conexão.
+    
+    client substitui a conexão própria por um canal já pronto (o de um
+    GatewayPublisher, sensors.gateway, ou o DeviceClient do simulador de
+    frota), que leva as mensagens por uma conexão compartilhada com outras
+    pulseiras. verbose=False cala o log de cada envio (erros continuam).
     """
     
-    def __init__(self, patient_id: str):
+    def __init__(self, patient_id: str, delta_encoding: bool = DELTA_ENCODING, clock=None,
+                 spool_dir: str = PUBLISH_SPOOL_DIR, wire_format: str = WIRE_FORMAT,
+                 mqtt_v5: bool = MQTT_V5, batch_window: float = PUBLISH_BATCH_WINDOW,
+                 presence: bool = PRESENCE_LWT, client=None, verbose: bool = True):
+        if wire_format not in WIRE_FORMATS:
+            raise ValueError(f"wire_format inválido: {wire_format} (use {', '.join(WIRE_FORMATS)})")
         self.patient_id = patient_id
+        self.wire_format = wire_format
+        self.clock = clock or SYSTEM_CLOCK
+        self.mqtt_v5 = mqtt_v5
+        self.verbose = verbose
         
         # ✅ Callback API v2 (nova versão)
-        self.client = mqtt.Client(
+        # Com presença, client_id fixo: ao reconectar, o broker encerra a sessão antiga
+        # (publicando o Will dela) antes do novo 'online', e nunca depois
+        self.client = client or mqtt.Client(
             callback_api_version=mqtt.CallbackAPIVersion.VERSION2,
-            client_id=f"pulseira_{patient_id}_{int(time.time())}"
+            client_id=f"pulseira_{patient_id}" if presence else f"pulseira_{patient_id}_{int(time.time())}",
+            protocol=mqtt.MQTTv5 if mqtt_v5 else mqtt.MQTTv311
         )
         
+        # MQTT v5: aliases da conexão atual ({tópico: alias}), zerados a cada conexão
+        self._publish_lock = threading.Lock()
+        self._topic_aliases = {}
+        self._alias_maximum = 0
+        
+        # Lote em montagem: [(tipo, payload, seq do resumo delta, payload para o spool)]
+        self.batch_window = batch_window
+        self._batch_lock = threading.RLock()
+        self._batch = []
+        self._batch_opened = None
+        
         self.is_connected = False
         self.failed_messages = []
         
+        # Codificação delta dos resumos: [(seq, MQTTMessageInfo)] aguardando PUBACK
+        self.delta_encoder = DeltaEncoder(dumps=self._encode) if delta_encoding else None
+        self._unacked_summaries = []
+        self._subscriber_epoch = None
+        
+        # Spool em disco (store-and-forward), esvaziado por uma thread na reconexão
+        self.spool = None
+        if spool_dir:
+            self.spool = MessageSpool(os.path.join(spool_dir, patient_id), SPOOL_MAX_BYTES, SPOOL_SEGMENT_BYTES,
+                                      clock=self.clock)
+        self._drain_bucket = TokenBucket(SPOOL_DRAIN_RATE, SPOOL_DRAIN_BURST)
+        self._drain_lock = threading.Lock()
+        self._drain_thread = None
+        # Reenvios aguardando confirmação, em ordem ({mid: [mensagem, confirmada, enviada]}); o spool
+        # só avança até a primeira não confirmada. mids confirmados antes de registrados
+        self._drain_cond = threading.Condition()
+        self._drain_inflight = OrderedDict()
+        self._drain_early = set()
+        
         # Configuração de callbacks (sintaxe nova)
         self.client.on_connect = self._on_connect
         self.client.on_disconnect = self._on_disconnect
+        self.client.on_publish = self._on_publish
+        if self.delta_encoder is not None:
+            self.client.on_message = self._on_message
+        
+        # Presença retida + Last Will (o broker anuncia 'offline' se a conexão cair)
+        self.presence = presence
+        self.presence_topic = f"eldercare/presence/{patient_id}"
+        self.keepalive = PRESENCE_KEEPALIVE if presence else MQTT_KEEPALIVE
+        if presence:
+            self.client.will_set(self.presence_topic, self._presence_payload('offline', 'lost'), qos=1, retain=True)
         
         # Estatísticas essenciais
         self.stats = {
             'emergency_sent': 0,
             'summary_sent': 1,
+            'summary_deltas': 0,
+            'summary_bytes': 0,
             'heartbeat_sent': 0,
+            'readings_sent': 0,
             'failed_sends': 0,
+            'spooled': 0,
+            'spool_drained': 0,
+            'spool_expired': 0,
+            'batches_sent': 0,
+            'batched_messages': 0,
+            'aliased_publishes': 0,
+            'presence_sent': 0,
             'connection_time': None
         }
     
     def connect(self) -> bool:
         """Conecta ao broker MQTT"""
         try:
-            print(f"🔌 Conectando pulseira {self.patient_id} ao MQTT...")
-            self.client.connect(MQTT_BROKER, MQTT_PORT, 60)
+            self._log(f"🔌 Conectando pulseira {self.patient_id} ao MQTT...")
+            self.client.connect(MQTT_BROKER, MQTT_PORT, self.keepalive)
             self.client.loop_start()
             
             # Aguarda conexão
@@ -57,33 +178,44 @@ class PulseiraPublisher:
     
     def disconnect(self):
         """Desconecta do broker MQTT"""
-        print(f"🔌 Desconectando pulseira {self.patient_id}...")
+        self._log(f"🔌 Desconectando pulseira {self.patient_id}...")
+        self.flush_batch()
+        if self.presence and self.is_connected:
+            # Desconexão normal não dispara o Will: anuncia o 'offline' antes de sair
+            try:
+                self._publish_presence('offline', 'disconnect').wait_for_publish(timeout=2)
+            except Exception as e:
+                print(f"⚠️  Status offline não confirmado: {e}")
         self.client.loop_stop()
         self.client.disconnect()
         self.is_connected = False
+        if self.spool is not None:
+            self.spool.close()
     
     def send_emergency(self, emergency_data: Dict) -> bool:
         """
         Envia dados de emergência com alta prioridade
         QoS 2 = Exactly once delivery (mais confiável)
         """
+        topic = f"eldercare/emergency/{self.patient_id}"
+        body = self._encode(emergency_data)
+        
+        if self._should_spool('emergency'):
+            return self._spool_message('emergency', topic, body, 2)
         if not self.is_connected:
             print("❌ Pulseira não conectada!")
             return False
         
-        topic = f"eldercare/emergency/{self.patient_id}"
-        
         try:
-            result = self.client.publish(topic, json.dumps(emergency_data, indent=2), qos=2)
+            result = self._publish('emergency', topic, body, 2)
             
             if result.rc == mqtt.MQTT_ERR_SUCCESS:
                 self.stats['emergency_sent'] += 1
                 alerts_count = len(emergency_data.get('alerts', []))
-                print(f"🚨 EMERGÊNCIA enviada: {alerts_count} alerta(s)")
+                self._log(f"🚨 EMERGÊNCIA enviada: {alerts_count} alerta(s)")
                 return True
             else:
-                self._handle_failure('emergency', topic, emergency_data)
-                return False
+                return self._handle_failure('emergency', topic, emergency_data, body, 2)
                 
         except Exception as e:
             print(f"❌ Erro ao enviar emergência: {e}")
@@ -94,28 +226,217 @@ class PulseiraPublisher:
         Envia resumo estatístico
         QoS 1 = At least once delivery
         """
+        topic = f"eldercare/summary/{self.patient_id}"
+        
+        # No spool o resumo vai completo (a base de um delta pode não existir na reconexão)
+        if self._should_spool('summary'):
+            return self._spool_message('summary', topic, self._encode(summary_data), 1)
         if not self.is_connected:
             return False
-        
-        topic = f"eldercare/summary/{self.patient_id}"
+        if self.batch_window > 0:
+            return self._add_summary_to_batch(summary_data)
         
         try:
-            result = self.client.publish(topic, json.dumps(summary_data, indent=2), qos=1)
+            seq, payload = None, summary_data
+            if self.delta_encoder is not None:
+                self._collect_summary_acks()
+                seq, payload = self.delta_encoder.encode(summary_data)
+            
+            body = self._encode(payload)
+            result = self._publish('summary', topic, body, 1)
             
             if result.rc == mqtt.MQTT_ERR_SUCCESS:
                 self.stats['summary_sent'] += 1
+                self.stats['summary_bytes'] += len(body)
+                if seq is not None:
+                    self._unacked_summaries.append((seq, result))
+                    if payload.get('encoding') == 'delta':
+                        self.stats['summary_deltas'] += 1
                 readings = summary_data.get('readings_count', 0)
                 health = summary_data.get('health_status', 'unknown')
-                print(f"📊 RESUMO enviado: {readings} leituras, status: {health}")
+                self._log(f"📊 RESUMO enviado: {readings} leituras, status: {health} ({len(body)} bytes)")
                 return True
             else:
-                self._handle_failure('summary', topic, summary_data)
-                return False
+                return self._handle_failure('summary', topic, summary_data, self._encode(summary_data), 1)
                 
         except Exception as e:
             print(f"❌ Erro ao enviar resumo: {e}")
             return False
     
+    def send_readings(self, cycles: List[Tuple[float, List[Dict]]], processed: bool = False) -> bool:
+        """
+        Envia um lote de ciclos de leitura brutos (protocol.readings)
+        QoS 1 = At least once delivery (o servidor descarta ciclos repetidos)
+        """
+        if not cycles:
+            return False
+        
+        topic = f"eldercare/readings/{self.patient_id}"
+        
+        try:
+            readings = encode_readings(cycles, processed=processed)
+            if self._should_spool('readings'):
+                if self._spool_message('readings', topic, self._encode(readings, indent=None), 1):
+                    self.stats['readings_sent'] += len(cycles)
+                    return True
+                return False
+            if not self.is_connected:
+                return False
+            if self.batch_window > 0:
+                return self._add_to_batch('readings', readings)
+            body = self._encode(readings, indent=None)
+            result = self._publish('readings', topic, body, 1)
+            
+            if result.rc == mqtt.MQTT_ERR_SUCCESS:
+                self.stats['readings_sent'] += len(cycles)
+                self._log(f"📦 LEITURAS enviadas: {len(cycles)} ciclo(s) ({len(body)} bytes)")
+                return True
+            elif self._handle_failure('readings', topic, {'cycles': len(cycles)}, body, 1):
+                self.stats['readings_sent'] += len(cycles)
+                return True
+            else:
+                return False
+                
+        except Exception as e:
+            print(f"❌ Erro ao enviar leituras: {e}")
+            return False
+    
+    def _log(self, message: str):
+        if self.verbose:
+            print(message)
+    
+    def _encode(self, data: Dict, indent=2) -> bytes:
+        """Serializa o payload publicado (JSON ou formato compacto)"""
+        return encode_message(data, self.wire_format, indent)
+    
+    def _collect_summary_acks(self):
+        """Confirma no codificador delta os resumos que já receberam PUBACK"""
+        pending = []
+        for seq, info in self._unacked_summaries:
+            if info.is_published():
+                self.delta_encoder.acknowledge(seq)
+            else:
+                pending.append((seq, info))
+        # Resumos antigos sem confirmação nunca serão base de um delta
+        self._unacked_summaries = pending[-self.delta_encoder.keyframe_interval:]
+    
+    # === LOTES (eldercare/batch) ===
+    
+    def _add_summary_to_batch(self, summary_data: Dict) -> bool:
+        with self._batch_lock:
+            seq, payload = None, summary_data
+            if self.delta_encoder is not None:
+                self._collect_summary_acks()
+                seq, payload = self.delta_encoder.encode(summary_data)
+            # No spool o resumo vai completo, como fora do lote
+            return self._add_to_batch('summary', payload, seq=seq, fallback=summary_data)
+    
+    def _add_to_batch(self, message_type: str, payload: Dict, seq=None, fallback=None) -> bool:
+        """Acrescenta ao lote; fecha o lote se encheu ou se é um heartbeat"""
+        with self._batch_lock:
+            if not self._batch:
+                self._batch_opened = self.clock.time()
+            self._batch.append((message_type, payload, seq, payload if fallback is None else fallback))
+            size = len(self._batch)
+        self._log(f"🧺 {message_type} no lote ({size} mensagem(ns))")
+        if message_type == 'heartbeat' or size >= PUBLISH_BATCH_MAX_MESSAGES:
+            return self.flush_batch()
+        return True
+    
+    def poll(self):
+        """Fecha o lote se a janela já passou (chamar a cada ciclo)"""
+        with self._batch_lock:
+            due = bool(self._batch) and self.clock.time() - self._batch_opened >= self.batch_window
+        if due:
+            self.flush_batch()
+    
+    def flush_batch(self) -> bool:
+        """Publica o lote em montagem (QoS 1); sem conexão, vai para o spool sem os heartbeats"""
+        with self._batch_lock:
+            items, self._batch, self._batch_opened = self._batch, [], None
+            if not items:
+                return True
+            topic = f"eldercare/batch/{self.patient_id}"
+            
+            if not self.is_connected or (self.spool is not None and self.spool.pending_by_priority()['summary']):
+                return self._spool_batch(topic, items)
+            
+            try:
+                body = self._encode(encode_batch([(t, payload) for t, payload, _, _ in items]), indent=None)
+                result = self._publish('batch', topic, body, 1, _batch_expiry({t for t, _, _, _ in items}))
+                
+                if result.rc == mqtt.MQTT_ERR_SUCCESS:
+                    self._count_batch(items, result)
+                    self._log(f"🧺 LOTE enviado: {len(items)} mensagem(ns) ({len(body)} bytes)")
+                    return True
+                self.stats['failed_sends'] += 1
+                print("❌ Falha no envio do lote")
+                return self._spool_batch(topic, items)
+            
+            except Exception as e:
+                print(f"❌ Erro ao enviar lote: {e}")
+                return False
+    
+    def _count_batch(self, items, result):
+        self.stats['batches_sent'] += 1
+        self.stats['batched_messages'] += len(items)
+        for message_type, payload, seq, _ in items:
+            if message_type == 'summary':
+                self.stats['summary_sent'] += 1
+                if seq is not None:
+                    self._unacked_summaries.append((seq, result))
+                    if payload.get('encoding') == 'delta':
+                        self.stats['summary_deltas'] += 1
+            elif message_type == 'readings':
+                self.stats['readings_sent'] += len(payload.get('rows', ()))
+            elif message_type == 'heartbeat':
+                self.stats['heartbeat_sent'] += 1
+    
+    def _spool_batch(self, topic: str, items) -> bool:
+        kept = [(message_type, fallback) for message_type, _, _, fallback in items if message_type != 'heartbeat']
+        if self.spool is None or not kept:
+            return False
+        return self._spool_message('summary', topic, self._encode(encode_batch(kept), indent=None), 1)
+    
+    # === MQTT v5 (EXPIRAÇÃO E ALIAS DE TÓPICO) ===
+    
+    def _publish(self, message_type: str, topic: str, body, qos: int, expiry: int = None):
+        """
+        client.publish; com MQTT v5, acrescenta a expiração do tipo e o alias do tópico
+        
+        Aliases valem só na conexão em que foram criados. O paho reenvia o
+        QoS 1/2 pendente na reconexão como foi gravado, e uma publicação só
+        com alias (tópico vazio) seria erro de protocolo na conexão nova; por
+        isso QoS 1/2 sempre leva o tópico completo (com o alias, que só
+        renova o mapeamento) e só o QoS 0, que o paho não reenvia, sai sem
+        o tópico.
+        """
+        if not self.mqtt_v5:
+            return self.client.publish(topic, body, qos=qos)
+        properties = Properties(PacketTypes.PUBLISH)
+        expiry = MESSAGE_EXPIRY.get(message_type, 0) if expiry is None else expiry
+        if expiry:
+            properties.MessageExpiryInterval = expiry
+        with self._publish_lock:
+            alias = self._topic_aliases.get(topic)
+            if alias is None:
+                # Primeira vez na conexão: tópico completo + alias (se o broker ainda aceitar)
+                if len(self._topic_aliases) < self._alias_maximum:
+                    alias = self._topic_aliases[topic] = len(self._topic_aliases) + 1
+                    properties.TopicAlias = alias
+                return self.client.publish(topic, body, qos=qos, properties=properties)
+            properties.TopicAlias = alias
+            if qos > 0:
+                return self.client.publish(topic, body, qos=qos, properties=properties)
+            self.stats['aliased_publishes'] += 1
+            return self.client.publish('', body, qos=qos, properties=properties)
+    
+    def _reset_topic_aliases(self, properties):
+        """Nova conexão: os aliases recomeçam do zero, até o limite do CONNACK"""
+        with self._publish_lock:
+            self._topic_aliases = {}
+            self._alias_maximum = getattr(properties, 'TopicAliasMaximum', 0) if self.mqtt_v5 else 0
+    
     def send_heartbeat(self) -> bool:
         """
         Envia sinal de vida da pulseira
@@ -132,9 +453,9 @@ class PulseiraPublisher:
             'patient_id': self.patient_id,
             'device_id': f"pulseira_{self.patient_id}",
             'message_type': 'HEARTBEAT',
-            'created_at': time.time(),  # Corrigido para compatibilidade
+            'created_at': self.clock.time(),  # Corrigido para compatibilidade
             'status': 'online',
-            'uptime_seconds': time.time() - (self.stats.get('connection_time', time.time())),
+            'uptime_seconds': self.clock.time() - (self.stats.get('connection_time') or self.clock.time()),
             'stats': {
                 'emergency_sent': self.stats['emergency_sent'],
                 'summary_sent': self.stats['summary_sent'],
@@ -142,14 +463,19 @@ class PulseiraPublisher:
             }
         }
         
+        # Com um lote aberto, o heartbeat vai junto e fecha o lote
+        with self._batch_lock:
+            if self._batch:
+                return self._add_to_batch('heartbeat', heartbeat_data)
+        
         try:
             # Retain=True: broker mantém última mensagem
             # Se pulseira desconectar, sistema sabe que último status era "online"
-            result = self.client.publish(topic, json.dumps(heartbeat_data), qos=0, retain=False)
+            result = self._publish('heartbeat', topic, self._encode(heartbeat_data, indent=None), 0)
             
             if result.rc == mqtt.MQTT_ERR_SUCCESS:
                 self.stats['heartbeat_sent'] += 1
-                print(f"💓 Heartbeat enviado (uptime: {int(heartbeat_data['uptime_seconds'])}s)")
+                self._log(f"💓 Heartbeat enviado (uptime: {int(heartbeat_data['uptime_seconds'])}s)")
                 return True
                 
         except Exception as e:
@@ -157,6 +483,29 @@ class PulseiraPublisher:
             
         return False
     
+    def _presence_payload(self, status: str, reason: str) -> bytes:
+        """Status de presença ('online'/'offline') e o motivo (connect, disconnect ou lost)"""
+        presence = {
+            'patient_id': self.patient_id,
+            'device_id': f"pulseira_{self.patient_id}",
+            'status': status,
+            'reason': reason,
+            'created_at': self.clock.time(),
+            'heartbeat_timeout': PRESENCE_HEARTBEAT_TIMEOUT
+        }
+        # Atrás de um gateway, o Will é o da conexão compartilhada (eldercare/gateway/<id>)
+        gateway_id = getattr(self.client, 'gateway_id', None)
+        if gateway_id:
+            presence['gateway'] = gateway_id
+        return self._encode(presence, indent=None)
+    
+    def _publish_presence(self, status: str, reason: str):
+        """Publica o status de presença retido (QoS 1, sem alias nem expiração)"""
+        result = self.client.publish(self.presence_topic, self._presence_payload(status, reason), qos=1, retain=True)
+        if result.rc == mqtt.MQTT_ERR_SUCCESS:
+            self.stats['presence_sent'] += 1
+        return result
+    
     def get_connection_status(self) -> Dict:
         """
         Retorna status de conectividade da pulseira
@@ -167,7 +516,8 @@ class PulseiraPublisher:
             'connected': self.is_connected,
             'broker': f"{MQTT_BROKER}:{MQTT_PORT}",
             'connection_time': self.stats.get('connection_time'),
-            'uptime_seconds': time.time() - (self.stats.get('connection_time', time.time())) if self.is_connected else 0,
+            'spool_pending': self.spool.pending() if self.spool is not None else 0,
+            'uptime_seconds': self.clock.time() - (self.stats.get('connection_time') or self.clock.time()) if self.is_connected else 0,
             'statistics': self.stats.copy()
         }
     
@@ -179,35 +529,194 @@ class PulseiraPublisher:
             print(f"❌ Falha na conexão da pulseira {self.patient_id}. Código: {reason_code}")
             self.is_connected = False
         else:
+            self._reset_topic_aliases(properties)
+            if self.delta_encoder is not None:
+                # A base confirmada antes da queda pode não ter chegado ao subscriber
+                self.delta_encoder.reset()
+                client.subscribe(SUBSCRIBER_EPOCH_TOPIC, qos=1)
             self.is_connected = True
-            self.stats['connection_time'] = time.time()
-            print(f"✅ Pulseira {self.patient_id} ONLINE")
+            self.stats['connection_time'] = self.clock.time()
+            self._log(f"✅ Pulseira {self.patient_id} ONLINE")
             
-            # Envia heartbeat imediatamente após conectar
-            self.send_heartbeat()
+            # Anuncia a presença (ou, sem presença, envia heartbeat imediatamente)
+            if self.presence:
+                self._publish_presence('online', 'connect')
+            else:
+                self.send_heartbeat()
+            
+            # Reenvia o que ficou no spool enquanto estava offline
+            self._start_drain()
+    
+    def _on_publish(self, client, userdata, mid, reason_code, properties):
+        """Publicação concluída (PUBACK/PUBCOMP, ou enviada em QoS 0): confirma os reenvios do spool"""
+        if self.spool is None:
+            return
+        with self._drain_cond:
+            entry = self._drain_inflight.get(mid)
+            if entry is None:
+                if self._drain_thread is not None:
+                    self._drain_early.add(mid)
+                return
+            entry[1] = True
+            self._ack_drained()
+            self._drain_cond.notify_all()
+    
+    def _ack_drained(self):
+        """Confirma no spool os reenvios confirmados em sequência (chamar com _drain_cond)"""
+        while self._drain_inflight:
+            mid, (message, confirmed, sent) = next(iter(self._drain_inflight.items()))
+            if not confirmed:
+                return
+            del self._drain_inflight[mid]
+            self.spool.ack(message)
+            if sent:
+                self.stats['spool_drained'] += 1
+    
+    def _on_message(self, client, userdata, msg):
+        """Época do subscriber: se mudou, ele pode não ter a base dos deltas"""
+        try:
+            epoch = json.loads(msg.payload).get('epoch')
+        except (ValueError, AttributeError):
+            return
+        if epoch != self._subscriber_epoch:
+            if self._subscriber_epoch is not None:
+                self._log(f"🔄 Subscriber reconectou: próximo resumo de {self.patient_id} vai completo")
+                self.delta_encoder.reset()
+            self._subscriber_epoch = epoch
     
     def _on_disconnect(self, client, userdata, disconnect_flags, reason_code, properties):
         """Callback quando desconecta (API v2)"""
         self.is_connected = False
         if reason_code != 0:
-            print(f"⚠️ Pulseira {self.patient_id} OFFLINE (inesperado): {reason_code}")
+            self._log(f"⚠️ Pulseira {self.patient_id} OFFLINE (inesperado): {reason_code}")
         else:
-            print(f"🔌 Pulseira {self.patient_id} OFFLINE (normal)")
+            self._log(f"🔌 Pulseira {self.patient_id} OFFLINE (normal)")
     
-    def _handle_failure(self, msg_type: str, topic: str, data: Dict):
-        """Gerencia falhas de envio"""
+    def _handle_failure(self, msg_type: str, topic: str, data: Dict, body, qos: int) -> bool:
+        """
+        Gerencia falhas de envio
+        
+        Returns:
+            True se a mensagem ficou no spool para reenvio
+        """
         self.stats['failed_sends'] += 1
         
-        # Salva para retry apenas mensagens críticas
+        if self.spool is not None:
+            print(f"❌ Falha no envio {msg_type}")
+            return self._spool_message(msg_type, topic, body, qos)
+        
+        # Sem spool: guarda apenas mensagens críticas
         if msg_type == 'emergency':
             self.failed_messages.append({
                 'type': msg_type,
                 'topic': topic,
                 'data': data,
-                'failed_at': time.time()
+                'failed_at': self.clock.time()
             })
         
         print(f"❌ Falha no envio {msg_type}")
+        return False
+    
+    # === SPOOL (STORE-AND-FORWARD) ===
+    
+    def _should_spool(self, msg_type: str) -> bool:
+        """Vai para o spool sem conexão ou se já há mensagens do mesmo tipo esperando (mantém a ordem)"""
+        if self.spool is None:
+            return False
+        return not self.is_connected or self.spool.pending_by_priority()[msg_type] > 0
+    
+    def _spool_message(self, msg_type: str, topic: str, body, qos: int) -> bool:
+        """Guarda a mensagem no spool e dispara o reenvio se já houver conexão"""
+        if not self.spool.append(msg_type, topic, body, qos):
+            print(f"❌ {msg_type} maior que o spool ({SPOOL_MAX_BYTES} bytes). Descartada.")
+            return False
+        self.stats['spooled'] += 1
+        self._log(f"💾 {msg_type} guardada no spool ({self.spool.pending()} pendente(s))")
+        self._start_drain()
+        return True
+    
+    def _start_drain(self):
+        if self.spool is None or not self.is_connected:
+            return
+        with self._drain_lock:
+            if self._drain_thread is not None or self.spool.pending() == 0:
+                return
+            self._drain_thread = threading.Thread(target=self._drain_spool, daemon=True)
+            self._drain_thread.start()
+    
+    def _remaining_expiry(self, message_type: str, message) -> int:
+        """
+        Expiração (MQTT v5) de uma mensagem do spool, descontado o tempo que ela esperou
+        
+        Returns:
+            Segundos restantes (0 = não expira), ou None se já expirou
+        """
+        if not self.mqtt_v5:
+            return 0
+        expiry = _batch_expiry(('summary', 'readings')) if message_type == 'batch' else MESSAGE_EXPIRY.get(message_type, 0)
+        if not expiry:
+            return 0
+        remaining = expiry - (self.clock.time() - message.queued_at)
+        return math.ceil(remaining) if remaining > 0 else None
+    
+    def _drain_spool(self):
+        """
+        Reenvia o spool em ordem (emergências primeiro), no máximo SPOOL_DRAIN_RATE mensagens/s
+        
+        Cada mensagem sai do spool quando o broker confirma (_on_publish); o
+        próximo lote só é lido depois das confirmações do anterior.
+        """
+        with self._drain_cond:
+            # Reenvios de uma conexão anterior sem confirmação saem de novo do spool
+            self._drain_inflight.clear()
+            self._drain_early.clear()
+        drained_before = self.stats['spool_drained']
+        while self.is_connected:
+            batch = self.spool.next_batch(self._drain_bucket.take(SPOOL_DRAIN_BURST))
+            done = 0
+            for message in batch:
+                try:
+                    message_type = message.topic.split('/')[1]
+                    expiry = self._remaining_expiry(message_type, message)
+                    if expiry is None:
+                        # Expirou no spool: o broker descartaria; sai sem ser enviada
+                        with self._drain_cond:
+                            self._drain_inflight[(message.segment, message.end)] = [message, True, False]
+                            self._ack_drained()
+                        self.stats['spool_expired'] += 1
+                        done += 1
+                        continue
+                    result = self._publish(message_type, message.topic, message.payload, message.qos, expiry)
+                except Exception as e:
+                    print(f"❌ Erro ao reenviar do spool: {e}")
+                    break
+                if result.rc != mqtt.MQTT_ERR_SUCCESS:
+                    break
+                with self._drain_cond:
+                    # A confirmação pode chegar (thread de rede) antes de o mid ser registrado
+                    confirmed = result.mid in self._drain_early
+                    self._drain_early.discard(result.mid)
+                    self._drain_inflight[result.mid] = [message, confirmed, True]
+                    self._ack_drained()
+                done += 1
+            with self._drain_cond:
+                while self.is_connected and self._drain_inflight:
+                    self._drain_cond.wait(1.0)
+                confirmed = not self._drain_inflight
+                self._drain_early.clear()
+            self.spool.commit()
+            if done < len(batch) or not confirmed:
+                break   # Publish recusado ou conexão caiu: o restante espera a próxima reconexão
+            with self._drain_lock:
+                if not batch and self.spool.pending() == 0:
+                    self._drain_thread = None
+                    drained = self.stats['spool_drained'] - drained_before
+                    if drained:
+                        self._log(f"📤 Spool esvaziado: {drained} mensagem(ns) reenviada(s)")
+                    return
+        with self._drain_lock:
+            self._drain_thread = None
+        print(f"⚠️ Reenvio do spool interrompido ({self.spool.pending()} pendente(s))")
 
 # Teste simplificado
 if __name__ == "__main__":
@@ -0,0 +1,81 @@
+"""
+Leitura de sensor compacta
+
+Cada ciclo da pulseira gera uma leitura por sensor. Em vez de um dict por
+leitura (mais o dict intermediário de generate_data), SensorReading guarda
+os campos em __slots__: sem __dict__ por instância, unidade e tipo de
+sensor compartilhados (strings da classe do sensor).
+
+A leitura responde à mesma interface de leitura de dict usada no
+EdgeProcessor e no motor de regras (get, [] e in), então dicts e
+SensorReading podem ser misturados; o EdgeProcessor converte o ciclo uma
+vez (as_readings) e lê os campos direto dos slots. O formato de envio
+continua o mesmo: to_dict() só monta o dict quando a leitura vai para uma
+mensagem JSON, e o lote de leituras brutas (protocol.readings) lê os
+valores da leitura sem dict intermediário.
+"""
+
+from typing import Any, Dict, Iterable, List, Union
+
+_FIELDS = frozenset(('sensor_type', 'timestamp', 'value', 'unit', 'fall_detected'))
+
+
+class SensorReading:
+    """
+    Leitura de um sensor em um ciclo
+
+    Campos ausentes (None) se comportam como chaves ausentes de um dict:
+    a leitura de queda não tem 'value' e as demais não têm 'fall_detected'.
+    """
+
+    __slots__ = ('sensor_type', 'timestamp', 'value', 'unit', 'fall_detected')
+
+    def __init__(self, sensor_type: str, timestamp: float, value=None, unit: str = None,
+                 fall_detected: bool = None):
+        self.sensor_type = sensor_type
+        self.timestamp = timestamp
+        self.value = value
+        self.unit = unit
+        self.fall_detected = fall_detected
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'SensorReading':
+        """Leitura a partir do formato de envio"""
+        return cls(data.get('sensor_type'), data.get('timestamp'), data.get('value'),
+                   data.get('unit'), data.get('fall_detected'))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in _FIELDS:
+            return default
+        value = getattr(self, key)
+        return default if value is None else value
+
+    def __getitem__(self, key: str) -> Any:
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def to_dict(self) -> Dict:
+        """Formato de envio (o mesmo dict gerado antes pelos sensores)"""
+        data = {'sensor_type': self.sensor_type}
+        if self.timestamp is not None:
+            data['timestamp'] = self.timestamp
+        if self.fall_detected is not None:
+            data['fall_detected'] = self.fall_detected
+        if self.value is not None:
+            data['value'] = self.value
+        if self.unit is not None:
+            data['unit'] = self.unit
+        return data
+
+    def __repr__(self):
+        return f"SensorReading({self.to_dict()})"
+
+
+def as_readings(readings: Iterable[Union[SensorReading, Dict]]) -> List[SensorReading]:
+    """Ciclo como lista de SensorReading (dicts no formato de envio são convertidos)"""
+    return [r if r.__class__ is SensorReading else SensorReading.from_dict(r) for r in readings]
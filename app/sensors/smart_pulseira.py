@@ -1,4 +1,4 @@
-import time
+import os
 import threading
 import random
 from typing import List, Dict
@@ -9,11 +9,39 @@ from .oxygen_sensor import OxygenSensor
 from .fall_sensor import FallSensor
 from .edge_processor import EdgeProcessor
 from .pulseira_publisher import PulseiraPublisher
+from .checkpoint import EdgeCheckpointer
+from .clock import SYSTEM_CLOCK
+from config.settings import (
+    ADAPTIVE_REPORTING, DELTA_ENCODING, READINGS_MODE, READINGS_BATCH_SIZE, EDGE_CHECKPOINT_DIR,
+    PUBLISH_SPOOL_DIR, WIRE_FORMAT, PRESENCE_LWT, PRESENCE_HEARTBEAT_INTERVAL
+)
+
+READINGS_MODES = ('edge', 'raw', 'both')
 
 class SmartPulseira:
     """
     Simulação completa de uma pulseira IoT inteligente
     Integra sensores + processamento edge + comunicação MQTT
+    
+    readings_mode: 'edge' (só EdgeProcessor), 'raw' (leituras brutas em lote,
+    processadas no servidor) ou 'both' (EdgeProcessor + leituras para auditoria)
+    
+    Com checkpoint_dir, o estado do EdgeProcessor é gravado periodicamente
+    em <checkpoint_dir>/<paciente>.ckpt e restaurado ao reiniciar.
+    
+    Com spool_dir, o que não puder ser enviado fica em disco até a
+    reconexão (ver PulseiraPublisher).
+    
+    Com presence, o online/offline vem do broker (status retido e Last
+    Will) e o heartbeat vira um sinal lento (PRESENCE_HEARTBEAT_INTERVAL).
+    
+    Com gateway (sensors.gateway.GatewayPublisher), a pulseira publica por
+    uma conexão compartilhada do gateway; presença, MQTT v5 e formato das
+    mensagens seguem os do gateway.
+    
+    clock (sensors.clock) é repassado aos sensores, ao EdgeProcessor e ao
+    publisher; com um VirtualClock passo a passo, o heartbeat é verificado
+    a cada ciclo em vez de em uma thread.
     """
     
     def __init__(self, patient_id: str, 
@@ -21,33 +49,61 @@ class SmartPulseira:
                  stress_status: str = 'stable',
                  temp_status: str = 'stable',
                  heart_rate_status: str = 'stable',
-                 fall_chance: str = 'low'
+                 fall_chance: str = 'low',
+                 adaptive_reporting: bool = ADAPTIVE_REPORTING,
+                 delta_encoding: bool = DELTA_ENCODING,
+                 readings_mode: str = READINGS_MODE,
+                 checkpoint_dir: str = EDGE_CHECKPOINT_DIR,
+                 spool_dir: str = PUBLISH_SPOOL_DIR,
+                 wire_format: str = WIRE_FORMAT,
+                 presence: bool = PRESENCE_LWT,
+                 gateway=None,
+                 clock=None
                 ):
+        if readings_mode not in READINGS_MODES:
+            raise ValueError(f"readings_mode inválido: {readings_mode} (use {', '.join(READINGS_MODES)})")
         self.patient_id = patient_id
+        self.readings_mode = readings_mode
         self.running = False
+        self.clock = clock or SYSTEM_CLOCK
         
         # === COMPONENTES PRINCIPAIS ===
         print(f"🔧 Inicializando pulseira inteligente para {patient_id}...")
         
         # 1. Sensores IoT
         self.sensors = [
-            HeartRateSensor(patient_id, status=heart_rate_status),
-            StressSensor(patient_id, status=stress_status),
-            TemperatureSensor(patient_id, status=temp_status),
-            OxygenSensor(patient_id, status=oxygen_status),
-            FallSensor(patient_id, chance=fall_chance)
+            HeartRateSensor(patient_id, status=heart_rate_status, clock=self.clock),
+            StressSensor(patient_id, status=stress_status, clock=self.clock),
+            TemperatureSensor(patient_id, status=temp_status, clock=self.clock),
+            OxygenSensor(patient_id, status=oxygen_status, clock=self.clock),
+            FallSensor(patient_id, chance=fall_chance, clock=self.clock)
         ]
         
         # 2. Processador de borda (inteligência)
-        self.edge_processor = EdgeProcessor(patient_id)
+        self.edge_processor = EdgeProcessor(patient_id, adaptive=adaptive_reporting, clock=self.clock)
+        
+        # Checkpoint do processador (retoma resumos e supressão de alertas)
+        self.checkpointer = None
+        if checkpoint_dir:
+            self.checkpointer = EdgeCheckpointer(os.path.join(checkpoint_dir, f"{patient_id}.ckpt"))
+            self.checkpointer.load(self.edge_processor)
         
         # 3. Publisher MQTT (comunicação)
-        self.publisher = PulseiraPublisher(patient_id)
+        if gateway is not None:
+            self.publisher = gateway.register(patient_id, delta_encoding=delta_encoding, clock=self.clock,
+                                              spool_dir=spool_dir)
+        else:
+            self.publisher = PulseiraPublisher(patient_id, delta_encoding=delta_encoding, clock=self.clock,
+                                               spool_dir=spool_dir, wire_format=wire_format,
+                                               presence=presence)
         
         # === CONFIGURAÇÕES ===
         self.reading_interval = (8, 15)  # Intervalo entre leituras (segundos)
-        self.heartbeat_interval = 30     # Heartbeat a cada 30 segundos
+        # Heartbeat a cada 30 segundos (com presença pelo broker, só um sinal lento)
+        self.heartbeat_interval = PRESENCE_HEARTBEAT_INTERVAL if self.publisher.presence else 30
         self.last_heartbeat = 0
+        self.readings_batch_size = READINGS_BATCH_SIZE
+        self._pending_cycles = []        # [(instante, leituras)] aguardando envio em lote
         
         # === ESTATÍSTICAS ===
         self.stats = {
@@ -78,13 +134,14 @@ class SmartPulseira:
         
         # Inicia monitoramento
         self.running = True
-        self.stats['uptime_start'] = time.time()
+        self.stats['uptime_start'] = self.clock.time()
         
         try:
-            # Thread para heartbeat periódico
-            heartbeat_thread = threading.Thread(target=self._heartbeat_loop)
-            heartbeat_thread.daemon = True
-            heartbeat_thread.start()
+            # Thread para heartbeat periódico (no relógio passo a passo, verificado a cada ciclo)
+            if not self.clock.stepped:
+                heartbeat_thread = threading.Thread(target=self._heartbeat_loop)
+                heartbeat_thread.daemon = True
+                heartbeat_thread.start()
             
             # Loop principal de monitoramento
             self._main_monitoring_loop(duration_seconds)
@@ -100,12 +157,12 @@ class SmartPulseira:
     
     def _main_monitoring_loop(self, duration_seconds: int):
         """Loop principal de coleta e processamento"""
-        start_time = time.time()
+        start_time = self.clock.time()
         cycle_count = 0
         
-        while self.running and (time.time() - start_time) < duration_seconds:
+        while self.running and (self.clock.time() - start_time) < duration_seconds:
             cycle_count += 1
-            cycle_start = time.time()
+            cycle_start = self.clock.time()
             
             print(f"\n📋 === CICLO {cycle_count} ===")
             
@@ -113,20 +170,36 @@ class SmartPulseira:
             all_readings = self._collect_sensor_data()
             
             if all_readings:
-                # 2. PROCESSA no EdgeProcessor
-                processing_result = self.edge_processor.process_sensor_readings(all_readings)
+                if self.readings_mode != 'raw':
+                    # 2. PROCESSA no EdgeProcessor
+                    processing_result = self.edge_processor.process_sensor_readings(all_readings)
+                    
+                    # 3. AÇÃO baseada na decisão do processador
+                    self._handle_processing_result(processing_result)
+                    
+                    if self.checkpointer:
+                        self.checkpointer.maybe_save(self.edge_processor, now=self.clock.time())
                 
-                # 3. AÇÃO baseada na decisão do processador
-                self._handle_processing_result(processing_result)
+                if self.readings_mode != 'edge':
+                    # Leituras brutas em lote (processadas no servidor no modo 'raw')
+                    self._pending_cycles.append((cycle_start, all_readings))
+                    if len(self._pending_cycles) >= self.readings_batch_size:
+                        self._flush_readings()
                 
                 self.stats['readings_collected'] += len(all_readings)
             else:
                 print("⚠️ Nenhum dado coletado neste ciclo")
             
+            if self.clock.stepped:
+                self._check_heartbeat()
+            
+            # Fecha o lote de mensagens do publisher se a janela já passou
+            self.publisher.poll()
+            
             # 4. AGUARDA próximo ciclo (intervalo variável)
             sleep_time = random.uniform(self.reading_interval[0], self.reading_interval[1])
             print(f"😴 Aguardando {sleep_time:.1f}s para próximo ciclo...")
-            time.sleep(sleep_time)
+            self.clock.sleep(sleep_time)
         
         print(f"\n🏁 Monitoramento finalizado após {cycle_count} ciclos")
     
@@ -215,22 +288,42 @@ class SmartPulseira:
         buffer_size = result.get('buffer_size', 0)
         print(f"💾 Dados no buffer: {buffer_size} leituras")
     
+    def _flush_readings(self):
+        """Envia o lote de leituras pendente"""
+        if not self._pending_cycles:
+            return
+        if self.publisher.send_readings(self._pending_cycles, processed=self.readings_mode == 'both'):
+            self._pending_cycles = []
+        else:
+            # Mantém o lote para a próxima tentativa (limitado a poucos lotes)
+            self._pending_cycles = self._pending_cycles[-self.readings_batch_size * 10:]
+    
     def _heartbeat_loop(self):
         """Loop de heartbeat em background"""
         while self.running:
-            current_time = time.time()
-            
-            if current_time - self.last_heartbeat >= self.heartbeat_interval:
-                self.publisher.send_heartbeat()
-                self.last_heartbeat = current_time
-            
-            time.sleep(5)  # Verifica heartbeat a cada 5 segundos
+            self._check_heartbeat()
+            # Dorme até o próximo heartbeat (thread daemon, não segura o encerramento)
+            self.clock.sleep(max(0.5, self.last_heartbeat + self.heartbeat_interval - self.clock.time()))
+    
+    def _check_heartbeat(self):
+        """Envia heartbeat se o intervalo já passou"""
+        current_time = self.clock.time()
+        if current_time - self.last_heartbeat >= self.heartbeat_interval:
+            self.publisher.send_heartbeat()
+            self.last_heartbeat = current_time
     
     def stop_monitoring(self):
         """Para o monitoramento e desconecta"""
         print(f"🛑 Parando monitoramento da pulseira {self.patient_id}...")
         self.running = False
         
+        # Envia as leituras que ainda não completaram um lote
+        self._flush_readings()
+        
+        # Grava o estado final do processador
+        if self.checkpointer:
+            self.checkpointer.save(self.edge_processor, now=self.clock.time())
+        
         # Desconecta do MQTT
         self.publisher.disconnect()
         
@@ -240,7 +333,7 @@ class SmartPulseira:
     def _show_final_stats(self):
         """Mostra estatísticas finais da pulseira"""
         if self.stats['uptime_start']:
-            uptime = time.time() - self.stats['uptime_start']
+            uptime = self.clock.time() - self.stats['uptime_start']
         else:
             uptime = 0
         
@@ -267,7 +360,7 @@ class SmartPulseira:
         return {
             'patient_id': self.patient_id,
             'running': self.running,
-            'uptime': time.time() - (self.stats['uptime_start'] or time.time()),
+            'uptime': self.clock.time() - (self.stats['uptime_start'] or self.clock.time()),
             'stats': self.stats.copy(),
             'edge_processor': self.edge_processor.get_status(),
             'publisher': self.publisher.get_connection_status(),
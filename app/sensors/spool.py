@@ -0,0 +1,346 @@
+"""
+Spool em disco das mensagens da pulseira (store-and-forward)
+
+Enquanto a pulseira está sem conexão (ou o publish falha), as mensagens
+vão para arquivos de segmento append-only, um conjunto por prioridade:
+
+    <diretório>/<prioridade>-<sequência>.seg
+
+Cada registro tem cabeçalho fixo (instante, QoS, tamanhos e crc32),
+tópico e payload. Na reconexão o spool é esvaziado em ordem, sempre da
+prioridade mais alta (emergências) para a mais baixa, e um segmento só é
+apagado depois que todas as suas mensagens foram confirmadas pelo broker.
+A posição de leitura do segmento em andamento fica em 'cursor.json', então
+após reiniciar o envio continua de onde parou (no máximo as mensagens do
+último lote são repetidas; o QoS já é "at least once").
+
+Limite de tamanho: para caber uma nova mensagem acima de max_bytes, os
+segmentos mais antigos da prioridade mais baixa são descartados (leituras,
+depois resumos), nunca os de prioridade mais alta que a da mensagem;
+emergências só são descartadas por outras emergências, quando não resta
+mais nada. Se nem assim couber, a mensagem é recusada. Heartbeats não
+entram no spool (um heartbeat atrasado não diz nada sobre a conexão atual).
+"""
+
+import json
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+from typing import Dict, List
+from .clock import SYSTEM_CLOCK
+
+# Ordem de envio (e ordem inversa de descarte)
+SPOOL_PRIORITIES = ('emergency', 'summary', 'readings')
+
+_RECORD = struct.Struct('<dBHII')   # enfileirada em, QoS, tamanho do tópico, tamanho do payload, crc32
+_SEGMENT_NAME = re.compile(r'^(\w+)-(\d+)\.seg$')
+_CURSOR_FILE = 'cursor.json'
+
+
+class SpooledMessage:
+    """Mensagem guardada no spool (segment/end identificam a posição para o ack)"""
+
+    __slots__ = ('topic', 'payload', 'qos', 'queued_at', 'priority', 'segment', 'end')
+
+    def __init__(self, topic: str, payload: bytes, qos: int, queued_at: float,
+                 priority: str, segment: str, end: int):
+        self.topic = topic
+        self.payload = payload
+        self.qos = qos
+        self.queued_at = queued_at
+        self.priority = priority
+        self.segment = segment
+        self.end = end
+
+
+class _Segment:
+    __slots__ = ('name', 'priority', 'seq', 'size', 'count', 'read_offset', 'read_count')
+
+    def __init__(self, name: str, priority: str, seq: int):
+        self.name = name
+        self.priority = priority
+        self.seq = seq
+        self.size = 0          # Bytes de registros completos
+        self.count = 0         # Registros completos
+        self.read_offset = 0   # Posição confirmada (ack)
+        self.read_count = 0
+
+
+class MessageSpool:
+    """
+    Fila persistente por prioridade em segmentos append-only (segura entre threads)
+
+    Args:
+        directory: Diretório do spool (um por pulseira)
+        max_bytes: Tamanho máximo somando todos os segmentos
+        segment_bytes: Tamanho a partir do qual um novo segmento é aberto
+        clock: Relógio do instante de cada mensagem (sensors.clock)
+    """
+
+    def __init__(self, directory: str, max_bytes: int, segment_bytes: int, clock=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.segment_bytes = segment_bytes
+        self.clock = clock or SYSTEM_CLOCK
+        self._lock = threading.RLock()
+        self._segments: Dict[str, List[_Segment]] = {priority: [] for priority in SPOOL_PRIORITIES}
+        self._writers = {}   # {prioridade: arquivo aberto do último segmento}
+        self._next_seq = 0
+        self.stats = {'spooled': 0, 'drained': 0, 'evicted': 0, 'evicted_bytes': 0, 'rejected': 0}
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    # === ESTADO EM DISCO ===
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _load(self):
+        """Reabre os segmentos existentes (registros incompletos no fim são descartados)"""
+        cursor = {}
+        try:
+            with open(self._path(_CURSOR_FILE), 'r', encoding='utf-8') as f:
+                cursor = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+        found = []
+        for name in os.listdir(self.directory):
+            match = _SEGMENT_NAME.match(name)
+            if match and match.group(1) in self._segments:
+                found.append(_Segment(name, match.group(1), int(match.group(2))))
+        for segment in sorted(found, key=lambda s: s.seq):
+            with open(self._path(segment.name), 'rb') as f:
+                for end, _ in _iter_records(f, 0):
+                    segment.size = end
+                    segment.count += 1
+            if os.path.getsize(self._path(segment.name)) != segment.size:
+                with open(self._path(segment.name), 'r+b') as f:
+                    f.truncate(segment.size)
+            offset, count = cursor.get(segment.name, (0, 0))
+            if 0 <= offset <= segment.size:
+                segment.read_offset, segment.read_count = offset, min(count, segment.count)
+            if segment.read_count >= segment.count:
+                os.remove(self._path(segment.name))
+                continue
+            self._segments[segment.priority].append(segment)
+            self._next_seq = max(self._next_seq, segment.seq + 1)
+
+    def _save_cursor(self):
+        cursor = {segments[0].name: [segments[0].read_offset, segments[0].read_count]
+                  for segments in self._segments.values() if segments and segments[0].read_offset}
+        tmp_path = self._path(_CURSOR_FILE + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cursor, f)
+        os.replace(tmp_path, self._path(_CURSOR_FILE))
+
+    # === ESCRITA ===
+
+    def append(self, priority: str, topic: str, payload: bytes, qos: int) -> bool:
+        """
+        Guarda uma mensagem no fim da fila da prioridade
+
+        Returns:
+            False se a mensagem não cabe no spool (nem descartando as mais antigas)
+        """
+        if priority not in self._segments:
+            raise ValueError(f"Prioridade de spool inválida: {priority} (use {', '.join(SPOOL_PRIORITIES)})")
+        if isinstance(payload, str):
+            payload = payload.encode()
+        encoded_topic = topic.encode()
+        record = _RECORD.pack(self.clock.time(), qos, len(encoded_topic), len(payload),
+                              zlib.crc32(payload, zlib.crc32(encoded_topic))) + encoded_topic + payload
+        with self._lock:
+            if not self._make_room(priority, len(record)):
+                self.stats['rejected'] += 1
+                return False
+            segments = self._segments[priority]
+            writer = self._writers.get(priority)
+            if writer is None or segments[-1].size >= self.segment_bytes:
+                self._open_segment(priority)
+                writer = self._writers[priority]
+            writer.write(record)
+            writer.flush()
+            segment = segments[-1]
+            segment.size += len(record)
+            segment.count += 1
+            self.stats['spooled'] += 1
+            return True
+
+    def _open_segment(self, priority: str):
+        self._close_writer(priority)
+        segment = _Segment(f"{priority}-{self._next_seq:08d}.seg", priority, self._next_seq)
+        self._next_seq += 1
+        self._writers[priority] = open(self._path(segment.name), 'ab')
+        self._segments[priority].append(segment)
+
+    def _close_writer(self, priority: str):
+        writer = self._writers.pop(priority, None)
+        if writer is not None:
+            writer.close()
+
+    def _make_room(self, priority: str, size: int) -> bool:
+        """
+        Descarta segmentos inteiros até caber size bytes (prioridade mais baixa e
+        mais antigo primeiro, só das prioridades que não são mais altas que priority)
+
+        Returns:
+            False, sem descartar nada, se nem assim couber
+        """
+        evictable = SPOOL_PRIORITIES[SPOOL_PRIORITIES.index(priority):]
+        kept = sum(s.size - s.read_offset for p in SPOOL_PRIORITIES if p not in evictable
+                   for s in self._segments[p])
+        if kept + size > self.max_bytes:
+            return False
+        while self.size_bytes() + size > self.max_bytes:
+            for victim in reversed(evictable):
+                if self._segments[victim]:
+                    segment = self._segments[victim][0]
+                    self.stats['evicted'] += segment.count - segment.read_count
+                    self.stats['evicted_bytes'] += segment.size - segment.read_offset
+                    self._remove_head(victim)
+                    break
+        return True
+
+    def _remove_head(self, priority: str):
+        segments = self._segments[priority]
+        segment = segments.pop(0)
+        if not segments:
+            self._close_writer(priority)
+        try:
+            os.remove(self._path(segment.name))
+        except OSError:
+            pass
+        self._save_cursor()
+
+    # === LEITURA ===
+
+    def next_batch(self, limit: int) -> List[SpooledMessage]:
+        """
+        Próximas mensagens (até limit) da prioridade mais alta com mensagens pendentes
+
+        As mensagens continuam no spool até ack().
+        """
+        with self._lock:
+            for priority in SPOOL_PRIORITIES:
+                segments = self._segments[priority]
+                if not segments:
+                    continue
+                segment = segments[0]
+                if segment.read_offset >= segment.size:
+                    if len(segments) > 1:
+                        self._remove_head(priority)   # Lido até o fim, mas não é o segmento em escrita
+                    continue
+                batch = []
+                with open(self._path(segment.name), 'rb') as f:
+                    f.seek(segment.read_offset)
+                    for end, (queued_at, qos, topic, payload) in _iter_records(f, segment.read_offset):
+                        if end > segment.size:
+                            break
+                        batch.append(SpooledMessage(topic, payload, qos, queued_at, priority, segment.name, end))
+                        if len(batch) >= limit:
+                            break
+                if batch:
+                    return batch
+            return []
+
+    def ack(self, message: SpooledMessage):
+        """
+        Confirma o envio de message e das anteriores do mesmo segmento
+
+        Cumulativo: confirmar uma mensagem adiante conta como confirmadas
+        todas as que estão antes dela no segmento.
+        """
+        with self._lock:
+            segments = self._segments[message.priority]
+            if not segments or segments[0].name != message.segment or message.end <= segments[0].read_offset:
+                return   # Segmento já descartado ou mensagem já confirmada
+            segment = segments[0]
+            acked = 0
+            with open(self._path(segment.name), 'rb') as f:
+                f.seek(segment.read_offset)
+                for end, _ in _iter_records(f, segment.read_offset):
+                    if end > message.end:
+                        break
+                    acked += 1
+            segment.read_offset = message.end
+            segment.read_count = min(segment.count, segment.read_count + acked)
+            self.stats['drained'] += acked
+            if segment.read_count >= segment.count or segment.read_offset >= segment.size:
+                # Segmento esvaziado (se era o último, a próxima escrita abre outro)
+                self._remove_head(message.priority)
+
+    def commit(self):
+        """Grava a posição de leitura (chamar ao fim de cada lote)"""
+        with self._lock:
+            self._save_cursor()
+
+    # === ESTADO ===
+
+    def pending(self) -> int:
+        """Mensagens aguardando envio"""
+        with self._lock:
+            return sum(s.count - s.read_count for segments in self._segments.values() for s in segments)
+
+    def pending_by_priority(self) -> Dict[str, int]:
+        with self._lock:
+            return {priority: sum(s.count - s.read_count for s in segments)
+                    for priority, segments in self._segments.items()}
+
+    def size_bytes(self) -> int:
+        with self._lock:
+            return sum(s.size - s.read_offset for segments in self._segments.values() for s in segments)
+
+    def close(self):
+        with self._lock:
+            for priority in list(self._writers):
+                self._close_writer(priority)
+            self._save_cursor()
+
+
+def _iter_records(f, offset: int):
+    """(posição final, (instante, QoS, tópico, payload)) de cada registro completo e íntegro"""
+    while True:
+        head = f.read(_RECORD.size)
+        if len(head) < _RECORD.size:
+            return
+        queued_at, qos, topic_size, payload_size, crc = _RECORD.unpack(head)
+        topic = f.read(topic_size)
+        payload = f.read(payload_size)
+        if len(topic) < topic_size or len(payload) < payload_size or zlib.crc32(payload, zlib.crc32(topic)) != crc:
+            return
+        offset += _RECORD.size + topic_size + payload_size
+        yield offset, (queued_at, qos, topic.decode(), payload)
+
+
+class TokenBucket:
+    """
+    Limite de taxa (mensagens por segundo, com rajada)
+
+    Args:
+        rate: Mensagens por segundo
+        burst: Mensagens que podem sair de uma vez
+    """
+
+    def __init__(self, rate: float, burst: int):
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate deve ser positivo e burst pelo menos 1")
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def take(self, wanted: int) -> int:
+        """Espera ter pelo menos um token e consome até wanted; retorna quantos"""
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                granted = min(wanted, int(self.tokens))
+                self.tokens -= granted
+                return granted
+            time.sleep((1 - self.tokens) / self.rate)
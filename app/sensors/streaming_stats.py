@@ -0,0 +1,236 @@
+"""
+Estatísticas em streaming para o processamento de borda
+
+Cada leitura atualiza agregados de tamanho fixo em O(1), sem guardar os
+valores brutos: o resumo é montado direto dos agregados.
+"""
+
+import math
+from collections import deque
+from typing import Dict, List, Sequence
+
+
+class RunningStats:
+    """
+    Agregados de um sensor: contagem, soma, mínimo, máximo, último valor
+    e variância pelo algoritmo de Welford (numericamente estável)
+    """
+    
+    __slots__ = ('count', 'total', 'min', 'max', 'last', 'mean', 'm2')
+    
+    def __init__(self):
+        self.reset()
+    
+    def reset(self):
+        """Zera os agregados (início de um novo período de resumo)"""
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+        self.last = None
+        self.mean = 0.0
+        self.m2 = 0.0
+    
+    def add(self, value):
+        """Atualiza os agregados com uma nova leitura"""
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        self.last = value
+        
+        # Welford: média e soma dos quadrados dos desvios
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+    
+    def to_state(self) -> List:
+        """Agregados como lista (checkpoint)"""
+        return [getattr(self, name) for name in self.__slots__]
+    
+    @classmethod
+    def from_state(cls, state: Sequence) -> 'RunningStats':
+        if len(state) != len(cls.__slots__):
+            raise ValueError(f"RunningStats espera {len(cls.__slots__)} campos")
+        stats = cls.__new__(cls)
+        for name, value in zip(cls.__slots__, state):
+            setattr(stats, name, value)
+        return stats
+    
+    @property
+    def variance(self) -> float:
+        """Variância amostral (0 com menos de 2 leituras)"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+    
+    @property
+    def std(self) -> float:
+        return math.sqrt(self.variance)
+    
+    def to_summary(self, unit: str) -> Dict:
+        """Estatísticas no formato do resumo enviado pela pulseira"""
+        return {
+            'avg': round(self.total / self.count, 2),
+            'min': self.min,
+            'max': self.max,
+            'count': self.count,
+            'last_value': self.last,
+            'std': round(self.std, 2),
+            'unit': unit
+        }
+
+
+# Parâmetros padrão dos detectores de tendência
+TREND_EWMA_ALPHA = 0.01       # Peso da leitura nova na linha de base (~100 leituras de memória)
+TREND_CUSUM_K = 0.5           # Folga do CUSUM (em desvios padrão)
+TREND_CUSUM_H = 5.0           # Limiar de alarme do CUSUM (em desvios padrão)
+TREND_WARMUP = 50             # Leituras antes de ativar o CUSUM (linha de base estável)
+TREND_WINDOW = 30             # Blocos na janela da inclinação
+TREND_BLOCK_SECONDS = 60      # Duração de cada bloco (média por minuto)
+TREND_MIN_BLOCKS = 10         # Blocos mínimos para estimar a inclinação
+
+
+class TrendDetector:
+    """
+    Detectores de tendência de um sensor, com estado de tamanho fixo
+    
+    - EWMA: linha de base e desvio padrão exponenciais
+    - CUSUM bilateral sobre o resíduo padronizado: acusa mudanças
+      persistentes que ficam abaixo dos limiares críticos
+    - Inclinação (unidades/hora) por mínimos quadrados sobre uma janela
+      deslizante de médias por bloco (TREND_WINDOW blocos de TREND_BLOCK_SECONDS)
+    
+    Cada leitura custa O(1); a reta é reajustada (O(janela)) só quando um
+    bloco fecha. 'drift' é a inclinação quando o CUSUM confirmou uma mudança
+    no mesmo sentido durante o período de resumo atual, e 0 caso contrário.
+    
+    Args:
+        min_std: Piso do desvio padrão (resolução do sensor), evita que
+                 leituras constantes gerem resíduos enormes
+    """
+    
+    __slots__ = ('min_std', 'count', 'mean', 'var', 'last_z', 's_hi', 's_lo',
+                 'shift_up', 'shift_down', 'block_start', 'block_sum', 'block_count',
+                 'points', 'slope')
+    
+    def __init__(self, min_std: float = 1.0):
+        self.min_std = float(min_std)
+        self.count = 0
+        self.mean = 0.0
+        self.var = 0.0
+        self.last_z = 0.0
+        self.s_hi = 0.0
+        self.s_lo = 0.0
+        self.shift_up = False
+        self.shift_down = False
+        self.block_start = 0.0
+        self.block_sum = 0.0
+        self.block_count = 0
+        self.points = deque(maxlen=TREND_WINDOW)
+        self.slope = 0.0
+    
+    def add(self, value, timestamp: float):
+        """Atualiza os detectores com uma nova leitura"""
+        # EWMA (resíduo medido contra a linha de base anterior)
+        if self.count == 0:
+            self.mean = float(value)
+            z = 0.0
+        else:
+            std = math.sqrt(self.var)
+            if std < self.min_std:
+                std = self.min_std
+            diff = value - self.mean
+            z = diff / std
+            increment = TREND_EWMA_ALPHA * diff
+            self.mean = self.mean + increment
+            self.var = (1 - TREND_EWMA_ALPHA) * (self.var + diff * increment)
+        self.count += 1
+        self.last_z = z
+        
+        # CUSUM bilateral
+        if self.count > TREND_WARMUP:
+            self.s_hi = max(0.0, self.s_hi + z - TREND_CUSUM_K)
+            self.s_lo = max(0.0, self.s_lo - z - TREND_CUSUM_K)
+            if self.s_hi > TREND_CUSUM_H:
+                self.shift_up = True
+                self.s_hi = self.s_lo = 0.0
+            elif self.s_lo > TREND_CUSUM_H:
+                self.shift_down = True
+                self.s_hi = self.s_lo = 0.0
+        
+        # Médias por bloco para a inclinação
+        if self.block_count and timestamp - self.block_start >= TREND_BLOCK_SECONDS:
+            self.points.append((self.block_start, self.block_sum / self.block_count))
+            self.block_sum = 0.0
+            self.block_count = 0
+            self.slope = self._fit_slope()
+        if not self.block_count:
+            self.block_start = timestamp
+        self.block_sum += value
+        self.block_count += 1
+    
+    def _fit_slope(self) -> float:
+        """Inclinação por mínimos quadrados (unidades/hora) dos blocos na janela"""
+        n = len(self.points)
+        if n < TREND_MIN_BLOCKS:
+            return 0.0
+        origin = self.points[0][0]
+        sum_x = sum_y = 0.0
+        for t, y in self.points:
+            sum_x += (t - origin) / 3600
+            sum_y += y
+        mean_x = sum_x / n
+        mean_y = sum_y / n
+        sxx = sxy = 0.0
+        for t, y in self.points:
+            dx = (t - origin) / 3600 - mean_x
+            sxx += dx * dx
+            sxy += dx * (y - mean_y)
+        return sxy / sxx if sxx > 0 else 0.0
+    
+    @property
+    def drift(self) -> float:
+        """Inclinação confirmada pelo CUSUM no período (0 se não houve mudança)"""
+        if (self.slope < 0 and self.shift_down) or (self.slope > 0 and self.shift_up):
+            return self.slope
+        return 0.0
+    
+    def to_state(self) -> List:
+        """Estado dos detectores como lista (checkpoint)"""
+        return [list(map(list, value)) if name == 'points' else value
+                for name, value in ((name, getattr(self, name)) for name in self.__slots__)]
+    
+    @classmethod
+    def from_state(cls, state: Sequence) -> 'TrendDetector':
+        if len(state) != len(cls.__slots__):
+            raise ValueError(f"TrendDetector espera {len(cls.__slots__)} campos")
+        detector = cls.__new__(cls)
+        for name, value in zip(cls.__slots__, state):
+            if name == 'points':
+                value = deque(map(tuple, value), maxlen=TREND_WINDOW)
+            setattr(detector, name, value)
+        return detector
+    
+    def reset_period(self):
+        """Início de um novo período de resumo (a linha de base é mantida)"""
+        self.shift_up = False
+        self.shift_down = False
+    
+    def to_summary(self) -> Dict:
+        """Campos de tendência incluídos nas estatísticas do resumo"""
+        return {
+            'baseline': round(self.mean, 2),
+            'slope': round(self.slope, 2),
+            'drift': round(self.drift, 2)
+        }
+    
+    def context(self) -> Dict:
+        """Estado atual para o contexto de uma emergência"""
+        drift = self.drift
+        return {
+            'baseline': round(self.mean, 2),
+            'deviation': round(self.last_z, 2),
+            'slope': round(self.slope, 2),
+            'direction': 'subindo' if drift > 0 else 'descendo' if drift < 0 else 'estável'
+        }
@@ -2,8 +2,10 @@ import random
 from .base_sensor import BaseSensor
 
 class StressSensor(BaseSensor):
-    def __init__(self, patient_id, status='stable'):
-        super().__init__(patient_id, "stress_level")
+    unit = "%"
+    
+    def __init__(self, patient_id, status='stable', clock=None):
+        super().__init__(patient_id, "stress_level", clock)
         if status == 'stable':
             # Nível de estresse inicial estável (5-30)
             self.current_stress = random.randint(0, 60)
@@ -18,7 +20,7 @@ class StressSensor(BaseSensor):
             self.current_stress = 40
 
     
-    def generate_data(self):
+    def read_value(self):
         """Gera dados de nível de estresse (0-100)"""
         
         variation = random.randint(-3, 3)
@@ -27,7 +29,4 @@ class StressSensor(BaseSensor):
         self.current_stress = max(0, min(100, self.current_stress))
         stress = self.current_stress
             
-        return {
-            "value": stress,
-            "unit": "%",
-        }
+        return stress
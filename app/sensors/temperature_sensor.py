@@ -2,8 +2,10 @@ import random
 from .base_sensor import BaseSensor
 
 class TemperatureSensor(BaseSensor):
-    def __init__(self, patient_id, status='stable'):
-        super().__init__(patient_id, "temperature")
+    unit = "°C"
+    
+    def __init__(self, patient_id, status='stable', clock=None):
+        super().__init__(patient_id, "temperature", clock)
         if status == 'stable':
             # Temperatura corporal inicial estável (36.0-37.0°C)
             self.current_temperature = round(random.uniform(36.0, 37.0), 1)
@@ -17,7 +19,7 @@ class TemperatureSensor(BaseSensor):
             # Valor padrão se o status não for reconhecido
             self.current_temperature = 36.5
     
-    def generate_data(self):
+    def read_value(self):
         """Gera dados de temperatura corporal (35.5-38.5°C)"""
         # Variação natural com chance de febre
         
@@ -29,7 +31,4 @@ class TemperatureSensor(BaseSensor):
         # Arredonda para 1 casa decimal para evitar problemas de precisão float
         temperature = round(self.current_temperature, 1)
 
-        return {
-            "value": temperature,
-            "unit": "°C",
-        }
\ No newline at end of file
+        return temperature
\ No newline at end of file
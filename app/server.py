@@ -1,17 +1,36 @@
-from fastapi import FastAPI, BackgroundTasks
+from fastapi import FastAPI, BackgroundTasks, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from subscriber.subscriber import ElderCareSubscriber
-from database.crud import get_patient, get_all_messages, get_patient_messages, get_all_patients
-from fastapi.responses import JSONResponse
-from typing import List
+from database.crud import (
+    get_patient, get_patient_messages, get_all_patients, get_changes_since,
+    get_message_rows, iter_patient_message_rows, get_sensor_series, iter_sensor_sketches,
+    get_device_presence, get_service_status
+)
+from database.database import create_database
+from database.serializers import encode_message_rows, encode_projected_rows, iter_ndjson, parse_fields
+from middleware import CompressionMiddleware
+from config.settings import (
+    COMPRESSION_MINIMUM_SIZE, GZIP_LEVEL, BROTLI_QUALITY,
+    SENSOR_UNITS, SERIES_MAX_POINTS,
+    HEARTBEAT_TIMEOUT, SUBSCRIBER_STATUS_INTERVAL, EMBEDDED_SUBSCRIBER
+)
+from analytics import parse_bucket, choose_bucket, lttb_indices, KllSketch
+from rules import get_rule_engine
+from datetime import datetime, timedelta
+from fastapi.responses import JSONResponse, StreamingResponse
+from typing import List, Optional, Tuple
 from database.schemas import HealthMessageSchema
 import json
 from fastapi import Response
 from fastapi.encoders import jsonable_encoder
 import threading
+import time
 
 app = FastAPI(title="ElderCare IoT Monitor API", version="1.0.0")
 
+# Garante que as tabelas existem (inclui o log de alterações)
+create_database()
+
 # Configuração CORS
 app.add_middleware(
     CORSMiddleware,
@@ -21,6 +40,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compressão gzip/brotli das respostas acima do tamanho mínimo
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=COMPRESSION_MINIMUM_SIZE,
+    gzip_level=GZIP_LEVEL,
+    brotli_quality=BROTLI_QUALITY,
+)
+
 subscriber_instance = None
 subscriber_thread = None
 
@@ -29,15 +56,33 @@ def run_subscriber():
     subscriber_instance = ElderCareSubscriber()
     subscriber_instance.start_listening()
 
+def _subscriber_service_status():
+    """
+    Retorna o status publicado pelo subscriber (em qualquer processo)
+    ou None se ele não está rodando
+    """
+    status = get_service_status("subscriber")
+    if status is None:
+        return None
+    try:
+        data = json.loads(status.data)
+    except json.JSONDecodeError:
+        data = {}
+    # Sem sinal de vida recente (3 ciclos) ou finalizado = parado
+    if not data.get("running") or time.time() - status.last_seen > 3 * SUBSCRIBER_STATUS_INTERVAL:
+        return None
+    return data
+
 @app.post("/start_subscriber")
 def start_subscriber():
     global subscriber_thread
-    if subscriber_thread is None or not subscriber_thread.is_alive():
-        subscriber_thread = threading.Thread(target=run_subscriber, daemon=True)
-        subscriber_thread.start()
-        return {"status": "Subscriber iniciado em background (thread)"}
-    else:
+    if _subscriber_service_status() is not None or (subscriber_thread is not None and subscriber_thread.is_alive()):
         return {"status": "Subscriber já está rodando"}
+    if not EMBEDDED_SUBSCRIBER:
+        return {"status": "Subscriber roda como serviço separado (python -m subscriber) e não está ativo"}
+    subscriber_thread = threading.Thread(target=run_subscriber, daemon=True)
+    subscriber_thread.start()
+    return {"status": "Subscriber iniciado em background (thread)"}
 
 @app.get("/paciente/{patient_id}")
 def read_patient(patient_id: str):
@@ -46,47 +91,42 @@ def read_patient(patient_id: str):
         return patient
     return {"error": "Paciente não encontrado"}
 
+# As rotas de mensagens devolvem Response direto: o campo `data` já é JSON
+# válido no banco e é copiado sem json.loads nem nova validação pelo
+# Pydantic (response_model fica apenas para a documentação OpenAPI).
+#
+# `fields` projeta apenas os campos pedidos, com a seleção feita no SQL
+# (ex: ?fields=id,timestamp,message_type,data.health_status).
+def _messages_response(patient_id: Optional[str], fields: Optional[str]) -> Response:
+    if fields:
+        try:
+            field_list = parse_fields(fields)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        rows = get_message_rows(patient_id, fields=field_list)
+        content = encode_projected_rows(rows, field_list)
+    else:
+        content = encode_message_rows(get_message_rows(patient_id))
+    return Response(content=content, media_type="application/json")
+
 @app.get("/status", response_model=List[HealthMessageSchema])
-def get_status():
-    messages = get_all_messages()
-    result = []
-    for m in messages:
-        data = m.data
-        if isinstance(data, str):
-            try:
-                data = json.loads(data)
-            except Exception:
-                data = {}
-        result.append({
-            "id": m.id,
-            "patient_id": m.patient_id,
-            "message_type": m.message_type,
-            "timestamp": m.timestamp,
-            "data": data
-        })
-    return result
+def get_status(fields: Optional[str] = None):
+    return _messages_response(None, fields)
 
 # pega todas as mensagens do paciente
 @app.get("/messages/{patient_id}", response_model=List[HealthMessageSchema])
-def read_patient_messages(patient_id: str):
-    messages = get_patient_messages(patient_id)
-    result = []
-    for m in messages:
-        # Se m.data for string, converte para dict
-        data = m.data
-        if isinstance(data, str):
-            try:
-                data = json.loads(data)
-            except Exception:
-                data = {}
-        result.append({
-            "id": m.id,
-            "patient_id": m.patient_id,
-            "message_type": m.message_type,
-            "timestamp": m.timestamp,
-            "data": data
-        })
-    return result
+def read_patient_messages(patient_id: str, fields: Optional[str] = None):
+    return _messages_response(patient_id, fields)
+
+# exporta o histórico completo do paciente em NDJSON (memória constante)
+@app.get("/messages/{patient_id}/export")
+def export_patient_messages(patient_id: str, message_type: Optional[str] = None):
+    rows = iter_patient_message_rows(patient_id, message_type)
+    return StreamingResponse(
+        iter_ndjson(rows),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{patient_id}_messages.ndjson"'}
+    )
 
 @app.get("/latest_message_per_patient", response_model=List[HealthMessageSchema])
 def latest_message_per_patient():
@@ -112,31 +152,49 @@ def latest_message_per_patient():
             })
     return result
 
+@app.get("/subscriber_status")
+def get_subscriber_status():
+    """Estatísticas publicadas pelo subscriber (serviço separado ou embutido)"""
+    service = _subscriber_service_status()
+    if service is None:
+        return {"running": False}
+    return service
+
+@app.get("/rules")
+def get_alert_rules():
+    """Regras de alerta em vigor (recarregadas automaticamente quando o arquivo muda)"""
+    rule_engine = get_rule_engine()
+    rule_engine.maybe_reload()
+    return rule_engine.describe()
+
 @app.get("/patients_status")
 def get_patients_status():
     """
     Retorna o status online/offline de todos os pacientes
+
+    Lido do estado compartilhado publicado pelo subscriber (device_presence),
+    então funciona em qualquer worker da API.
     """
-    global subscriber_instance
-    
-    if subscriber_instance is None:
+    service = _subscriber_service_status()
+    if service is None:
         return {"error": "Subscriber não está rodando. Inicie o subscriber primeiro."}
     
-    import time
     current_time = time.time()
-    timeout = getattr(subscriber_instance, 'heartbeat_timeout', 30)  # 30s default
+    timeout = service.get('heartbeat_timeout', HEARTBEAT_TIMEOUT)
     
     patients_status = {}
     
     # Verifica status de todos os pacientes que já enviaram heartbeat
-    for patient_id, last_heartbeat in subscriber_instance.online_patients.items():
-        time_since_last = current_time - last_heartbeat
-        is_online = time_since_last <= timeout
+    for presence in get_device_presence():
+        if presence.last_heartbeat is None:
+            continue
+        time_since_last = current_time - presence.last_heartbeat
+        is_online = presence.status == "ONLINE" and time_since_last <= timeout
         
-        patients_status[patient_id] = {
-            "patient_id": patient_id,
+        patients_status[presence.patient_id] = {
+            "patient_id": presence.patient_id,
             "is_online": is_online,
-            "last_heartbeat": last_heartbeat,
+            "last_heartbeat": presence.last_heartbeat,
             "time_since_last": int(time_since_last),
             "status": "ONLINE" if is_online else "OFFLINE"
         }
@@ -160,3 +218,183 @@ def get_patients_status():
         "offline_count": len([p for p in patients_status.values() if not p["is_online"]])
     }
 
+@app.get("/changes")
+def get_changes(since: int = 0, limit: int = 500):
+    """
+    Retorna as alterações (novas mensagens, mudanças de estado e de
+    conectividade) ocorridas depois do cursor `since`.
+    
+    O cliente guarda o `cursor` retornado e o envia na próxima chamada.
+    Se o cursor expirou (log compactado), responde 410 com
+    `resync_required`: o cliente deve recarregar a lista completa e
+    continuar a partir do `cursor` informado.
+    """
+    limit = max(1, min(limit, 5000))
+    result = get_changes_since(since, limit)
+    if result["resync_required"]:
+        return JSONResponse(status_code=410, content=result)
+    return result
+
+def _local_naive(value: datetime) -> datetime:
+    """Converte para hora local sem fuso (convenção dos timestamps gravados)"""
+    if value.tzinfo is not None:
+        return value.astimezone().replace(tzinfo=None)
+    return value
+
+def _parse_range(start: Optional[datetime], end: Optional[datetime]) -> Tuple[datetime, datetime]:
+    """
+    Normaliza o período `from`/`to` (padrão: últimas 24h) para hora local
+    sem fuso, como os timestamps no banco; datas com fuso são convertidas.
+    Período vazio ou invertido -> 422.
+    """
+    end = _local_naive(end) if end else datetime.now()
+    start = _local_naive(start) if start else end - timedelta(hours=24)
+    if start >= end:
+        raise HTTPException(status_code=422, detail="Período inválido: 'from' deve ser anterior a 'to'")
+    return start, end
+
+@app.get("/patients/{patient_id}/series")
+def get_patient_series(
+    patient_id: str,
+    sensor: str,
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    bucket: Optional[str] = None,
+    downsample: Optional[str] = None,
+    max_points: int = SERIES_MAX_POINTS,
+):
+    """
+    Série temporal de um sensor agregada em intervalos (avg/min/max/count),
+    calculada no SQL a partir das estatísticas dos resumos.
+    
+    - `from`/`to`: período (padrão: últimas 24h)
+    - `bucket`: tamanho do intervalo (ex: 5m, 1h); sem ele, é escolhido
+      automaticamente para caber em `max_points`
+    - `downsample=lttb`: reduz a série para `max_points` preservando o
+      formato da curva (LTTB); sem ele, séries maiores que `max_points` são recusadas
+    """
+    if sensor not in SENSOR_UNITS:
+        raise HTTPException(status_code=400, detail=f"Sensor inválido: {sensor}")
+    if downsample not in (None, "lttb"):
+        raise HTTPException(status_code=400, detail=f"Downsampling inválido: {downsample}")
+    max_points = max(3, min(max_points, SERIES_MAX_POINTS))
+    start, end = _parse_range(start, end)
+    range_seconds = (end - start).total_seconds()
+    
+    try:
+        bucket_seconds = parse_bucket(bucket) if bucket else choose_bucket(range_seconds, max_points)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    if downsample is None and range_seconds / bucket_seconds > max_points:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Período gera mais de {max_points} pontos: use um bucket maior ou downsample=lttb"
+        )
+    
+    rows = get_sensor_series(patient_id, sensor, start.isoformat(), end.isoformat(), bucket_seconds)
+    total_buckets = len(rows)
+    if downsample == "lttb" and total_buckets > max_points:
+        indices = lttb_indices([r.bucket for r in rows], [r.avg for r in rows], max_points)
+        rows = [rows[i] for i in indices]
+    
+    # timestamp é gravado sem fuso; o bucket usa a mesma convenção (epoch ingênuo)
+    epoch = datetime(1970, 1, 1)
+    points = [{
+        "t": (epoch + timedelta(seconds=r.bucket * bucket_seconds)).isoformat(),
+        "avg": round(r.avg, 2),
+        "min": r.min,
+        "max": r.max,
+        "count": r.count
+    } for r in rows]
+    
+    return {
+        "patient_id": patient_id,
+        "sensor": sensor,
+        "unit": SENSOR_UNITS[sensor],
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "bucket_seconds": bucket_seconds,
+        "downsample": downsample,
+        "total_buckets": total_buckets,
+        "points": points
+    }
+
+def _parse_quantiles(q: str) -> List[float]:
+    """Converte "0.05,0.5,0.95" em lista de quantis"""
+    try:
+        values = [float(part) for part in q.split(",") if part.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Quantis inválidos: {q}")
+    if not values or len(values) > 20 or any(not 0 <= v <= 1 for v in values):
+        raise HTTPException(status_code=400, detail="Informe de 1 a 20 quantis entre 0 e 1")
+    return values
+
+@app.get("/patients/{patient_id}/percentiles")
+def get_patient_percentiles(
+    patient_id: str,
+    sensor: str,
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    bucket: Optional[str] = None,
+    q: str = "0.05,0.5,0.95",
+):
+    """
+    Percentis de um sensor por intervalo (ex: hora/dia) e no período todo,
+    obtidos mesclando os sketches KLL enviados nos resumos (sem leituras brutas).
+    
+    - `from`/`to`: período (padrão: últimas 24h)
+    - `bucket`: tamanho do intervalo (ex: 1h, 1d); sem ele, é escolhido
+      automaticamente para caber em SERIES_MAX_POINTS
+    - `q`: quantis separados por vírgula (padrão: 0.05,0.5,0.95)
+    """
+    if sensor not in SENSOR_UNITS:
+        raise HTTPException(status_code=400, detail=f"Sensor inválido: {sensor}")
+    quantiles = _parse_quantiles(q)
+    names = [f"p{v * 100:g}" for v in quantiles]
+    start, end = _parse_range(start, end)
+    range_seconds = (end - start).total_seconds()
+    
+    try:
+        bucket_seconds = parse_bucket(bucket) if bucket else choose_bucket(range_seconds, SERIES_MAX_POINTS)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if range_seconds / bucket_seconds > SERIES_MAX_POINTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Período gera mais de {SERIES_MAX_POINTS} pontos: use um bucket maior"
+        )
+    
+    # Mescla os sketches de cada intervalo (as linhas chegam ordenadas por bucket)
+    buckets = []
+    for row in iter_sensor_sketches(patient_id, sensor, start.isoformat(), end.isoformat(), bucket_seconds):
+        try:
+            sketch = KllSketch.from_pairs(json.loads(row.sketch))
+        except ValueError:
+            continue
+        if buckets and buckets[-1][0] == row.bucket:
+            buckets[-1][1].merge(sketch)
+        else:
+            buckets.append((row.bucket, sketch))
+    
+    overall = KllSketch()
+    epoch = datetime(1970, 1, 1)
+    points = []
+    for bucket_index, sketch in buckets:
+        overall.merge(sketch)
+        points.append({
+            "t": (epoch + timedelta(seconds=bucket_index * bucket_seconds)).isoformat(),
+            "count": sketch.n,
+            **dict(zip(names, sketch.quantiles(quantiles)))
+        })
+    
+    return {
+        "patient_id": patient_id,
+        "sensor": sensor,
+        "unit": SENSOR_UNITS[sensor],
+        "from": start.isoformat(),
+        "to": end.isoformat(),
+        "bucket_seconds": bucket_seconds,
+        "overall": {"count": overall.n, **dict(zip(names, overall.quantiles(quantiles)))},
+        "points": points
+    }
@@ -0,0 +1,20 @@
+"""
+Simulador de frota de pulseiras para testes de carga.
+
+- connections.py: Pool de conexões MQTT compartilhadas (DeviceClient por pulseira)
+- fleet.py: Pulseiras virtuais em um único event loop asyncio
+- runner.py: Frota dividida em processos, com estatísticas agregadas
+- config.py: Opções do simulador (padrões, arquivo JSON e linha de comando)
+
+Uso (a partir da pasta app):
+    python -m simulator --devices 10000 --connections 8 --duration 600
+    python -m simulator --devices 40000 --processes 4 --config frota.json
+"""
+
+from .connections import MqttConnection, MqttConnectionPool, DeviceClient
+from .fleet import VirtualPulseira, FleetSimulator
+from .runner import FleetRunner, aggregate_statistics
+from .config import load_fleet_config, load_config
+
+__all__ = ["MqttConnection", "MqttConnectionPool", "DeviceClient", "VirtualPulseira", "FleetSimulator",
+           "FleetRunner", "aggregate_statistics", "load_fleet_config", "load_config"]
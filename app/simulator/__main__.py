@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Simulador de frota (processos x event loops x conexões compartilhadas)
+
+Uso (a partir da pasta app):
+    python -m simulator --devices 10000 --connections 8 --duration 600
+    python -m simulator --devices 40000 --processes 4 --dry-run   # sem broker
+    python -m simulator --config frota.json                        # opções em JSON
+"""
+
+import argparse
+import time
+from sensors.smart_pulseira import READINGS_MODES
+from protocol import WIRE_FORMATS
+from .config import load_fleet_config, FALL_CHANCES
+from .runner import FleetRunner
+
+def _parse_args():
+    # Sem defaults aqui: o que não vier na linha de comando sai do arquivo ou de FLEET_DEFAULTS
+    parser = argparse.ArgumentParser(description="Simulador de frota de pulseiras")
+    parser.add_argument("--config", help="Arquivo JSON com as opções abaixo")
+    parser.add_argument("--devices", type=int)
+    parser.add_argument("--processes", type=int, help="Processos (divide as pulseiras)")
+    parser.add_argument("--connections", type=int, help="Conexões MQTT por processo")
+    parser.add_argument("--duration", type=float, help="Segundos de simulação")
+    parser.add_argument("--broker")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--first-index", dest="first_index", type=int, help="Índice do primeiro paciente (PAT00000...)")
+    parser.add_argument("--alert-share", dest="alert_share", type=float)
+    parser.add_argument("--critical-share", dest="critical_share", type=float)
+    parser.add_argument("--fall-chance", dest="fall_chance", choices=FALL_CHANCES)
+    parser.add_argument("--readings-mode", dest="readings_mode", choices=READINGS_MODES)
+    parser.add_argument("--adaptive", action=argparse.BooleanOptionalAction)
+    parser.add_argument("--delta", action=argparse.BooleanOptionalAction)
+    parser.add_argument("--wire-format", dest="wire_format", choices=WIRE_FORMATS, help="Formato das mensagens")
+    parser.add_argument("--report-interval", dest="report_interval", type=float)
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--dry-run", dest="dry_run", action=argparse.BooleanOptionalAction, help="Não conecta ao broker")
+    parser.add_argument("--record", help="Grava o tráfego publicado (python -m traffic replay)")
+    args = vars(parser.parse_args())
+    return args.pop("config"), args
+
+def main():
+    config_path, overrides = _parse_args()
+    try:
+        config = load_fleet_config(config_path, overrides)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
+
+    print(f"🔧 Frota: {config['devices']} pulseiras em {config['processes']} processo(s), "
+          f"{config['connections']} conexões MQTT por processo ({'dry-run' if config['dry_run'] else config['broker']})")
+    wall_start = time.time()
+    stats = FleetRunner(config).run()
+    if stats is None:
+        print("❌ Nenhum processo da frota rodou.")
+        return
+
+    elapsed = time.time() - wall_start
+    print(f"\n📊 === ESTATÍSTICAS FINAIS DA FROTA ({stats['processes']} processo(s), {elapsed:.0f}s) ===")
+    print(f"📱 Pulseiras: {stats['devices']} | ciclos: {stats['cycles']}")
+    print(f"📡 Leituras coletadas: {stats['readings_collected']}")
+    print(f"🚨 Emergências enviadas: {stats['emergencies_detected']}")
+    print(f"📋 Resumos enviados: {stats['summaries_sent']}")
+    print(f"💓 Heartbeats enviados: {stats['heartbeats_sent']}")
+    print(f"❌ Falhas de envio: {stats['failed_sends']}")
+    print(f"📤 MQTT: {stats['mqtt']['published']} mensagens, {stats['mqtt']['bytes'] / 2**20:.1f} MiB")
+    print(f"⏱️  Pior atraso p99 do event loop: {stats['loop_lag_p99_ms']:.1f} ms")
+
+if __name__ == "__main__":
+    main()
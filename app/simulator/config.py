@@ -0,0 +1,95 @@
+"""
+Configuração do simulador de frota
+
+Os valores vêm, em ordem de prioridade, das opções da linha de comando,
+do arquivo JSON (--config) e dos padrões abaixo. Exemplo de arquivo:
+
+    {"devices": 40000, "processes": 4, "connections": 8, "duration": 1800,
+     "critical_share": 0.05, "readings_mode": "both", "wire_format": "compact"}
+"""
+
+import json
+from typing import Dict, Optional
+from config.settings import (
+    MQTT_BROKER, MQTT_PORT, ADAPTIVE_REPORTING, DELTA_ENCODING, READINGS_MODE, WIRE_FORMAT
+)
+from protocol import WIRE_FORMATS
+from sensors.smart_pulseira import READINGS_MODES
+
+FLEET_DEFAULTS = {
+    'devices': 1000,
+    'processes': 1,            # Processos (cada um com seu event loop e suas conexões)
+    'connections': 4,          # Conexões MQTT por processo
+    'duration': 300,
+    'broker': MQTT_BROKER,
+    'port': MQTT_PORT,
+    'first_index': 0,          # Índice do primeiro paciente (PAT00000...)
+    'alert_share': 0.1,
+    'critical_share': 0.02,
+    'fall_chance': 'low',
+    'readings_mode': READINGS_MODE,
+    'adaptive': ADAPTIVE_REPORTING,
+    'delta': DELTA_ENCODING,
+    'wire_format': WIRE_FORMAT,   # 'json' ou 'compact' (protocol.compact)
+    'report_interval': 10,
+    'seed': None,
+    'dry_run': False,
+    'record': None,            # Arquivo de gravação do tráfego (um por processo: <arquivo>.<n>)
+}
+
+SENSOR_STATUSES = ('stable', 'alert', 'critical')
+FALL_CHANCES = ('low', 'medium', 'high')
+
+
+def load_fleet_config(path: Optional[str] = None, overrides: Optional[Dict] = None) -> Dict:
+    """
+    Monta a configuração: padrões <- arquivo JSON <- overrides (valores None são ignorados)
+
+    Raises:
+        ValueError: Se o arquivo ou algum valor for inválido
+    """
+    config = load_config(FLEET_DEFAULTS, path, overrides)
+    _validate(config)
+    return config
+
+
+def load_config(defaults: Dict, path: Optional[str] = None, overrides: Optional[Dict] = None) -> Dict:
+    """
+    Padrões <- arquivo JSON <- overrides, sem validar os valores (também usado pelo pulseira.py)
+
+    Raises:
+        ValueError: Se o arquivo for inválido ou tiver chaves fora de defaults
+    """
+    config = dict(defaults)
+    if path:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                file_config = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise ValueError(f"Arquivo de configuração inválido ({path}): {e}")
+        if not isinstance(file_config, dict):
+            raise ValueError(f"Arquivo de configuração inválido ({path}): esperado um objeto JSON")
+        unknown = set(file_config) - set(defaults)
+        if unknown:
+            raise ValueError(f"Opções desconhecidas em {path}: {', '.join(sorted(unknown))}")
+        config.update(file_config)
+    config.update({k: v for k, v in (overrides or {}).items() if v is not None})
+    return config
+
+
+def _validate(config: Dict):
+    for key in ('devices', 'processes', 'connections'):
+        if not isinstance(config[key], int) or config[key] < 1:
+            raise ValueError(f"'{key}' deve ser um inteiro positivo")
+    if config['devices'] < config['processes']:
+        raise ValueError("'devices' deve ser pelo menos igual a 'processes'")
+    if config['duration'] <= 0 or config['report_interval'] <= 0:
+        raise ValueError("'duration' e 'report_interval' devem ser positivos")
+    if not 0 <= config['alert_share'] + config['critical_share'] <= 1:
+        raise ValueError("'alert_share' + 'critical_share' deve estar entre 0 e 1")
+    if config['fall_chance'] not in FALL_CHANCES:
+        raise ValueError(f"'fall_chance' deve ser um de: {', '.join(FALL_CHANCES)}")
+    if config['readings_mode'] not in READINGS_MODES:
+        raise ValueError(f"'readings_mode' deve ser um de: {', '.join(READINGS_MODES)}")
+    if config['wire_format'] not in WIRE_FORMATS:
+        raise ValueError(f"'wire_format' deve ser um de: {', '.join(WIRE_FORMATS)}")
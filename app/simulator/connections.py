@@ -0,0 +1,357 @@
+"""
+Conexões MQTT compartilhadas pelas pulseiras virtuais
+
+Em vez de um cliente paho (e uma thread de rede) por pulseira, o simulador
+abre poucas conexões e distribui as pulseiras entre elas (pulseira i usa a
+conexão i % tamanho). publish() do paho é thread-safe e não bloqueia: a
+mensagem entra na fila do cliente e a thread de rede da conexão envia.
+
+Cada pulseira fala com a conexão por um DeviceClient, que imita a parte do
+cliente paho usada pelo PulseiraPublisher (publish, subscribe, callbacks):
+a pulseira virtual é um PulseiraPublisher comum com esse cliente.
+"""
+
+import threading
+import time
+from typing import Callable, Dict, Optional
+import paho.mqtt.client as mqtt
+from paho.mqtt.packettypes import PacketTypes
+from paho.mqtt.reasoncodes import ReasonCode
+from config.settings import MQTT_KEEPALIVE
+
+# Limites da fila do paho por conexão (milhares de pulseiras por conexão)
+MAX_INFLIGHT = 1000
+MAX_QUEUED = 0   # 0 = sem limite
+
+
+class _Delivered:
+    """Resultado de publish no modo dry-run (sempre entregue)"""
+
+    rc = mqtt.MQTT_ERR_SUCCESS
+
+    def __init__(self, mid: int):
+        self.mid = mid
+
+    @staticmethod
+    def is_published() -> bool:
+        return True
+
+    @staticmethod
+    def wait_for_publish(timeout: Optional[float] = None) -> bool:
+        return True
+
+
+# Códigos repassados a quem entra com a conexão já no ar e às confirmações do dry-run
+_CONNACK_SUCCESS = ReasonCode(PacketTypes.CONNACK, "Success")
+_PUBACK_SUCCESS = ReasonCode(PacketTypes.PUBACK, "Success")
+
+
+class _Rejected:
+    """Resultado de publish recusado (sem conexão ou fila cheia)"""
+
+    rc = mqtt.MQTT_ERR_NO_CONN
+    mid = 0
+
+    @staticmethod
+    def is_published() -> bool:
+        return False
+
+    @staticmethod
+    def wait_for_publish(timeout: Optional[float] = None) -> bool:
+        return False
+
+
+class MqttConnection:
+    """
+    Uma conexão MQTT compartilhada
+
+    Args:
+        client_id: Identificador do cliente no broker
+        broker, port: Endereço do broker
+        dry_run: Não conecta; as mensagens são só contadas
+        recorder: Grava as mensagens aceitas (traffic.TrafficRecorder)
+        keepalive, protocol, max_inflight: Repassados ao cliente paho
+
+    Quem usa a conexão se registra com attach(cliente): o cliente recebe
+    on_connect/on_disconnect (assinatura da Callback API v2 do paho, com
+    ele mesmo no lugar do cliente paho). publish() aceita on_publish, chamado
+    uma vez com (mid, reason_code, properties) quando o broker confirma.
+    """
+
+    def __init__(self, client_id: str, broker: str, port: int, dry_run: bool = False, recorder=None,
+                 keepalive: int = MQTT_KEEPALIVE, protocol: int = mqtt.MQTTv311, max_inflight: int = MAX_INFLIGHT):
+        self.client_id = client_id
+        self.recorder = recorder
+        self.broker = broker
+        self.port = port
+        self.dry_run = dry_run
+        self.keepalive = keepalive
+        self.is_connected = dry_run
+        self.client = None
+        self.stats = {'published': 0, 'bytes': 0, 'failed': 0, 'connects': 0, 'disconnects': 0}
+        self.clients = []
+        self._lock = threading.Lock()
+        self._subscriptions = {}   # {tópico: {cliente: QoS}}
+        self._callbacks = {}       # {mid: (on_publish, QoS)} aguardando confirmação
+        self._early = {}           # {mid: (reason_code, properties)} confirmados antes de registrados
+        self._mid = 0              # mids do dry-run
+
+        if not dry_run:
+            self.client = mqtt.Client(
+                callback_api_version=mqtt.CallbackAPIVersion.VERSION2,
+                client_id=client_id,
+                protocol=protocol
+            )
+            self.client.max_inflight_messages_set(max_inflight)
+            self.client.max_queued_messages_set(MAX_QUEUED)
+            self.client.reconnect_delay_set(1, 60)
+            self.client.on_connect = self._on_connect
+            self.client.on_disconnect = self._on_disconnect
+            self.client.on_publish = self._on_publish
+            self.client.on_message = self._on_message
+
+    def connect(self):
+        """Inicia a conexão (assíncrona; o paho reconecta sozinho)"""
+        if self.client is None:
+            return
+        self.client.connect_async(self.broker, self.port, self.keepalive)
+        self.client.loop_start()
+
+    def will_set(self, topic: str, payload: bytes, qos: int = 1, retain: bool = True):
+        """Last Will da conexão (o broker só o recebe na próxima conexão)"""
+        if self.client is not None:
+            self.client.will_set(topic, payload, qos=qos, retain=retain)
+
+    def close(self):
+        if self.client is None:
+            return
+        self.client.disconnect()
+        self.client.loop_stop()
+        self.is_connected = False
+
+    def attach(self, client):
+        """Registra um cliente (recebe on_connect na hora, se já conectada)"""
+        with self._lock:
+            if client not in self.clients:
+                self.clients.append(client)
+            connected = self.is_connected
+        if connected and client.on_connect is not None:
+            client.on_connect(client, None, None, _CONNACK_SUCCESS, None)
+
+    def detach(self, client):
+        with self._lock:
+            if client in self.clients:
+                self.clients.remove(client)
+            for subscribers in self._subscriptions.values():
+                subscribers.pop(client, None)
+
+    def subscribe(self, client, topic: str, qos: int = 0):
+        """
+        Assina um tópico exato para o cliente (on_message dele); a conexão
+        assina uma vez por tópico e de novo a cada reconexão
+        """
+        with self._lock:
+            subscribers = self._subscriptions.setdefault(topic, {})
+            first = not subscribers or qos > max(subscribers.values())
+            subscribers[client] = qos
+        if first and self.client is not None and self.is_connected:
+            self.client.subscribe(topic, qos)
+
+    def publish(self, topic: str, payload: bytes, qos: int, retain: bool = False, properties=None,
+                on_publish: Optional[Callable] = None):
+        """
+        Publica sem bloquear
+
+        Returns:
+            MQTTMessageInfo (ou equivalente) se a mensagem foi aceita, None se falhou
+        """
+        if not self.is_connected:
+            self.stats['failed'] += 1
+            return None
+        if self.dry_run:
+            with self._lock:
+                self._mid = self._mid % 65535 + 1
+                info = _Delivered(self._mid)
+        else:
+            info = self.client.publish(topic, payload, qos=qos, retain=retain, properties=properties)
+            if info.rc != mqtt.MQTT_ERR_SUCCESS:
+                self.stats['failed'] += 1
+                return None
+        self.stats['published'] += 1
+        self.stats['bytes'] += len(payload)
+        if self.recorder is not None:
+            self.recorder.record(topic, payload, qos, retain)
+
+        if self.dry_run:
+            if on_publish is not None:
+                on_publish(info.mid, _PUBACK_SUCCESS, None)
+            return info
+        # A confirmação pode chegar (thread de rede) antes de o mid ser conhecido aqui
+        with self._lock:
+            early = self._early.pop(info.mid, None)
+            if early is None:
+                self._callbacks[info.mid] = (on_publish, qos)
+        if early is not None and on_publish is not None:
+            on_publish(info.mid, *early)
+        return info
+
+    def _on_connect(self, client, userdata, flags, reason_code, properties):
+        if reason_code.is_failure:
+            print(f"❌ Conexão {self.client_id} recusada: {reason_code}")
+            return
+        if self.stats['connects']:
+            print(f"🔄 Conexão {self.client_id} restabelecida")
+        self.stats['connects'] += 1
+        with self._lock:
+            self.is_connected = True
+            clients = list(self.clients)
+            topics = {topic: max(subscribers.values())
+                      for topic, subscribers in self._subscriptions.items() if subscribers}
+        for topic, qos in topics.items():
+            client.subscribe(topic, qos)
+        # Sem as propriedades do CONNACK: alias de tópico é por conexão, e
+        # clientes que dividem a mesma não podem numerar os seus
+        for attached in clients:
+            if attached.on_connect is not None:
+                try:
+                    attached.on_connect(attached, None, flags, reason_code, None)
+                except Exception as e:
+                    print(f"⚠️ Conexão {self.client_id}: erro no on_connect de um cliente: {e}")
+
+    def _on_disconnect(self, client, userdata, disconnect_flags, reason_code, properties):
+        self.stats['disconnects'] += 1
+        with self._lock:
+            self.is_connected = False
+            clients = list(self.clients)
+            # QoS 0 ainda na fila não é reenviado pelo paho: nunca será confirmado
+            self._callbacks = {mid: entry for mid, entry in self._callbacks.items() if entry[1] > 0}
+        if reason_code != 0:
+            print(f"⚠️ Conexão {self.client_id} caiu: {reason_code}")
+        for attached in clients:
+            if attached.on_disconnect is not None:
+                attached.on_disconnect(attached, None, disconnect_flags, reason_code, properties)
+
+    def _on_publish(self, client, userdata, mid, reason_code, properties):
+        with self._lock:
+            entry = self._callbacks.pop(mid, None)
+            if entry is None:
+                self._early[mid] = (reason_code, properties)
+                return
+        callback = entry[0]
+        if callback is not None:
+            callback(mid, reason_code, properties)
+
+    def _on_message(self, client, userdata, msg):
+        with self._lock:
+            subscribers = list(self._subscriptions.get(msg.topic, ()))
+        for subscriber in subscribers:
+            if subscriber.on_message is not None:
+                try:
+                    subscriber.on_message(subscriber, None, msg)
+                except Exception as e:
+                    print(f"⚠️ Conexão {self.client_id}: erro no on_message de um cliente: {e}")
+
+
+class DeviceClient:
+    """
+    Cliente de uma pulseira sobre uma MqttConnection compartilhada
+
+    Implementa a parte do cliente paho que o PulseiraPublisher usa; o Will
+    não existe por pulseira (a conexão é compartilhada) e é ignorado.
+    """
+
+    def __init__(self, connection: MqttConnection):
+        self.connection = connection
+        self.on_connect = None
+        self.on_disconnect = None
+        self.on_publish = None
+        self.on_message = None
+
+    def will_set(self, topic: str, payload=None, qos: int = 0, retain: bool = False, properties=None):
+        pass
+
+    def connect(self, host: str = None, port: int = None, keepalive: int = None):
+        self.connection.attach(self)
+
+    def loop_start(self):
+        pass
+
+    def loop_stop(self):
+        pass
+
+    def disconnect(self):
+        self.connection.detach(self)
+
+    def subscribe(self, topic: str, qos: int = 0):
+        self.connection.subscribe(self, topic, qos)
+        return mqtt.MQTT_ERR_SUCCESS, None
+
+    def publish(self, topic: str, payload=None, qos: int = 0, retain: bool = False, properties=None):
+        if isinstance(payload, str):
+            payload = payload.encode()
+        info = self.connection.publish(topic, payload or b'', qos, retain, properties, on_publish=self._published)
+        return _Rejected if info is None else info
+
+    def _published(self, mid: int, reason_code, properties):
+        if self.on_publish is not None:
+            self.on_publish(self, None, mid, reason_code, properties)
+
+
+class MqttConnectionPool:
+    """
+    Conjunto fixo de conexões; cada pulseira usa sempre a mesma
+
+    Args:
+        size: Quantidade de conexões
+        broker, port: Endereço do broker
+        client_prefix: Prefixo dos client_ids
+        dry_run: Conexões que só contam as mensagens (sem broker)
+        recorder: Gravador compartilhado pelas conexões (traffic.TrafficRecorder)
+        fixed_ids: client_ids sem o instante (<prefixo>_<n>): ao reconectar, o broker
+            encerra a sessão antiga (e publica o Will dela) antes da nova
+        connection_options: keepalive, protocol e max_inflight de cada MqttConnection
+    """
+
+    def __init__(self, size: int, broker: str, port: int,
+                 client_prefix: str = "fleet", dry_run: bool = False, recorder=None,
+                 fixed_ids: bool = False, **connection_options):
+        if size < 1:
+            raise ValueError("O pool precisa de pelo menos uma conexão")
+        suffix = "" if fixed_ids else f"_{int(time.time())}"
+        self.connections = [
+            MqttConnection(f"{client_prefix}_{i}{suffix}", broker, port, dry_run=dry_run, recorder=recorder,
+                           **connection_options)
+            for i in range(size)
+        ]
+
+    def __len__(self):
+        return len(self.connections)
+
+    def connection_for(self, device_index: int) -> MqttConnection:
+        return self.connections[device_index % len(self.connections)]
+
+    def connect(self, timeout: float = 5.0) -> int:
+        """
+        Conecta todas e espera até timeout
+
+        Returns:
+            Quantidade de conexões ativas
+        """
+        for connection in self.connections:
+            connection.connect()
+        deadline = time.time() + timeout
+        while time.time() < deadline and not all(c.is_connected for c in self.connections):
+            time.sleep(0.1)
+        return sum(c.is_connected for c in self.connections)
+
+    def close(self):
+        for connection in self.connections:
+            connection.close()
+
+    def stats(self) -> Dict:
+        """Totais das conexões"""
+        totals = {'connections': len(self.connections),
+                  'connected': sum(c.is_connected for c in self.connections)}
+        for key in ('published', 'bytes', 'failed', 'connects'):
+            totals[key] = sum(c.stats[key] for c in self.connections)
+        return totals
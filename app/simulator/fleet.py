@@ -0,0 +1,264 @@
+"""
+Simulador de frota: milhares de pulseiras virtuais em um único event loop
+
+Cada pulseira virtual reaproveita os sensores, o EdgeProcessor e o
+PulseiraPublisher da SmartPulseira, mas não tem threads nem conexão própria: um task asyncio
+por pulseira executa o ciclo (coleta -> EdgeProcessor -> publicação) e
+dorme de forma assíncrona até o próximo, e as mensagens saem por um pool
+pequeno de conexões MQTT compartilhadas (simulator.connections).
+
+Os tópicos, QoS e payloads são os mesmos de uma pulseira real, então o
+subscriber e a API recebem a carga que receberiam da frota.
+"""
+
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+from config.settings import (
+    MQTT_BROKER, MQTT_PORT, ADAPTIVE_REPORTING, DELTA_ENCODING, READINGS_MODE, READINGS_BATCH_SIZE,
+    WIRE_FORMAT
+)
+from sensors.heart_rate_sensor import HeartRateSensor
+from sensors.stress_sensor import StressSensor
+from sensors.temperature_sensor import TemperatureSensor
+from sensors.oxygen_sensor import OxygenSensor
+from sensors.fall_sensor import FallSensor
+from sensors.edge_processor import EdgeProcessor
+from sensors.pulseira_publisher import PulseiraPublisher
+from sensors.clock import SYSTEM_CLOCK
+from sensors.smart_pulseira import READINGS_MODES
+from traffic import TrafficRecorder
+from .connections import MqttConnection, MqttConnectionPool, DeviceClient
+
+READING_INTERVAL = (8, 15)     # Intervalo entre ciclos (segundos), como na SmartPulseira
+HEARTBEAT_INTERVAL = 30
+LAG_SAMPLES = 10_000           # Atrasos do event loop guardados para o percentil
+
+DEVICE_STATS = ('readings_collected', 'emergencies_detected', 'summaries_sent',
+                'heartbeats_sent', 'readings_sent', 'failed_sends')
+
+
+def report_line(stats: Dict, previous: Optional[Dict], interval: float) -> str:
+    """Linha do relatório periódico (taxas desde o relatório anterior)"""
+    previous = previous or {'cycles': 0, 'mqtt': {'published': 0}}
+    cycles_rate = (stats['cycles'] - previous['cycles']) / interval
+    publish_rate = (stats['mqtt']['published'] - previous['mqtt']['published']) / interval
+    return (f"📊 [{stats['uptime_seconds']:.0f}s] {stats['devices']} pulseiras | "
+            f"{cycles_rate:,.0f} ciclos/s | {publish_rate:,.0f} msgs/s | "
+            f"🚨 {stats['emergencies_detected']} | 📋 {stats['summaries_sent']} | "
+            f"❌ {stats['failed_sends']} | atraso p99 {stats['loop_lag_p99_ms']:.1f} ms")
+
+
+class VirtualPulseira:
+    """
+    Pulseira virtual (sensores + EdgeProcessor + PulseiraPublisher) em uma conexão compartilhada
+
+    O envio é o do PulseiraPublisher da SmartPulseira (delta, heartbeat,
+    formato compacto), com um DeviceClient sobre a conexão no lugar do
+    cliente paho. Spool, lotes, MQTT v5 e presença ficam desligados: são
+    por conexão ou por disco, e a frota divide poucas conexões.
+
+    Args:
+        patient_id: ID do paciente
+        connection: Conexão MQTT compartilhada
+        statuses: Status de cada sensor ({'oxygen': 'stable', ...}, como na SmartPulseira)
+        clock: Relógio dos sensores, do EdgeProcessor e das mensagens (default: tempo real)
+    """
+
+    def __init__(self, patient_id: str, connection: MqttConnection,
+                 statuses: Optional[Dict[str, str]] = None,
+                 adaptive_reporting: bool = ADAPTIVE_REPORTING,
+                 delta_encoding: bool = DELTA_ENCODING,
+                 readings_mode: str = READINGS_MODE,
+                 wire_format: str = WIRE_FORMAT,
+                 clock=None):
+        if readings_mode not in READINGS_MODES:
+            raise ValueError(f"readings_mode inválido: {readings_mode} (use {', '.join(READINGS_MODES)})")
+        statuses = statuses or {}
+        self.patient_id = patient_id
+        self.connection = connection
+        self.readings_mode = readings_mode
+        self.clock = clock or SYSTEM_CLOCK
+        self.sensors = [
+            HeartRateSensor(patient_id, status=statuses.get('heart_rate', 'stable'), clock=self.clock),
+            StressSensor(patient_id, status=statuses.get('stress', 'stable'), clock=self.clock),
+            TemperatureSensor(patient_id, status=statuses.get('temperature', 'stable'), clock=self.clock),
+            OxygenSensor(patient_id, status=statuses.get('oxygen', 'stable'), clock=self.clock),
+            FallSensor(patient_id, chance=statuses.get('fall', 'low'), clock=self.clock)
+        ]
+        self.edge_processor = EdgeProcessor(patient_id, adaptive=adaptive_reporting, clock=self.clock)
+        self.publisher = PulseiraPublisher(
+            patient_id, delta_encoding=delta_encoding, clock=self.clock, spool_dir='',
+            wire_format=wire_format, mqtt_v5=False, batch_window=0, presence=False,
+            client=DeviceClient(connection), verbose=False
+        )
+        self.publisher.client.connect()   # Registra na conexão (on_connect quando ela estiver no ar)
+        self._pending_cycles = []
+        self.last_heartbeat = self.clock.time()   # O publisher envia um heartbeat ao conectar
+        self._stats = dict.fromkeys(DEVICE_STATS, 0)
+
+    @property
+    def stats(self) -> Dict:
+        # Heartbeats do publisher: inclui os enviados a cada (re)conexão
+        return {**self._stats, 'heartbeats_sent': self.publisher.stats['heartbeat_sent']}
+
+    def run_cycle(self, now: Optional[float] = None):
+        """Um ciclo da pulseira: coleta, processa e publica o que for decidido"""
+        now = self.clock.time() if now is None else now
+        readings = [sensor.get_sensor_reading() for sensor in self.sensors]
+        self._stats['readings_collected'] += len(readings)
+
+        if self.readings_mode != 'raw':
+            result = self.edge_processor.process_sensor_readings(readings, now=now)
+            action = result['action']
+            if action == 'emergency':
+                self._count(self.publisher.send_emergency(result['data']), 'emergencies_detected')
+            elif action == 'summary':
+                self._count(self.publisher.send_summary(result['data']), 'summaries_sent')
+
+        if self.readings_mode != 'edge':
+            self._pending_cycles.append((now, readings))
+            if len(self._pending_cycles) >= READINGS_BATCH_SIZE:
+                self.flush_readings()
+
+        if now - self.last_heartbeat >= HEARTBEAT_INTERVAL:
+            self.send_heartbeat(now)
+
+    def flush_readings(self):
+        """Envia o lote de leituras brutas pendente"""
+        if not self._pending_cycles:
+            return
+        cycles = len(self._pending_cycles)
+        if self._count(self.publisher.send_readings(self._pending_cycles, processed=self.readings_mode == 'both')):
+            self._stats['readings_sent'] += cycles
+            self._pending_cycles = []
+        else:
+            self._pending_cycles = self._pending_cycles[-READINGS_BATCH_SIZE * 10:]
+
+    def send_heartbeat(self, now: Optional[float] = None):
+        self._count(self.publisher.send_heartbeat())
+        self.last_heartbeat = self.clock.time() if now is None else now
+
+    def _count(self, sent: bool, key: Optional[str] = None) -> bool:
+        if sent:
+            if key is not None:
+                self._stats[key] += 1
+        else:
+            self._stats['failed_sends'] += 1
+        return sent
+
+
+class FleetSimulator:
+    """
+    N pulseiras virtuais em um event loop, com conexões MQTT compartilhadas
+
+    Args:
+        n_devices: Quantidade de pulseiras
+        connections: Conexões MQTT compartilhadas
+        first_index: Índice da primeira pulseira (IDs PAT00000, PAT00001, ...)
+        alert_share / critical_share: Fração de pulseiras com sensores em alerta / críticos
+        dry_run: Não conecta ao broker (mede só o custo da simulação)
+        seed: Semente dos sorteios (perfis, intervalos e sensores)
+        on_report: Recebe as estatísticas a cada report_interval (default: imprime o relatório)
+        record_path: Grava as mensagens publicadas neste arquivo (python -m traffic replay)
+    """
+
+    def __init__(self, n_devices: int, connections: int = 4,
+                 broker: str = MQTT_BROKER, port: int = MQTT_PORT,
+                 first_index: int = 0, patient_prefix: str = "PAT",
+                 alert_share: float = 0.1, critical_share: float = 0.02,
+                 fall_chance: str = 'low', dry_run: bool = False,
+                 seed: Optional[int] = None, report_interval: float = 10.0,
+                 adaptive_reporting: bool = ADAPTIVE_REPORTING,
+                 delta_encoding: bool = DELTA_ENCODING,
+                 readings_mode: str = READINGS_MODE,
+                 wire_format: str = WIRE_FORMAT,
+                 on_report: Optional[Callable[[Dict], None]] = None,
+                 record_path: Optional[str] = None):
+        self.rng = random.Random(seed)
+        self.on_report = on_report
+        if seed is not None:
+            random.seed(seed)   # Sensores usam o random global
+        self.recorder = TrafficRecorder(record_path) if record_path else None
+        self.pool = MqttConnectionPool(connections, broker, port, client_prefix=f"fleet_{first_index}",
+                                       dry_run=dry_run, recorder=self.recorder)
+        self.report_interval = report_interval
+        self.devices: List[VirtualPulseira] = []
+        for i in range(n_devices):
+            draw = self.rng.random()
+            status = 'critical' if draw < critical_share else 'alert' if draw < critical_share + alert_share else 'stable'
+            sensor = self.rng.choice(('heart_rate', 'stress', 'temperature', 'oxygen'))
+            self.devices.append(VirtualPulseira(
+                f"{patient_prefix}{first_index + i:05d}", self.pool.connection_for(i),
+                statuses={sensor: status, 'fall': fall_chance},
+                adaptive_reporting=adaptive_reporting, delta_encoding=delta_encoding,
+                readings_mode=readings_mode, wire_format=wire_format
+            ))
+        self.running = False
+        self.cycles = 0
+        self.lags = deque(maxlen=LAG_SAMPLES)
+        self.started_at = None
+
+    async def run(self, duration: float):
+        """Executa a frota por duration segundos"""
+        loop = asyncio.get_running_loop()
+        self.running = True
+        self.started_at = time.time()
+        stop_at = loop.time() + duration
+        tasks = [asyncio.create_task(self._device_loop(device, stop_at)) for device in self.devices]
+        reporter = asyncio.create_task(self._report_loop())
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            self.running = False
+            reporter.cancel()
+            for task in tasks:
+                task.cancel()
+            for device in self.devices:
+                device.flush_readings()
+
+    async def _device_loop(self, device: VirtualPulseira, stop_at: float):
+        loop = asyncio.get_running_loop()
+        # Partidas espalhadas no primeiro intervalo (sem rajada inicial)
+        due = loop.time() + self.rng.uniform(0, READING_INTERVAL[1])
+        while self.running and due < stop_at:
+            await asyncio.sleep(due - loop.time())
+            woke = loop.time()
+            self.lags.append(woke - due)
+            device.run_cycle()
+            self.cycles += 1
+            due = woke + self.rng.uniform(*READING_INTERVAL)
+
+    async def _report_loop(self):
+        previous = None
+        while True:
+            await asyncio.sleep(self.report_interval)
+            stats = self.get_statistics()
+            if self.on_report is not None:
+                self.on_report(stats)
+            else:
+                print(report_line(stats, previous, self.report_interval))
+            previous = stats
+
+    def get_statistics(self) -> Dict:
+        """Totais da frota (mesmas chaves das estatísticas das pulseiras)"""
+        totals = dict.fromkeys(DEVICE_STATS, 0)
+        for device in self.devices:
+            for key, value in device.stats.items():
+                totals[key] += value
+        lags = sorted(self.lags)
+        return {
+            'devices': len(self.devices),
+            'cycles': self.cycles,
+            'uptime_seconds': time.time() - self.started_at if self.started_at else 0,
+            **totals,
+            'loop_lag_p99_ms': lags[int(len(lags) * 0.99)] * 1000 if lags else 0.0,
+            'mqtt': self.pool.stats()
+        }
+
+    def close(self):
+        self.pool.close()
+        if self.recorder is not None:
+            self.recorder.close()
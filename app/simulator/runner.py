@@ -0,0 +1,147 @@
+"""
+Execução da frota em vários processos
+
+A população de pulseiras é dividida entre N processos; cada um roda o seu
+FleetSimulator (event loop e conexões MQTT próprios), sem disputar o GIL.
+Os processos enviam suas estatísticas periodicamente por uma fila, e o
+processo principal soma tudo em um único relatório ao vivo.
+"""
+
+import asyncio
+import gc
+import multiprocessing
+import queue
+import time
+from typing import Dict, List, Optional
+from .fleet import FleetSimulator, DEVICE_STATS, report_line
+
+_FINAL_TIMEOUT = 30   # Espera pelas estatísticas finais após o fim da simulação
+
+
+def shard_sizes(devices: int, processes: int) -> List[int]:
+    """Pulseiras por processo (diferença de no máximo uma entre processos)"""
+    return [devices // processes + (1 if i < devices % processes else 0) for i in range(processes)]
+
+
+def aggregate_statistics(shards: List[Dict]) -> Dict:
+    """Soma as estatísticas dos processos (o atraso do event loop é o pior entre eles)"""
+    totals = {'processes': len(shards), 'devices': 0, 'cycles': 0, 'uptime_seconds': 0.0,
+              'loop_lag_p99_ms': 0.0, **dict.fromkeys(DEVICE_STATS, 0),
+              'mqtt': {'connections': 0, 'connected': 0, 'published': 0, 'bytes': 0, 'failed': 0, 'connects': 0}}
+    for stats in shards:
+        totals['devices'] += stats['devices']
+        totals['cycles'] += stats['cycles']
+        totals['uptime_seconds'] = max(totals['uptime_seconds'], stats['uptime_seconds'])
+        totals['loop_lag_p99_ms'] = max(totals['loop_lag_p99_ms'], stats['loop_lag_p99_ms'])
+        for key in DEVICE_STATS:
+            totals[key] += stats[key]
+        for key in totals['mqtt']:
+            totals['mqtt'][key] += stats['mqtt'][key]
+    return totals
+
+
+def _shard_worker(shard: int, n_devices: int, first_index: int, config: Dict, reports):
+    """Processo filho: roda um FleetSimulator e publica as estatísticas na fila"""
+    seed = config['seed'] + shard if config['seed'] is not None else None
+    record_path = config['record']
+    if record_path and config['processes'] > 1:
+        record_path = f"{record_path}.{shard}"
+    simulator = FleetSimulator(
+        n_devices, connections=config['connections'], broker=config['broker'], port=config['port'],
+        first_index=first_index, alert_share=config['alert_share'], critical_share=config['critical_share'],
+        fall_chance=config['fall_chance'], dry_run=config['dry_run'], seed=seed,
+        report_interval=config['report_interval'], adaptive_reporting=config['adaptive'],
+        delta_encoding=config['delta'], readings_mode=config['readings_mode'],
+        wire_format=config['wire_format'],
+        on_report=lambda stats: reports.put((shard, 'report', stats)), record_path=record_path
+    )
+    # Sensores e processadores vivem a simulação inteira: fora das coletas do GC
+    gc.collect()
+    gc.freeze()
+
+    if not simulator.pool.connect():
+        simulator.close()
+        reports.put((shard, 'error', f"sem conexão com o broker {config['broker']}:{config['port']}"))
+        return
+    try:
+        asyncio.run(simulator.run(config['duration']))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        simulator.close()
+        reports.put((shard, 'final', simulator.get_statistics()))
+
+
+class FleetRunner:
+    """
+    Frota dividida em processos, com relatório agregado
+
+    Args:
+        config: Configuração completa (simulator.config.load_fleet_config)
+    """
+
+    def __init__(self, config: Dict):
+        self.config = config
+        self.reports = multiprocessing.Queue()
+        self.workers = []
+        self.shard_stats = {}    # {processo: últimas estatísticas}
+        self.finished = set()
+        self.errors = {}
+
+    def run(self) -> Optional[Dict]:
+        """
+        Roda a frota até o fim da duração (ou Ctrl+C)
+
+        Returns:
+            Estatísticas finais agregadas, ou None se nenhum processo rodou
+        """
+        config = self.config
+        first_index = config['first_index']
+        for shard, size in enumerate(shard_sizes(config['devices'], config['processes'])):
+            worker = multiprocessing.Process(
+                target=_shard_worker, args=(shard, size, first_index, config, self.reports),
+                name=f"fleet-{shard}", daemon=True
+            )
+            worker.start()
+            self.workers.append(worker)
+            first_index += size
+        print(f"🚀 {len(self.workers)} processo(s) iniciados")
+
+        try:
+            self._collect_reports(until=time.time() + config['duration'] + _FINAL_TIMEOUT)
+        except KeyboardInterrupt:
+            print("\n🛑 Interrompido pelo usuário. Aguardando estatísticas finais...")
+            self._collect_reports(until=time.time() + _FINAL_TIMEOUT)
+
+        for worker in self.workers:
+            worker.join(timeout=5)
+            if worker.is_alive():
+                worker.terminate()
+        for shard, error in self.errors.items():
+            print(f"❌ Processo {shard}: {error}")
+        if not self.shard_stats:
+            return None
+        return aggregate_statistics(list(self.shard_stats.values()))
+
+    def _collect_reports(self, until: float):
+        """Lê a fila e imprime o relatório agregado a cada report_interval"""
+        interval = self.config['report_interval']
+        next_report = time.time() + interval
+        previous = None
+        while len(self.finished) + len(self.errors) < len(self.workers) and time.time() < until:
+            try:
+                shard, kind, payload = self.reports.get(timeout=max(0.1, next_report - time.time()))
+                if kind == 'error':
+                    self.errors[shard] = payload
+                else:
+                    self.shard_stats[shard] = payload
+                    if kind == 'final':
+                        self.finished.add(shard)
+            except queue.Empty:
+                pass
+            if time.time() >= next_report:
+                if self.shard_stats:
+                    stats = aggregate_statistics(list(self.shard_stats.values()))
+                    print(report_line(stats, previous, interval) + f" | {len(self.shard_stats)} processo(s)")
+                    previous = stats
+                next_report += interval
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Serviço do subscriber MQTT (processo próprio)
+
+Roda o ElderCareSubscriber fora da API, para que a API possa usar vários
+workers (uvicorn --workers N). A conectividade das pulseiras e o sinal de
+vida do subscriber são publicados no SQLite (device_presence e
+service_status) e lidos por qualquer worker.
+
+Uso (a partir da pasta app):
+    python -m subscriber
+"""
+
+import signal
+from .subscriber import ElderCareSubscriber
+
+def _handle_sigterm(signum, frame):
+    # docker stop envia SIGTERM: reaproveita o desligamento do Ctrl+C
+    raise KeyboardInterrupt
+
+def main():
+    signal.signal(signal.SIGTERM, _handle_sigterm)
+    subscriber = ElderCareSubscriber()
+    subscriber.start_listening()
+
+if __name__ == "__main__":
+    main()
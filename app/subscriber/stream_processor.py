@@ -0,0 +1,133 @@
+"""
+Processamento de borda no servidor para leituras brutas
+
+Pulseiras sem EdgeProcessor publicam lotes de leituras em
+eldercare/readings/<paciente>. Os lotes ficam em fila por paciente e, a
+cada flush, um FleetEdgeProcessor processa todos os pacientes em bloco:
+a rodada k processa o k-ésimo ciclo pendente de cada paciente (com o
+instante próprio de cada um). As emergências e resumos resultantes têm o
+mesmo formato dos enviados pelas pulseiras e seguem o caminho normal de
+ingestão (callback emit).
+"""
+
+import threading
+from typing import Callable, Dict, Optional
+import numpy as np
+from protocol import decode_readings
+from rules import RuleEngine
+from sensors.fleet_processor import FleetEdgeProcessor, FLEET_SENSORS
+
+_FLEET_COLUMNS = FLEET_SENSORS + ('fall_detection',)
+
+
+class ReadingStreamProcessor:
+    """
+    Fila de leituras brutas + FleetEdgeProcessor compartilhado
+
+    Args:
+        emit: Função (message_type, patient_id, data) chamada para cada
+              emergência ou resumo gerado
+        rule_engine: Regras de alerta (default: tabela compartilhada do processo)
+    """
+
+    def __init__(self, emit: Callable[[str, str, Dict], None],
+                 rule_engine: Optional[RuleEngine] = None):
+        self.emit = emit
+        self.fleet = FleetEdgeProcessor([], rule_engine=rule_engine)
+        self._lock = threading.Lock()
+        self._pending = {}            # {patient_id: [(instantes, valores (ciclos, sensores))]}
+        self._last_time = {}          # {patient_id: instante do último ciclo aceito}
+        self.stats = {'batches': 0, 'cycles': 0, 'duplicates': 0, 'invalid': 0,
+                      'emergencies': 0, 'summaries': 0}
+
+    def ingest(self, patient_id: str, payload: Dict) -> int:
+        """
+        Enfileira um lote de leituras; ciclos repetidos ou fora de ordem
+        (reentrega QoS 1) são descartados
+
+        Returns:
+            Ciclos aceitos
+
+        Raises:
+            ValueError: Se o lote for inválido
+        """
+        try:
+            sensors, times, values = decode_readings(payload)
+        except ValueError:
+            self.stats['invalid'] += 1
+            raise
+        table = np.full((len(times), len(_FLEET_COLUMNS)), np.nan)
+        for c, sensor in enumerate(_FLEET_COLUMNS):
+            if sensor in sensors:
+                table[:, c] = values[:, sensors.index(sensor)]
+
+        with self._lock:
+            last = self._last_time.get(patient_id, float('-inf'))
+            # Mantém só ciclos em ordem crescente e posteriores ao último aceito
+            previous = np.maximum.accumulate(np.concatenate([[last], times[:-1]])) if len(times) else times
+            keep = times > previous
+            accepted = int(keep.sum())
+            if accepted:
+                self._pending.setdefault(patient_id, []).append((times[keep], table[keep]))
+                self._last_time[patient_id] = float(times[keep][-1])
+            self.stats['batches'] += 1
+            self.stats['cycles'] += accepted
+            self.stats['duplicates'] += len(times) - accepted
+        return accepted
+
+    def pending_cycles(self) -> int:
+        with self._lock:
+            return sum(len(times) for batches in self._pending.values() for times, _ in batches)
+
+    def flush(self) -> int:
+        """
+        Processa todos os ciclos pendentes em bloco e emite as mensagens
+
+        Returns:
+            Quantidade de mensagens emitidas
+        """
+        with self._lock:
+            pending = self._pending
+            self._pending = {}
+        if not pending:
+            return 0
+
+        fleet = self.fleet
+        # Pacientes novos entram de uma vez, com o resumo contado a partir da 1ª leitura
+        for i in fleet.add_patients([p for p in pending if p not in fleet.index]):
+            fleet.last_summary_sent[i] = pending[fleet.patient_ids[i]][0][0][0]
+
+        # Todos os ciclos em arrays: paciente, posição na fila do paciente, instante e valores
+        rows, ranks, times, tables = [], [], [], []
+        for patient_id, batches in pending.items():
+            patient_times = np.concatenate([t for t, _ in batches])
+            rows.append(np.full(len(patient_times), fleet.index[patient_id]))
+            ranks.append(np.arange(len(patient_times)))
+            times.append(patient_times)
+            tables.append(np.concatenate([v for _, v in batches]))
+        rows, ranks = np.concatenate(rows), np.concatenate(ranks)
+        times, tables = np.concatenate(times), np.concatenate(tables)
+        order = np.argsort(ranks, kind='stable')
+        bounds = np.searchsorted(ranks[order], np.arange(ranks.max() + 2))
+
+        n = len(fleet)
+        emitted = 0
+        for k in range(len(bounds) - 1):
+            chosen = order[bounds[k]:bounds[k + 1]]
+            idx = rows[chosen]
+            active = np.zeros(n, dtype=bool)
+            active[idx] = True
+            tick_times = np.zeros(n, dtype=float)
+            tick_times[idx] = times[chosen]
+            readings = {}
+            for c, sensor in enumerate(_FLEET_COLUMNS):
+                column = np.full(n, np.nan)
+                column[idx] = tables[chosen, c]
+                readings[sensor] = column
+            result = fleet.process_tick(readings, now=tick_times, active=active)
+            for message in result.messages():
+                data = message['data']
+                self.emit(data['message_type'], data['patient_id'], data)
+                self.stats['emergencies' if message['action'] == 'emergency' else 'summaries'] += 1
+                emitted += 1
+        return emitted
@@ -5,9 +5,12 @@ Recebe mensagens MQTT das pulseiras e salva em SQLite
 
 Funcionalidades:
 - Recebe emergency/summary/heartbeat via MQTT
+- Reconstrói resumos enviados como delta (protocol.delta)
+- Processa no servidor as leituras brutas (readings) em bloco
 - Salva dados em SQLite usando módulo database
 - Calcula estado atual dos pacientes (SAUDÁVEL/ALERTA/CRÍTICO)
-- Monitora conectividade das pulseiras
+- Monitora conectividade das pulseiras (presença retida + Last Will, com
+  timeout de heartbeat como reserva)
 
 Estrutura de Estados:
 - CRÍTICO: emergência nas últimas 1h
@@ -22,10 +25,21 @@ import threading
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 import paho.mqtt.client as mqtt
-from config.settings import MQTT_BROKER, MQTT_PORT
+from config.settings import (
+    MQTT_BROKER, MQTT_PORT, HEARTBEAT_TIMEOUT, PRESENCE_HEARTBEAT_TIMEOUT, SUBSCRIBER_STATUS_INTERVAL,
+    STREAM_FLUSH_INTERVAL,
+    CHANGE_LOG_RETENTION_SECONDS, CHANGE_LOG_MAX_ENTRIES, CHANGE_LOG_COMPACT_INTERVAL
+)
 
 # Importar módulo de persistência SQLite
-from database import create_health_message, get_patient
+from database import (
+    create_database, create_health_message, get_patient,
+    record_change, compact_change_log,
+    update_device_presence, update_service_status,
+    get_latest_summary, get_message_data_as_dict
+)
+from protocol import DeltaDecoder, decode_payload, is_compact, decode_batch, SUBSCRIBER_EPOCH_TOPIC
+from subscriber.stream_processor import ReadingStreamProcessor
 
 
 class ElderCareSubscriber:
@@ -37,21 +51,45 @@ class ElderCareSubscriber:
     """
     
     def __init__(self):
-        # Status online dos pacientes (apenas em memória)
+        # Status online dos pacientes (em memória e publicado em device_presence,
+        # para que os workers da API possam ler de outro processo)
         self.online_patients = {}  # {patient_id: last_heartbeat_time}
+        self.offline_patients = set()  # Pacientes já marcados como offline
+        # Pulseiras com presença pelo broker: timeout de heartbeat (reserva) de cada uma
+        self.presence_timeouts = {}  # {patient_id: segundos}
+        # Pulseiras atrás de gateways (sensors.gateway): o Will é da conexão do gateway
+        self.patient_gateways = {}   # {patient_id: gateway da última presença online}
+        self.offline_gateways = {}   # {gateway: pulseiras marcadas offline pela queda dele}
+        
+        # Estado atual dos pacientes (para registrar mudanças no log)
+        self.patient_states = {}  # {patient_id: estado}
         
         # Estados possíveis
         self.HEALTHY = "ESTÁVEL"
         self.ALERT = "ALERTA" 
         self.CRITICAL = "CRÍTICO"
         self.OFFLINE = "OFFLINE"
+        self.ONLINE = "ONLINE"
         
         # Controle de execução
         self.running = False
         
         # Timeout de heartbeat
-        self.heartbeat_timeout = 90    # 90s sem heartbeat = offline
-        self.offline_check_interval = 30  # Verifica a cada 30 segundos
+        self.heartbeat_timeout = HEARTBEAT_TIMEOUT    # 90s sem heartbeat = offline
+        # Verifica timeouts e publica o sinal de vida do serviço a cada ciclo
+        self.offline_check_interval = SUBSCRIBER_STATUS_INTERVAL
+        self.started_at = time.time()
+        
+        # Compactação do log de alterações (/changes)
+        self.last_compaction = 0
+        
+        # Resumos delta: últimos resumos completos por paciente (base no banco após reiniciar)
+        self.summary_decoder = DeltaDecoder(load_base=self._load_summary_base)
+        
+        # Leituras brutas: processamento de borda em bloco, com as emergências
+        # e resumos gerados seguindo o mesmo caminho das mensagens das pulseiras
+        self.stream_processor = ReadingStreamProcessor(emit=self._on_stream_message)
+        self.stream_flush_interval = STREAM_FLUSH_INTERVAL
         
         # Estatísticas
         self.stats = {
@@ -59,6 +97,13 @@ class ElderCareSubscriber:
             'emergencies_received': 0,
             'summaries_received': 0,
             'heartbeats_processed': 0,  # Só para estatística, não salva
+            'readings_received': 0,     # Ciclos brutos aceitos para processamento
+            'readings_audited': 0,      # Ciclos já processados na pulseira (não salva)
+            'compact_messages': 0,      # Recebidas no formato compacto (protocol.compact)
+            'batches_received': 0,      # Lotes (eldercare/batch) desmembrados
+            'presence_updates': 0,      # Status online/offline (eldercare/presence)
+            'presence_retained': 0,     # ... recebidos como retidos (ao subscrever)
+            'gateway_updates': 0,       # Status das conexões de gateways (eldercare/gateway)
             'start_time': datetime.now()
         }
         
@@ -71,6 +116,9 @@ class ElderCareSubscriber:
         except (AttributeError, TypeError):
             self.client = mqtt.Client(client_id=f"eldercare_subscriber_{int(time.time())}")
         
+        # Garante que as tabelas existem (inclui o log de alterações)
+        create_database()
+        
         print("🔧 ElderCare Subscriber inicializado")
         print(f" SALVA em SQLite: emergency + summary")
         print(f"💓 PROCESSA (não salva): heartbeat")
@@ -102,6 +150,7 @@ class ElderCareSubscriber:
             
             # Inicia thread de monitoramento de timeout em background
             self._start_patient_monitor()
+            self._start_stream_flusher()
             
             print("👂 Aguardando mensagens MQTT...")
             print("Press Ctrl+C para parar\n")
@@ -121,6 +170,8 @@ class ElderCareSubscriber:
             
             # Para thread de monitoramento
             self.running = False
+            self._flush_readings()
+            self._publish_service_status()
             
             self._show_final_stats()
             
@@ -143,31 +194,51 @@ class ElderCareSubscriber:
         monitor_thread.start()
         print(f"👁️  Monitor de timeout iniciado (verifica a cada {self.offline_check_interval}s)")
     
+    def _start_stream_flusher(self):
+        """Inicia thread que processa as leituras brutas pendentes"""
+        flusher_thread = threading.Thread(target=self._stream_flush_loop, daemon=True)
+        flusher_thread.start()
+    
+    def _stream_flush_loop(self):
+        """Processa em bloco, a cada stream_flush_interval, as leituras recebidas"""
+        while self.running:
+            time.sleep(self.stream_flush_interval)
+            self._flush_readings()
+    
+    def _flush_readings(self):
+        """Roda o processamento de borda nas leituras pendentes"""
+        try:
+            self.stream_processor.flush()
+        except Exception as e:
+            print(f"⚠️  Erro no processamento das leituras: {e}")
+    
     def _patient_timeout_monitor(self):
         """
         Monitor que roda em thread separada
         Verifica se algum paciente ficou offline (sem heartbeat)
+        e compacta periodicamente o log de alterações
         """
-        patients_offline = set()  # Track de pacientes já marcados como offline
-        
         while self.running:
             try:
                 current_time = time.time()
                 
-                # Verifica cada paciente que já enviou heartbeat
-                for patient_id, last_heartbeat in self.online_patients.items():
+                # Verifica cada paciente que já enviou heartbeat (com presença pelo
+                # broker, o Will já avisa; o timeout longo é só a reserva)
+                for patient_id, last_heartbeat in list(self.online_patients.items()):
                     time_since_last = current_time - last_heartbeat
+                    timeout = self.presence_timeouts.get(patient_id, self.heartbeat_timeout)
                     
-                    if time_since_last > self.heartbeat_timeout:
-                        # Paciente ficou offline
-                        if patient_id not in patients_offline:
-                            print(f"⚠️  PACIENTE OFFLINE: {patient_id} (sem heartbeat há {int(time_since_last)}s)")
-                            patients_offline.add(patient_id)
-                    else:
-                        # Paciente voltou online
-                        if patient_id in patients_offline:
-                            print(f"✅ PACIENTE ONLINE: {patient_id} (heartbeat recebido)")
-                            patients_offline.remove(patient_id)
+                    # Paciente ficou offline
+                    if time_since_last > timeout and patient_id not in self.offline_patients:
+                        print(f"⚠️  PACIENTE OFFLINE: {patient_id} (sem heartbeat há {int(time_since_last)}s)")
+                        self.offline_patients.add(patient_id)
+                        self._record_connectivity(patient_id, self.OFFLINE, last_heartbeat)
+                
+                self._publish_service_status()
+                
+                if current_time - self.last_compaction >= CHANGE_LOG_COMPACT_INTERVAL:
+                    self._compact_change_log()
+                    self.last_compaction = current_time
                 
                 # Aguarda próxima verificação
                 time.sleep(self.offline_check_interval)
@@ -176,18 +247,63 @@ class ElderCareSubscriber:
                 print(f"⚠️  Erro no monitor de timeout: {e}")
                 time.sleep(self.offline_check_interval)
     
+    def _compact_change_log(self):
+        """Remove alterações antigas do log de alterações"""
+        removed = compact_change_log(CHANGE_LOG_RETENTION_SECONDS, CHANGE_LOG_MAX_ENTRIES)
+        if removed:
+            print(f"🧹 Log de alterações compactado: {removed} entradas removidas")
+    
+    def _publish_service_status(self):
+        """Publica sinal de vida e estatísticas do subscriber para a API"""
+        update_service_status("subscriber", self.started_at, {
+            **self.get_statistics(),
+            'running': self.running,
+            # A API só confere o status gravado contra este limite; o offline de
+            # cada pulseira (timeout ou Last Will) é decidido aqui
+            'heartbeat_timeout': max([self.heartbeat_timeout, *self.presence_timeouts.values()])
+        })
+    
+    def _record_connectivity(self, patient_id: str, status: str, last_heartbeat: float):
+        """Registra mudança de conectividade (estado compartilhado e log de alterações)"""
+        update_device_presence(patient_id, status, last_heartbeat)
+        record_change("connectivity", patient_id, {
+            "status": status,
+            "is_online": status == self.ONLINE,
+            "last_heartbeat": last_heartbeat
+        })
+    
+    def _update_patient_state(self, patient_id: str, message_type: str, data: Dict):
+        """Atualiza o estado do paciente e registra no log se mudou"""
+        if message_type == 'emergency':
+            state = self.CRITICAL
+        else:
+            health_status = data.get('health_status')
+            if health_status == 'critical':
+                state = self.CRITICAL
+            elif health_status == 'alert':
+                state = self.ALERT
+            else:
+                state = self.HEALTHY
+        
+        previous = self.patient_states.get(patient_id)
+        if state != previous:
+            self.patient_states[patient_id] = state
+            record_change("state", patient_id, {"previous": previous, "current": state})
+    
     def _on_connect(self, client, userdata, flags, reason_code, properties=None):
         """Callback quando conecta ao broker"""
         if hasattr(reason_code, 'is_failure'):
             if not reason_code.is_failure:
                 print("✅ Subscriber conectado ao broker MQTT")
                 self._subscribe_to_topics(client)
+                self._publish_epoch(client)
             else:
                 print(f"❌ Falha na conexão: {reason_code}")
         else:
             if reason_code == 0:
                 print("✅ Subscriber conectado ao broker MQTT")
                 self._subscribe_to_topics(client)
+                self._publish_epoch(client)
             else:
                 print(f"❌ Falha na conexão, código: {reason_code}")
     
@@ -198,6 +314,19 @@ class ElderCareSubscriber:
         print("   🚨 emergency/* - SALVA")
         print("   📊 summary/* - SALVA") 
         print("   💓 heartbeat/* - APENAS status online")
+        print("   🟢 presence/* - online/offline retido e Last Will (mapa completo ao subscrever)")
+        print("   📶 gateway/* - Last Will das conexões de gateways (pulseiras offline)")
+        print("   📦 readings/* - processadas no servidor (emergency/summary)")
+        print("   🧺 batch/* - lotes de summary/readings/heartbeat")
+    
+    def _publish_epoch(self, client):
+        """
+        Anuncia uma nova época (retida) a cada conexão: o que as pulseiras
+        publicaram enquanto o subscriber estava fora não chegou a ele, então
+        elas descartam a base dos deltas e mandam o próximo resumo completo
+        """
+        epoch = {'epoch': f"{self.started_at:.6f}-{time.time():.6f}", 'started_at': self.started_at}
+        client.publish(SUBSCRIBER_EPOCH_TOPIC, json.dumps(epoch), qos=1, retain=True)
     
     def _on_disconnect(self, client, userdata, reason_code, properties=None, *args):
         """Callback quando desconecta do broker"""
@@ -213,34 +342,100 @@ class ElderCareSubscriber:
                 
             message_type = topic_parts[1]
             patient_id = topic_parts[2]
-            payload = json.loads(msg.payload.decode())
+            if message_type == 'subscriber':
+                return   # Época publicada pelo próprio subscriber
+            # JSON ou formato compacto (identificado pelo próprio payload)
+            payload = decode_payload(msg.payload)
+            if is_compact(msg.payload):
+                self.stats['compact_messages'] += 1
             
-            # HEARTBEAT: Apenas atualiza status online (NÃO REGISTRA)
-            if message_type == 'heartbeat':
-                self._process_heartbeat_only(patient_id, payload)
+            # BATCH: Vários itens em uma publicação (protocol.batch), processados em ordem
+            if message_type == 'batch':
+                items = decode_batch(payload)
+                self.stats['batches_received'] += 1
+                for item_type, item in items:
+                    self._dispatch_message(item_type, patient_id, item, msg.qos)
                 return
             
-            # EMERGENCY e SUMMARY: Salva e processa
-            if message_type in ['emergency', 'summary']:
-                self.stats['messages_received'] += 1
-                self._save_medical_message(message_type, patient_id, payload, msg.qos)
-                
-                if message_type == 'emergency':
-                    self.stats['emergencies_received'] += 1
-                else:
-                    self.stats['summaries_received'] += 1
-            else:
-                print(f"⚠️  Tipo desconhecido: {message_type}")
+            # PRESENCE: Status retido/Last Will (NÃO REGISTRA mensagem)
+            if message_type == 'presence':
+                self._process_presence(patient_id, payload, bool(getattr(msg, 'retain', False)))
+                return
+            
+            # GATEWAY: Status de uma conexão de gateway (o terceiro nível é o gateway)
+            if message_type == 'gateway':
+                self._process_gateway(patient_id, payload, bool(getattr(msg, 'retain', False)))
+                return
+            
+            self._dispatch_message(message_type, patient_id, payload, msg.qos)
                 
         except json.JSONDecodeError:
             print(f"❌ Erro decodificando JSON: {msg.topic}")
+        except UnicodeDecodeError as e:
+            print(f"❌ Texto inválido (UTF-8) no payload: {msg.topic} ({e})")
+        except ValueError as e:
+            print(f"❌ Mensagem inválida: {msg.topic} ({e})")
         except Exception as e:
             print(f"❌ Erro processando mensagem: {e}")
     
+    def _dispatch_message(self, message_type: str, patient_id: str, payload: Dict, qos: int):
+        """Processa uma mensagem já decodificada (do próprio tópico ou de um lote)"""
+        # HEARTBEAT: Apenas atualiza status online (NÃO REGISTRA)
+        if message_type == 'heartbeat':
+            self._process_heartbeat_only(patient_id, payload)
+            return
+        
+        # READINGS: Leituras brutas (só entram na fila; o flush gera as mensagens)
+        if message_type == 'readings':
+            self._process_readings(patient_id, payload)
+            return
+        
+        # Resumo delta: reconstrói o resumo completo antes de salvar
+        if message_type == 'summary' and payload.get('encoding') == 'delta':
+            payload = self.summary_decoder.decode(patient_id, payload)
+            if payload is None:
+                print(f"⚠️  Resumo delta de {patient_id} sem base conhecida. Aguardando keyframe.")
+                return
+        elif message_type == 'summary':
+            self.summary_decoder.decode(patient_id, payload)
+        
+        # EMERGENCY e SUMMARY: Salva e processa
+        if message_type in ['emergency', 'summary']:
+            self._ingest_medical_message(message_type, patient_id, payload, qos)
+        else:
+            print(f"⚠️  Tipo desconhecido: {message_type}")
+    
+    def _ingest_medical_message(self, message_type: str, patient_id: str, payload: Dict, qos: int):
+        """Salva emergência/resumo e atualiza as estatísticas"""
+        self.stats['messages_received'] += 1
+        self._save_medical_message(message_type, patient_id, payload, qos)
+        
+        if message_type == 'emergency':
+            self.stats['emergencies_received'] += 1
+        else:
+            self.stats['summaries_received'] += 1
+    
+    def _on_stream_message(self, message_type: str, patient_id: str, data: Dict):
+        """Emergência/resumo gerado no servidor a partir de leituras brutas"""
+        self._ingest_medical_message(message_type, patient_id, data, 1)
+    
+    def _process_readings(self, patient_id: str, payload: Dict):
+        """
+        Enfileira um lote de leituras brutas
+        Lotes já processados na pulseira ('processed') são só contados (NÃO SALVA)
+        """
+        if payload.get('processed'):
+            self.stats['readings_audited'] += len(payload.get('rows') or [])
+            return
+        try:
+            self.stats['readings_received'] += self.stream_processor.ingest(patient_id, payload)
+        except ValueError as e:
+            print(f"⚠️  {e} ({patient_id})")
+    
     def _process_heartbeat_only(self, patient_id: str, payload: Dict):
         """
         Processa heartbeat APENAS para status online
-        NÃO SALVA em arquivo nenhum
+        NÃO SALVA mensagem (só atualiza device_presence)
         Só marca online se o heartbeat for recente (<= 60s)
         """
         # Extrai timestamp do heartbeat
@@ -259,13 +454,105 @@ class ElderCareSubscriber:
         if age > 60:
             print(f"⏳ Heartbeat antigo ignorado para {patient_id} (age={int(age)}s, ts={heartbeat_time})")
             return
-        # Atualiza apenas em memória
+        # Paciente novo ou voltando de offline: registra no log de alterações
+        if patient_id not in self.online_patients or patient_id in self.offline_patients:
+            if patient_id in self.offline_patients:
+                print(f"✅ PACIENTE ONLINE: {patient_id} (heartbeat recebido)")
+                self.offline_patients.discard(patient_id)
+            self._record_connectivity(patient_id, self.ONLINE, now)
+        else:
+            update_device_presence(patient_id, self.ONLINE, now)
         self.online_patients[patient_id] = now
         # Estatística (mas não salva)
         self.stats['heartbeats_processed'] += 1
         uptime = payload.get('uptime_seconds', 0)
         print(f"💓 {patient_id} online (uptime: {uptime}s, heartbeat age: {int(age)}s)")
     
+    def _process_presence(self, patient_id: str, payload: Dict, retained: bool):
+        """
+        Processa o status de presença publicado pela pulseira (ou pelo broker, no Last Will)
+        
+        Os retidos chegam logo após subscrever, um por pulseira, e reconstroem
+        o mapa online/offline sem esperar heartbeats.
+        """
+        status = payload.get('status')
+        if status not in ('online', 'offline'):
+            print(f"⚠️  Presença inválida de {patient_id}: {status}")
+            return
+        try:
+            self.presence_timeouts[patient_id] = float(payload.get('heartbeat_timeout', PRESENCE_HEARTBEAT_TIMEOUT))
+        except (TypeError, ValueError):
+            self.presence_timeouts[patient_id] = PRESENCE_HEARTBEAT_TIMEOUT
+        self.stats['presence_updates'] += 1
+        if retained:
+            self.stats['presence_retained'] += 1
+        origin = ", retido" if retained else ""
+        now = time.time()
+        
+        if status == 'online':
+            gateway = payload.get('gateway')
+            if gateway in self.offline_gateways and patient_id in self.offline_gateways[gateway]:
+                if retained:
+                    # Online retido de antes da queda do gateway (a ordem dos retidos não é garantida)
+                    return
+                self.offline_gateways[gateway].discard(patient_id)
+            self.patient_gateways[patient_id] = gateway
+            if patient_id not in self.online_patients or patient_id in self.offline_patients:
+                print(f"✅ PACIENTE ONLINE: {patient_id} (presença{origin})")
+                self.offline_patients.discard(patient_id)
+                self._record_connectivity(patient_id, self.ONLINE, now)
+            else:
+                update_device_presence(patient_id, self.ONLINE, now)
+            # O timeout de reserva conta a partir daqui
+            self.online_patients[patient_id] = now
+            return
+        
+        if patient_id in self.offline_patients:
+            return
+        last_seen = self.online_patients.get(patient_id, payload.get('created_at') or now)
+        reason = "conexão perdida, Last Will" if payload.get('reason') == 'lost' else "desconectou"
+        print(f"⚠️  PACIENTE OFFLINE: {patient_id} ({reason}{origin})")
+        self.offline_patients.add(patient_id)
+        self._record_connectivity(patient_id, self.OFFLINE, last_seen)
+    
+    def _process_gateway(self, gateway: str, payload: Dict, retained: bool):
+        """
+        Status de uma conexão de gateway: no 'offline' (Last Will ou
+        desconexão), ficam offline as pulseiras cuja última presença veio
+        por ela
+        
+        A lista do Will é a da última conexão do gateway (o broker só recebe
+        um Will novo ao conectar), então vale o mapa patient_gateways; a
+        lista só cobre as pulseiras ainda sem presença conhecida (retidos
+        chegam em qualquer ordem ao subscrever).
+        """
+        status = payload.get('status')
+        devices = payload.get('devices', [])
+        if status not in ('online', 'offline') or not isinstance(devices, list):
+            print(f"⚠️  Status inválido do gateway {gateway}: {status}")
+            return
+        self.stats['gateway_updates'] += 1
+        if status == 'online':
+            self.offline_gateways.pop(gateway, None)
+            print(f"📶 Gateway {gateway} online ({len(devices)} pulseiras)")
+            return
+        affected = {patient_id for patient_id, last_gateway in self.patient_gateways.items() if last_gateway == gateway}
+        affected.update(patient_id for patient_id in devices if patient_id not in self.patient_gateways)
+        self.offline_gateways[gateway] = affected
+        print(f"📶 Gateway {gateway} offline ({len(affected)} pulseiras)")
+        for patient_id in sorted(affected):
+            self._process_presence(patient_id, {
+                'status': 'offline',
+                'reason': payload.get('reason'),
+                'created_at': payload.get('created_at'),
+                'heartbeat_timeout': payload.get('heartbeat_timeout', PRESENCE_HEARTBEAT_TIMEOUT)
+            }, retained)
+    
+    def _load_summary_base(self, patient_id: str) -> Optional[Dict]:
+        """Último resumo salvo do paciente (base de delta após reiniciar o subscriber)"""
+        message = get_latest_summary(patient_id)
+        return get_message_data_as_dict(message) if message else None
+    
     def _save_medical_message(self, message_type: str, patient_id: str, data: Dict, qos: int):
         """Salva APENAS mensagens médicas (emergency + summary) em SQLite"""
         # Verificar se paciente existe no banco
@@ -290,6 +577,8 @@ class ElderCareSubscriber:
         )
         
         if message:
+            self._update_patient_state(patient_id, message_type, data)
+            
             # Log de sucesso
             if message_type == 'emergency':
                 alerts = data.get('alerts', [])
@@ -305,10 +594,14 @@ class ElderCareSubscriber:
         """Retorna estatísticas do subscriber"""
         uptime = datetime.now() - self.stats['start_time']
         online_count = len([p for p, t in self.online_patients.items() 
-                          if time.time() - t < self.heartbeat_timeout])
+                          if p not in self.offline_patients
+                          and time.time() - t < self.presence_timeouts.get(p, self.heartbeat_timeout)])
         
         return {
             **self.stats,
+            # Contados só no decodificador (protocol.delta)
+            'summary_deltas': self.summary_decoder.stats['deltas'],
+            'summary_missing_base': self.summary_decoder.stats['missing_base'],
             'uptime_seconds': int(uptime.total_seconds()),
             'patients_online': online_count,
             'total_patients': len(self.online_patients)
@@ -322,7 +615,11 @@ class ElderCareSubscriber:
         print(f"📨 Mensagens salvas no SQLite: {stats['messages_received']}")
         print(f"🚨 Emergências salvas: {stats['emergencies_received']}")
         print(f"📊 Resumos salvos: {stats['summaries_received']}")
+        print(f"🧩 Resumos delta reconstruídos: {stats['summary_deltas']} (sem base: {stats['summary_missing_base']})")
         print(f"💓 Heartbeats processados (não salvos): {stats['heartbeats_processed']}")
+        print(f"📦 Ciclos de leitura processados no servidor: {stats['readings_received']} (auditoria: {stats['readings_audited']})")
+        print(f"🗜️  Mensagens no formato compacto: {stats['compact_messages']}")
+        print(f"🧺 Lotes recebidos: {stats['batches_received']}")
         print(f"👥 Pacientes monitorados: {stats['total_patients']}")
         print(f"🟢 Pacientes online: {stats['patients_online']}")
 
@@ -0,0 +1,16 @@
+"""
+Gravação e reprodução de tráfego MQTT para benchmarks do subscriber e do banco.
+
+- recording.py: Formato binário append-only, gravador e leitura dos arquivos
+- replay.py: Reprodução no ritmo original, acelerada ou máxima, com vazão e latência
+
+Uso (a partir da pasta app):
+    python -m traffic record trafego.bin --duration 600
+    python -m traffic replay trafego.bin --register-patients --report resultados.jsonl
+"""
+
+from .recording import RecordedMessage, TrafficRecorder, iter_recording, read_recordings, record_from_broker
+from .replay import TrafficReplayer, subscriber_target, broker_target, format_report
+
+__all__ = ["RecordedMessage", "TrafficRecorder", "iter_recording", "read_recordings", "record_from_broker",
+           "TrafficReplayer", "subscriber_target", "broker_target", "format_report"]
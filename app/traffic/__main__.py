@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Gravação e reprodução de tráfego MQTT
+
+Uso (a partir da pasta app):
+    python -m traffic record trafego.bin [--duration 600]         # assina eldercare/# no broker
+    python -m simulator --devices 2000 --duration 300 --record trafego.bin
+    python -m traffic info trafego.bin
+    python -m traffic replay trafego.bin [--speed 10] [--register-patients] [--report resultados.jsonl]
+    python -m traffic replay trafego.bin --target broker --speed 1
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import time
+from collections import Counter
+from config.settings import MQTT_BROKER, MQTT_PORT
+from .recording import read_recordings, record_from_broker
+from .replay import TrafficReplayer, subscriber_target, broker_target, format_report
+
+def _speed(value: str):
+    return None if value == 'max' else float(value)
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description="Gravação e reprodução de tráfego MQTT")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record = commands.add_parser("record", help="Grava o tráfego do broker")
+    record.add_argument("path")
+    record.add_argument("--broker", default=MQTT_BROKER)
+    record.add_argument("--port", type=int, default=MQTT_PORT)
+    record.add_argument("--topic", default="eldercare/#")
+    record.add_argument("--duration", type=float, help="Segundos (default: até Ctrl+C)")
+
+    info = commands.add_parser("info", help="Resumo de uma gravação")
+    info.add_argument("paths", nargs="+")
+
+    replay = commands.add_parser("replay", help="Reproduz uma gravação e mede a ingestão")
+    replay.add_argument("paths", nargs="+", help="Arquivos (vários são intercalados pelo instante)")
+    replay.add_argument("--speed", type=_speed, default=None,
+                        help="1 = ritmo gravado, N = N vezes mais rápido, max = sem esperas (default)")
+    replay.add_argument("--target", choices=("subscriber", "broker"), default="subscriber")
+    replay.add_argument("--broker", default=MQTT_BROKER)
+    replay.add_argument("--port", type=int, default=MQTT_PORT)
+    replay.add_argument("--register-patients", action="store_true",
+                        help="Cadastra os pacientes da gravação que não existem no banco")
+    replay.add_argument("--report", help="Acrescenta o relatório (JSON, uma linha) a este arquivo")
+    replay.add_argument("--verbose", action="store_true", help="Mostra os logs do subscriber")
+    return parser.parse_args()
+
+def _patient_ids(paths):
+    return sorted({m.topic.split('/')[2] for m in read_recordings(paths) if m.topic.count('/') == 2})
+
+def _info(paths):
+    types, sizes = Counter(), Counter()
+    first = last = None
+    for message in read_recordings(paths):
+        first = message.timestamp if first is None else first
+        last = message.timestamp
+        types[message.message_type] += 1
+        sizes[message.message_type] += len(message.payload)
+    file_bytes = sum(os.path.getsize(path) for path in paths)
+    total = sum(types.values())
+    print(f"📼 {', '.join(paths)}: {total:,} mensagens em {(last - first) if total else 0:.0f}s, "
+          f"{file_bytes / 2**20:.1f} MiB em disco ({len(_patient_ids(paths)):,} pacientes)")
+    for message_type, count in types.most_common():
+        print(f"   {message_type:<12} {count:>10,} mensagens {sizes[message_type] / 2**20:>8.1f} MiB")
+
+def _register_patients(paths):
+    from database import create_database, create_patient, get_patient
+    created = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        create_database()
+        for patient_id in _patient_ids(paths):
+            if not get_patient(patient_id) and create_patient(patient_id, f"Paciente {patient_id}"):
+                created += 1
+    print(f"👤 {created} paciente(s) cadastrado(s)")
+
+def _replay(args):
+    replayer = TrafficReplayer(read_recordings(args.paths), speed=args.speed)
+    if args.target == 'broker':
+        from simulator.connections import MqttConnection
+        connection = MqttConnection(f"eldercare_replay_{int(time.time())}", args.broker, args.port)
+        connection.connect()
+        deadline = time.time() + 5
+        while not connection.is_connected and time.time() < deadline:
+            time.sleep(0.1)
+        if not connection.is_connected:
+            connection.close()
+            print(f"❌ Sem conexão com o broker {args.broker}:{args.port}")
+            return None
+        try:
+            return replayer.replay(broker_target(connection))
+        finally:
+            connection.close()
+
+    from subscriber.subscriber import ElderCareSubscriber
+    with contextlib.nullcontext() if args.verbose else contextlib.redirect_stdout(io.StringIO()):
+        subscriber = ElderCareSubscriber()
+        report = replayer.replay(subscriber_target(subscriber))
+        t0 = time.perf_counter()
+        subscriber._flush_readings()
+        report['flush_seconds'] = time.perf_counter() - t0
+        report['subscriber'] = {key: value for key, value in subscriber.stats.items() if key != 'start_time'}
+    return report
+
+def main():
+    args = _parse_args()
+    try:
+        if args.command == 'record':
+            count = record_from_broker(args.path, args.broker, args.port, args.topic, args.duration)
+            print(f"💾 {count:,} mensagens gravadas em {args.path}")
+        elif args.command == 'info':
+            _info(args.paths)
+        else:
+            if args.register_patients:
+                _register_patients(args.paths)
+            report = _replay(args)
+            if report is None:
+                return
+            print(format_report(report))
+            if args.report:
+                entry = {'recorded_at': time.time(), 'paths': args.paths, 'target': args.target, **report}
+                with open(args.report, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry) + "\n")
+                print(f"📝 Relatório acrescentado a {args.report}")
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Gravação de tráfego MQTT em arquivo binário (append-only)
+
+Formato (little-endian):
+- cabeçalho: magic b'EMTR', versão (u8), instante de início (f64)
+- registros: deslocamento em microssegundos desde o início (u64), flags (u8:
+  bits 0-1 QoS, bit 2 retain, bit 3 tópico novo), id do tópico (u32) e
+  tamanho do payload (u32); se o tópico é novo, segue o nome (u16 + UTF-8);
+  depois o payload.
+
+Os tópicos se repetem muito (eldercare/<tipo>/<paciente>), então cada um
+é gravado uma vez só e os registros seguintes usam o id. Um registro
+incompleto no fim do arquivo (processo interrompido) é descartado ao ler
+e ao reabrir o arquivo para continuar gravando.
+"""
+
+import heapq
+import os
+import struct
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+import paho.mqtt.client as mqtt
+
+MAGIC = b'EMTR'
+VERSION = 1
+_HEADER = struct.Struct('<4sBd')
+_RECORD = struct.Struct('<QBII')
+_TOPIC = struct.Struct('<H')
+
+_QOS_MASK = 0x03
+_RETAIN = 0x04
+_NEW_TOPIC = 0x08
+
+
+class RecordedMessage:
+    """Mensagem gravada (mesmos atributos de um paho MQTTMessage: topic, payload, qos, retain)"""
+
+    __slots__ = ('timestamp', 'topic', 'payload', 'qos', 'retain')
+
+    def __init__(self, timestamp: float, topic: str, payload: bytes, qos: int = 0, retain: bool = False):
+        self.timestamp = timestamp
+        self.topic = topic
+        self.payload = payload
+        self.qos = qos
+        self.retain = retain
+
+    @property
+    def message_type(self) -> str:
+        """Segundo nível do tópico (emergency, summary, heartbeat, readings...)"""
+        parts = self.topic.split('/')
+        return parts[1] if len(parts) > 1 else self.topic
+
+
+class TrafficRecorder:
+    """
+    Grava mensagens em um arquivo de tráfego (seguro entre threads)
+
+    Args:
+        path: Arquivo de saída; se já existir, a gravação continua no fim dele
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.topics: Dict[str, int] = {}
+        self.messages = 0
+        self._lock = threading.Lock()
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            self.started_at, self.topics, end = _scan(path)
+            self._file = open(path, 'r+b')
+            self._file.truncate(end)
+            self._file.seek(end)
+        else:
+            self.started_at = time.time()
+            self._file = open(path, 'wb')
+            self._file.write(_HEADER.pack(MAGIC, VERSION, self.started_at))
+
+    def record(self, topic: str, payload: bytes, qos: int = 0, retain: bool = False,
+               timestamp: Optional[float] = None):
+        """Acrescenta uma mensagem (timestamp default: agora)"""
+        if isinstance(payload, str):
+            payload = payload.encode()
+        offset = max(0, int(((time.time() if timestamp is None else timestamp) - self.started_at) * 1e6))
+        flags = (qos & _QOS_MASK) | (_RETAIN if retain else 0)
+        with self._lock:
+            if self._file is None:
+                return
+            topic_id = self.topics.get(topic)
+            name = b''
+            if topic_id is None:
+                topic_id = self.topics[topic] = len(self.topics)
+                encoded = topic.encode()
+                name = _TOPIC.pack(len(encoded)) + encoded
+                flags |= _NEW_TOPIC
+            self._file.write(_RECORD.pack(offset, flags, topic_id, len(payload)) + name + payload)
+            self.messages += 1
+
+    def on_message(self, client, userdata, msg):
+        """Callback do paho: grava o que o cliente receber"""
+        self.record(msg.topic, msg.payload, msg.qos, msg.retain)
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def _read_header(f, path: str) -> float:
+    header = f.read(_HEADER.size)
+    if len(header) < _HEADER.size:
+        raise ValueError(f"Arquivo de tráfego truncado: {path}")
+    magic, version, started_at = _HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ValueError(f"Não é um arquivo de tráfego: {path}")
+    if version != VERSION:
+        raise ValueError(f"Versão de arquivo de tráfego não suportada: {version}")
+    return started_at
+
+
+def _iter_records(f, started_at: float, topics: List[str], with_payload: bool = True):
+    """(posição final, mensagem) de cada registro completo"""
+    while True:
+        head = f.read(_RECORD.size)
+        if len(head) < _RECORD.size:
+            return
+        offset, flags, topic_id, size = _RECORD.unpack(head)
+        name = None
+        if flags & _NEW_TOPIC:
+            raw = f.read(_TOPIC.size)
+            if len(raw) < _TOPIC.size:
+                return
+            length = _TOPIC.unpack(raw)[0]
+            name = f.read(length)
+            if len(name) < length:
+                return
+            if topic_id != len(topics):
+                raise ValueError(f"Arquivo de tráfego corrompido (tópico {topic_id} fora de ordem)")
+        elif topic_id >= len(topics):
+            raise ValueError(f"Arquivo de tráfego corrompido (tópico {topic_id} desconhecido)")
+        if with_payload:
+            payload = f.read(size)
+            if len(payload) < size:
+                return
+        else:
+            payload = None
+            end = f.seek(size, os.SEEK_CUR)
+            if end > os.fstat(f.fileno()).st_size:
+                return
+        if name is not None:
+            topics.append(name.decode())
+        yield f.tell(), RecordedMessage(started_at + offset / 1e6, topics[topic_id], payload,
+                                        flags & _QOS_MASK, bool(flags & _RETAIN))
+
+
+def _scan(path: str):
+    """Início, tópicos e fim do último registro completo (para continuar a gravação)"""
+    topics: List[str] = []
+    with open(path, 'rb') as f:
+        started_at = _read_header(f, path)
+        end = f.tell()
+        for end, _ in _iter_records(f, started_at, topics, with_payload=False):
+            pass
+    return started_at, {topic: i for i, topic in enumerate(topics)}, end
+
+
+def iter_recording(path: str) -> Iterator[RecordedMessage]:
+    """Mensagens de um arquivo, na ordem gravada"""
+    with open(path, 'rb') as f:
+        started_at = _read_header(f, path)
+        for _, message in _iter_records(f, started_at, []):
+            yield message
+
+
+def read_recordings(paths: List[str]) -> Iterator[RecordedMessage]:
+    """Mensagens de vários arquivos (ex.: um por processo do simulador), intercaladas pelo instante"""
+    if len(paths) == 1:
+        return iter_recording(paths[0])
+    return heapq.merge(*(iter_recording(path) for path in paths), key=lambda m: m.timestamp)
+
+
+def record_from_broker(path: str, broker: str, port: int, topic: str = "eldercare/#",
+                       duration: Optional[float] = None) -> int:
+    """
+    Assina topic no broker e grava tudo até duration segundos (ou Ctrl+C)
+
+    Returns:
+        Mensagens gravadas
+    """
+    recorder = TrafficRecorder(path)
+    client = mqtt.Client(callback_api_version=mqtt.CallbackAPIVersion.VERSION2,
+                         client_id=f"eldercare_recorder_{int(time.time())}")
+    client.on_message = recorder.on_message
+    client.on_connect = lambda c, userdata, flags, reason_code, properties: c.subscribe(topic, qos=2)
+    try:
+        client.connect(broker, port, 60)
+    except Exception as e:
+        recorder.close()
+        print(f"❌ Erro ao conectar ao broker {broker}:{port}: {e}")
+        return 0
+
+    print(f"🎙️ Gravando {topic} de {broker}:{port} em {path}" + (f" por {duration:.0f}s" if duration else ""))
+    client.loop_start()
+    deadline = time.time() + duration if duration else None
+    try:
+        while deadline is None or time.time() < deadline:
+            time.sleep(1)
+            recorder.flush()
+    except KeyboardInterrupt:
+        print("\n🛑 Gravação interrompida pelo usuário")
+    finally:
+        client.disconnect()
+        client.loop_stop()
+        recorder.close()
+    return recorder.messages
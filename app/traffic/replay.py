@@ -0,0 +1,132 @@
+"""
+Reprodução de tráfego gravado
+
+O TrafficReplayer entrega as mensagens de uma gravação a um destino (o
+_on_message do ElderCareSubscriber, direto, ou um broker MQTT), no ritmo
+original, acelerado (speed=N) ou o mais rápido possível (speed=None), e
+mede vazão e latência de cada entrega. Com a mesma gravação a entrada é
+idêntica a cada execução, então o relatório pode ser comparado entre
+versões para encontrar regressões.
+"""
+
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Iterable, List, Optional
+from .recording import RecordedMessage
+
+
+def _percentiles(values: List[float]) -> Dict:
+    """p50/p95/p99/máximo em milissegundos"""
+    if not values:
+        return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0, 'max': 0.0}
+    values = sorted(values)
+    last = len(values) - 1
+    return {
+        'p50': values[int(last * 0.50)] * 1000,
+        'p95': values[int(last * 0.95)] * 1000,
+        'p99': values[int(last * 0.99)] * 1000,
+        'max': values[-1] * 1000,
+    }
+
+
+class TrafficReplayer:
+    """
+    Entrega mensagens gravadas medindo cada entrega
+
+    Args:
+        messages: Mensagens em ordem de instante (recording.read_recordings)
+        speed: 1.0 = ritmo original, N = N vezes mais rápido, None = sem esperas
+    """
+
+    def __init__(self, messages: Iterable[RecordedMessage], speed: Optional[float] = None):
+        if speed is not None and speed <= 0:
+            raise ValueError("speed deve ser positivo (ou None para a velocidade máxima)")
+        self.messages = messages
+        self.speed = speed
+
+    def replay(self, deliver: Callable[[RecordedMessage], None]) -> Dict:
+        """
+        Entrega todas as mensagens a deliver
+
+        Returns:
+            Relatório: mensagens, bytes, duração, vazão, latência por entrega
+            (total e por tipo) e atraso em relação ao horário previsto
+        """
+        latencies = defaultdict(list)    # {tipo: [segundos por entrega]}
+        sizes = defaultdict(int)
+        lags = []
+        first_timestamp = last_timestamp = None
+        perf = time.perf_counter
+        started = perf()
+        for message in self.messages:
+            if first_timestamp is None:
+                first_timestamp = message.timestamp
+            last_timestamp = message.timestamp
+            if self.speed is not None:
+                due = started + (message.timestamp - first_timestamp) / self.speed
+                wait = due - perf()
+                if wait > 0:
+                    time.sleep(wait)
+                lags.append(max(0.0, perf() - due))
+            t0 = perf()
+            deliver(message)
+            message_type = message.message_type
+            latencies[message_type].append(perf() - t0)
+            sizes[message_type] += len(message.payload)
+        seconds = perf() - started
+
+        count = sum(len(values) for values in latencies.values())
+        total_bytes = sum(sizes.values())
+        return {
+            'messages': count,
+            'bytes': total_bytes,
+            'recorded_seconds': (last_timestamp - first_timestamp) if count else 0.0,
+            'seconds': seconds,
+            'speed': self.speed,
+            'messages_per_second': count / seconds if seconds > 0 else 0.0,
+            'mb_per_second': total_bytes / 2**20 / seconds if seconds > 0 else 0.0,
+            'latency_ms': _percentiles([v for values in latencies.values() for v in values]),
+            'schedule_lag_ms': _percentiles(lags) if self.speed is not None else None,
+            'by_type': {
+                message_type: {'messages': len(values), 'bytes': sizes[message_type],
+                               'latency_ms': _percentiles(values)}
+                for message_type, values in sorted(latencies.items())
+            },
+        }
+
+
+def subscriber_target(subscriber) -> Callable[[RecordedMessage], None]:
+    """Entrega direto no callback do ElderCareSubscriber (sem broker)"""
+    def deliver(message: RecordedMessage):
+        subscriber._on_message(None, None, message)
+    return deliver
+
+
+def broker_target(connection) -> Callable[[RecordedMessage], None]:
+    """Publica no broker pela conexão (simulator.connections.MqttConnection)"""
+    def deliver(message: RecordedMessage):
+        connection.publish(message.topic, message.payload, message.qos, message.retain)
+    return deliver
+
+
+def format_report(report: Dict) -> str:
+    """Relatório legível (mesmos números do dict)"""
+    latency = report['latency_ms']
+    speed = 'máxima' if report['speed'] is None else f"{report['speed']:g}x"
+    lines = [
+        f"📊 === REPRODUÇÃO ({report['messages']:,} mensagens, velocidade {speed}) ===",
+        f"Gravação: {report['recorded_seconds']:.1f}s | reprodução: {report['seconds']:.2f}s",
+        f"Vazão: {report['messages_per_second']:,.0f} msgs/s ({report['mb_per_second']:.2f} MiB/s)",
+        f"Latência por mensagem: p50 {latency['p50']:.3f} ms | p95 {latency['p95']:.3f} ms | "
+        f"p99 {latency['p99']:.3f} ms | máx {latency['max']:.1f} ms",
+    ]
+    if report['schedule_lag_ms'] is not None:
+        lag = report['schedule_lag_ms']
+        lines.append(f"Atraso em relação ao ritmo gravado: p99 {lag['p99']:.1f} ms | máx {lag['max']:.1f} ms")
+    lines.append(f"\n{'tipo':<12} {'mensagens':>10} {'KiB':>10} {'p50 ms':>8} {'p99 ms':>8}")
+    for message_type, stats in report['by_type'].items():
+        lines.append(f"{message_type:<12} {stats['messages']:>10,} {stats['bytes'] / 1024:>10,.0f} "
+                     f"{stats['latency_ms']['p50']:>8.3f} {stats['latency_ms']['p99']:>8.3f}")
+    if 'flush_seconds' in report:
+        lines.append(f"\nProcessamento das leituras brutas pendentes no fim: {report['flush_seconds'] * 1000:.0f} ms")
+    return "\n".join(lines)